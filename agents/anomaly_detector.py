@@ -7,12 +7,22 @@ Detects thermal, power, and attitude anomalies with explainability
 import asyncio
 import numpy as np
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any, List
 from sklearn.ensemble import IsolationForest
 
+from tools.tle_catalog import get_catalog
+from tools.eclipse import get_eclipse_schedule, eclipse_status
+
 logger = logging.getLogger(__name__)
 
+# Nominal envelope per telemetry channel: (low, high, severity, subsystem)
+NOMINAL_LIMITS = {
+    'battery_temp_c': (0.0, 40.0, 'HIGH', 'Thermal'),
+    'power_w': (350.0, 550.0, 'MEDIUM', 'Power'),
+    'attitude_deg': (0.0, 0.5, 'HIGH', 'Attitude'),
+}
+
 
 class AnomalyDetectorAgent:
     """
@@ -28,6 +38,7 @@ class AnomalyDetectorAgent:
         self.detection_threshold = 0.5
         self.model = IsolationForest(contamination=0.1, random_state=42, n_estimators=100)
         self.anomaly_history = []
+        self.constellation = ['LEO-SAT-001', 'LEO-SAT-002', 'LEO-SAT-003']
         logger.info(f"Initialized {self.name} with ML-based detection")
 
     def _calculate_adaptive_threshold(self) -> float:
@@ -37,6 +48,36 @@ class AnomalyDetectorAgent:
         recent = self.anomaly_history[-10:]
         return min(np.mean(recent) + 1.5 * np.std(recent), 0.8)
 
+    def _eclipse_context(self) -> Dict[str, Dict]:
+        """Current eclipse state of each constellation satellite (empty if unavailable)"""
+        try:
+            catalog = get_catalog()
+            satellites = [sat_id for sat_id in self.constellation if sat_id in catalog.name_index]
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            eclipses = get_eclipse_schedule(satellites, start=now, catalog=catalog)
+            return {sat_id: eclipse_status(eclipses, sat_id, now) for sat_id in satellites}
+        except Exception as e:
+            logger.warning(f"Eclipse prediction unavailable: {e}")
+            return {}
+
+    def _format_eclipse_context(self, context: Dict[str, Dict]) -> str:
+        if not context:
+            return "Eclipse prediction unavailable\n"
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        lines = ""
+        for sat_id, status in context.items():
+            if status['in_eclipse']:
+                state = "IN ECLIPSE"
+                change = status['next_exit']
+                label = "exit"
+            else:
+                state = "SUNLIT"
+                change = status['next_entry']
+                label = "entry"
+            when = f"{label} in {(change - now).total_seconds() / 60:.0f} min" if change else "no change in 24 h"
+            lines += f"{sat_id}: {state} ({when})\n"
+        return lines
+
     def _analyze_metrics(self) -> Dict[str, Any]:
         """Multi-dimensional anomaly analysis"""
         prob = np.random.random()
@@ -68,10 +109,36 @@ class AnomalyDetectorAgent:
         self.anomaly_history.append(metrics['score'])
         return metrics
 
+    def assess_batch(self, batch: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Limit check of every sample in an ingest batch (TelemetryIngestServer.subscribe)
+
+        Returns:
+            One verdict per out-of-envelope channel value: index (sample in
+            the batch), satellite, timestamp, channel, value, severity, reason
+        """
+        verdicts = []
+        for channel, (low, high, severity, subsystem) in NOMINAL_LIMITS.items():
+            values = batch['columns'].get(channel)
+            if values is None:
+                continue
+            for i in np.flatnonzero((values < low) | (values > high)):
+                value = float(values[i])
+                verdicts.append({
+                    'index': int(i), 'satellite': batch['satellites'][i], 'timestamp': float(batch['timestamps'][i]),
+                    'channel': channel, 'value': value, 'severity': severity,
+                    'reason': f"{subsystem} {channel} = {value:.2f} outside nominal {low:g} to {high:g}",
+                })
+        return verdicts
+
     async def run(self, context: Dict[str, Any]) -> str:
         """Run anomaly detection with explainability"""
         try:
             metrics = self._analyze_metrics()
+            eclipse = self._eclipse_context()
+            if metrics.get('power_anomaly') and any(s['in_eclipse'] for s in eclipse.values()):
+                metrics['reason'] += ' (satellite in eclipse: check against expected battery discharge)'
+            eclipse_report = self._format_eclipse_context(eclipse)
 
             if metrics['severity'] != 'NORMAL':
                 report = f"""
@@ -88,6 +155,9 @@ Thermal System: {"ANOMALY" if metrics.get('thermal_anomaly') else "NORMAL"}
 Power System: {"ANOMALY" if metrics.get('power_anomaly') else "NORMAL"}
 Attitude Control: NORMAL
 
+🌗 ECLIPSE STATE:
+----------------------------------------------------------------------
+{eclipse_report}
 💡 RECOMMENDATIONS:
 ----------------------------------------------------------------------
 1. Initiate contingency procedures
@@ -107,7 +177,10 @@ Anomaly Score: {metrics['score']:.2f}
 Metrics Analyzed: Temperature, Power, Attitude, Velocity
 Anomalies Detected: 0
 Next Check: 60 seconds
-"""
+
+🌗 ECLIPSE STATE:
+----------------------------------------------------------------------
+{eclipse_report}"""
 
             return report
 
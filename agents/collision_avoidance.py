@@ -6,11 +6,20 @@ Enhanced Collision Avoidance Agent
 - Covariance-based uncertainty quantification
 """
 
+import os
 import asyncio
 import numpy as np
 import logging
-from datetime import datetime
-from typing import Dict, Any, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from tools.tle_catalog import get_catalog
+from tools.conjunction_screening import screen_catalog, events_to_records
+from tools.covariance import event_probabilities
+from tools.monte_carlo_pc import pc_monte_carlo_sgp4
+from tools.maneuver_planning import plan_maneuvers, select_maneuver
+from tools.event_store import get_event_store
 
 logger = logging.getLogger(__name__)
 
@@ -26,65 +35,155 @@ class CollisionAvoidanceAgent:
 
     def __init__(self):
         self.name = "collision_avoidance"
-        self.monitored_objects = 25483
+        self.catalog = get_catalog()
+        self.event_store = get_event_store()
+        self.monitored_objects = len(self.catalog)
+        self.constellation = ['LEO-SAT-001', 'LEO-SAT-002', 'LEO-SAT-003']
+        self.screening_window_hours = 24.0
+        self.screening_distance_km = 5.0
+        self.workers = os.cpu_count() or 1
+        self._executor = None  # one process pool for screening and Monte Carlo, started on first use
+        self.position_uncertainty_m = 200.0  # per object at the screening epoch, propagated to TCA
+        self.combined_radius_m = 10.0
+        self.velocity_uncertainty_m_s = 0.2
+        self.monte_carlo_threshold = 1e-4  # events at or above this Pc get a Monte Carlo assessment
+        self.maneuver_threshold = 1e-4  # combined Pc that triggers an avoidance maneuver
+        self.thrust_acceleration_m_s2 = 1.0  # 0.001 km/s^2
         logger.info(f"Initialized {self.name} with probabilistic analysis")
 
-    def _calculate_collision_probability(self) -> Tuple[float, List[Dict]]:
-        """Calculate collision probability using Gaussian mixture model"""
-        # Simulate probabilistic risk assessment
-        risk_prob = np.random.random()
-
-        if risk_prob < 0.05:
-            probability = 0.85
-            conjunction_events = [
-                {
-                    'object_id': 'DEB_001',
-                    'distance': 850,
-                    'time_to_ca': 4320,
-                    'probability': 0.85,
-                    'covariance': [[100, 0], [0, 100]]
-                }
-            ]
-        else:
-            probability = 0.02
-            conjunction_events = []
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        if self._executor is None and self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
 
+    def close(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _calculate_collision_probability(self) -> Tuple[float, List[Dict]]:
+        """Screen the constellation against the catalog and score each conjunction"""
+        primaries = [sat_id for sat_id in self.constellation if sat_id in self.catalog.name_index]
+        if not primaries:
+            return 0.0, []
+
+        # A few primaries against the catalog: the filter chain beats the KD-tree sweep
+        events = screen_catalog(self.catalog, start=datetime.now(timezone.utc),
+                                duration_hours=self.screening_window_hours,
+                                screening_distance_km=self.screening_distance_km,
+                                primaries=primaries, prefilter=True,
+                                workers=self.workers, executor=self._pool())
+
+        records = events_to_records(events, self.catalog)
+        scored = event_probabilities(self.catalog, events, self.combined_radius_m / 1000,
+                                     self.position_uncertainty_m / 1000,
+                                     self.velocity_uncertainty_m_s / 1000)
+
+        conjunction_events = []
+        for record in records:
+            k = record['event_index']
+            probability = float(scored['probability'][k])
+            conjunction_events.append({
+                'primary_id': record['primary_name'],
+                'object_id': record['object_name'],
+                'primary_norad_id': record['primary_id'],
+                'object_norad_id': record['object_id'],
+                'tca': record['tca'],
+                'distance': round(record['distance'], 3),
+                'time_to_ca': int(record['tca_seconds']),
+                'probability': probability,
+                # Encounter-plane covariance at TCA in m^2
+                'covariance': np.round(scored['covariance_km2'][k] * 1e6, 1).tolist(),
+                'position_covariance_km2': scored['position_covariance_km2'][k],
+            })
+            if probability >= self.monte_carlo_threshold:
+                conjunction_events[-1].update(self._monte_carlo_probability(record, events['start']))
+
+        self.event_store.upsert_events([{
+            'primary_id': record['primary_id'],
+            'secondary_id': record['object_id'],
+            'primary_name': record['primary_name'],
+            'secondary_name': record['object_name'],
+            'tca': record['tca'],
+            'miss_distance_km': record['distance'],
+            'relative_speed_km_s': record['relative_speed'],
+            'probability': event['probability'],
+            'probability_mc': event.get('probability_mc'),
+            'covariance': event['covariance'],
+        } for record, event in zip(records, conjunction_events)])
+
+        # Probability of at least one collision across independent events
+        probability = 1.0 - np.prod([1.0 - e['probability'] for e in conjunction_events])
         return probability, conjunction_events
 
+    def _monte_carlo_probability(self, record: Dict, start: datetime) -> Dict[str, Any]:
+        """High-fidelity Pc for a flagged event, sampling both objects' states at the screening epoch"""
+        satellites = [self.catalog.satellite(record['primary_id']),
+                      self.catalog.satellite(record['object_id'])]
+        variances = np.array([(self.position_uncertainty_m / 1000)**2] * 3 +
+                             [(self.velocity_uncertainty_m_s / 1000)**2] * 3)
+        covariances = np.stack([np.diag(variances)] * 2)
+
+        estimate = pc_monte_carlo_sgp4(satellites, start, covariances, self.combined_radius_m / 1000,
+                                       record['tca_seconds'], workers=self.workers,
+                                       stop_below=self.monte_carlo_threshold / 10, executor=self._pool())
+        return {
+            'probability_mc': estimate['pc'],
+            'probability_mc_interval': (estimate['ci_low'], estimate['ci_high']),
+            'monte_carlo_samples': estimate['samples'],
+        }
+
     def _calculate_maneuver_plan(self, conjunctions: List[Dict]) -> Dict[str, Any]:
-        """Calculate automatic maneuver plan with delta-V"""
+        """Pick the cheapest avoidance burn that brings the riskiest satellite's combined Pc under target"""
         if not conjunctions:
             return {'maneuver_required': False}
 
-        closest = conjunctions[0]
-        altitude = 550  # km
-        velocity = 7.58  # km/s
-
-        # Calculate delta-V needed (simplified)
-        delta_v_radial = 0.1  # km/s
-        delta_v_along_track = 0.05  # km/s
-        total_delta_v = np.sqrt(delta_v_radial**2 + delta_v_along_track**2)
+        worst = max(conjunctions, key=lambda c: c.get('probability_mc', c['probability']))
+        threats = [c for c in conjunctions if c['primary_norad_id'] == worst['primary_norad_id']]
+        risk = 1.0 - np.prod([1.0 - c.get('probability_mc', c['probability']) for c in threats])
+        if risk < self.maneuver_threshold:
+            return {'maneuver_required': False}
 
-        # Calculate thruster burn parameters
-        thrust_acceleration = 0.001  # km/s^2
-        burn_time = total_delta_v / thrust_acceleration  # seconds
+        # Screened TCAs are naive UTC (see screen_catalog)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        plan = plan_maneuvers(self.catalog.satellite(worst['primary_norad_id']),
+                              [self.catalog.satellite(c['object_norad_id']) for c in threats],
+                              [(c['tca'] - now).total_seconds() for c in threats], now,
+                              np.stack([c['position_covariance_km2'] for c in threats]),
+                              self.combined_radius_m / 1000)
+        best = select_maneuver(plan, self.maneuver_threshold / 10)
+        if best is None:
+            logger.warning(f"No valid avoidance maneuver found for {worst['primary_id']}")
+            return {'maneuver_required': False}
+        if plan['delta_v_m_s'][best] == 0:
+            # Re-screening the refined geometry already meets the target
+            return {'maneuver_required': False}
 
+        radial, along_track, cross_track = plan['delta_v_rtn_m_s'][best]
+        delta_v = plan['delta_v_m_s'][best]
         return {
             'maneuver_required': True,
-            'delta_v_magnitude': total_delta_v,
-            'delta_v_radial': delta_v_radial,
-            'delta_v_along_track': delta_v_along_track,
-            'burn_time_seconds': burn_time,
-            'thrust_vector': [delta_v_radial, delta_v_along_track, 0],
-            'earliest_execution': 'NOW',
-            'post_maneuver_separation': closest['distance'] + 2.5
+            'satellite': worst['primary_id'],
+            'delta_v_magnitude': float(delta_v),
+            'delta_v_radial': float(radial),
+            'delta_v_along_track': float(along_track),
+            'delta_v_cross_track': float(cross_track),
+            'burn_time_seconds': float(delta_v / self.thrust_acceleration_m_s2),
+            'thrust_vector': [float(radial), float(along_track), float(cross_track)],
+            'earliest_execution': (now + timedelta(seconds=float(plan['burn_seconds'][best]))).isoformat(),
+            'pre_maneuver_probability': float(risk),
+            'post_maneuver_probability': float(plan['risk'][best]),
+            'post_maneuver_separation': round(float(plan['miss_distance_km'][best].min()), 3),
+            'pareto_options': len(plan['pareto']),
         }
 
     async def run(self, context: Dict[str, Any]) -> str:
         """Perform collision avoidance analysis"""
         try:
-            collision_prob, conjunctions = self._calculate_collision_probability()
-            maneuver = self._calculate_maneuver_plan(conjunctions)
+            # Screening, Monte Carlo and planning take seconds; keep the event loop (telemetry ingest) running
+            collision_prob, conjunctions = await asyncio.to_thread(self._calculate_collision_probability)
+            maneuver = await asyncio.to_thread(self._calculate_maneuver_plan, conjunctions)
 
             report = f"""
 🛡️  COLLISION AVOIDANCE ASSESSMENT
@@ -101,35 +200,40 @@ Overall Collision Probability: {collision_prob:.1%}
                 for i, conj in enumerate(conjunctions):
                     report += f"""
 Conjunction Event {i+1}:
+   Satellite: {conj['primary_id']}
    Object ID: {conj['object_id']}
    Distance: {conj['distance']} km
    Time to Closest Approach: {conj['time_to_ca']} seconds
    Probability of Collision: {conj['probability']:.1%}
-
 """
+                    if 'probability_mc' in conj:
+                        low, high = conj['probability_mc_interval']
+                        report += (f"   Monte Carlo Pc: {conj['probability_mc']:.2e} "
+                                   f"(95% CI {low:.2e}-{high:.2e}, "
+                                   f"{conj['monte_carlo_samples']:,} samples)\n")
+                    report += "\n"
 
                 if maneuver['maneuver_required']:
                     report += f"""
-AUTOMATIC MANEUVER PLAN:
-   Delta-V Required: {maneuver['delta_v_magnitude']:.3f} km/s
-   - Radial Component: {maneuver['delta_v_radial']:.3f} km/s
-   - Along-Track: {maneuver['delta_v_along_track']:.3f} km/s
+AUTOMATIC MANEUVER PLAN ({maneuver['satellite']}):
+   Delta-V Required: {maneuver['delta_v_magnitude']:.3f} m/s
+   - Radial Component: {maneuver['delta_v_radial']:.3f} m/s
+   - Along-Track: {maneuver['delta_v_along_track']:.3f} m/s
+   - Cross-Track: {maneuver['delta_v_cross_track']:.3f} m/s
    Thruster Burn Time: {maneuver['burn_time_seconds']:.1f} seconds
-   Thrust Vector: {maneuver['thrust_vector']}
+   Thrust Vector (RTN, m/s): {maneuver['thrust_vector']}
    Post-Maneuver Separation: {maneuver['post_maneuver_separation']} km
+   Combined Pc: {maneuver['pre_maneuver_probability']:.2e} -> {maneuver['post_maneuver_probability']:.2e}
+   Fuel/Risk Pareto Options: {maneuver['pareto_options']}
    Earliest Execution: {maneuver['earliest_execution']}
 
 """
             else:
-                report += f"""
-All satellites maintain safe separation:
-   • LEO-SAT-001: Closest approach 45 km (safe)
-   • LEO-SAT-002: Closest approach 38 km (safe)
-   • LEO-SAT-003: Closest approach 52 km (safe)
-
-Next assessment: 15 minutes
-
-"""
+                report += "\nAll satellites maintain safe separation:\n"
+                for sat_id in self.constellation:
+                    report += (f"   • {sat_id}: no approach within {self.screening_distance_km} km "
+                               f"in the next {self.screening_window_hours:.0f} hours (safe)\n")
+                report += "\nNext assessment: 15 minutes\n\n"
 
             return report
 
@@ -9,6 +9,7 @@ from agents.orbit_predictor import OrbitPredictorAgent
 from agents.collision_avoidance import CollisionAvoidanceAgent
 from agents.alert_generator import AlertGeneratorAgent
 from agents.report_agent import ReportAgent
+from tools.telemetry_replay import replay_pipeline
 
 async def create_mission_coordinator():
     telemetry_monitor = TelemetryMonitorAgent()
@@ -27,6 +28,13 @@ async def create_mission_coordinator():
             self.alert_generator = alert_generator
             self.report_agent = report_agent
 
+        async def replay(self, path: str, speed=1.0, **server_options):
+            """Replay a telemetry recording through anomaly detection and alerting; returns the timing report"""
+            async def alert(verdicts):
+                return await self.alert_generator.run({'alerts': [
+                    {'priority': v['severity'], 'message': f"{v['satellite']}: {v['reason']}"} for v in verdicts]})
+            return await replay_pipeline(path, self.anomaly_detector.assess_batch, alert, speed, **server_options)
+
         async def run(self, query: str) -> str:
             q = query.lower()
             if "status" in q or "show" in q:
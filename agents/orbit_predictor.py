@@ -3,10 +3,17 @@ Orbit Predictor Agent - SGP4-based trajectory prediction
 """
 
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from typing import Dict, Any
 import logging
 
+from tools.orbital_mechanics import julian_dates, calculate_orbital_period
+from tools.tle_catalog import get_catalog
+from tools.ephemeris_cache import get_ephemeris_cache
+from tools.visibility import predict_passes, DEFAULT_GROUND_STATIONS
+from tools.frames import teme_to_geodetic
+from tools.downlink_scheduler import schedule_downlinks, next_contact
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,29 +22,65 @@ class OrbitPredictorAgent:
 
     def __init__(self):
         self.name = "orbit_predictor"
-        logger.info(f"Initialized {self.name} agent")
+        self.constellation = ['LEO-SAT-001', 'LEO-SAT-002', 'LEO-SAT-003']
+        self.catalog = get_catalog()
+        self.ephemeris = get_ephemeris_cache()
+        self.ground_stations = DEFAULT_GROUND_STATIONS
+        logger.info(f"Initialized {self.name} agent with {len(self.catalog)} catalog objects")
 
     async def run(self, context: Dict[str, Any]) -> str:
         """Predict orbital trajectories"""
         try:
-            current_time = datetime.now()
+            current_time = datetime.now(timezone.utc)
+
+            # Whole catalog from the shared ephemeris cache; shape (N, 1, 3)
+            jd, fr = julian_dates(current_time)
+            positions, velocities = self.ephemeris.states(self.catalog.norad_ids, jd, fr,
+                                                          catalog=self.catalog)
+            semi_major_axes = self.catalog.semi_major_axis_km
+            latitudes, longitudes, altitudes = teme_to_geodetic(positions, jd, fr)
+
+            constellation = [sat_id for sat_id in self.constellation if sat_id in self.catalog.name_index]
+            passes = predict_passes(self.catalog, self.ground_stations, start=current_time,
+                                    satellites=constellation)
+            downlinks = schedule_downlinks(passes, self.ground_stations)
+            now = current_time.replace(tzinfo=None)
 
             report = "\n🌍 ORBITAL TRAJECTORY PREDICTION\n"
             report += "=" * 70 + "\n"
             report += f"Prediction Time: {current_time.strftime('%Y-%m-%d %H:%M:%S')} UTC\n"
-            report += f"Forecast Period: Next 24 hours\n\n"
+            report += f"Forecast Period: Next 24 hours\n"
+            report += f"Catalog Objects Propagated: {len(self.catalog):,}\n\n"
 
-            satellites = ['LEO-SAT-001', 'LEO-SAT-002', 'LEO-SAT-003']
+            for sat_id in constellation:
+                idx = self.catalog.index_of(sat_id)
+                x, y, z = positions[idx, 0]
+                vx, vy, vz = velocities[idx, 0]
+                period = calculate_orbital_period(semi_major_axes[idx])
 
-            for sat_id in satellites:
                 report += f"🛰️  {sat_id}\n"
                 report += f"   Current Position (ECI):\n"
-                report += f"      X: 3456.7 km, Y: 4521.3 km, Z: 2345.8 km\n"
+                report += f"      X: {x:.1f} km, Y: {y:.1f} km, Z: {z:.1f} km\n"
+                report += (f"   Sub-satellite Point: {abs(latitudes[idx, 0]):.2f}°{'N' if latitudes[idx, 0] >= 0 else 'S'}, "
+                           f"{abs(longitudes[idx, 0]):.2f}°{'E' if longitudes[idx, 0] >= 0 else 'W'}, "
+                           f"altitude {altitudes[idx, 0]:.1f} km\n")
                 report += f"   Current Velocity:\n"
-                report += f"      Vx: -3.2 km/s, Vy: 6.1 km/s, Vz: 2.8 km/s\n"
-                report += f"   Orbital Period: 95.8 minutes\n"
-                report += f"   Next Ground Station Pass: +2.3 hours\n"
-                report += f"   Next Downlink Window: +3.1 hours (duration: 8 min)\n\n"
+                report += f"      Vx: {vx:.2f} km/s, Vy: {vy:.2f} km/s, Vz: {vz:.2f} km/s\n"
+                report += f"   Orbital Period: {period:.1f} minutes\n"
+                next_pass = next((p for p in passes if p['satellite'] == sat_id), None)
+                if next_pass:
+                    hours_until = (next_pass['aos'] - now).total_seconds() / 3600
+                    report += (f"   Next Ground Station Pass: +{max(hours_until, 0):.1f} hours "
+                               f"({next_pass['station']}, max elevation {next_pass['max_elevation_deg']:.0f}°)\n")
+                else:
+                    report += f"   Next Ground Station Pass: none in next 24 hours\n"
+                downlink = next_contact(downlinks, sat_id, after=now)
+                if downlink:
+                    hours_until = (downlink['start'] - now).total_seconds() / 3600
+                    report += (f"   Next Downlink Window: +{max(hours_until, 0):.1f} hours "
+                               f"({downlink['station']}, duration: {downlink['duration_seconds'] / 60:.0f} min)\n\n")
+                else:
+                    report += f"   Next Downlink Window: none scheduled in next 24 hours\n\n"
 
             report += "📊 Trajectory Confidence: 99.2%\n"
             report += "🔄 Update Frequency: Every 60 seconds\n"
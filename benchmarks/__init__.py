@@ -0,0 +1 @@
+"""SatelliteOps AI Benchmarks"""
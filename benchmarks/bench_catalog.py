@@ -0,0 +1,46 @@
+"""
+SatelliteOps AI - TLE Catalog Load Benchmark
+Compares text parsing against the memory-mapped binary cache
+
+Usage:
+    python -m benchmarks.bench_catalog
+"""
+
+import os
+import time
+import tempfile
+
+from benchmarks.synthetic import synthetic_tle_text
+from tools.tle_catalog import TLECatalog
+
+N_OBJECTS = 30_000
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        tle_path = os.path.join(tmp, 'catalog.txt')
+        cache_dir = os.path.join(tmp, 'cache')
+        with open(tle_path, 'w') as f:
+            f.write(synthetic_tle_text(N_OBJECTS))
+
+        start = time.perf_counter()
+        parsed = TLECatalog.from_file(tle_path, cache_dir=cache_dir)
+        parse_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cached = TLECatalog.from_file(tle_path, cache_dir=cache_dir)
+        cache_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for norad_id in parsed.norad_ids[:10_000].tolist():
+            cached.index_of(norad_id)
+        lookup_us = (time.perf_counter() - start) / 10_000 * 1e6
+
+    print("=" * 70)
+    print("TLE CATALOG LOAD BENCHMARK")
+    print("=" * 70)
+    print(f"Objects:            {len(cached):,}")
+    print(f"Text parse + cache: {parse_seconds * 1000:.1f} ms")
+    print(f"Cached (mmap) load: {cache_seconds * 1000:.1f} ms")
+    print(f"NORAD ID lookup:    {lookup_us:.2f} us")
+    print("=" * 70)
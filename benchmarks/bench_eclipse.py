@@ -0,0 +1,31 @@
+"""
+SatelliteOps AI - Eclipse Prediction Benchmark
+Eclipse entry/exit intervals for a synthetic constellation over a 24 hour horizon
+
+Usage:
+    python -m benchmarks.bench_eclipse
+"""
+
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import synthetic_catalog
+from tools.eclipse import predict_eclipses
+
+CATALOG_SIZES = [100, 1_000, 5_000]
+
+
+if __name__ == "__main__":
+    start = datetime(2025, 11, 18)
+    print("=" * 70)
+    print("ECLIPSE PREDICTION BENCHMARK (24 h, conical shadow)")
+    print("=" * 70)
+    for n in CATALOG_SIZES:
+        catalog = synthetic_catalog(n)
+        catalog.satellites()
+        t0 = time.perf_counter()
+        eclipses = predict_eclipses(catalog, start=start)
+        elapsed = time.perf_counter() - t0
+        print(f"{n:>6,} satellites: {elapsed:6.2f} s ({len(eclipses):,} eclipses, "
+              f"{n / elapsed:,.0f} satellite-days/s)")
+    print("=" * 70)
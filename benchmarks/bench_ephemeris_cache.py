@@ -0,0 +1,40 @@
+"""
+SatelliteOps AI - Ephemeris Cache Benchmark
+Compares cold (propagate) and warm (interpolate) query latency per object
+
+Usage:
+    python -m benchmarks.bench_ephemeris_cache
+"""
+
+import time
+import numpy as np
+
+from benchmarks.synthetic import synthetic_catalog, BENCHMARK_EPOCH_JD
+from tools.ephemeris_cache import EphemerisCache
+
+N_OBJECTS = 5_000
+
+
+if __name__ == "__main__":
+    catalog = synthetic_catalog(N_OBJECTS)
+    norad_ids = catalog.norad_ids.tolist()
+    cache = EphemerisCache()
+
+    jd = np.array([BENCHMARK_EPOCH_JD])
+    start = time.perf_counter()
+    cache.states(norad_ids, jd, np.array([0.1]), catalog=catalog)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cache.states(norad_ids, jd, np.array([0.1234]), catalog=catalog)
+    warm = time.perf_counter() - start
+
+    print("=" * 70)
+    print("EPHEMERIS CACHE BENCHMARK")
+    print("=" * 70)
+    print(f"Objects:          {N_OBJECTS:,}")
+    print(f"Cold query:       {cold * 1e6 / N_OBJECTS:.1f} us/object")
+    print(f"Warm query:       {warm * 1e6 / N_OBJECTS:.1f} us/object")
+    print(f"Cache size:       {cache.nbytes / 1024**2:.1f} MB")
+    print(f"Error bound:      {cache.error_bound_km * 1000:.2f} m")
+    print("=" * 70)
@@ -0,0 +1,62 @@
+"""
+SatelliteOps AI - Frame Conversion Benchmark
+Per-object rotations vs one cached rotation per epoch for (N, M) ephemerides
+
+Usage:
+    python -m benchmarks.bench_frames
+"""
+
+import time
+import numpy as np
+from datetime import datetime
+
+from benchmarks.synthetic import synthetic_catalog
+from tools.orbital_mechanics import propagate_batch, time_grid
+from tools.frames import epoch_rotations, teme_to_j2000, teme_to_geodetic, _epoch_terms
+
+CATALOG_SIZES = [100, 1_000, 5_000]
+STEPS = 144  # one day at 10 minutes
+PER_OBJECT_LIMIT = 200
+
+
+def benchmark_frames(n_objects: int) -> dict:
+    """TEME -> J2000 and TEME -> geodetic for a whole ephemeris"""
+    catalog = synthetic_catalog(n_objects)
+    jd, fr = time_grid(datetime(2025, 11, 18), STEPS * 10 / 60.0, 600.0)
+    positions, _ = propagate_batch(catalog.satellites(), jd, fr)
+
+    # Baseline: rotation terms rebuilt for every object (sampled, then scaled)
+    sample = min(n_objects, PER_OBJECT_LIMIT)
+    start = time.perf_counter()
+    for i in range(sample):
+        matrices = _epoch_terms.__wrapped__(jd.tobytes(), fr.tobytes())['teme_to_j2000']
+        np.einsum('mij,mj->mi', matrices, positions[i])
+    per_object = (time.perf_counter() - start) * n_objects / sample
+
+    _epoch_terms.cache_clear()
+    start = time.perf_counter()
+    teme_to_j2000(positions, jd, fr)
+    batched_cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    teme_to_j2000(positions, jd, fr)
+    batched_warm = time.perf_counter() - start
+
+    epoch_rotations(jd, fr)
+    start = time.perf_counter()
+    teme_to_geodetic(positions, jd, fr)
+    geodetic = time.perf_counter() - start
+    return {'objects': n_objects, 'per_object': per_object, 'cold': batched_cold,
+            'warm': batched_warm, 'geodetic': geodetic}
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print(f"FRAME CONVERSION BENCHMARK ({STEPS} epochs)")
+    print("=" * 70)
+    for n in CATALOG_SIZES:
+        r = benchmark_frames(n)
+        print(f"{r['objects']:>6,} objects: per-object {r['per_object'] * 1e3:8.1f} ms | "
+              f"batched {r['cold'] * 1e3:6.1f} ms cold, {r['warm'] * 1e3:6.1f} ms cached "
+              f"({r['per_object'] / r['warm']:5.0f}x) | geodetic {r['geodetic'] * 1e3:6.1f} ms")
+    print("=" * 70)
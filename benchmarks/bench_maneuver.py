@@ -0,0 +1,56 @@
+"""
+SatelliteOps AI - Maneuver Planning Benchmark
+Candidate burns evaluated per second as the RTN delta-V grid grows
+
+Usage:
+    python -m benchmarks.bench_maneuver
+"""
+
+import time
+import numpy as np
+from datetime import datetime
+
+from tools.orbital_mechanics import parse_tle
+from tools.tle_catalog import TLECatalog
+from tools.maneuver_planning import plan_maneuvers
+
+ISS_TLE = (
+    "1 25544U 98067A   25322.50000000  .00002182  00000-0  41420-4 0  9997",
+    "2 25544  51.6416 247.4627 0006703 130.5360 325.0288 15.72125391563537"
+)
+EPOCH = datetime(2025, 11, 18, 12)
+TCA_SECONDS = 5407.9  # closest approach of the neighbour below, ~2.6 km
+GRIDS = [(5, 11, 5), (9, 21, 9), (11, 41, 11)]
+
+
+def close_neighbour():
+    """ISS and a copy with a slightly rotated plane and phase"""
+    catalog = TLECatalog.from_satellites(["ISS", "NEIGHBOUR"], [parse_tle(*ISS_TLE)] * 2)
+    catalog.columns['norad_id'][1] = 90001
+    catalog.columns['raan'][1] += np.radians(0.02)
+    catalog.columns['mean_anomaly'][1] += np.radians(0.01)
+    catalog = TLECatalog(catalog.names, catalog.columns)
+    return catalog.satellite(25544), catalog.satellite(90001)
+
+
+def benchmark_planner(grid) -> dict:
+    """Plan against the neighbour with an n_radial x n_along x n_cross grid"""
+    primary, threat = close_neighbour()
+    axes = [np.linspace(-0.5, 0.5, n) for n in grid]
+    start = time.perf_counter()
+    plan = plan_maneuvers(primary, [threat], [TCA_SECONDS], EPOCH, np.eye(3) * 1.5**2, 0.02,
+                          radial_m_s=axes[0], along_track_m_s=axes[1], cross_track_m_s=axes[2])
+    return {'candidates': len(plan['risk']), 'pareto': len(plan['pareto']),
+            'seconds': time.perf_counter() - start}
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("MANEUVER TRADE-SPACE BENCHMARK (4 burn epochs, 25-sample TCA window)")
+    print("=" * 70)
+    for grid in GRIDS:
+        result = benchmark_planner(grid)
+        print(f"{'x'.join(map(str, grid)):>10} grid: {result['candidates']:>7,} candidates "
+              f"in {result['seconds']:.3f} s ({result['candidates'] / result['seconds']:,.0f}/s), "
+              f"{result['pareto']} on the Pareto front")
+    print("=" * 70)
@@ -0,0 +1,47 @@
+"""
+SatelliteOps AI - Monte Carlo Pc Benchmark
+Samples per second and time to convergence across worker counts
+
+Usage:
+    python -m benchmarks.bench_monte_carlo
+"""
+
+import os
+import time
+import numpy as np
+
+from tools.monte_carlo_pc import pc_monte_carlo
+
+HARD_BODY_RADIUS_KM = 0.05
+RELATIVE_TOLERANCE = 0.05
+
+
+def crossing_encounter():
+    """Two circular orbits crossing at 90 degrees, 300 m radial miss at t = 0"""
+    speed = np.sqrt(398600.4418 / 7000.0)
+    states = np.array([[7000.0, 0, 0, 0, speed, 0], [7000.3, 0, 0, 0, 0, speed]])
+    covariance = np.diag([0.1**2] * 3 + [1e-6**2] * 3)
+    return states, np.stack([covariance, covariance])
+
+
+def benchmark_monte_carlo(workers: int) -> dict:
+    """Run one converged Monte Carlo assessment"""
+    states, covariances = crossing_encounter()
+    start = time.perf_counter()
+    estimate = pc_monte_carlo(states, covariances, HARD_BODY_RADIUS_KM, 0.0,
+                              relative_tolerance=RELATIVE_TOLERANCE, workers=workers)
+    estimate['seconds'] = time.perf_counter() - start
+    return estimate
+
+
+if __name__ == "__main__":
+    cpus = os.cpu_count() or 1
+    print("=" * 70)
+    print(f"MONTE CARLO Pc BENCHMARK ({cpus} CPUs, stop at +/-{RELATIVE_TOLERANCE:.0%} (95% CI))")
+    print("=" * 70)
+    for workers in sorted({1, 2, cpus}):
+        result = benchmark_monte_carlo(workers)
+        print(f"{workers:>3} workers: Pc {result['pc']:.3e} "
+              f"[{result['ci_low']:.3e}, {result['ci_high']:.3e}] from {result['samples']:,} samples "
+              f"in {result['seconds']:.2f} s ({result['samples'] / result['seconds'] / 1e3:.0f}k samples/s)")
+    print("=" * 70)
@@ -0,0 +1,47 @@
+"""
+SatelliteOps AI - Parallel Screening Benchmark
+Speedup of shared-memory sharded screening from 1 to N worker processes
+
+Usage:
+    python -m benchmarks.bench_parallel_screening
+"""
+
+import os
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import synthetic_catalog
+from tools.conjunction_screening import screen_catalog
+
+N_OBJECTS = 10_000
+WINDOW_HOURS = 2.0
+STEP_SECONDS = 30.0
+SCREENING_DISTANCE_KM = 5.0
+
+
+def benchmark_workers(catalog, workers: int) -> dict:
+    """Time one all-vs-all screening run with the given pool size"""
+    start = time.perf_counter()
+    events = screen_catalog(catalog, start=datetime(2025, 11, 18), duration_hours=WINDOW_HOURS,
+                            step_seconds=STEP_SECONDS, screening_distance_km=SCREENING_DISTANCE_KM,
+                            workers=workers)
+    return {'seconds': time.perf_counter() - start, 'conjunctions': len(events['primary'])}
+
+
+if __name__ == "__main__":
+    cpus = os.cpu_count() or 1
+    catalog = synthetic_catalog(N_OBJECTS)
+    catalog.satellites()
+
+    print("=" * 70)
+    print(f"PARALLEL SCREENING BENCHMARK ({N_OBJECTS:,} objects, {WINDOW_HOURS:.0f} h window, "
+          f"{cpus} CPUs)")
+    print("=" * 70)
+    baseline = None
+    for workers in sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1))):
+        result = benchmark_workers(catalog, workers)
+        baseline = baseline or result['seconds']
+        speedup = baseline / result['seconds']
+        print(f"{workers:>3} workers: {result['seconds']:7.2f} s, speedup {speedup:4.1f}x "
+              f"(efficiency {speedup / workers:.0%}), {result['conjunctions']} conjunctions")
+    print("=" * 70)
@@ -0,0 +1,46 @@
+"""
+SatelliteOps AI - Conjunction Prefilter Benchmark
+Pairs eliminated by the apogee/perigee, orbit path and time filters
+
+Usage:
+    python -m benchmarks.bench_prefilter
+"""
+
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import synthetic_catalog
+from tools.conjunction_filters import prefilter_pairs
+
+CATALOG_SIZES = [1_000, 2_000, 5_000]
+WINDOW_HOURS = 24.0
+SCREENING_DISTANCE_KM = 5.0
+
+
+def benchmark_prefilter(n_objects: int) -> dict:
+    """Time one all-vs-all filter chain run"""
+    catalog = synthetic_catalog(n_objects)
+    catalog.satellites()
+
+    start = time.perf_counter()
+    pairs, stats = prefilter_pairs(catalog, start=datetime(2025, 11, 18),
+                                   duration_hours=WINDOW_HOURS,
+                                   screening_distance_km=SCREENING_DISTANCE_KM)
+    stats['seconds'] = time.perf_counter() - start
+    stats['objects'] = n_objects
+    return stats
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print(f"CONJUNCTION PREFILTER BENCHMARK ({WINDOW_HOURS:.0f} h window, "
+          f"{SCREENING_DISTANCE_KM} km)")
+    print("=" * 70)
+    for n in CATALOG_SIZES:
+        result = benchmark_prefilter(n)
+        total = result['total_pairs']
+        print(f"{result['objects']:>7,} objects ({total:>12,} pairs): {result['seconds']:7.2f} s")
+        for name in ('apogee_perigee', 'orbit_path', 'time'):
+            print(f"    {name:<16} -{result[name]:>12,} ({result[name] / total:6.1%})")
+        print(f"    {'remaining':<16} {result['remaining']:>13,} ({result['remaining'] / total:6.1%})")
+    print("=" * 70)
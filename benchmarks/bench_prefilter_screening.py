@@ -0,0 +1,59 @@
+"""
+SatelliteOps AI - Prefiltered vs KD-tree Screening Benchmark
+Filter chain plus pair screening against KD-tree screening, all-vs-all and for a few primaries against the catalog
+
+Usage:
+    python -m benchmarks.bench_prefilter_screening
+"""
+
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import synthetic_catalog
+from tools.conjunction_screening import screen_catalog
+
+ALL_VS_ALL_SIZES = [1_000, 2_000]
+PRIMARIES_SIZES = [5_000, 20_000]
+N_PRIMARIES = 3
+WINDOW_HOURS = 24.0
+SCREENING_DISTANCE_KM = 5.0
+
+
+def benchmark_pair(n_objects: int, primaries: bool) -> dict:
+    """Time KD-tree and prefiltered screening of the same catalog and check they agree"""
+    catalog = synthetic_catalog(n_objects)
+    catalog.satellites()
+    options = dict(start=datetime(2025, 11, 18), duration_hours=WINDOW_HOURS,
+                   screening_distance_km=SCREENING_DISTANCE_KM,
+                   primaries=catalog.names[:N_PRIMARIES].tolist() if primaries else None)
+
+    result = {'objects': n_objects}
+    for label, prefilter in (('kdtree', False), ('prefilter', True)):
+        start = time.perf_counter()
+        events = screen_catalog(catalog, prefilter=prefilter, **options)
+        result[label] = time.perf_counter() - start
+        result[f'{label}_events'] = set(zip(events['primary'].tolist(), events['secondary'].tolist()))
+    stats = events['prefilter']
+    result['remaining'] = stats['remaining'] / max(stats['total_pairs'], 1)
+    result['missed'] = len(result['kdtree_events'] - result['prefilter_events'])
+    return result
+
+
+def report(result: dict):
+    print(f"{result['objects']:>7,} objects: KD-tree {result['kdtree']:7.2f} s, "
+          f"prefilter {result['prefilter']:7.2f} s ({result['kdtree'] / result['prefilter']:5.1f}x), "
+          f"{result['remaining']:6.2%} of pairs screened, {len(result['kdtree_events'])} conjunctions, "
+          f"{result['missed']} missed")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print(f"PREFILTERED vs KD-TREE SCREENING ({WINDOW_HOURS:.0f} h window, {SCREENING_DISTANCE_KM} km)")
+    print("=" * 70)
+    print("All-vs-all")
+    for n in ALL_VS_ALL_SIZES:
+        report(benchmark_pair(n, primaries=False))
+    print(f"{N_PRIMARIES} primaries against the catalog")
+    for n in PRIMARIES_SIZES:
+        report(benchmark_pair(n, primaries=True))
+    print("=" * 70)
@@ -0,0 +1,48 @@
+"""
+SatelliteOps AI - Conjunction Screening Benchmark
+All-vs-all KD-tree screening from 1k to 30k objects
+
+Usage:
+    python -m benchmarks.bench_screening
+"""
+
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import synthetic_catalog
+from tools.conjunction_screening import screen_catalog
+
+CATALOG_SIZES = [1_000, 5_000, 10_000, 20_000, 30_000]
+WINDOW_HOURS = 1.0
+STEP_SECONDS = 30.0
+SCREENING_DISTANCE_KM = 5.0
+
+
+def benchmark_screening(n_objects: int) -> dict:
+    """Time one all-vs-all screening run (SGP4 records are built beforehand)"""
+    catalog = synthetic_catalog(n_objects)
+    catalog.satellites()
+
+    start = time.perf_counter()
+    events = screen_catalog(catalog, start=datetime(2025, 11, 18), duration_hours=WINDOW_HOURS,
+                            step_seconds=STEP_SECONDS, screening_distance_km=SCREENING_DISTANCE_KM)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'objects': n_objects,
+        'seconds': elapsed,
+        'pairs': n_objects * (n_objects - 1) // 2,
+        'conjunctions': len(events['primary'])
+    }
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print(f"CONJUNCTION SCREENING BENCHMARK ({WINDOW_HOURS:.0f} h window, "
+          f"{STEP_SECONDS:.0f} s step, {SCREENING_DISTANCE_KM} km)")
+    print("=" * 70)
+    for n in CATALOG_SIZES:
+        result = benchmark_screening(n)
+        print(f"{result['objects']:>7,} objects ({result['pairs']:>12,} pairs): "
+              f"{result['seconds']:7.2f} s, {result['conjunctions']} conjunctions")
+    print("=" * 70)
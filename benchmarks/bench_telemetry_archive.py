@@ -0,0 +1,80 @@
+"""
+SatelliteOps AI - Telemetry Archive Benchmark
+Storage per sample for 1000 satellites x 1 Hz, and range query latency over a week of history
+
+Usage:
+    python -m benchmarks.bench_telemetry_archive
+"""
+
+import tempfile
+import time
+import numpy as np
+
+from tools.telemetry_archive import TelemetryArchive
+from tools.telemetry_simulator import TelemetrySimulator
+from tools.telemetry_tools import decode_frames, housekeeping_channels
+
+N_SATELLITES = 1_000
+ARCHIVE_SECONDS = 3_600
+HISTORY_DAYS = 7
+QUERIES = 20
+RAW_BYTES_PER_SAMPLE = 8 + 4 * 5    # float64 timestamp + five float32 channels
+
+
+def timed(query, repeats: int = QUERIES) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        query()
+    return (time.perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+    t0 = 1.7e9 - 1.7e9 % 86400
+    simulator = TelemetrySimulator(N_SATELLITES)
+    satellites = np.array([f'LEO-SAT-{apid:03d}' for apid in simulator.apids])
+    hour = [housekeeping_channels(decode_frames(simulator.packets(t0 + s))) for s in range(ARCHIVE_SECONDS)]
+    hour = {name: np.stack([columns[name] for columns in hour]) for name in hour[0]}     # (seconds, satellites)
+
+    print("=" * 70)
+    print(f"TELEMETRY ARCHIVE BENCHMARK ({N_SATELLITES:,} satellites x 1 Hz)")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as root:
+        archive = TelemetryArchive(root)
+        start = time.perf_counter()
+        for s in range(ARCHIVE_SECONDS):
+            archive.append_batch(satellites, np.full(N_SATELLITES, t0 + s),
+                                 {name: values[s] for name, values in hour.items()})
+        archive.close()
+        elapsed = time.perf_counter() - start
+        samples = ARCHIVE_SECONDS * N_SATELLITES
+        print(f"Archive 1 h: {elapsed / ARCHIVE_SECONDS * 1e3:.2f} ms per 1 s batch "
+              f"({samples / elapsed / 1e6:.2f} M samples/s, compression included)")
+        print(f"Storage: {archive.size_bytes / samples:.1f} bytes per sample vs {RAW_BYTES_PER_SAMPLE} raw "
+              f"({RAW_BYTES_PER_SAMPLE * samples / archive.size_bytes:.1f}x), "
+              f"{archive.size_bytes * 24 / 1e9:.2f} GB per constellation-day")
+
+    with tempfile.TemporaryDirectory() as root:
+        # A week of LEO-SAT-002 at 1 Hz, each hour borrowing another satellite's simulated hour
+        with TelemetryArchive(root) as archive:
+            for h in range(HISTORY_DAYS * 24):
+                archive.append_batch(np.full(ARCHIVE_SECONDS, 'LEO-SAT-002'),
+                                     t0 + 3600.0 * h + np.arange(ARCHIVE_SECONDS),
+                                     {name: values[:, h % N_SATELLITES] for name, values in hour.items()})
+        now = t0 + HISTORY_DAYS * 86400.0
+
+        archive = TelemetryArchive(root)
+        start = time.perf_counter()
+        week = archive.query('LEO-SAT-002', 'power_w', start=now - HISTORY_DAYS * 86400.0)
+        cold = time.perf_counter() - start
+        print(f"\nLEO-SAT-002 power, last {HISTORY_DAYS} days ({len(week['timestamp']):,} samples, "
+              f"{sum(len(archive.index('LEO-SAT-002', d)) for d in archive.days('LEO-SAT-002'))} chunks):")
+        print(f"  First query: {cold * 1e3:.1f} ms; repeated: "
+              f"{timed(lambda: archive.query('LEO-SAT-002', 'power_w', start=now - HISTORY_DAYS * 86400.0)) * 1e3:.1f} ms")
+        print(f"  All channels: "
+              f"{timed(lambda: archive.query('LEO-SAT-002', start=now - HISTORY_DAYS * 86400.0)) * 1e3:.1f} ms")
+        print(f"LEO-SAT-002 power, last hour: "
+              f"{timed(lambda: archive.query('LEO-SAT-002', 'power_w', start=now - 3600.0), 200) * 1e3:.2f} ms")
+        print(f"LEO-SAT-002 power, 10 min three days ago: "
+              f"{timed(lambda: archive.query('LEO-SAT-002', 'power_w', start=now - 3 * 86400.0, end=now - 3 * 86400.0 + 600), 200) * 1e3:.2f} ms")
+        archive.close()
+    print("=" * 70)
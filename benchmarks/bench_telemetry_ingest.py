@@ -0,0 +1,73 @@
+"""
+SatelliteOps AI - Telemetry Ingestion Benchmark
+Sustained 1000 satellites x 1 Hz over UDP from the simulator, then a TCP firehose for headroom
+
+Usage:
+    python -m benchmarks.bench_telemetry_ingest
+"""
+
+import asyncio
+import socket
+import threading
+import time
+
+from tools.telemetry_ingest import TelemetryIngestServer
+from tools.telemetry_simulator import TelemetrySimulator
+from tools.telemetry_store import TelemetryStore
+from tools.telemetry_aggregation import WindowAggregator
+
+N_SATELLITES = 1_000
+SUSTAINED_SECONDS = 20.0
+FIREHOSE_PERIODS = 200          # packets: FIREHOSE_PERIODS x N_SATELLITES
+
+
+async def sustained():
+    async with TelemetryIngestServer(TelemetryStore(), WindowAggregator(), udp_port=0, tcp_port=None) as server:
+        simulator = TelemetrySimulator(N_SATELLITES, rate_hz=1.0, port=server.udp_address[1])
+        cpu, wall = time.process_time(), time.perf_counter()
+        sent = await simulator.run(SUSTAINED_SECONDS)
+        await asyncio.sleep(2 * server.batch_interval_seconds)
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+        metrics = server.metrics()
+
+    print(f"Sustained UDP ({N_SATELLITES:,} satellites x 1 Hz, {SUSTAINED_SECONDS:.0f} s):")
+    print(f"  Sent {sent:,}, ingested {metrics['packets_ingested']:,}, lost {metrics['packets_lost']:,}, "
+          f"dropped {metrics['packets_dropped']:,}")
+    print(f"  Ingest rate: {metrics['ingest_rate_hz']:.0f} packets/s, {metrics['batches']:,} batches")
+    print(f"  Packet age at ingest: {metrics['packet_age_seconds'] * 1e3:.0f} ms "
+          f"(batch interval {server.batch_interval_seconds * 1e3:.0f} ms)")
+    print(f"  CPU: {cpu / wall:.1%} of one core (server and simulator)")
+
+
+async def firehose():
+    async with TelemetryIngestServer(TelemetryStore(), WindowAggregator(), udp_port=None, tcp_port=0) as server:
+        simulator = TelemetrySimulator(N_SATELLITES)
+        data = b''.join(simulator.packets(1.7e9 + period) for period in range(FIREHOSE_PERIODS))
+
+        def send():
+            with socket.create_connection(server.tcp_address) as sock:
+                sock.sendall(data)
+
+        start = time.perf_counter()
+        sender = threading.Thread(target=send)
+        sender.start()
+        total = FIREHOSE_PERIODS * N_SATELLITES
+        while server.counters['packets_ingested'] < total:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        sender.join()
+        metrics = server.metrics()
+
+    rate = total / elapsed
+    print(f"TCP firehose ({total:,} packets, flow-controlled):")
+    print(f"  {rate / 1e3:.0f} k packets/s ({rate / N_SATELLITES:.0f}x the 1 Hz constellation load), "
+          f"dropped {metrics['packets_dropped']:,}")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("TELEMETRY INGESTION BENCHMARK")
+    print("=" * 70)
+    asyncio.run(sustained())
+    asyncio.run(firehose())
+    print("=" * 70)
@@ -0,0 +1,73 @@
+"""
+SatelliteOps AI - Telemetry Rollups Benchmark
+Dashboard series queries over 30 days of 1 Hz history: rollup level choice, points returned and latency
+
+Usage:
+    python -m benchmarks.bench_telemetry_rollups
+"""
+
+import os
+import tempfile
+import time
+import numpy as np
+
+from tools.telemetry_archive import TelemetryArchive
+from tools.telemetry_rollups import lttb_indices
+
+HISTORY_DAYS = 30
+MAX_POINTS = 1000
+QUERIES = 20
+SPANS = (('1 hour', 3600), ('1 day', 86400), ('7 days', 7 * 86400), ('30 days', 30 * 86400))
+
+
+def timed(query, repeats: int = QUERIES) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        query()
+    return (time.perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    t0 = 1.7e9 - 1.7e9 % 86400
+    now = t0 + HISTORY_DAYS * 86400.0
+
+    print("=" * 70)
+    print(f"TELEMETRY ROLLUPS BENCHMARK ({HISTORY_DAYS} days of one satellite at 1 Hz, max {MAX_POINTS} points)")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as root:
+        with TelemetryArchive(root) as archive:
+            start = time.perf_counter()
+            for hour in range(HISTORY_DAYS * 24):
+                timestamps = t0 + 3600.0 * hour + np.arange(3600.0)
+                orbit = np.cos(2 * np.pi * timestamps / 5700.0)
+                archive.append_batch(np.full(3600, 'LEO-SAT-002'), timestamps, {
+                    'battery_temp_c': (20.0 + 5.0 * orbit + rng.normal(0.0, 0.3, 3600)).astype(np.float32),
+                    'power_w': (450.0 + 30.0 * orbit + rng.normal(0.0, 5.0, 3600)).astype(np.float32),
+                })
+            elapsed = time.perf_counter() - start
+        sizes = {}
+        for path, _, names in os.walk(root):
+            for name in names:
+                sizes[os.path.splitext(name)[1]] = sizes.get(os.path.splitext(name)[1], 0) + \
+                    os.path.getsize(os.path.join(path, name))
+        print(f"Archive write: {elapsed / (HISTORY_DAYS * 24) * 1e3:.2f} ms per 1 h chunk (rollups included)")
+        print(f"Storage: chunks {sizes['.tlm'] / 1e6:.1f} MB, 1 min rollups {sizes['.r60'] / 1e6:.2f} MB, "
+              f"1 h rollups {sizes['.r3600'] / 1e3:.0f} kB")
+
+        archive = TelemetryArchive(root)
+        print(f"\n{'Range':<10}{'Level':>8}{'Points':>9}{'Series':>12}{'Raw + LTTB':>14}")
+        for label, span in SPANS:
+            series = archive.series('LEO-SAT-002', 'power_w', start=now - span, end=now, max_points=MAX_POINTS)
+            latency = timed(lambda: archive.series('LEO-SAT-002', 'power_w', start=now - span, end=now,
+                                                   max_points=MAX_POINTS))
+
+            def raw_lttb():
+                raw = archive.query('LEO-SAT-002', 'power_w', start=now - span, end=now)
+                lttb_indices(raw['timestamp'], raw['power_w'], MAX_POINTS)
+
+            level = f"{series['resolution_seconds']:g} s" if series['resolution_seconds'] else 'raw'
+            print(f"{label:<10}{level:>8}{len(series['timestamp']):>9,}{latency * 1e3:>10.1f} ms"
+                  f"{timed(raw_lttb, 3) * 1e3:>12.1f} ms")
+        archive.close()
+    print("=" * 70)
@@ -0,0 +1,48 @@
+"""
+SatelliteOps AI - Telemetry Store Benchmark
+1000 satellites at 1 Hz: micro-batch append rate, memory and window query latency
+
+Usage:
+    python -m benchmarks.bench_telemetry_store
+"""
+
+import time
+import numpy as np
+
+from tools.telemetry_store import TelemetryStore
+
+N_SATELLITES = 1_000
+RETENTION_HOURS = 3.0
+SIMULATED_SECONDS = 1_800
+QUERIES = 10_000
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    store = TelemetryStore(retention_seconds=RETENTION_HOURS * 3600)
+    satellites = np.array([f'SAT-{i:04d}' for i in range(N_SATELLITES)])
+    columns = {name: rng.normal(size=N_SATELLITES).astype(np.float32) for name in store.channels}
+
+    print("=" * 70)
+    print(f"TELEMETRY STORE BENCHMARK ({N_SATELLITES:,} satellites x 1 Hz, {RETENTION_HOURS:.0f} h retention)")
+    print("=" * 70)
+    start = time.perf_counter()
+    for second in range(SIMULATED_SECONDS):
+        store.append_batch(satellites, np.full(N_SATELLITES, float(second)), columns)
+    elapsed = time.perf_counter() - start
+    samples = SIMULATED_SECONDS * N_SATELLITES
+    print(f"Append: {samples / elapsed / 1e6:.2f} M samples/s "
+          f"({elapsed / SIMULATED_SECONDS * 1e3:.2f} ms per 1 s batch)")
+    print(f"Memory: {store.memory_bytes / 1e6:.0f} MB (fixed; "
+          f"{store.memory_bytes / N_SATELLITES / (RETENTION_HOURS * 3600):.0f} bytes per satellite-second)")
+
+    start = time.perf_counter()
+    for i in range(QUERIES):
+        store.window(satellites[i % N_SATELLITES], 'power_w', start=600.0, end=1200.0)
+    print(f"10 min window query: {(time.perf_counter() - start) / QUERIES * 1e6:.1f} us")
+
+    start = time.perf_counter()
+    for i in range(QUERIES):
+        store.append(satellites[i % N_SATELLITES], SIMULATED_SECONDS + i, power_w=1.0)
+    print(f"Single append: {(time.perf_counter() - start) / QUERIES * 1e6:.1f} us")
+    print("=" * 70)
@@ -0,0 +1,66 @@
+"""
+SatelliteOps AI - Telemetry Validation Benchmark
+Per-packet dict validation vs vectorized FrameValidator reason bitmasks
+
+Usage:
+    python -m benchmarks.bench_telemetry_validation
+"""
+
+import time
+
+from tools.telemetry_simulator import TelemetrySimulator
+from tools.telemetry_tools import (HOUSEKEEPING_DTYPE, FrameValidator, decode_frames, parse_telemetry,
+                                   reason_counts, select_valid, validate_telemetry)
+
+N_SATELLITES = 1_000
+BATCH_PERIODS = (1, 10, 100)
+REPEATS = 20
+
+
+def best_of(function, repeats: int = REPEATS) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    simulator = TelemetrySimulator(N_SATELLITES)
+    t0 = 1.7e9
+
+    print("=" * 70)
+    print("TELEMETRY VALIDATION BENCHMARK")
+    print("=" * 70)
+    data = simulator.packets(t0)
+    size = HOUSEKEEPING_DTYPE.itemsize
+    elapsed = best_of(lambda: [validate_telemetry(parse_telemetry(data[i * size:(i + 1) * size]))
+                               for i in range(N_SATELLITES)], repeats=3)
+    print(f"Per packet (parse_telemetry + validate_telemetry): {elapsed / N_SATELLITES * 1e6:.1f} us/packet")
+
+    for periods in BATCH_PERIODS:
+        validator = FrameValidator()
+        validator.validate(decode_frames(simulator.packets(t0)), now=t0)
+        frames = decode_frames(b''.join(simulator.packets(t0 + 1 + i) for i in range(periods)),
+                               validate=False)
+        now = t0 + periods + 1
+        last_time = validator.last_time.copy()
+        last_values = {name: values.copy() for name, values in validator.last_values.items()}
+
+        def run():
+            validator.validate(frames, now)
+            # Same reference state every repeat
+            validator.last_time[:] = last_time
+            for name, values in last_values.items():
+                validator.last_values[name][:] = values
+
+        elapsed = best_of(run)
+        reasons = validator.validate(frames, now)
+        kept = select_valid(frames, reasons)
+        print(f"Batch of {len(frames):>7,}: {elapsed * 1e3:7.2f} ms "
+              f"({elapsed / len(frames) * 1e9:.0f} ns/packet), kept {len(kept):,} "
+              f"{'(no copy)' if kept is frames else ''}")
+    flagged = {name: count for name, count in reason_counts(reasons).items() if count}
+    print(f"Flags in the last batch: {flagged or 'none'}")
+    print("=" * 70)
@@ -0,0 +1,45 @@
+"""
+SatelliteOps AI - Ground Station Pass Prediction Benchmark
+1000 satellites x 20 stations over a 24 hour horizon
+
+Usage:
+    python -m benchmarks.bench_visibility [workers]
+"""
+
+import os
+import sys
+import time
+import numpy as np
+from datetime import datetime
+
+from benchmarks.synthetic import synthetic_catalog
+from tools.visibility import predict_passes
+
+N_SATELLITES = 1_000
+N_STATIONS = 20
+
+
+def synthetic_stations(n: int, seed: int = 7) -> list:
+    """Random ground stations between +/-70 degrees latitude"""
+    rng = np.random.default_rng(seed)
+    return [{'name': f'GS-{i:02d}', 'latitude_deg': rng.uniform(-70, 70),
+             'longitude_deg': rng.uniform(-180, 180), 'altitude_km': 0.1,
+             'min_elevation_deg': 5.0} for i in range(n)]
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    catalog = synthetic_catalog(N_SATELLITES)
+    stations = synthetic_stations(N_STATIONS)
+    start = datetime(2025, 11, 18)
+
+    print("=" * 70)
+    print("GROUND STATION PASS PREDICTION BENCHMARK")
+    print("=" * 70)
+    for n_workers in sorted({1, workers}):
+        t0 = time.perf_counter()
+        passes = predict_passes(catalog, stations, start=start, workers=n_workers, chunk_size=250)
+        elapsed = time.perf_counter() - t0
+        print(f"{N_SATELLITES:,} satellites x {N_STATIONS} stations, {n_workers} worker(s): "
+              f"{elapsed:.2f} s ({len(passes):,} passes)")
+    print("=" * 70)
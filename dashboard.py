@@ -6,11 +6,10 @@ Professional Streamlit UI for satellite operations
 import streamlit as st
 import asyncio
 import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 import sys
+import time
 sys.path.insert(0, '.')
 
 st.set_page_config(
@@ -83,21 +82,59 @@ if selected_view == "📊 Dashboard":
         df_metrics = pd.DataFrame(metrics_data)
         st.dataframe(df_metrics, use_container_width=True)
 
-elif selected_view == "📡 Telemetry":
-    st.subheader("Live Telemetry Stream")
-    hours = np.arange(0, 24, 0.5)
-    temp_data = 22 + 5*np.sin(hours/12) + np.random.normal(0, 0.5, len(hours))
-    power_data = 450 + 50*np.sin(hours/6) + np.random.normal(0, 5, len(hours))
-
-    col1, col2 = st.columns(2)
-
-    with col1:
-        fig_temp = px.line(x=hours, y=temp_data, labels={'x': 'Time (hours)', 'y': 'Temperature (°C)'}, title="Battery Temperature")
-        st.plotly_chart(fig_temp, use_container_width=True)
+    st.subheader("🌗 Eclipse Schedule (next 24 h)")
+    try:
+        from tools.eclipse import get_eclipse_schedule
+        eclipses = get_eclipse_schedule(['LEO-SAT-001', 'LEO-SAT-002', 'LEO-SAT-003'])
+        if eclipses:
+            df_eclipses = pd.DataFrame(eclipses)
+            df_eclipses['duration (min)'] = (df_eclipses['duration_seconds'] / 60).round(1)
+            st.dataframe(df_eclipses[['satellite', 'entry', 'exit', 'duration (min)']],
+                         use_container_width=True)
+        else:
+            st.info("No eclipses in the next 24 hours")
+    except Exception:
+        st.warning("Eclipse prediction not available")
 
-    with col2:
-        fig_power = px.line(x=hours, y=power_data, labels={'x': 'Time (hours)', 'y': 'Power (W)'}, title="Power Output")
-        st.plotly_chart(fig_power, use_container_width=True)
+elif selected_view == "📡 Telemetry":
+    st.subheader("Telemetry History")
+    try:
+        from tools.telemetry_archive import get_telemetry_archive
+        archive = get_telemetry_archive()
+        satellites = archive.satellites
+    except Exception:
+        satellites = None
+        st.warning("Telemetry archive not available")
+
+    if satellites == []:
+        st.info("No archived telemetry yet (set TELEMETRY_INGEST_PORT and run main.py)")
+    elif satellites:
+        ranges = {'Last hour': 3600, 'Last 24 hours': 86400, 'Last 7 days': 7 * 86400, 'Last 30 days': 30 * 86400}
+        col1, col2 = st.columns(2)
+        with col1:
+            satellite = st.selectbox("Satellite", satellites)
+        with col2:
+            span = ranges[st.selectbox("Range", list(ranges), index=1)]
+        end = time.time()
+        st.caption("Archived telemetry (the current hour is written once it closes); "
+                   "long ranges show 1 min / 1 h rollups with their min-max band")
+
+        resolutions = {1.0: '1 s', 60.0: '1 min', 3600.0: '1 h'}
+        charts = [('battery_temp_c', 'Battery Temperature', 'Temperature (°C)'),
+                  ('power_w', 'Power Output', 'Power (W)')]
+        for column, (channel, title, label) in zip(st.columns(2), charts):
+            series = archive.series(satellite, channel, start=end - span, end=end, max_points=1000)
+            times = pd.to_datetime(series['timestamp'], unit='s')
+            fig = go.Figure()
+            if series['resolution_seconds']:
+                fig.add_trace(go.Scatter(x=times, y=series['max'], line={'width': 0}, showlegend=False))
+                fig.add_trace(go.Scatter(x=times, y=series['min'], line={'width': 0}, fill='tonexty',
+                                         name='min - max'))
+                title += f" ({resolutions.get(series['resolution_seconds'])} means)"
+            fig.add_trace(go.Scatter(x=times, y=series['mean'], mode='lines', name=label))
+            fig.update_layout(title=title, xaxis_title='Time (UTC)', yaxis_title=label)
+            with column:
+                st.plotly_chart(fig, use_container_width=True)
 
 elif selected_view == "⚠️ Anomalies":
     st.subheader("Anomaly Detection Report")
@@ -110,6 +147,22 @@ elif selected_view == "⚠️ Anomalies":
 
 elif selected_view == "🛡️ Collisions":
     st.subheader("Collision Risk Assessment")
+    try:
+        from tools.tle_catalog import get_catalog
+        st.metric("🛰️ Catalog Objects", f"{len(get_catalog()):,}")
+    except Exception:
+        st.warning("TLE catalog not available")
+    try:
+        from tools.event_store import get_event_store
+        upcoming = get_event_store().query(start=datetime.utcnow(), limit=100)
+        if upcoming:
+            st.dataframe(pd.DataFrame(upcoming)[[
+                'tca', 'primary_name', 'secondary_name', 'miss_distance_km',
+                'probability', 'probability_mc', 'screen_count']], use_container_width=True)
+        else:
+            st.info("No upcoming conjunctions on record")
+    except Exception:
+        st.warning("Conjunction event store not available")
     if hasattr(st.session_state, 'coordinator'):
         try:
             result = asyncio.run(st.session_state.coordinator.run("collision"))
@@ -11,6 +11,9 @@ import asyncio
 import os
 from dotenv import load_dotenv
 from agents.mission_coordinator import create_mission_coordinator
+from tools.telemetry_ingest import start_ingest_server, get_ingest_server
+from tools.telemetry_archive import get_telemetry_archive
+from tools.telemetry_recording import TelemetryRecorder
 import logging
 
 # Configure logging
@@ -38,11 +41,27 @@ async def main():
         print("❌ Error: Please set GOOGLE_API_KEY in .env file")
         return
 
+    coordinator = None
+    archive_task = None
+    recorder = None
     try:
         # Create mission coordinator agent
         logger.info("Creating mission coordinator agent...")
         coordinator = await create_mission_coordinator()
 
+        # Live telemetry over UDP/TCP (CCSDS housekeeping packets) when a port is configured
+        ingest_port = os.getenv('TELEMETRY_INGEST_PORT')
+        if ingest_port:
+            # Optionally capture the raw packets for replay ('replay <path>')
+            record_path = os.getenv('TELEMETRY_RECORD_PATH')
+            recorder = TelemetryRecorder(record_path) if record_path else None
+            server = await start_ingest_server(port=int(ingest_port), recorder=recorder)
+            print(f"📡 Receiving telemetry on UDP/TCP port {server.udp_address[1]}")
+            if recorder is not None:
+                print(f"💾 Recording telemetry to {record_path}")
+            # Everything ingested is also kept on disk (data/telemetry_archive)
+            archive_task = asyncio.create_task(get_telemetry_archive().record(server.subscribe()))
+
         print("✅ System initialized successfully!\n")
         print("="*80)
         print("Available Commands:")
@@ -51,15 +70,17 @@ async def main():
         print("  3. 'orbit' - Predict orbital trajectories")
         print("  4. 'collision' - Check collision risks")
         print("  5. 'report' - Generate mission report")
-        print("  6. 'help' - Show this menu")
-        print("  7. 'exit' - Exit system")
+        print("  6. 'replay <file> [speed|max]' - Replay recorded telemetry through anomaly alerting")
+        print("  7. 'help' - Show this menu")
+        print("  8. 'exit' - Exit system")
         print("  Or type any natural language query!")
         print("="*80)
 
         # Interactive loop
         while True:
             try:
-                user_input = input("\n🛰️  Query: ").strip()
+                # Read in a thread so telemetry ingestion keeps running while waiting
+                user_input = (await asyncio.to_thread(input, "\n🛰️  Query: ")).strip()
 
                 if not user_input:
                     continue
@@ -75,6 +96,21 @@ async def main():
                     print("  • orbit - Predict next 24 hours")
                     print("  • collision - Check conjunction risks")
                     print("  • report - Generate comprehensive report")
+                    print("  • replay <file> [speed|max] - Replay a recording, report latency and throughput")
+                    continue
+
+                if user_input.lower().startswith('replay '):
+                    path, *speed = user_input.split()[1:]
+                    speed = None if speed and speed[0] == 'max' else float(speed[0]) if speed else 1.0
+                    print(f"\n⏯️  Replaying {path} at {'maximum' if speed is None else f'{speed:g}x'} speed...\n")
+                    result = await coordinator.replay(path, speed)
+                    print(f"Packets: {result['packets_ingested']:,} of {result['packets_sent']:,} ingested "
+                          f"in {result['duration_seconds']:.1f} s ({result['throughput_hz']:,.0f} packets/s)")
+                    print(f"Anomalies: {result['anomalies']:,} in {result['alerts']:,} alerts")
+                    print(f"Latency to verdict: p50 {result['verdict_latency_p50_seconds'] * 1e3:.0f} ms, "
+                          f"p99 {result['verdict_latency_p99_seconds'] * 1e3:.0f} ms")
+                    print(f"Latency to alert: p50 {result['alert_latency_p50_seconds'] * 1e3:.0f} ms, "
+                          f"p99 {result['alert_latency_p99_seconds'] * 1e3:.0f} ms")
                     continue
 
                 # Process query through mission coordinator
@@ -95,6 +131,22 @@ async def main():
         logger.error(f"System initialization failed: {e}")
         print(f"\n❌ Fatal Error: {e}")
         return
+    finally:
+        # Release whatever was started, also when initialization failed part way
+        server = get_ingest_server()
+        if server is not None:
+            await server.stop()
+        if archive_task is not None:
+            archive_task.cancel()
+            try:
+                await archive_task
+            except asyncio.CancelledError:
+                pass
+            get_telemetry_archive().close()
+        if recorder is not None:
+            recorder.close()
+        if coordinator is not None:
+            coordinator.collision_avoidance.close()
 
     print("\n✅ System shutdown complete.")
 
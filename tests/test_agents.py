@@ -4,6 +4,7 @@ Unit Tests for SatelliteOps AI Agents
 
 import pytest
 import asyncio
+import numpy as np
 from agents.telemetry_monitor import TelemetryMonitorAgent
 from agents.anomaly_detector import AnomalyDetectorAgent
 from agents.orbit_predictor import OrbitPredictorAgent
@@ -30,6 +31,12 @@ async def test_anomaly_detector_agent():
     assert "ANOMALY" in result or "NOMINAL" in result
     assert agent.name == "anomaly_detector"
 
+    batch = {'satellites': ['LEO-SAT-001', 'LEO-SAT-002'], 'timestamps': [1.7e9, 1.7e9],
+             'columns': {'battery_temp_c': np.array([20.0, 55.0]), 'power_w': np.array([450.0, 440.0])}}
+    verdicts = agent.assess_batch(batch)
+    assert [(v['index'], v['satellite'], v['channel'], v['severity']) for v in verdicts] == [
+        (1, 'LEO-SAT-002', 'battery_temp_c', 'HIGH')]
+
 
 @pytest.mark.asyncio
 async def test_orbit_predictor_agent():
@@ -52,6 +59,75 @@ async def test_collision_avoidance_agent():
     assert agent.name == "collision_avoidance"
 
 
+@pytest.mark.asyncio
+async def test_collision_avoidance_keeps_event_loop_running():
+    """Test screening runs off the event loop (telemetry ingest shares it)"""
+    import asyncio
+    import time
+    from benchmarks.synthetic import synthetic_catalog
+    from tools.event_store import ConjunctionEventStore
+
+    agent = CollisionAvoidanceAgent()
+    agent.catalog = synthetic_catalog(500, seed=1)
+    agent.constellation = agent.catalog.names[:3].tolist()
+    agent.event_store = ConjunctionEventStore(':memory:')
+    agent.screening_distance_km = 50.0
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    result = await agent.run({})
+    task.cancel()
+    agent.close()
+    assert "Conjunction Event 1" in result
+    assert len(ticks) > 10 and np.diff(ticks).max() < 1.0
+
+
+@pytest.mark.asyncio
+async def test_collision_avoidance_plans_maneuver():
+    """Test a high-Pc conjunction produces a burn that clears the maneuver threshold"""
+    from datetime import datetime, timezone
+    from sgp4.api import jday
+    from tools.event_store import ConjunctionEventStore
+    from tools.orbital_mechanics import satellite_from_elements
+    from tools.tle_catalog import TLECatalog
+
+    # Orbits 1 deg apart in inclination, both a quarter orbit before the shared node: ~0.1 km miss in ~24 min
+    now = datetime.now(timezone.utc)
+    jd, fr = jday(now.year, now.month, now.day, now.hour, now.minute, now.second + now.microsecond / 1e6)
+    satellites = [satellite_from_elements(90001 + k, jd + fr, 0.0, 0.0, 0.0, 1e-4, 0.0, np.radians(inclination),
+                                          np.radians(270.0 + 0.0055 * k), 2 * np.pi / 95.0, np.radians(40.0))
+                  for k, inclination in enumerate((51.6, 52.6))]
+    agent = CollisionAvoidanceAgent()
+    agent.catalog = TLECatalog.from_satellites(['LEO-SAT-001', 'DEBRIS-1'], satellites)
+    agent.constellation = ['LEO-SAT-001']
+    agent.event_store = ConjunctionEventStore(':memory:')
+    agent.screening_window_hours = 1.0
+    agent.combined_radius_m = 20.0
+    agent.monte_carlo_threshold = 1.0
+
+    probability, conjunctions = agent._calculate_collision_probability()
+    assert len(conjunctions) == 1 and conjunctions[0]['distance'] < 0.2
+    assert probability >= agent.maneuver_threshold
+
+    maneuver = agent._calculate_maneuver_plan(conjunctions)
+    assert maneuver['maneuver_required'] and maneuver['satellite'] == 'LEO-SAT-001'
+    assert maneuver['pre_maneuver_probability'] == pytest.approx(probability)
+    assert maneuver['post_maneuver_probability'] < min(agent.maneuver_threshold, probability / 10)
+    assert maneuver['post_maneuver_separation'] > conjunctions[0]['distance']
+    assert maneuver['delta_v_magnitude'] == pytest.approx(np.linalg.norm(maneuver['thrust_vector']))
+    assert 0 < maneuver['delta_v_magnitude'] < 5.0
+    assert datetime.fromisoformat(maneuver['earliest_execution']) < conjunctions[0]['tca']
+
+    result = await agent.run({})
+    agent.close()
+    assert "AUTOMATIC MANEUVER PLAN (LEO-SAT-001)" in result
+
+
 @pytest.mark.asyncio
 async def test_agent_error_handling():
     """Test agent error handling"""
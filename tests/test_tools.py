@@ -4,21 +4,424 @@ Unit Tests for SatelliteOps AI Tools
 
 import pytest
 import numpy as np
-from tools.telemetry_tools import parse_telemetry, validate_telemetry
-from tools.orbital_mechanics import calculate_orbital_period, calculate_miss_distance
+from concurrent.futures import ProcessPoolExecutor
+from tools.telemetry_tools import (parse_telemetry, validate_telemetry, decode_frames, encode_frames,
+                                   frame_apids, frame_sequence_counts, frame_times, aggregate_telemetry,
+                                   FrameValidator, validate_frames, select_valid, reason_names,
+                                   HOUSEKEEPING_DTYPE, NON_MONOTONIC, RATE_OF_CHANGE, STALE)
+from tools.orbital_mechanics import (
+    calculate_orbital_period, calculate_miss_distance,
+    calculate_collision_probability, parse_tle, propagate_batch, julian_dates, sgp4_propagate,
+    propagate_numerical, BSTAR_TO_BALLISTIC
+)
 from tools.ml_tools import extract_features
+from tools.tle_catalog import TLECatalog, validate_tle_pair, TLE_PATH
+from tools.ephemeris_cache import EphemerisCache
+from tools.visibility import predict_passes, station_geometry, gmst, teme_to_ecef
+from tools.conjunction_screening import (screen_positions, screen_catalog, refine_tca,
+                                         refine_events_numerical)
+from tools.conjunction_filters import prefilter_pairs
+from tools.collision_probability import collision_probability
+from tools.monte_carlo_pc import pc_monte_carlo
+from tools.maneuver_planning import plan_maneuvers, select_maneuver
+from tools.event_store import ConjunctionEventStore
+from tools.covariance import state_transition_matrices, propagate_covariance, event_probabilities
+from tools.eclipse import get_eclipse_schedule, predict_eclipses, sun_position, shadow_function, illumination, AU_KM
+from tools.downlink_scheduler import DownlinkScheduler, weighted_interval_schedule
+from tools.telemetry_store import TelemetryStore
+from tools.telemetry_aggregation import WindowAggregator
+from tools.telemetry_ingest import TelemetryIngestServer
+from tools.telemetry_simulator import TelemetrySimulator, simulated_housekeeping
+from tools.telemetry_archive import (TelemetryArchive, encode_timestamps, decode_timestamps, encode_floats,
+                                     decode_floats)
+from tools.telemetry_rollups import rollup, merge_rollups, lttb_indices, lttb
+from tools.telemetry_recording import TelemetryRecorder, read_recording
+from tools.telemetry_replay import TelemetryReplayer, replay_pipeline
+from tools.frames import (teme_to_j2000, j2000_to_teme, teme_to_ecef_velocity, ecef_to_geodetic,
+                          geodetic_to_ecef)
 
 
 def test_parse_telemetry():
     """Test telemetry parsing"""
-    raw_data = b"test_data"
+    raw_data = encode_frames(42, [1763424000.5], {'position_km': [[6878.0, 0.0, 0.0]],
+                                                  'battery_temp_c': [22.5], 'power_w': [450.0]})
     telemetry = parse_telemetry(raw_data)
 
     assert 'timestamp' in telemetry
     assert 'position' in telemetry
     assert 'velocity' in telemetry
+    assert telemetry['apid'] == 42
+    assert telemetry['timestamp'].microsecond == 500000
+    assert telemetry['temperature'] == pytest.approx(22.5)
+    with pytest.raises(ValueError):
+        parse_telemetry(b"test_data")
 
 
+def test_decode_frames():
+    """Test batch decoding is a zero-copy view that round-trips every field"""
+    rng = np.random.default_rng(3)
+    n = 1000
+    timestamps = 1763424000.0 + np.arange(n) * 0.25
+    payload = {'position_km': rng.normal(size=(n, 3)), 'velocity_km_s': rng.normal(size=(n, 3)),
+               'battery_temp_c': rng.normal(20, 3, n), 'power_w': rng.normal(450, 10, n),
+               'attitude_deg': rng.normal(size=(n, 3))}
+    apids = rng.integers(0, 2048, n)
+    buffer = bytearray(encode_frames(apids, timestamps, payload, sequence_counts=np.arange(n) + 16380))
+
+    frames = decode_frames(buffer)
+    assert len(frames) == n and np.shares_memory(frames, np.frombuffer(buffer, dtype=np.uint8))
+    np.testing.assert_array_equal(frame_apids(frames), apids)
+    np.testing.assert_array_equal(frame_sequence_counts(frames), (np.arange(n) + 16380) % 16384)
+    np.testing.assert_allclose(frame_times(frames), timestamps, atol=1 / 65536)
+    for name, values in payload.items():
+        np.testing.assert_allclose(frames[name], values, rtol=1e-6)
+
+    with pytest.raises(ValueError):
+        decode_frames(buffer[:-1])
+    buffer[5] += 1  # corrupt one packet length
+    with pytest.raises(ValueError):
+        decode_frames(buffer)
+
+
+def test_telemetry_store():
+    """Test ring-buffer retention, wrapped windows and zero-copy views"""
+    from collections import deque
+
+    rng = np.random.default_rng(5)
+    store = TelemetryStore(retention_seconds=50, view_seconds=20)
+    reference = {name: deque(maxlen=50) for name in ('A', 'B', 'C')}
+    t = 0.0
+    for batch in range(40):
+        satellites = rng.choice(['A', 'B', 'C'], size=rng.integers(1, 120)).tolist()
+        timestamps = t + np.arange(len(satellites))
+        t += len(satellites)
+        power = rng.normal(450, 10, len(satellites))
+        if batch % 4 == 0:
+            for satellite, timestamp, value in zip(satellites, timestamps, power):
+                store.append(satellite, timestamp, power_w=value)
+        else:
+            store.append_batch(satellites, timestamps, {'power_w': power})
+        for satellite, timestamp, value in zip(satellites, timestamps, power):
+            reference[satellite].append((timestamp, value))
+
+    for satellite, held in reference.items():
+        times, values = store.window(satellite, 'power_w')
+        np.testing.assert_array_equal(times, [h[0] for h in held])
+        np.testing.assert_allclose(values, [h[1] for h in held], rtol=1e-6)
+
+        start, end = held[10][0] - 0.5, held[40][0]
+        times, _ = store.window(satellite, 'power_w', start=start, end=end)
+        np.testing.assert_array_equal(times, [h[0] for h in held if start <= h[0] <= end])
+
+        times, values = store.window(satellite, 'power_w', last=20)
+        np.testing.assert_array_equal(times, [h[0] for h in list(held)[-20:]])
+        assert not values.flags.owndata and not values.flags.writeable
+
+    latest = store.latest(['A', 'missing'])
+    assert latest['timestamp'][0] == reference['A'][-1][0]
+    assert np.isnan(latest['timestamp'][1]) and np.isnan(latest['battery_temp_c'][0])
+    assert store.timestamps.shape[1] == 50 + 20
+
+
+def test_window_aggregator():
+    """Test streaming window statistics against direct computation over the window"""
+    from datetime import datetime, timedelta
+
+    rng = np.random.default_rng(11)
+    aggregator = WindowAggregator(window_seconds=60, panes=12)
+    satellites = np.array([f'SAT-{i}' for i in range(40)])
+    t0 = 1.7e9
+    history = []
+    for second in range(200):
+        timestamps = t0 + second + rng.random(len(satellites)) * 0.5
+        temperature = rng.normal(20, 5, len(satellites))
+        aggregator.update_batch(satellites, timestamps, {'battery_temp_c': temperature})
+        history.append((timestamps, temperature))
+    times = np.concatenate([h[0] for h in history]).reshape(-1, len(satellites))[:, 3]
+    values = np.concatenate([h[1] for h in history]).reshape(-1, len(satellites))[:, 3]
+
+    stats = aggregator.sliding_window(['SAT-3', 'missing'])
+    pane = np.floor(times / aggregator.pane_seconds)
+    window = values[pane > pane.max() - aggregator.panes]
+    assert stats['count'][0, 0] == len(window) == 60
+    np.testing.assert_allclose(stats['mean'][0, 0], window.mean())
+    np.testing.assert_allclose(stats['std'][0, 0], window.std(ddof=1))
+    assert stats['min'][0, 0] == window.min() and stats['max'][0, 0] == window.max()
+    assert abs(stats['p50'][0, 0] - np.median(window)) < 120.0 / aggregator.bins
+    assert stats['count'][1, 0] == 0 and np.isnan(stats['mean'][1, 0])
+    assert np.isnan(stats['mean'][0, 1])    # channel never reported
+
+    # Running window totals for every satellite, and a 'now' that cuts through the window
+    every = aggregator.sliding_window(satellites)
+    all_times = np.concatenate([h[0] for h in history]).reshape(-1, len(satellites))
+    all_values = np.concatenate([h[1] for h in history]).reshape(-1, len(satellites))
+    all_panes = np.floor(all_times / aggregator.pane_seconds)
+    held = all_panes > all_panes.max(axis=0) - aggregator.panes
+    np.testing.assert_allclose(every['mean'][:, 0], np.nanmean(np.where(held, all_values, np.nan), axis=0))
+    np.testing.assert_array_equal(every['max'][:, 0], np.max(np.where(held, all_values, -np.inf), axis=0))
+    later = aggregator.sliding_window(['SAT-3'], now=times.max() + 30)
+    window = values[pane > pane.max() + 6 - aggregator.panes]
+    assert later['count'][0, 0] == len(window) == 30
+    np.testing.assert_allclose(later['mean'][0, 0], window.mean())
+    assert later['min'][0, 0] == window.min()
+
+    tumbling = aggregator.tumbling_window(['SAT-3'])
+    bucket = values[np.floor(times / 60) == tumbling['start'][0] / 60]
+    assert tumbling['count'][0, 0] == len(bucket)
+    np.testing.assert_allclose(tumbling['variance'][0, 0], bucket.var(ddof=1))
+
+    start = datetime(2025, 11, 18)
+    samples = [{'timestamp': start + timedelta(seconds=s), 'temperature': float(s), 'power': 400.0}
+               for s in range(120)]
+    aggregated = aggregate_telemetry(samples, window_seconds=60)
+    assert aggregated['sample_count'] == 60
+    assert aggregated['mean_temperature'] == np.mean(np.arange(60, 120))
+    assert aggregated['max_temperature'] == 119.0
+
+
+@pytest.mark.asyncio
+async def test_telemetry_ingest():
+    """Test UDP ingestion from the simulator, drop policy and rejection of bad datagrams"""
+    import asyncio
+    import socket
+
+    store, aggregator = TelemetryStore(), WindowAggregator()
+    async with TelemetryIngestServer(store, aggregator, udp_port=0, tcp_port=None,
+                                     batch_interval_seconds=0.02) as server:
+        batches = server.subscribe()
+        simulator = TelemetrySimulator(n_satellites=20, rate_hz=10.0, port=server.udp_address[1])
+        sent = await simulator.run(0.5)
+        await asyncio.sleep(0.1)
+        metrics = server.metrics()
+    assert sent >= 100 and metrics['packets_ingested'] == sent
+    assert metrics['packets_lost'] == metrics['packets_dropped'] == metrics['queue_depth'] == 0
+    assert len(store) == 20 and 'LEO-SAT-001' in store and 'LEO-SAT-020' in store
+    assert not np.isnan(store.latest(['LEO-SAT-007'])['altitude_km'][0])
+    assert aggregator.sliding_window(['LEO-SAT-001'])['count'][0, 0] > 1
+    assert not batches.empty()
+
+    server = TelemetryIngestServer(TelemetryStore(), WindowAggregator(), udp_port=0, tcp_port=None,
+                                   batch_interval_seconds=10.0, max_queue_packets=100)
+    async with server:
+        data = TelemetrySimulator(n_satellites=300).packets(1.7e9)
+        size = len(data) // 300
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for i in range(300):
+                sock.sendto(data[i * size:(i + 1) * size], server.udp_address)
+            sock.sendto(data[:size - 1], server.udp_address)
+        while server.counters['packets_rejected'] == 0:
+            await asyncio.sleep(0.01)
+    metrics = server.metrics()
+    assert metrics['packets_received'] == 300 and metrics['packets_rejected'] == 1
+    assert metrics['packets_dropped'] == 200 and metrics['packets_ingested'] == 100
+    assert server.store.satellites[0] == 'LEO-SAT-201'     # oldest packets were dropped
+
+
+
+@pytest.mark.asyncio
+async def test_telemetry_replay(tmp_path):
+    """Test recording round trip, identical ingestion at any replay speed and pipeline latency report"""
+    import asyncio
+    import time
+
+    path = str(tmp_path / 'pass.tlmrec')
+    t0 = 1.7e9
+    with TelemetryRecorder(path) as recorder:
+        for second in range(10):
+            payload = simulated_housekeeping(20, np.full(20, t0 + second))
+            if second == 4:
+                payload['battery_temp_c'][3] = 60.0
+            data = encode_frames(np.arange(1, 21), np.full(20, t0 + second), payload, np.full(20, second))
+            recorder.write(data[:len(data) // 2], np.full(10, t0 + second + 0.1))
+            recorder.write(data[len(data) // 2:], np.full(10, t0 + second + 0.6))
+    blocks = list(read_recording(path))
+    assert len(blocks) == 20 and blocks[1][0].tolist() == [t0 + 0.6] * 10 and len(blocks[1][1]) == len(data) // 2
+
+    stores = []
+    for speed in (None, 50.0):
+        store = TelemetryStore()
+        async with TelemetryIngestServer(store, WindowAggregator(), udp_port=None, tcp_port=0,
+                                         batch_interval_seconds=0.01) as server:
+            started = time.perf_counter()
+            assert await TelemetryReplayer(path, speed, *server.tcp_address[:2]).run() == 200
+            elapsed = time.perf_counter() - started
+            while server.counters['packets_ingested'] < 200:
+                await asyncio.sleep(0.01)
+        stores.append(store)
+    assert elapsed > 9.5 / 50.0 - 0.005         # PACING_SECONDS early at most
+    times, temperature = stores[0].window('LEO-SAT-004', 'battery_temp_c')
+    assert len(times) == 10 and temperature[4] == 60.0
+    assert all(np.array_equal(stores[0].window(s, 'power_w')[1], stores[1].window(s, 'power_w')[1])
+               for s in stores[0].satellites)
+
+    alerted = []
+
+    async def alert(verdicts):
+        alerted.extend(verdicts)
+
+    def detect(batch):
+        hot = np.flatnonzero(batch['columns']['battery_temp_c'] > 40.0)
+        return [{'index': int(i), 'satellite': batch['satellites'][i]} for i in hot]
+
+    report = await replay_pipeline(path, detect, alert, speed=None)
+    assert report['packets_sent'] == report['packets_ingested'] == 200
+    assert report['anomalies'] == report['alerts'] == 1 and alerted[0]['satellite'] == 'LEO-SAT-004'
+    assert 0 < report['verdict_latency_p50_seconds'] <= report['verdict_latency_max_seconds'] < 5.0
+    assert report['alert_latency_max_seconds'] >= report['alert_latency_p50_seconds'] > 0
+
+def test_validate_frames():
+    """Test batch validation reason bits, cross-batch state and zero-copy selection"""
+    t0 = 1.7e9
+    apids = np.array([1, 2, 1, 2, 1, 2, 1, 2])
+    timestamps = t0 + np.array([0, 0, 1, 1, 2, 0.5, 3, 400], dtype=np.float64)
+    payload = simulated_housekeeping(8, np.full(8, t0))
+    payload['position_km'][:] = payload['position_km'][0]
+    payload['velocity_km_s'][:] = payload['velocity_km_s'][0]
+    payload['power_w'][:] = 450.0
+    payload['battery_temp_c'][:] = 20.0
+    payload['power_w'][2] = np.nan
+    payload['battery_temp_c'][4] = 120.0
+    frames = decode_frames(encode_frames(apids, timestamps, payload))
+
+    reasons = validate_frames(frames, now=t0 + 10)
+    assert [reason_names(r) for r in reasons] == [
+        [], [], ['missing_field'], [],
+        ['out_of_range', 'rate_of_change'], ['non_monotonic'],
+        [], ['future_timestamp'],       # rate judged against packet 0, not the 120 C one
+    ]
+    kept = select_valid(frames, reasons)
+    assert len(kept) == 5 and kept is not frames
+    clean = frames[[0, 1]]
+    assert select_valid(clean, validate_frames(clean)) is clean
+
+    # Later batches are checked against the last kept packet of each APID (the NaN one was not kept)
+    validator = FrameValidator()
+    validator.validate(frames[:4], now=t0 + 10)
+    later = decode_frames(encode_frames([1, 2], t0 + np.array([-0.5, 600.0]),
+                                        {name: values[:2] for name, values in payload.items()}))
+    reasons = validator.validate(later, now=t0 + 600)
+    assert reasons[0] & NON_MONOTONIC and reasons[0] & STALE and not reasons[1]
+
+    garbage = np.frombuffer(bytes(HOUSEKEEPING_DTYPE.itemsize), dtype=HOUSEKEEPING_DTYPE)
+    assert reason_names(validate_frames(garbage)[0])[0] == 'bad_header'
+
+    # A spike, or a rejected packet's garbage values, does not flag the good packet after it
+    spike = {name: values[[0] * 6] for name, values in payload.items()}
+    spike['battery_temp_c'][[1, 4]] = 70.0
+    frames = decode_frames(encode_frames(np.ones(6, dtype=int), t0 + np.arange(6.0), spike))
+    frames = np.concatenate([frames[:3], garbage, frames[3:]])
+    assert [reason_names(r) for r in validate_frames(frames)] == [
+        [], ['rate_of_change'], [], ['bad_header', 'out_of_range'], [], ['rate_of_change'], []]
+    validator = FrameValidator()
+    assert validator.validate(frames[:6])[-1] == RATE_OF_CHANGE and not validator.validate(frames[6:])[0]
+
+
+def test_telemetry_archive(tmp_path):
+    """Test lossless codecs, chunking across day boundaries, range queries and reopening"""
+    rng = np.random.default_rng(0)
+    timestamps = 1.7e9 + np.cumsum(rng.choice([1.0, 1.0, 2.0], 500)) + rng.integers(0, 4, 500) / 65536
+    assert np.array_equal(decode_timestamps(encode_timestamps(timestamps), 500), timestamps)
+    assert decode_timestamps(encode_timestamps(timestamps[:1]), 1)[0] == timestamps[0]
+    values = (20.0 + np.cumsum(rng.normal(0.0, 0.01, 500))).astype(np.float32)
+    values[7] = np.nan
+    blob = encode_floats(values)
+    assert np.array_equal(decode_floats(blob, 500), values, equal_nan=True) and len(blob) < values.nbytes
+
+    midnight = 1.7e9 - 1.7e9 % 86400
+    archive = TelemetryArchive(tmp_path)
+    power = rng.normal(450.0, 5.0, 7200).astype(np.float32)
+    for second in range(3600):      # 23:30 - 00:30, two satellites at 1 Hz
+        t = midnight - 1800.0 + second
+        archive.append_batch(['LEO-SAT-001', 'LEO-SAT-002'], [t, t + 0.5],
+                             {'power_w': power[2 * second:2 * second + 2]})
+    assert archive.days('LEO-SAT-002') == ['20231113']     # 00:00 - 00:30 still buffered
+    result = archive.query('LEO-SAT-002', 'power_w')
+    assert len(result['timestamp']) == 3600 and np.array_equal(result['power_w'], power[1::2])
+    assert np.all(np.isnan(archive.query('LEO-SAT-002')['battery_temp_c']))
+
+    archive.close()
+    archive = TelemetryArchive(tmp_path)
+    assert archive.days('LEO-SAT-002') == ['20231113', '20231114']
+    assert len(archive.index('LEO-SAT-002', '20231114')) == 1
+    result = archive.query('LEO-SAT-002', ['power_w'], start=midnight - 10.0, end=midnight + 10.0)
+    assert np.array_equal(result['timestamp'], midnight - 9.5 + np.arange(20))
+    assert np.array_equal(result['power_w'], power[2 * 1790 + 1:2 * 1810:2])
+    assert len(archive.query('LEO-SAT-003', 'power_w')['timestamp']) == 0
+    assert sum(path.stat().st_size for path in tmp_path.glob('*/*.tlm')) < 7200 * 4
+    archive.close()
+
+
+@pytest.mark.asyncio
+async def test_telemetry_archive_record(tmp_path):
+    """Test the subscription is read while windows are written and drained on cancellation"""
+    import asyncio
+    import time
+
+    archive = TelemetryArchive(tmp_path, chunk_seconds=60.0, flush_delay_seconds=1.0)
+    write = archive._write
+    archive._write = lambda pending: (time.sleep(0.2), write(pending))   # slow disk
+    batches, dropped = asyncio.Queue(4), 0
+    task = asyncio.create_task(archive.record(batches))
+    t0 = 1.7e9 - 1.7e9 % 86400
+    for second in range(200):
+        if batches.full():                  # TelemetryIngestServer drops the oldest
+            batches.get_nowait()
+            dropped += 1
+        batches.put_nowait({'satellites': ['LEO-SAT-001'], 'timestamps': [t0 + second],
+                            'columns': {'power_w': [float(second)]}})
+        if second < 197:                    # the last batches are still queued at shutdown
+            await asyncio.sleep(0.005)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert dropped == 0 and len(archive.index('LEO-SAT-001', archive.days('LEO-SAT-001')[0])) == 4
+    assert np.array_equal(archive.query('LEO-SAT-001', 'power_w')['power_w'], np.arange(200.0))
+    archive.close()
+
+
+def test_telemetry_rollups(tmp_path):
+    """Test rollup statistics and merging, LTTB peak retention and bounded archive series"""
+    rng = np.random.default_rng(0)
+    t0 = 1.7e9 - 1.7e9 % 86400
+    values = rng.normal(size=(7200, 2)).astype(np.float32)
+    values[:90, 0] = np.nan
+    records = rollup(t0 + np.arange(7200.0), values, 60.0)
+    assert len(records) == 120 and records['count'][1].tolist() == [30, 60]
+    assert np.isnan(records['mean'][0, 0]) and np.allclose(records['mean'][:, 1], values[:, 1].reshape(120, 60).mean(1))
+    assert np.array_equal(records['max'][:, 1], values[:, 1].reshape(120, 60).max(1))
+    halves = np.concatenate([rollup(t0 + np.arange(3000.0, 7200.0), values[3000:], 3600.0),
+                             rollup(t0 + np.arange(3000.0), values[:3000], 3600.0)])
+    merged, whole = merge_rollups(halves), rollup(t0 + np.arange(7200.0), values, 3600.0)
+    assert np.array_equal(merged['count'], whole['count']) and np.allclose(merged['mean'], whole['mean'])
+
+    x = np.arange(100_000.0)
+    y = np.sin(x / 5000) + rng.normal(0.0, 0.01, len(x))
+    y[31_337] = 10.0
+    kept = lttb_indices(x, y, 500)
+    assert len(kept) == 500 and kept[0] == 0 and kept[-1] == len(x) - 1 and 31_337 in kept
+    assert np.all(np.diff(kept) > 0) and len(lttb(x[:100], y[:100], 500)[0]) == 100
+
+    with TelemetryArchive(tmp_path) as archive:
+        for hour in range(72):
+            power = 450.0 + rng.normal(0.0, 5.0, 3600).astype(np.float32)
+            if hour == 40:
+                power[100] = 900.0
+            archive.append_batch(np.full(3600, 'LEO-SAT-001'), t0 + 3600.0 * hour + np.arange(3600.0),
+                                 {'power_w': power})
+        end = t0 + 72 * 3600.0
+        for span, resolution in [(600, 0.0), (86400, 60.0), (3 * 86400, 3600.0)]:
+            series = archive.series('LEO-SAT-001', 'power_w', start=end - span, end=end, max_points=200)
+            assert series['resolution_seconds'] == resolution and len(series['timestamp']) <= 200
+        assert series['max'].max() == 900.0 and series['min'].min() < 440.0
+        assert np.allclose(series['mean'], 450.0, atol=1.0)
+        # 2 Hz: 1 s buckets would fit the budget but are not stored, so the stored 1 min level is read
+        archive.append_batch(np.full(2400, 'LEO-SAT-002'), t0 + np.arange(2400) / 2, {'power_w': np.ones(2400)})
+        assert archive.series('LEO-SAT-002', 'power_w', max_points=100)['resolution_seconds'] == 60.0
+        raw = archive.query('LEO-SAT-001', 'power_w', start=t0 + 7200.0, end=t0 + 10799.0)['power_w']
+        hourly = archive.rollups('LEO-SAT-001', 3600.0, start=t0 + 7200.0, end=t0 + 7300.0)
+        assert len(hourly) == 1 and np.isclose(hourly['mean'][0, 1], raw.mean())
+
 def test_validate_telemetry():
     """Test telemetry validation"""
     valid_telemetry = {
@@ -53,6 +456,566 @@ def test_calculate_miss_distance():
     assert miss_distance >= 0
 
 
+ISS_TLE = (
+    "1 25544U 98067A   25322.50000000  .00002182  00000-0  41420-4 0  9997",
+    "2 25544  51.6416 247.4627 0006703 130.5360 325.0288 15.72125391563537"
+)
+
+
+def test_propagate_batch():
+    """Test vectorized SGP4 propagation shapes and consistency"""
+    satellite = parse_tle(*ISS_TLE)
+    jd = np.full(4, satellite.jdsatepoch)
+    fr = satellite.jdsatepochF + np.arange(4) / 1440
+
+    positions, velocities = propagate_batch([satellite, satellite], jd, fr)
+    assert positions.shape == (2, 4, 3)
+    assert velocities.shape == (2, 4, 3)
+
+    _, r, v = satellite.sgp4(jd[2], fr[2])
+    assert np.allclose(positions[1, 2], r)
+    assert np.allclose(velocities[1, 2], v)
+    assert 6600 < np.linalg.norm(positions[0, 0]) < 6900
+
+
+def test_julian_dates():
+    """Test datetime to two-part Julian date conversion"""
+    from datetime import datetime
+    jd, fr = julian_dates(datetime(2025, 11, 18, 12, 0, 0))
+    assert jd[0] + fr[0] == pytest.approx(2460998.0)
+
+
+def test_sgp4_propagate():
+    """Test single-object propagation returns a LEO state"""
+    position, velocity = sgp4_propagate(*ISS_TLE, 1.0)
+    assert position.shape == (3,)
+    assert 6500 < np.linalg.norm(position) < 7100
+    assert 7.0 < np.linalg.norm(velocity) < 8.0
+
+
+
+def test_propagate_numerical():
+    """Test the J2-J4/drag integrator against SGP4, time reversal and drag decay"""
+    satellite = parse_tle(*ISS_TLE)
+    times = np.arange(0.0, 5401.0, 600.0)
+    positions, velocities = propagate_batch([satellite], np.full(len(times), satellite.jdsatepoch),
+                                            satellite.jdsatepochF + times / 86400.0)
+    ballistic = np.array([BSTAR_TO_BALLISTIC * satellite.bstar])
+
+    numerical, numerical_velocities = propagate_numerical(positions[:, 0], velocities[:, 0], times,
+                                                          ballistic)
+    assert numerical.shape == (1, len(times), 3)
+    assert np.linalg.norm(numerical[0] - positions[0], axis=1).max() < 1.0   # km over one orbit
+
+    back, _ = propagate_numerical(numerical[:, -1], numerical_velocities[:, -1], -times[1:], ballistic)
+    assert np.linalg.norm(back[0, -1] - positions[0, 0]) < 1e-3
+
+    def energy(r, v):
+        return 0.5 * np.sum(v**2, axis=-1) - 398600.4418 / np.linalg.norm(r, axis=-1)
+    heavy_drag, heavy_velocities = propagate_numerical(positions[:, 0], velocities[:, 0], times,
+                                                       ballistic * 1e4)
+    assert energy(heavy_drag[0, -1], heavy_velocities[0, -1]) < energy(
+        numerical[0, -1], numerical_velocities[0, -1])
+
+def test_validate_tle_pair():
+    """Test TLE checksum validation"""
+    is_valid, errors = validate_tle_pair(*ISS_TLE)
+    assert is_valid and errors == []
+
+    corrupted = ISS_TLE[0][:68] + "0"
+    is_valid, errors = validate_tle_pair(corrupted, ISS_TLE[1])
+    assert not is_valid
+    assert "Checksum" in errors[0]
+
+
+def test_tle_catalog(tmp_path):
+    """Test columnar catalog parsing, indexing and cache round trip"""
+    catalog = TLECatalog.from_file(TLE_PATH, cache_dir=str(tmp_path))
+
+    assert len(catalog) == 4
+    assert catalog.index_of(25544) == catalog.index_of("ISS (ZARYA)")
+    assert catalog['inclination'].dtype == np.float64
+
+    # Records rebuilt from the columns propagate like the original TLE
+    satellite = parse_tle(*ISS_TLE)
+    positions, _ = propagate_batch(catalog.satellites(), satellite.jdsatepoch, satellite.jdsatepochF + 0.1)
+    _, r, _ = satellite.sgp4(satellite.jdsatepoch, satellite.jdsatepochF + 0.1)
+    assert np.allclose(positions[catalog.index_of(25544), 0], r, atol=1e-3)
+
+    cached = TLECatalog.from_file(TLE_PATH, cache_dir=str(tmp_path))
+    assert isinstance(cached.norad_ids, np.memmap)
+    assert np.array_equal(cached.norad_ids, catalog.norad_ids)
+    assert cached.index_of("LEO-SAT-002") == catalog.index_of(40001)
+
+
+def test_ephemeris_cache():
+    """Test interpolated states, cache hits, epoch invalidation and eviction"""
+    catalog = TLECatalog.from_file(TLE_PATH, cache_dir=None)
+    cache = EphemerisCache(step_seconds=60.0)
+    jd = np.full(50, 2460998.0)
+    fr = np.linspace(0.0, 0.2, 50) + 1e-4
+
+    positions, velocities = cache.states(catalog.norad_ids, jd, fr, catalog=catalog)
+    expected_pos, expected_vel = propagate_batch(catalog.satellites(), jd, fr)
+    assert np.linalg.norm(positions - expected_pos, axis=-1).max() <= cache.error_bound_km
+    assert np.abs(velocities - expected_vel).max() < 1e-4
+
+    # Eccentric objects (e up to 0.02, perigee down to ~6,600 km) stay within their own bounds
+    from benchmarks.synthetic import synthetic_catalog, BENCHMARK_EPOCH_JD
+    eccentric = synthetic_catalog(300, seed=3)
+    eccentric = eccentric.subset(eccentric.norad_ids[eccentric['eccentricity'] > 0.01])
+    times = np.random.default_rng(0).uniform(0.0, 0.5, 2000)
+    interpolated, _ = EphemerisCache(step_seconds=60.0).states(eccentric.norad_ids, np.full(2000, BENCHMARK_EPOCH_JD),
+                                                               times, catalog=eccentric)
+    propagated, _ = propagate_batch(eccentric.satellites(), np.full(2000, BENCHMARK_EPOCH_JD), times)
+    error = np.linalg.norm(interpolated - propagated, axis=-1).max(axis=1)
+    assert np.all(error <= cache.error_bounds_km(eccentric.norad_ids, catalog=eccentric))
+    assert error.max() <= cache.error_bound_km
+
+    cache.states([25544], jd[:5], fr[:5], catalog=catalog)
+    assert cache.hits == 1 and cache.misses == 4
+
+    # A newer element set replaces the cached ephemeris
+    columns = {name: np.array(values) for name, values in catalog.columns.items()}
+    columns['epoch_fr'] = columns['epoch_fr'] + 0.01
+    updated = TLECatalog(catalog.names, columns)
+    cache.states([25544], jd[:5], fr[:5], catalog=updated)
+    assert cache.misses == 5
+    assert cache.entries[25544]['element_epoch'] > catalog['epoch_jd'][0]
+
+    small = EphemerisCache(memory_budget_mb=0.05)
+    for norad_id in catalog.norad_ids.tolist():
+        small.states([norad_id], jd, fr, catalog=catalog)
+    assert len(small) < len(catalog)
+    assert small.nbytes <= small.memory_budget_bytes or len(small) == 1
+
+
+def test_predict_passes():
+    """Test refined AOS/LOS/max elevation against a 1-second brute-force sweep"""
+    from datetime import datetime
+    from tools.orbital_mechanics import time_grid
+
+    catalog = TLECatalog.from_file(TLE_PATH, cache_dir=None)
+    station = {'name': 'Wallops', 'latitude_deg': 37.94, 'longitude_deg': -75.46,
+               'altitude_km': 0.01, 'min_elevation_deg': 5.0}
+    start = datetime(2025, 11, 18, 12)
+
+    passes = predict_passes(catalog, [station], start=start, duration_hours=12, satellites=[25544])
+    assert len(passes) > 0
+    assert all(p['aos'] < p['max_elevation_time'] < p['los'] for p in passes)
+
+    jd, fr = time_grid(start, 12, 1.0)
+    positions, _ = propagate_batch([catalog.satellite(25544)], jd, fr)
+    station_pos, up = station_geometry(station)
+    rho = teme_to_ecef(positions[0], gmst(jd, fr)) - station_pos
+    elevation = np.degrees(np.arcsin(rho @ up / np.linalg.norm(rho, axis=1)))
+    rises = np.nonzero(np.diff((elevation > 5.0).astype(int)) == 1)[0]
+
+    first = passes[0]
+    assert (first['aos'] - start).total_seconds() == pytest.approx(rises[0] + 0.5, abs=1.0)
+    assert first['max_elevation_deg'] == pytest.approx(elevation[rises[0]:rises[0] + 1200].max(), abs=0.05)
+
+
+def test_frames():
+    """Test frame conversions against Vallado's TEME example and geodetic round trips"""
+    from datetime import datetime
+
+    jd, fr = julian_dates(datetime(2004, 4, 6, 7, 51, 28, 386009))
+    r = np.array([[5094.18016210, 6127.64465950, 6380.34453270]])
+    v = np.array([[-4.746131487, 0.785818041, 5.531931288]])
+
+    np.testing.assert_allclose(teme_to_j2000(r, jd, fr)[0], [5102.5096, 6123.01152, 6378.1363], atol=1e-3)
+    np.testing.assert_allclose(j2000_to_teme(teme_to_j2000(r, jd, fr), jd, fr), r, atol=1e-9)
+    theta = gmst(jd, fr - 0.439961 / 86400)  # UT1
+    np.testing.assert_allclose(teme_to_ecef(r, theta)[0], [-1033.4750313, 7901.3055856, 6380.3445327], atol=1e-4)
+    np.testing.assert_allclose(teme_to_ecef_velocity(r, v, theta)[0],
+                               [-3.225636520, -2.872451450, 5.531924446], atol=1e-4)
+
+    # Batched (N, M, 3) ephemeris matches per-object conversion
+    ephemeris = np.stack([r * 1.0, r * 1.1, -r])[:, 0][:, None, :].repeat(2, axis=1)
+    both = (np.array([jd[0], jd[0]]), np.array([fr[0], fr[0] + 0.01]))
+    batched = teme_to_j2000(ephemeris, *both)
+    np.testing.assert_allclose(batched[1, 1], teme_to_j2000(ephemeris[1, 1:], jd, fr + 0.01)[0])
+
+    lat = np.array([89.9999, -45.0, 0.0, 30.5])
+    lon = np.array([10.0, -170.0, 0.0, 179.0])
+    alt = np.array([400.0, 0.0, 1000.0, 2.0])
+    back = ecef_to_geodetic(geodetic_to_ecef(lat, lon, alt))
+    np.testing.assert_allclose(back[0], lat, atol=1e-9)
+    np.testing.assert_allclose(back[1], lon, atol=1e-9)
+    np.testing.assert_allclose(back[2], alt, atol=1e-8)
+
+
+def test_predict_eclipses():
+    """Test Sun position and refined eclipse intervals against a 1 s shadow sweep"""
+    from datetime import datetime, timedelta
+    from tools.orbital_mechanics import time_grid
+
+    jd, fr = julian_dates(datetime(2006, 4, 2))
+    np.testing.assert_allclose(sun_position(jd, fr)[0] / AU_KM, [0.9771945, 0.1924424, 0.0834308], atol=1e-5)
+
+    catalog = TLECatalog.from_file(TLE_PATH, cache_dir=None)
+    start = datetime(2025, 11, 18)
+    eclipses = predict_eclipses(catalog, start=start, duration_hours=6, satellites=[25544])
+    assert len(eclipses) >= 3
+    assert all(e['entry'] < e['exit'] for e in eclipses)
+
+    jd, fr = time_grid(start, 6, 1.0)
+    positions, _ = propagate_batch([catalog.satellite(25544)], jd, fr)
+    sun = sun_position(jd, fr)
+    shadow = shadow_function(positions, sun)[0]
+    crossings = np.nonzero(np.diff((shadow < 0).astype(int)))[0] + 0.5
+    refined = sorted((e[key] - start).total_seconds() for e in eclipses for key in ('entry', 'exit')
+                     if start < e[key] < start + timedelta(hours=6))
+    np.testing.assert_allclose(refined, crossings, atol=0.6)
+
+    # Full sun or full umbra away from the limb; monotonic through the penumbra
+    sunlit = illumination(positions, sun)[0]
+    assert set(np.unique(sunlit[np.abs(shadow) > 0.01])) <= {0.0, 1.0}
+    penumbra = np.diff(sunlit[int(crossings[0]) - 20:int(crossings[0]) + 20])
+    assert np.all(penumbra >= 0) or np.all(penumbra <= 0)
+
+    # The shared schedule is reused within its window and re-predicted when the element set changes
+    schedule = get_eclipse_schedule([25544], start=start, duration_hours=6, catalog=catalog)
+    assert [e['entry'] for e in schedule] == [e['entry'] for e in eclipses]
+    inner = get_eclipse_schedule([25544], start=start + timedelta(hours=1), duration_hours=3, catalog=catalog)
+    assert inner and all(any(e is f for f in schedule) for e in inner)
+    reloaded = TLECatalog(catalog.names, {**catalog.columns, 'epoch_fr': catalog['epoch_fr'] + 0.001})
+    shifted = get_eclipse_schedule([25544], start=start, duration_hours=6, catalog=reloaded)
+    delays = [(a['entry'] - b['entry']).total_seconds() for a, b in zip(shifted[1:], schedule[1:])]
+    assert len(delays) >= 3 and np.allclose(delays, 86.4, atol=1.0)
+
+
+def test_downlink_scheduler():
+    """Test downlink plans respect station/satellite exclusivity and update incrementally"""
+    from datetime import datetime, timedelta
+
+    start = np.array([0.0, 5.0, 12.0, 20.0])
+    end = np.array([10.0, 15.0, 22.0, 30.0])
+    chosen = weighted_interval_schedule(start, end, np.array([10.0, 30.0, 1.0, 10.0]), gap=1.0)
+    assert chosen.tolist() == [1, 3]
+
+    t0 = datetime(2025, 11, 18)
+
+    def window(norad_id, station, aos_min, los_min):
+        return {'satellite': f'SAT-{norad_id}', 'norad_id': norad_id, 'station': station,
+                'aos': t0 + timedelta(minutes=aos_min), 'los': t0 + timedelta(minutes=los_min)}
+
+    stations = [{'name': 'A', 'data_rate_mbps': 100.0}, {'name': 'B', 'data_rate_mbps': 50.0}]
+    passes = [window(1, 'A', 0, 10), window(2, 'A', 5, 20), window(1, 'B', 12, 18),
+              window(2, 'B', 6, 14), window(3, 'A', 22, 30)]
+    scheduler = DownlinkScheduler(stations, turnaround_seconds=60.0)
+    plan = scheduler.schedule(passes)
+
+    for key in ('station', 'norad_id'):
+        groups = {}
+        for contact in plan:
+            groups.setdefault(contact[key], []).append(contact)
+        for contacts in groups.values():
+            assert all(a['end'] <= b['start'] for a, b in zip(contacts, contacts[1:]))
+    # Satellite 2 on A (15 min at 100) beats satellite 1 on A; satellite 1 still gets B later
+    assert {(c['norad_id'], c['station']) for c in plan} == {(2, 'A'), (1, 'B'), (3, 'A')}
+    assert scheduler.total_volume_mbit() == pytest.approx((15 * 100 + 6 * 50 + 8 * 100) * 60)
+
+    # Shrinking satellite 2's A window re-plans to match a full solve
+    shorter = window(2, 'A', 5, 8)
+    updated = scheduler.update(added=[shorter], removed=[passes[1]])
+    full = DownlinkScheduler(stations, turnaround_seconds=60.0).schedule(
+        [p for p in passes if p is not passes[1]] + [shorter])
+    assert [(c['norad_id'], c['station'], c['start']) for c in updated] == \
+        [(c['norad_id'], c['station'], c['start']) for c in full]
+
+
+def test_screen_positions_between_samples():
+    """Test head-on approach between grid samples is found with its linear TCA"""
+    t = np.array([-15.0, 15.0, 45.0])  # sample times (30 s step)
+    velocities = np.zeros((3, 3, 3))
+    velocities[0, :, 0], velocities[1, :, 0] = 7.5, -7.5
+    positions = np.zeros((3, 3, 3))
+    positions[0, :, 0] = 7.5 * (t - 10.0)           # meets object 1 at t = 10 s
+    positions[1, :, 0] = -7.5 * (t - 10.0)
+    positions[1, :, 1] = 0.8                         # 0.8 km miss
+    positions[2] = 5000.0                            # far away
+
+    candidates = screen_positions(positions, velocities, 30.0, screening_distance_km=2.0)
+    assert set(zip(candidates['primary'], candidates['secondary'])) == {(0, 1)}
+    best = np.argmin(candidates['miss_distance_km'])
+    assert candidates['miss_distance_km'][best] == pytest.approx(0.8)
+    assert candidates['tca_seconds'][best] - 15.0 == pytest.approx(10.0)
+
+
+def test_screen_catalog():
+    """Test catalog screening groups a persistent close pair into one event"""
+    from datetime import datetime
+    iss = parse_tle(*ISS_TLE)
+    shifted = parse_tle(*ISS_TLE)
+    names = ["ISS", "ISS-TRAILER", "LEO-SAT-001"]
+    catalog = TLECatalog.from_satellites(names, [iss, shifted, parse_tle(*ISS_TLE)])
+    catalog.columns['norad_id'][1:] = [90001, 90002]
+    catalog.columns['mean_anomaly'][1] += np.radians(0.01)   # ~1.2 km along-track
+    catalog.columns['raan'][2] += np.radians(30.0)           # different plane
+    catalog = TLECatalog(catalog.names, catalog.columns)
+
+    events = screen_catalog(catalog, start=datetime(2025, 11, 18, 12), duration_hours=1.0,
+                            screening_distance_km=5.0)
+    assert len(events['primary']) == 1
+    assert (events['primary'][0], events['secondary'][0]) == (0, 1)
+    assert 0.8 < events['miss_distance_km'][0] < 1.6
+
+
+
+def test_screen_catalog_workers():
+    """Test sharded screening merges a pair that stays close across every shard"""
+    from datetime import datetime
+    catalog = TLECatalog.from_satellites(["ISS", "ISS-TRAILER", "LEO-SAT-001"],
+                                         [parse_tle(*ISS_TLE) for _ in range(3)])
+    catalog.columns['norad_id'][1:] = [90001, 90002]
+    catalog.columns['mean_anomaly'][1] += np.radians(0.01)
+    catalog.columns['raan'][2] += np.radians(30.0)
+    catalog = TLECatalog(catalog.names, catalog.columns)
+
+    start = datetime(2025, 11, 18, 12)
+    with ProcessPoolExecutor(max_workers=2) as executor:    # one pool serving several runs
+        for prefilter in (False, True):
+            serial = screen_catalog(catalog, start=start, duration_hours=1.0, block_steps=30,
+                                    prefilter=prefilter)
+            sharded = screen_catalog(catalog, start=start, duration_hours=1.0, block_steps=30,
+                                     prefilter=prefilter, workers=2)
+            pooled = screen_catalog(catalog, start=start, duration_hours=1.0, block_steps=30,
+                                    prefilter=prefilter, workers=2, executor=executor)
+            assert len(sharded['primary']) == 1
+            for column in ('primary', 'secondary', 'tca_seconds', 'miss_distance_km'):
+                assert np.array_equal(sharded[column], serial[column])
+                assert np.array_equal(pooled[column], serial[column])
+
+def test_refine_tca():
+    """Test batched TCA refinement against a fine SGP4 sweep"""
+    catalog = TLECatalog.from_satellites(["ISS", "ISS-NEIGHBOUR"], [parse_tle(*ISS_TLE)] * 2)
+    catalog.columns['norad_id'][1] = 90001
+    catalog.columns['raan'][1] += np.radians(0.02)
+    catalog.columns['mean_anomaly'][1] += np.radians(0.01)
+    satellites = TLECatalog(catalog.names, catalog.columns).satellites()
+    jd = np.full(241, 2460998.0)
+    fr = np.arange(241) * 30.0 / 86400.0
+    positions, velocities = propagate_batch(satellites, jd, fr)
+
+    distance = np.linalg.norm(positions[1] - positions[0], axis=1)
+    step = int(np.argmin(distance[1:-1])) + 1
+    tca = refine_tca(positions, velocities, np.array([[0, 1]]), np.array([step]), 30.0)
+
+    fine_fr = (tca['tca_seconds'][0] + np.arange(-30.0, 30.0, 0.01)) / 86400.0
+    fine_positions, _ = propagate_batch(satellites, np.full(len(fine_fr), 2460998.0), fine_fr)
+    fine_distance = np.linalg.norm(fine_positions[1] - fine_positions[0], axis=1)
+    assert abs(tca['miss_distance_km'][0] - fine_distance.min()) < 1e-3
+    assert tca['miss_distance_km'][0] <= distance.min()
+    assert abs(np.argmin(fine_distance) * 0.01 - 30.0) < 0.05
+
+
+
+def test_refine_events_numerical():
+    """Test numerical TCA refinement agrees with the SGP4 screening result"""
+    from datetime import datetime
+    catalog = TLECatalog.from_satellites(["ISS", "ISS-NEIGHBOUR"], [parse_tle(*ISS_TLE)] * 2)
+    catalog.columns['norad_id'][1] = 90001
+    catalog.columns['raan'][1] += np.radians(0.02)
+    catalog.columns['mean_anomaly'][1] += np.radians(0.01)
+    catalog = TLECatalog(catalog.names, catalog.columns)
+    events = screen_catalog(catalog, start=datetime(2025, 11, 18, 12), duration_hours=2.0)
+
+    refined = refine_events_numerical(catalog, events)
+    assert len(refined['tca_seconds']) == len(events['primary']) >= 1
+    assert np.allclose(refined['tca_seconds'], events['tca_seconds'], atol=0.5)
+    assert np.allclose(refined['miss_distance_km'], events['miss_distance_km'], atol=0.05)
+
+def test_prefilter_pairs():
+    """Test the filter chain drops separated orbits and keeps the close pair"""
+    from datetime import datetime
+    satellites = [parse_tle(*ISS_TLE) for _ in range(4)]
+    catalog = TLECatalog.from_satellites(["ISS", "ISS-TRAILER", "LEO-SAT-001", "HIGH"], satellites)
+    catalog.columns['norad_id'][1:] = [90001, 90002, 90003]
+    catalog.columns['mean_anomaly'][1] += np.radians(0.01)
+    catalog.columns['raan'][2] += np.radians(30.0)
+    catalog.columns['mean_motion'][3] *= 0.5                 # ~4,300 km higher
+    catalog = TLECatalog(catalog.names, catalog.columns)
+
+    start = datetime(2025, 11, 18, 12)
+    pairs, stats = prefilter_pairs(catalog, start=start, duration_hours=1.0)
+    assert [0, 1] in pairs.tolist()
+    assert not np.isin(pairs, 3).any()
+    assert stats['apogee_perigee'] == 3
+    assert stats['total_pairs'] == 6 and stats['remaining'] == len(pairs)
+
+    events = screen_catalog(catalog, start=start, duration_hours=1.0, prefilter=True)
+    assert len(events['primary']) == 1
+    assert 0.8 < events['miss_distance_km'][0] < 1.6
+
+
+def test_prefilter_matches_brute_force():
+    """Test prefiltered screening finds every conjunction brute-force screening finds"""
+    from datetime import datetime
+    from benchmarks.synthetic import synthetic_catalog
+
+    catalog = synthetic_catalog(1000, seed=1)   # a flat 20 km pad dropped a 25 km conjunction here
+    options = dict(start=datetime(2025, 11, 18), duration_hours=6.0, screening_distance_km=25.0)
+    brute = screen_catalog(catalog, **options)
+    filtered = screen_catalog(catalog, prefilter=True, **options)
+    assert len(brute['primary']) > 100
+    assert set(zip(brute['primary'].tolist(), brute['secondary'].tolist())) <= \
+        set(zip(filtered['primary'].tolist(), filtered['secondary'].tolist()))
+
+
+def test_collision_probability():
+    """Test batched Pc against direct grid integration of the 2D Gaussian"""
+    miss = np.array([[30.0, -20.0], [0.0, 0.0], [400.0, 150.0]])
+    covariance = np.array([[[90.0**2, 2000.0], [2000.0, 40.0**2]],
+                           [[200.0**2, 0.0], [0.0, 200.0**2]],
+                           [[300.0**2, -8000.0], [-8000.0, 120.0**2]]])
+    radius = 10.0
+
+    grid = np.linspace(-radius, radius, 801)
+    x, y = np.meshgrid(grid, grid)
+    inside = x**2 + y**2 <= radius**2
+    expected = []
+    for m, c in zip(miss, covariance):
+        d = np.stack([x - m[0], y - m[1]], axis=-1)
+        density = np.exp(-0.5 * np.einsum('...i,ij,...j->...', d, np.linalg.inv(c), d)) / (
+            2 * np.pi * np.sqrt(np.linalg.det(c)))
+        expected.append(np.sum(density * inside) * (grid[1] - grid[0])**2)
+
+    exact = collision_probability(miss, covariance, radius)
+    lookup = collision_probability(miss, covariance, radius, method='lookup')
+    assert np.allclose(exact, expected, rtol=1e-2)
+    assert np.allclose(lookup, exact, rtol=3e-2)
+    assert abs(calculate_collision_probability(0.0, 200.0, 10.0) - exact[1]) < 1e-12
+    # Worst case of the isotropic approximation: 10:1 covariance, R at the guard, misses down to Pc = 1e-10
+    angle, depth = np.meshgrid(np.radians(np.arange(0.0, 91.0)), np.linspace(0.0, 7.0, 141))
+    miss = np.stack([10.0 * depth * np.cos(angle), depth * np.sin(angle)], axis=-1).reshape(-1, 2)
+    covariance = np.broadcast_to(np.diag([100.0, 1.0]), (len(miss), 2, 2))
+    reference = collision_probability(miss, covariance, 0.1)
+    error = np.abs(collision_probability(miss, covariance, 0.1, method='lookup') / reference - 1)
+    assert 0.03 < error[reference >= 1e-10].max() < 0.034
+
+    with pytest.raises(ValueError):
+        collision_probability(miss, covariance, radius, method='monte-carlo')
+
+
+
+def test_covariance_propagation():
+    """Test batched STMs against direct propagation and encounter-plane covariances from screening"""
+    from datetime import datetime
+    from tools.orbital_mechanics import kepler_propagate
+    positions = np.array([[7000.0, 0.0, 0.0], [0.0, 6800.0, 300.0]])
+    velocities = np.array([[0.0, 7.2, 1.0], [-7.6, 0.0, 0.4]])
+    dt = np.array([1500.0, 4000.0])
+    stm = state_transition_matrices(positions, velocities, dt)
+    assert stm.shape == (2, 6, 6)
+    assert np.allclose(np.linalg.det(stm), 1.0, atol=1e-6)   # two-body flow preserves phase volume
+
+    deviation = np.array([0.05, -0.02, 0.01, 2e-5, -1e-5, 3e-5])
+    r0, v0 = kepler_propagate(positions, velocities, dt)
+    r1, v1 = kepler_propagate(positions + deviation[:3], velocities + deviation[3:], dt)
+    linear = np.einsum('kij,j->ki', stm, deviation)
+    assert np.allclose(linear, np.concatenate([r1 - r0, v1 - v0], axis=1), atol=1e-4)
+
+    covariance = propagate_covariance(np.diag([0.1**2] * 3 + [1e-4**2] * 3), stm)
+    assert np.allclose(covariance, np.swapaxes(covariance, 1, 2))
+
+    catalog = TLECatalog.from_satellites(["ISS", "ISS-TRAILER"], [parse_tle(*ISS_TLE)] * 2)
+    catalog.columns['norad_id'][1] = 90001
+    catalog.columns['mean_anomaly'][1] += np.radians(0.01)
+    catalog = TLECatalog(catalog.names, catalog.columns)
+    events = screen_catalog(catalog, start=datetime(2025, 11, 18, 12), duration_hours=1.0)
+    assert np.allclose(np.linalg.norm(events['relative_position_km'], axis=1),
+                       events['miss_distance_km'])
+
+    scored = event_probabilities(catalog, events, 0.01, 0.2, 2e-4)
+    assert np.allclose(np.linalg.norm(scored['miss_km'], axis=1), events['miss_distance_km'])
+    assert np.all(np.linalg.eigvalsh(scored['covariance_km2']) > 0)
+    assert np.all((scored['probability'] >= 0) & (scored['probability'] < 1))
+
+def test_pc_monte_carlo():
+    """Test Monte Carlo Pc agrees with the 2D integral and is worker-count independent"""
+    speed = np.sqrt(398600.4418 / 7000.0)
+    states = np.array([[7000.0, 0, 0, 0, speed, 0], [7000.3, 0, 0, 0, 0, speed]])
+    covariance = np.diag([0.1**2] * 3 + [1e-6**2] * 3)
+    covariances = np.stack([covariance, covariance])
+
+    expected = collision_probability(np.array([[0.3, 0.0]]), 2 * covariance[None, :2, :2], 0.05)[0]
+    estimate = pc_monte_carlo(states, covariances, 0.05, 0.0, max_samples=60_000, seed=1)
+    assert estimate['ci_low'] < expected < estimate['ci_high']
+
+    single = pc_monte_carlo(states, covariances, 0.05, 0.0, max_samples=20_000, batch_size=5_000)
+    pooled = pc_monte_carlo(states, covariances, 0.05, 0.0, max_samples=20_000, batch_size=5_000,
+                            workers=2)
+    assert single == pooled
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert pc_monte_carlo(states, covariances, 0.05, 0.0, max_samples=20_000, batch_size=5_000,
+                              workers=2, executor=executor) == single
+
+
+
+def test_plan_maneuvers():
+    """Test the planner finds along-track burns that clear a close approach"""
+    from datetime import datetime
+    catalog = TLECatalog.from_satellites(["ISS", "ISS-NEIGHBOUR"], [parse_tle(*ISS_TLE)] * 2)
+    catalog.columns['norad_id'][1] = 90001
+    catalog.columns['raan'][1] += np.radians(0.02)
+    catalog.columns['mean_anomaly'][1] += np.radians(0.01)
+    catalog = TLECatalog(catalog.names, catalog.columns)
+    primary, threat = catalog.satellite(25544), catalog.satellite(90001)
+
+    plan = plan_maneuvers(primary, [threat], [5407.9], datetime(2025, 11, 18, 12),
+                          np.eye(3) * 1.5**2, 0.02)
+    assert len(plan['risk']) == 4 * 5 * 11 * 5
+    assert plan['miss_distance_km'].shape == (len(plan['risk']), 1)
+
+    # Zero delta-V reproduces the unmaneuvered ~2.6 km approach
+    coast = np.flatnonzero(plan['delta_v_m_s'] == 0)
+    assert np.allclose(plan['miss_distance_km'][coast], 2.63, atol=0.01)
+    assert plan['risk'][coast[0]] > 1e-5
+
+    # Pareto set is sorted by fuel with strictly decreasing risk
+    pareto = plan['pareto']
+    assert np.all(np.diff(plan['delta_v_m_s'][pareto]) >= 0)
+    assert np.all(np.diff(plan['risk'][pareto]) < 0)
+
+    best = select_maneuver(plan, 1e-7)
+    assert plan['risk'][best] <= 1e-7
+    assert abs(plan['delta_v_rtn_m_s'][best][1]) > 0
+    assert plan['miss_distance_km'][best, 0] > plan['miss_distance_km'][coast[0], 0]
+
+
+def test_event_store():
+    """Test re-screened events update in place and queries filter by object, time and Pc"""
+    from datetime import datetime, timedelta
+    tca = datetime(2025, 11, 18, 12)
+    events = [
+        {'primary_id': 25544, 'secondary_id': 90001, 'tca': tca, 'miss_distance_km': 1.2,
+         'probability': 2e-4, 'covariance': [[100, 0], [0, 100]]},
+        {'primary_id': 25544, 'secondary_id': 90001, 'tca': tca + timedelta(hours=1.5),
+         'miss_distance_km': 3.0, 'probability': 1e-7},
+        {'primary_id': 90002, 'secondary_id': 90003, 'tca': tca + timedelta(hours=3),
+         'miss_distance_km': 0.4, 'probability': 5e-3},
+    ]
+    with ConjunctionEventStore(':memory:') as store:
+        assert store.upsert_events(events) == (3, 0)
+
+        # Same encounter re-screened (reversed pair order, TCA moved by 20 s)
+        rescreen = {'primary_id': 90001, 'secondary_id': 25544, 'tca': tca + timedelta(seconds=20),
+                    'miss_distance_km': 0.9, 'probability': 4e-4}
+        assert store.upsert_events([rescreen]) == (0, 1)
+        assert len(store) == 3
+
+        first = store.query(object_id=25544)
+        assert len(first) == 2
+        assert first[0]['miss_distance_km'] == 0.9 and first[0]['screen_count'] == 2
+        assert first[0]['tca'] == tca + timedelta(seconds=20)
+
+        assert len(store.query(start=tca + timedelta(hours=1), end=tca + timedelta(hours=2))) == 1
+        risky = store.query(min_probability=1e-4)
+        assert [e['secondary_id'] for e in risky] == [25544, 90003]
+        assert store.query(object_id=90003)[0]['covariance'] is None
+
 def test_extract_features():
     """Test feature extraction"""
     telemetry = {
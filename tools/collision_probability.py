@@ -0,0 +1,246 @@
+"""
+Collision Probability
+Batched 2D encounter-plane Pc (Foster/Alfano integral) with a precomputed lookup mode
+"""
+
+import logging
+import numpy as np
+from functools import lru_cache
+from typing import Tuple
+from scipy.special import erf, erfc, gammainc, gammaln, logsumexp, roots_legendre
+from scipy.stats import ncx2
+
+logger = logging.getLogger(__name__)
+
+PC_QUADRATURE_NODES = 64
+GAUSSIAN_SPAN_SIGMA = 8.0  # integrand support kept around the miss point
+
+# Lookup table axes: sqrt(u) = R / sqrt(sigma_x sigma_y), sqrt(v) = Mahalanobis miss distance
+LOOKUP_SQRT_U_MAX = 8.0
+LOOKUP_SQRT_V_MAX = 16.0
+LOOKUP_SPACING = 1.0 / 32
+LOOKUP_MAX_RADIUS_RATIO = 0.1  # R / sigma_y above which the lookup defers to pc_foster
+
+
+def encounter_plane(relative_position: np.ndarray, relative_velocity: np.ndarray) -> np.ndarray:
+    """
+    Encounter-plane basis at TCA
+
+    The plane is perpendicular to the relative velocity. The first axis runs
+    along the miss vector, the second completes the right-handed set.
+
+    Args:
+        relative_position, relative_velocity: (K, 3) secondary minus primary at TCA
+
+    Returns:
+        (K, 2, 3) basis rows
+    """
+    along = relative_velocity / np.linalg.norm(relative_velocity, axis=-1, keepdims=True)
+    # Remove any residual along-track component (TCA is only solved to a tolerance)
+    miss = relative_position - np.einsum('ij,ij->i', relative_position, along)[:, None] * along
+    x_axis = miss / np.maximum(np.linalg.norm(miss, axis=-1, keepdims=True), 1e-15)
+    y_axis = np.cross(along, x_axis)
+    return np.stack([x_axis, y_axis], axis=1)
+
+
+def project_to_encounter_plane(relative_position: np.ndarray, relative_velocity: np.ndarray,
+                               covariance: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Project a combined 3x3 position covariance into the encounter plane
+
+    Args:
+        relative_position, relative_velocity: (K, 3) at TCA
+        covariance: (K, 3, 3) combined position covariance in the same frame
+
+    Returns:
+        (miss, covariance_2d): (K, 2) miss vectors and (K, 2, 2) covariances
+    """
+    basis = encounter_plane(relative_position, relative_velocity)
+    miss = np.einsum('kij,kj->ki', basis, relative_position)
+    covariance_2d = np.einsum('kij,kjl,kml->kim', basis, covariance, basis)
+    return miss, covariance_2d
+
+
+def _principal_axes(miss: np.ndarray, covariance: np.ndarray):
+    """Rotate miss vectors into the principal axes of each 2x2 covariance"""
+    a, b, c = covariance[:, 0, 0], covariance[:, 0, 1], covariance[:, 1, 1]
+    theta = 0.5 * np.arctan2(2 * b, a - c)
+    cos, sin = np.cos(theta), np.sin(theta)
+    var_x = a * cos**2 + 2 * b * sin * cos + c * sin**2
+    var_y = a * sin**2 - 2 * b * sin * cos + c * cos**2
+    x = cos * miss[:, 0] + sin * miss[:, 1]
+    y = -sin * miss[:, 0] + cos * miss[:, 1]
+    return x, y, np.sqrt(np.maximum(var_x, 0)), np.sqrt(np.maximum(var_y, 0))
+
+
+def _erf_difference(upper: np.ndarray, lower: np.ndarray) -> np.ndarray:
+    """erf(upper) - erf(lower) without cancellation in the tails"""
+    return np.where(lower > 0, erfc(lower) - erfc(upper),
+                    np.where(upper < 0, erfc(-upper) - erfc(-lower), erf(upper) - erf(lower)))
+
+
+def pc_foster(miss: np.ndarray, covariance: np.ndarray, hard_body_radius,
+              nodes: int = PC_QUADRATURE_NODES) -> np.ndarray:
+    """
+    Probability of collision by numerical integration (Foster/Alfano)
+
+    Integrates the 2D Gaussian over the hard-body disk. In the covariance
+    principal axes the inner integral across the disk is an erf difference,
+    leaving a 1D integral over x that is evaluated with Gauss-Legendre
+    quadrature in x = R sin(phi) (which removes the square-root endpoint
+    singularity). The x range is clipped to GAUSSIAN_SPAN_SIGMA standard
+    deviations around the miss point so narrow distributions stay resolved;
+    the truncation limits absolute accuracy to about 1e-15. With the default
+    64 nodes the relative error is below 1e-9 against adaptive 2D quadrature
+    for sigma_y from R / 20 up to 300 R.
+
+    Args:
+        miss: (K, 2) miss vectors in the encounter plane
+        covariance: (K, 2, 2) combined covariances (same length units squared)
+        hard_body_radius: Combined hard-body radius, scalar or (K,)
+        nodes: Quadrature nodes per conjunction
+
+    Returns:
+        (K,) probabilities of collision
+    """
+    miss = np.atleast_2d(np.asarray(miss, dtype=np.float64))
+    covariance = np.asarray(covariance, dtype=np.float64).reshape(-1, 2, 2)
+    radius = np.broadcast_to(np.asarray(hard_body_radius, dtype=np.float64), (len(miss),))
+    x_m, y_m, sigma_x, sigma_y = _principal_axes(miss, covariance)
+
+    lo = np.clip(x_m - GAUSSIAN_SPAN_SIGMA * sigma_x, -radius, radius)
+    hi = np.clip(x_m + GAUSSIAN_SPAN_SIGMA * sigma_x, -radius, radius)
+    phi_lo = np.arcsin(lo / radius)
+    phi_hi = np.arcsin(hi / radius)
+
+    t, w = roots_legendre(nodes)
+    half = 0.5 * (phi_hi - phi_lo)
+    phi = (phi_lo + half)[:, None] + half[:, None] * t[None, :]
+    x = radius[:, None] * np.sin(phi)
+    chord = radius[:, None] * np.cos(phi)
+
+    root2_sigma_y = np.sqrt(2) * sigma_y[:, None]
+    across = 0.5 * _erf_difference((y_m[:, None] + chord) / root2_sigma_y,
+                                   (y_m[:, None] - chord) / root2_sigma_y)
+    density = np.exp(-0.5 * ((x - x_m[:, None]) / sigma_x[:, None])**2) / (
+        np.sqrt(2 * np.pi) * sigma_x[:, None])
+    pc = half * np.sum(w * density * across * chord, axis=1)
+    return np.clip(pc, 0.0, 1.0)
+
+
+def _isotropic_log_ratio(u: np.ndarray, v: np.ndarray, terms: int = 400) -> np.ndarray:
+    """
+    ln(Pc / ((u / 2) exp(-v / 2))) from the Poisson mixture form of the
+    noncentral chi-square CDF, summed in log space so nothing underflows
+    """
+    k = np.arange(terms)
+    with np.errstate(divide='ignore'):
+        log_terms = (k * np.log(np.maximum(v[:, None] / 2, 1e-300)) - gammaln(k + 1)
+                     + np.log(gammainc(k + 1, u[:, None] / 2)) - np.log(u[:, None] / 2))
+    log_terms[:, 1:] = np.where(v[:, None] > 0, log_terms[:, 1:], -np.inf)
+    return logsumexp(log_terms, axis=1)
+
+
+@lru_cache(maxsize=1)
+def _lookup_table() -> np.ndarray:
+    """
+    ln(Pc / ((u / 2) exp(-v / 2))) for the isotropic case on the lookup grid
+
+    The isotropic Pc is the noncentral chi-square CDF with 2 degrees of
+    freedom. Dividing out its small-body limit leaves a smooth function that
+    is 0 at u = 0, which interpolates far better than Pc itself. Nodes where
+    the CDF underflows are filled from the series form.
+    """
+    sqrt_u = np.arange(0.0, LOOKUP_SQRT_U_MAX + LOOKUP_SPACING / 2, LOOKUP_SPACING)
+    sqrt_v = np.arange(0.0, LOOKUP_SQRT_V_MAX + LOOKUP_SPACING / 2, LOOKUP_SPACING)
+    u = np.broadcast_to(sqrt_u[1:, None]**2, (len(sqrt_u) - 1, len(sqrt_v)))
+    v = np.broadcast_to(sqrt_v[None, :]**2, u.shape)
+
+    cdf = ncx2.cdf(u, 2, v)
+    with np.errstate(divide='ignore'):
+        ratio = np.log(cdf) - np.log(u / 2) + v / 2
+    underflow = cdf < 1e-280
+    ratio[underflow] = _isotropic_log_ratio(u[underflow], v[underflow])
+
+    table = np.zeros((len(sqrt_u), len(sqrt_v)))
+    table[1:] = ratio
+    logger.debug(f"Built Pc lookup table {table.shape}")
+    return table
+
+
+def pc_lookup(miss: np.ndarray, covariance: np.ndarray, hard_body_radius) -> np.ndarray:
+    """
+    Probability of collision from a precomputed table (Chan's equivalent isotropic form)
+
+    The covariance is replaced by an isotropic one of equal area, making Pc
+    a function of u = R^2 / (sigma_x sigma_y) and the squared Mahalanobis
+    miss distance v only. That function is tabulated once and interpolated
+    bilinearly in (sqrt u, sqrt v).
+
+    Error bounds (relative, against pc_foster):
+        - Interpolation: below 1e-3 for Pc >= 1e-10 and below 5e-3 down to
+          Pc = 1e-30 (isotropic reference, whole table).
+        - Equivalent isotropic approximation: grows as (R / sigma_y)^2 and
+          with the depth of the miss in the tail, and peaks near a 10:1
+          aspect ratio. Measured maxima over aspect ratios 1-1000 and every
+          miss direction: at R = 0.1 sigma_y (the LOOKUP_MAX_RADIUS_RATIO
+          guard) 3.3% for Pc >= 1e-10 and 1.3% for Pc >= 1e-6; at
+          R = 0.05 sigma_y 0.7% and 0.25%.
+        - Conjunctions beyond the guard or outside the table (R above 8
+          equivalent sigmas, miss beyond 16 sigmas) are evaluated by pc_foster.
+
+    Args:
+        miss: (K, 2) miss vectors in the encounter plane
+        covariance: (K, 2, 2) combined covariances
+        hard_body_radius: Combined hard-body radius, scalar or (K,)
+
+    Returns:
+        (K,) probabilities of collision
+    """
+    miss = np.atleast_2d(np.asarray(miss, dtype=np.float64))
+    covariance = np.asarray(covariance, dtype=np.float64).reshape(-1, 2, 2)
+    radius = np.broadcast_to(np.asarray(hard_body_radius, dtype=np.float64), (len(miss),))
+    x_m, y_m, sigma_x, sigma_y = _principal_axes(miss, covariance)
+
+    u = radius**2 / (sigma_x * sigma_y)
+    v = (x_m / sigma_x)**2 + (y_m / sigma_y)**2
+
+    table = _lookup_table()
+    gu = np.sqrt(u) / LOOKUP_SPACING
+    gv = np.sqrt(v) / LOOKUP_SPACING
+    in_table = ((gu <= table.shape[0] - 1) & (gv <= table.shape[1] - 1) &
+                (radius <= LOOKUP_MAX_RADIUS_RATIO * np.minimum(sigma_x, sigma_y)))
+    gu, gv = np.where(in_table, gu, 0.0), np.where(in_table, gv, 0.0)
+
+    i = np.minimum(gu.astype(np.int64), table.shape[0] - 2)
+    j = np.minimum(gv.astype(np.int64), table.shape[1] - 2)
+    fu, fv = gu - i, gv - j
+    ratio = ((1 - fu) * (1 - fv) * table[i, j] + fu * (1 - fv) * table[i + 1, j] +
+             (1 - fu) * fv * table[i, j + 1] + fu * fv * table[i + 1, j + 1])
+    pc = np.exp(ratio - v / 2) * (u / 2)
+
+    if not in_table.all():
+        fallback = ~in_table
+        pc[fallback] = pc_foster(miss[fallback], covariance[fallback], radius[fallback])
+    return np.clip(pc, 0.0, 1.0)
+
+
+def collision_probability(miss: np.ndarray, covariance: np.ndarray, hard_body_radius,
+                          method: str = 'exact') -> np.ndarray:
+    """
+    Probability of collision for arrays of conjunctions
+
+    Args:
+        miss: (K, 2) miss vectors in the encounter plane
+        covariance: (K, 2, 2) combined covariances
+        hard_body_radius: Combined hard-body radius, scalar or (K,)
+        method: 'exact' (numerical integration) or 'lookup' (precomputed table)
+
+    Returns:
+        (K,) probabilities of collision
+    """
+    if method == 'exact':
+        return pc_foster(miss, covariance, hard_body_radius)
+    if method == 'lookup':
+        return pc_lookup(miss, covariance, hard_body_radius)
+    raise ValueError(f"Unknown Pc method: {method!r} (expected 'exact' or 'lookup')")
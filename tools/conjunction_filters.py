@@ -0,0 +1,338 @@
+"""
+Conjunction Prefilters
+Classical apogee/perigee, orbit path and time filters (Hoots et al., 1984) over element columns
+"""
+
+import logging
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from tools.orbital_mechanics import (
+    propagate_batch, julian_dates, state_to_elements, j2_secular_rates, J2, EARTH_RADIUS_KM
+)
+from tools.tle_catalog import TLECatalog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAD_KM = 2.0           # drag decay and other radius changes not in spread_km
+# Osculating elements at one epoch miss the J2 short-period terms, so the radius they predict
+# strays from the propagated one by up to ~4.1 J2 Re^2 / a (26 km in LEO, measured over a
+# synthetic catalog); spread_km allows this factor per object
+SHORT_PERIOD_SPREAD = 6.0
+DEFAULT_PAD_SECONDS = 30.0     # timing margin per node passage
+
+
+def catalog_elements(catalog: TLECatalog, epoch: datetime,
+                     rows: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Osculating elements of catalog objects at a common epoch
+
+    Args:
+        catalog: Element source
+        epoch: Evaluation epoch (UTC)
+        rows: Catalog rows to evaluate (default: all)
+
+    Returns:
+        Element columns (see state_to_elements) plus perigee_km, apogee_km and
+        spread_km, the most the object's propagated radius can differ from
+        these elements. Objects that fail to propagate get NaN elements.
+    """
+    satellites = catalog.satellites() if rows is None else [
+        catalog.satellite(int(norad_id)) for norad_id in catalog.norad_ids[rows]]
+    jd, fr = julian_dates(epoch)
+    positions, velocities = propagate_batch(satellites, jd, fr)
+    elements = state_to_elements(positions[:, 0], velocities[:, 0])
+
+    a, e = elements['semi_major_axis_km'], elements['eccentricity']
+    elements['perigee_km'] = a * (1 - e)
+    elements['apogee_km'] = a * (1 + e)
+    elements['spread_km'] = SHORT_PERIOD_SPREAD * J2 * EARTH_RADIUS_KM**2 / a
+    return elements
+
+
+def apogee_perigee_pairs(perigee: np.ndarray, apogee: np.ndarray, distance_km: float,
+                         chunk_pairs: int = 5_000_000):
+    """
+    All-vs-all apogee/perigee filter as a sort-and-sweep interval join
+
+    Two orbits can only come within distance_km if their radial shells
+    [perigee, apogee] overlap once padded by distance_km. Objects are sorted
+    by perigee, so each object's partners are a contiguous run found with
+    one searchsorted call.
+
+    Yields:
+        (i, j) row index arrays of surviving pairs, in chunks of about chunk_pairs
+    """
+    valid = np.flatnonzero(np.isfinite(perigee) & np.isfinite(apogee))
+    order = valid[np.argsort(perigee[valid], kind='stable')]
+    sorted_perigee = perigee[order]
+
+    upper = np.searchsorted(sorted_perigee, apogee[order] + distance_km, side='right')
+    counts = np.maximum(upper - np.arange(len(order)) - 1, 0)
+    ends = np.cumsum(counts)
+
+    first = 0
+    while first < len(order):
+        base = ends[first - 1] if first else 0
+        last = int(np.searchsorted(ends, base + chunk_pairs, side='right'))
+        last = max(last, first + 1)
+
+        c = counts[first:last]
+        i_sorted = np.repeat(np.arange(first, last), c)
+        offsets = np.arange(c.sum()) - np.repeat(np.cumsum(c) - c, c)
+        j_sorted = i_sorted + 1 + offsets
+        yield order[i_sorted], order[j_sorted]
+        first = last
+
+
+def _orbit_frames(elements: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Orbit-normal, ascending-node and in-plane 90-degrees-ahead unit vectors of every object"""
+    inc, raan = elements['inclination'], elements['raan']
+    normal = np.stack([np.sin(inc) * np.sin(raan), -np.sin(inc) * np.cos(raan), np.cos(inc)], axis=-1)
+    node = np.stack([np.cos(raan), np.sin(raan), np.zeros_like(raan)], axis=-1)
+    return normal, node, np.cross(normal, node)
+
+
+def _mutual_node_geometry(elements: Dict[str, np.ndarray], i: np.ndarray, j: np.ndarray,
+                          distance_km: float, drift_seconds: float):
+    """
+    True anomaly of the mutual node in each orbit and the angular half-width
+    around each node within which an object can be closer than distance_km
+    to the other orbital plane.
+    """
+    normal, node, ahead = _orbit_frames(elements)
+    cross = np.cross(normal[i], normal[j])
+    sin_rel = np.linalg.norm(cross, axis=1)
+    coplanar = sin_rel < 1e-8
+    line = np.where(coplanar[:, None], node[i], cross / np.where(coplanar, 1.0, sin_rel)[:, None])
+
+    def node_anomaly(k):
+        u = np.arctan2(np.einsum('ij,ij->i', line, ahead[k]), np.einsum('ij,ij->i', line, node[k]))
+        return u - elements['arg_perigee'][k]
+
+    drift = 0.0
+    if drift_seconds:
+        # Secular J2 drift moves the nodes during the window; widen the regions accordingly
+        raan_rate, perigee_rate = j2_secular_rates(elements['semi_major_axis_km'],
+                                                   elements['eccentricity'], elements['inclination'])
+        rate = np.abs(raan_rate) + np.abs(perigee_rate)
+        drift = (rate[i] + rate[j]) * drift_seconds / np.maximum(sin_rel, 1e-3)
+
+    def half_width(k):
+        ratio = distance_km / np.maximum(elements['perigee_km'][k] * sin_rel, 1e-12)
+        width = np.where(ratio < 1, np.arcsin(np.minimum(ratio, 1.0)), np.pi)
+        return np.minimum(width + drift, np.pi)
+
+    return node_anomaly(i), node_anomaly(j), half_width(i), half_width(j)
+
+
+def _radius(elements: Dict[str, np.ndarray], k: np.ndarray, true_anomaly: np.ndarray) -> np.ndarray:
+    a, e = elements['semi_major_axis_km'][k], elements['eccentricity'][k]
+    return a * (1 - e**2) / (1 + e * np.cos(true_anomaly))
+
+
+def orbit_path_filter(elements: Dict[str, np.ndarray], i: np.ndarray, j: np.ndarray,
+                      distance_km: float, drift_seconds: float = 0.0) -> np.ndarray:
+    """
+    Orbit path (geometric) filter
+
+    Away from the mutual nodes the out-of-plane separation alone exceeds
+    distance_km, and near them the separation is at least the difference of
+    the orbital radii. A pair is rejected when, at both nodes, the radius
+    difference minus the most each radius can change across its node region
+    still exceeds distance_km. Both objects' spread_km is added to
+    distance_km, as the elements are a snapshot of osculating values.
+
+    Returns:
+        Boolean mask of pairs that survive
+    """
+    distance_km = distance_km + elements['spread_km'][i] + elements['spread_km'][j]
+    f_i, f_j, width_i, width_j = _mutual_node_geometry(elements, i, j, distance_km, drift_seconds)
+
+    def variation(k, width):
+        a, e = elements['semi_major_axis_km'][k], elements['eccentricity'][k]
+        slope = a * e * (1 + e) / (1 - e)**2
+        return np.minimum(slope * width, 2 * a * e)
+
+    allowance = variation(i, width_i) + variation(j, width_j) + distance_km
+    keep = np.zeros(len(i), dtype=bool)
+    for offset in (0.0, np.pi):
+        gap = np.abs(_radius(elements, i, f_i + offset) - _radius(elements, j, f_j + offset))
+        keep |= gap <= allowance
+    return keep
+
+
+def _true_to_mean(true_anomaly: np.ndarray, e: np.ndarray) -> np.ndarray:
+    eccentric = 2 * np.arctan2(np.sqrt(1 - e) * np.sin(true_anomaly / 2),
+                               np.sqrt(1 + e) * np.cos(true_anomaly / 2))
+    return eccentric - e * np.sin(eccentric)
+
+
+def _wrap(angle: np.ndarray) -> np.ndarray:
+    return np.mod(angle + np.pi, 2 * np.pi) - np.pi
+
+
+def time_filter(snapshots: Sequence[Dict[str, np.ndarray]], i: np.ndarray, j: np.ndarray,
+                distance_km: float, duration_seconds: float,
+                pad_seconds: float = DEFAULT_PAD_SECONDS) -> np.ndarray:
+    """
+    Time filter over a window, from elements at its start, midpoint and end
+
+    Each object can only be within distance_km of the other plane while it
+    is inside its node region. The phase of an object relative to a mutual
+    node (mean argument of latitude minus that of the node, which precesses)
+    is close to linear over the window, so its node passages are periodic:
+    the three snapshots give the rate, and their departure from a straight
+    line widens the passages. A pair survives when a passage of one object
+    overlaps the nearest passage of the other. Distances are widened by
+    spread_km as in orbit_path_filter, and phases by the angle it subtends.
+
+    Args:
+        snapshots: catalog_elements at the window start, midpoint and end
+        i, j: Row indices of the pairs into the snapshots
+        distance_km: Screening distance plus margin
+        duration_seconds: Window length
+        pad_seconds: Timing margin per passage
+
+    Returns:
+        Boolean mask of pairs that survive
+    """
+    middle = snapshots[1]
+    spread = middle['spread_km'][i] + middle['spread_km'][j]
+    geometry = [_mutual_node_geometry(elements, i, j, distance_km + spread, 0.0) for elements in snapshots]
+
+    def stretch(k):
+        # Largest dM/df, turning node-region widths in true anomaly into mean anomaly
+        e = np.max([elements['eccentricity'][k] for elements in snapshots], axis=0)
+        return (1 + e)**1.5 / np.sqrt(1 - np.minimum(e, 0.99))
+
+    width_i = np.max([g[2] for g in geometry], axis=0) * stretch(i)
+    width_j = np.max([g[3] for g in geometry], axis=0) * stretch(j)
+    # Regions covering most of the orbit cannot be separated in time
+    keep = (width_i >= np.pi / 2) | (width_j >= np.pi / 2)
+
+    half = duration_seconds / 2
+
+    def passages(k, side, offset, width):
+        """Passage centre before the midpoint, half-width and period, all in seconds"""
+        n = middle['mean_motion'][k]
+        phase, node = [], []
+        for elements, g in zip(snapshots, geometry):
+            e, w = elements['eccentricity'][k], elements['arg_perigee'][k]
+            node.append(w + _true_to_mean(g[side] + offset, e))
+            phase.append(w + elements['mean_anomaly'][k] - node[-1])
+        # Unwrap about the osculating mean motion (off by well under a revolution over the window)
+        first = _wrap(phase[1] - phase[0] - n * half) + n * half
+        second = _wrap(phase[2] - phase[1] - n * half) + n * half
+        rate = (first + second) / duration_seconds
+        # The node moving fast or unevenly breaks the linear model: such pairs are kept
+        steady = (np.abs(_wrap(node[1] - node[0])) < np.pi / 4) & (np.abs(_wrap(node[2] - node[1])) < np.pi / 4)
+        # Phase error: curvature over the window plus the osculating error at the snapshots
+        error = 0.5 * np.abs(first - second) + 2 * middle['spread_km'][k] / middle['semi_major_axis_km'][k]
+        centre = -np.mod(phase[0] + rate * half, 2 * np.pi) / rate
+        return centre, (width + error) / rate + pad_seconds, 2 * np.pi / rate, steady
+
+    overlap = np.zeros(len(i), dtype=bool)
+    separable = np.ones(len(i), dtype=bool)
+    for offset in (0.0, np.pi):
+        start_i, w_i, period_i, steady_i = passages(i, 0, offset, width_i)
+        start_j, w_j, period_j, steady_j = passages(j, 1, offset, width_j)
+        separable &= steady_i & steady_j & np.isfinite(w_i + w_j)
+
+        # Step through the passages of the longer-period object, checking the nearest of the other
+        swap = period_j > period_i
+        start_a, w_a, period_a = (np.where(swap, start_j, start_i), np.where(swap, w_j, w_i),
+                                  np.where(swap, period_j, period_i))
+        start_b, w_b, period_b = (np.where(swap, start_i, start_j), np.where(swap, w_i, w_j),
+                                  np.where(swap, period_i, period_j))
+
+        # First passage ending before the window, then every passage up to its end
+        first = start_a - np.ceil((start_a + half + w_a) / period_a) * period_a
+        count = np.ceil((duration_seconds + 2 * w_a) / period_a) + 2
+        steps = int(np.nanmax(np.where(separable & ~keep, count, 0), initial=0))
+        for m in range(steps):
+            centre_a = first + m * period_a
+            in_window = (m < count) & (centre_a + w_a >= -half) & (centre_a - w_a <= half)
+            centre_b = start_b + np.round((centre_a - start_b) / period_b) * period_b
+            overlap |= in_window & (np.abs(centre_a - centre_b) <= w_a + w_b)
+
+    return keep | overlap | ~separable
+
+
+def prefilter_pairs(catalog: TLECatalog,
+                    start: Optional[datetime] = None,
+                    duration_hours: float = 24.0,
+                    screening_distance_km: float = 5.0,
+                    primaries: Optional[Sequence[Union[int, str]]] = None,
+                    pad_km: float = DEFAULT_PAD_KM,
+                    pad_seconds: float = DEFAULT_PAD_SECONDS) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Run the apogee/perigee -> orbit path -> time filter chain
+
+    Every object is propagated once at the window start, midpoint and end.
+    The apogee/perigee and orbit path filters use the midpoint elements; the
+    time filter uses all three to follow each object's node passages across
+    the whole window. Pairs are filtered in chunks, so memory stays bounded.
+
+    Args:
+        catalog: Element source
+        start: Window start (UTC); defaults to now
+        duration_hours: Window length
+        screening_distance_km: Screening threshold the survivors will be checked against
+        primaries: NORAD IDs or names to pair with the catalog (default: all-vs-all)
+        pad_km: Distance margin on top of each object's spread_km
+        pad_seconds: Timing margin for the time filter
+
+    Returns:
+        (pairs, stats) where pairs is a (K, 2) array of catalog rows (i < j)
+        and stats counts the total pairs and those eliminated by each filter
+    """
+    start = start or datetime.now(timezone.utc)
+    if start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+
+    duration = duration_hours * 3600
+    distance = screening_distance_km + pad_km
+    snapshots = [catalog_elements(catalog, start + timedelta(seconds=offset))
+                 for offset in (0.0, duration / 2, duration)]
+    elements = snapshots[1]
+
+    n = len(catalog)
+    stats = {'total_pairs': 0, 'apogee_perigee': 0, 'orbit_path': 0, 'time': 0, 'remaining': 0}
+
+    perigee = elements['perigee_km'] - elements['spread_km']
+    apogee = elements['apogee_km'] + elements['spread_km']
+    if primaries is None:
+        stats['total_pairs'] = n * (n - 1) // 2
+        chunks = apogee_perigee_pairs(perigee, apogee, distance)
+    else:
+        rows = np.unique([catalog.index_of(key) for key in primaries])
+        others = np.setdiff1d(np.arange(n), rows)
+        i = np.concatenate([np.repeat(rows, len(others))] +
+                           [np.repeat(r, np.sum(rows > r)) for r in rows])
+        j = np.concatenate([np.tile(others, len(rows))] + [rows[rows > r] for r in rows])
+        stats['total_pairs'] = len(i)
+        overlap = (perigee[i] <= apogee[j] + distance) & (perigee[j] <= apogee[i] + distance)
+        chunks = [(i[overlap], j[overlap])]
+
+    survivors_i, survivors_j, compared = [], [], 0
+    for i, j in chunks:
+        compared += len(i)
+        keep = orbit_path_filter(elements, i, j, distance, drift_seconds=duration / 2)
+        stats['orbit_path'] += int(len(i) - keep.sum())
+        i, j = i[keep], j[keep]
+        keep = time_filter(snapshots, i, j, distance, duration, pad_seconds)
+        stats['time'] += int(len(i) - keep.sum())
+        survivors_i.append(np.minimum(i[keep], j[keep]))
+        survivors_j.append(np.maximum(i[keep], j[keep]))
+    stats['apogee_perigee'] = stats['total_pairs'] - compared
+
+    i = np.concatenate(survivors_i) if survivors_i else np.empty(0, dtype=np.int64)
+    j = np.concatenate(survivors_j) if survivors_j else np.empty(0, dtype=np.int64)
+    pairs = np.column_stack([i, j]).astype(np.int64)
+    stats['remaining'] = len(pairs)
+
+    logger.info("Prefilter: {total_pairs:,} pairs -> apogee/perigee -{apogee_perigee:,}, "
+                "orbit path -{orbit_path:,}, time -{time:,} -> {remaining:,}".format(**stats))
+    return pairs, stats
@@ -0,0 +1,596 @@
+"""
+Conjunction Screening
+All-vs-all close approach screening with a per-timestep KD-tree spatial index
+"""
+
+import logging
+import numpy as np
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+from scipy.spatial import cKDTree
+
+from tools.orbital_mechanics import (propagate_batch, time_grid, julian_dates, propagate_numerical,
+                                    BSTAR_TO_BALLISTIC, SECONDS_PER_DAY)
+from tools.ephemeris_cache import hermite_interpolate
+from tools.conjunction_filters import prefilter_pairs
+from tools.tle_catalog import TLECatalog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCREENING_DISTANCE_KM = 5.0
+MAX_RELATIVE_SPEED_KM_S = 15.5  # head-on LEO encounter
+EVENT_COLUMNS = ('primary', 'secondary', 'tca_seconds', 'miss_distance_km', 'relative_speed_km_s')
+STATE_COLUMNS = ('relative_position_km', 'relative_velocity_km_s')  # (K, 3), secondary minus primary at TCA
+TCA_ITERATIONS = 8
+NUMERICAL_WINDOW_SECONDS = 30.0  # integration span either side of the screened TCA
+NUMERICAL_STEP_SECONDS = 10.0
+SHARDS_PER_WORKER = 4  # more shards than workers evens out uneven shard costs
+
+# Per-process SGP4 records of the sharded run in progress, keyed by its shared memory name
+_shared = {}
+
+
+def _empty_events() -> Dict[str, np.ndarray]:
+    return {
+        'primary': np.empty(0, dtype=np.int64),
+        'secondary': np.empty(0, dtype=np.int64),
+        'tca_seconds': np.empty(0),
+        'miss_distance_km': np.empty(0),
+        'relative_speed_km_s': np.empty(0),
+        'relative_position_km': np.empty((0, 3)),
+        'relative_velocity_km_s': np.empty((0, 3)),
+    }
+
+
+def screen_positions(positions: np.ndarray, velocities: np.ndarray, step_seconds: float,
+                     screening_distance_km: float = DEFAULT_SCREENING_DISTANCE_KM,
+                     primary_mask: Optional[np.ndarray] = None,
+                     max_relative_speed_km_s: float = MAX_RELATIVE_SPEED_KM_S,
+                     first_step: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Find close approaches in a block of propagated states
+
+    Every sample is treated as the midpoint of a step_seconds interval. Pairs
+    within screening_distance + max_relative_speed * step / 2 of each other are
+    taken from a KD-tree, and relative motion is linearized over the interval
+    to estimate each pair's closest approach.
+
+    Args:
+        positions, velocities: (N, M, 3) states on an even time grid
+        step_seconds: Grid spacing
+        screening_distance_km: Report approaches closer than this
+        primary_mask: Only keep pairs involving at least one flagged object
+        max_relative_speed_km_s: Upper bound on relative speed (sets the search radius)
+        first_step: Grid index of the block's first sample
+
+    Returns:
+        Per-sample candidate columns (primary, secondary, step, tca_seconds,
+        miss_distance_km, relative_speed_km_s), not yet grouped into events
+    """
+    half_step = step_seconds / 2
+    radius = screening_distance_km + max_relative_speed_km_s * half_step
+    found = {name: [] for name in EVENT_COLUMNS + ('step',)}
+
+    for m in range(positions.shape[1]):
+        p = positions[:, m]
+        valid = np.flatnonzero(np.isfinite(p[:, 0]))
+        if len(valid) < 2:
+            continue
+
+        tree = cKDTree(p[valid])
+        pairs = tree.query_pairs(radius, output_type='ndarray')
+        if len(pairs) == 0:
+            continue
+        i, j = valid[pairs[:, 0]], valid[pairs[:, 1]]
+        if primary_mask is not None:
+            keep = primary_mask[i] | primary_mask[j]
+            i, j = i[keep], j[keep]
+
+        dr = p[j] - p[i]
+        dv = velocities[j, m] - velocities[i, m]
+        speed_sq = np.einsum('ij,ij->i', dv, dv)
+        tau = np.clip(-np.einsum('ij,ij->i', dr, dv) / np.maximum(speed_sq, 1e-12),
+                      -half_step, half_step)
+        miss = np.linalg.norm(dr + dv * tau[:, None], axis=1)
+
+        close = miss < screening_distance_km
+        if not close.any():
+            continue
+        step = first_step + m
+        found['primary'].append(i[close])
+        found['secondary'].append(j[close])
+        found['step'].append(np.full(close.sum(), step))
+        found['tca_seconds'].append(step * step_seconds + tau[close])
+        found['miss_distance_km'].append(miss[close])
+        found['relative_speed_km_s'].append(np.sqrt(speed_sq[close]))
+
+    if not found['primary']:
+        candidates = _empty_events()
+        candidates['step'] = np.empty(0, dtype=np.int64)
+        return candidates
+    return {name: np.concatenate(values) for name, values in found.items()}
+
+
+def screen_pairs(positions: np.ndarray, velocities: np.ndarray, pairs: np.ndarray,
+                 step_seconds: float,
+                 screening_distance_km: float = DEFAULT_SCREENING_DISTANCE_KM,
+                 first_step: int = 0, chunk_pairs: int = 20000) -> Dict[str, np.ndarray]:
+    """
+    Find close approaches among an explicit list of candidate pairs
+
+    Same linearized-interval test as screen_positions, evaluated directly on
+    the given pairs (e.g. prefilter survivors) instead of through a KD-tree.
+
+    Args:
+        positions, velocities: (N, M, 3) states on an even time grid
+        pairs: (K, 2) row indices into positions
+        step_seconds: Grid spacing
+        screening_distance_km: Report approaches closer than this
+        first_step: Grid index of the block's first sample
+        chunk_pairs: Pairs evaluated at once (bounds temporary memory)
+
+    Returns:
+        Per-sample candidate columns, as screen_positions
+    """
+    half_step = step_seconds / 2
+    found = {name: [] for name in EVENT_COLUMNS + ('step',)}
+
+    for first in range(0, len(pairs), chunk_pairs):
+        i, j = pairs[first:first + chunk_pairs, 0], pairs[first:first + chunk_pairs, 1]
+        dr = positions[j] - positions[i]
+        dv = velocities[j] - velocities[i]
+        speed_sq = np.einsum('kmj,kmj->km', dv, dv)
+        tau = np.clip(-np.einsum('kmj,kmj->km', dr, dv) / np.maximum(speed_sq, 1e-12),
+                      -half_step, half_step)
+        miss = np.linalg.norm(dr + dv * tau[..., None], axis=2)
+
+        # NaN states (propagation errors) compare False and drop out here
+        k, m = np.nonzero(miss < screening_distance_km)
+        if len(k) == 0:
+            continue
+        step = first_step + m
+        found['primary'].append(i[k])
+        found['secondary'].append(j[k])
+        found['step'].append(step)
+        found['tca_seconds'].append(step * step_seconds + tau[k, m])
+        found['miss_distance_km'].append(miss[k, m])
+        found['relative_speed_km_s'].append(np.sqrt(speed_sq[k, m]))
+
+    if not found['primary']:
+        candidates = _empty_events()
+        candidates['step'] = np.empty(0, dtype=np.int64)
+        return candidates
+    return {name: np.concatenate(values) for name, values in found.items()}
+
+
+def _relative_state(positions: np.ndarray, velocities: np.ndarray, i: np.ndarray, j: np.ndarray,
+                    k: np.ndarray, s: np.ndarray, h: float):
+    """
+    Relative position, velocity and acceleration of pairs (i, j) at fraction s
+    of grid interval k, from the cubic Hermite interpolant of each object.
+    The interpolant is linear in the end states, so it is built on the
+    relative states directly.
+    """
+    p0, p1 = positions[j, k] - positions[i, k], positions[j, k + 1] - positions[i, k + 1]
+    v0, v1 = velocities[j, k] - velocities[i, k], velocities[j, k + 1] - velocities[i, k + 1]
+    r, v = hermite_interpolate(p0, v0, p1, v1, s, h)
+    s = s[:, None]
+    a = ((12 * s - 6) * (p0 - p1) / h + (6 * s - 4) * v0 + (6 * s - 2) * v1) / h
+    return r, v, a
+
+
+def refine_tca(positions: np.ndarray, velocities: np.ndarray, pairs: np.ndarray,
+               steps: np.ndarray, step_seconds: float,
+               iterations: int = TCA_ITERATIONS) -> Dict[str, np.ndarray]:
+    """
+    Time of closest approach for many pairs at once
+
+    The closest approach is a root of the range-rate r.v (negative before,
+    positive after). Near each sample index in steps, the two grid intervals
+    on either side are checked for a sign change, and the root is refined in
+    the bracketing interval by Newton's method on the Hermite interpolant,
+    falling back to bisection whenever a Newton step leaves the bracket.
+    Pairs without a bracket (approach at the edge of the grid) keep the
+    closer grid end.
+
+    Args:
+        positions, velocities: (N, M, 3) states on an even time grid
+        pairs: (K, 2) row indices into positions
+        steps: (K,) grid index near each pair's approach
+        step_seconds: Grid spacing
+        iterations: Newton/bisection iterations (each at least halves the bracket)
+
+    Returns:
+        Columns tca_seconds (from the first grid sample), miss_distance_km,
+        relative_speed_km_s, plus (K, 3) relative_position_km and
+        relative_velocity_km_s (secondary minus primary) at TCA
+    """
+    i, j = pairs[:, 0], pairs[:, 1]
+    h = step_seconds
+    last = positions.shape[1] - 1
+    steps = np.clip(steps, 0, last)
+
+    def relative(t_index):
+        return (positions[j, t_index] - positions[i, t_index],
+                velocities[j, t_index] - velocities[i, t_index])
+
+    nearby = np.stack([np.maximum(steps - 1, 0), steps, np.minimum(steps + 1, last)])
+    f = np.empty(nearby.shape)
+    distance = np.empty(nearby.shape)
+    for n, t_index in enumerate(nearby):
+        r, v = relative(t_index)
+        f[n] = np.einsum('ij,ij->i', r, v)
+        distance[n] = np.linalg.norm(r, axis=1)
+
+    before = (steps > 0) & (f[0] < 0) & (f[1] >= 0)
+    after = (steps < last) & (f[1] < 0) & (f[2] >= 0)
+    bracketed = before | after
+
+    # Unbracketed pairs (approach beyond the grid ends) keep the closest sample
+    closest = nearby[np.argmin(distance, axis=0), np.arange(len(steps))]
+    k = np.where(before, steps - 1, np.where(after, steps, np.minimum(closest, last - 1)))
+    s = np.where(bracketed, 0.5, (closest - k).astype(np.float64))
+    lo, hi = np.zeros(len(steps)), np.ones(len(steps))
+
+    for _ in range(iterations):
+        r, v, a = _relative_state(positions, velocities, i, j, k, s, h)
+        f = np.einsum('ij,ij->i', r, v)
+        df = (np.einsum('ij,ij->i', v, v) + np.einsum('ij,ij->i', r, a)) * h
+        lo = np.where(bracketed & (f < 0), s, lo)
+        hi = np.where(bracketed & (f >= 0), s, hi)
+        newton = s - f / np.where(df > 0, df, 1.0)
+        inside = (df > 0) & (newton >= lo) & (newton <= hi)
+        s = np.where(bracketed, np.where(inside, newton, 0.5 * (lo + hi)), s)
+
+    r, v, _ = _relative_state(positions, velocities, i, j, k, s, h)
+    return {
+        'tca_seconds': (k + s) * h,
+        'miss_distance_km': np.linalg.norm(r, axis=1),
+        'relative_speed_km_s': np.linalg.norm(v, axis=1),
+        'relative_position_km': r,
+        'relative_velocity_km_s': v,
+    }
+
+
+def _refine_candidates(candidates: Dict[str, np.ndarray], positions: np.ndarray,
+                       velocities: np.ndarray, step_seconds: float, first_step: int,
+                       screening_distance_km: float) -> Dict[str, np.ndarray]:
+    """Replace linearized candidate approaches with refined TCAs, dropping those beyond the threshold"""
+    if len(candidates['primary']) == 0:
+        return candidates
+    pairs = np.column_stack([candidates['primary'], candidates['secondary']])
+    tca = refine_tca(positions, velocities, pairs, candidates['step'] - first_step, step_seconds)
+    candidates['tca_seconds'] = tca['tca_seconds'] + first_step * step_seconds
+    candidates['miss_distance_km'] = tca['miss_distance_km']
+    candidates['relative_speed_km_s'] = tca['relative_speed_km_s']
+    for name in STATE_COLUMNS:
+        candidates[name] = tca[name]
+    close = candidates['miss_distance_km'] < screening_distance_km
+    return {name: values[close] for name, values in candidates.items()}
+
+
+def group_events(candidates: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Collapse per-sample candidates into conjunction events
+
+    Consecutive samples of the same pair form one encounter; the sample with
+    the smallest miss distance represents it.
+    """
+    if len(candidates['primary']) == 0:
+        return _empty_events()
+
+    order = np.lexsort((candidates['step'], candidates['secondary'], candidates['primary']))
+    i = candidates['primary'][order]
+    j = candidates['secondary'][order]
+    step = candidates['step'][order]
+
+    new_event = np.ones(len(order), dtype=bool)
+    new_event[1:] = (i[1:] != i[:-1]) | (j[1:] != j[:-1]) | (step[1:] - step[:-1] > 1)
+    event_id = np.cumsum(new_event) - 1
+
+    miss = candidates['miss_distance_km'][order]
+    best = np.lexsort((miss, event_id))
+    first = np.ones(len(best), dtype=bool)
+    first[1:] = event_id[best][1:] != event_id[best][:-1]
+    rows = order[best[first]]
+
+    return {name: values[rows] for name, values in candidates.items() if name != 'step'}
+
+
+def _with_ephemeris(names: Sequence[str], shape: tuple, work: Callable, *args):
+    """Run work(positions, velocities, *args) on the shared ephemeris, mapped (no copy) for this task only"""
+    blocks = [SharedMemory(name=name) for name in names]
+    try:
+        return work(*[np.ndarray(shape, dtype=np.float64, buffer=block.buf) for block in blocks], *args)
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def _propagate_shard(positions: np.ndarray, velocities: np.ndarray, catalog: TLECatalog, run: str,
+                     jd: np.ndarray, fr: np.ndarray, first: int):
+    """Propagate a slice of the time grid straight into the shared ephemeris"""
+    if _shared.get('run') != run:
+        _shared.update(run=run, satellites=catalog.satellites())
+    last = first + len(jd)
+    positions[:, first:last], velocities[:, first:last] = propagate_batch(_shared['satellites'], jd, fr)
+
+
+def _screen_time_shard(positions: np.ndarray, velocities: np.ndarray, first: int, last: int,
+                       step_seconds: float, screening_distance_km: float,
+                       primary_mask: Optional[np.ndarray],
+                       max_relative_speed_km_s: float) -> Dict[str, np.ndarray]:
+    """KD-tree screening of grid samples [first, last), refined on the full shared grid"""
+    block = screen_positions(positions[:, first:last], velocities[:, first:last], step_seconds,
+                             screening_distance_km, primary_mask, max_relative_speed_km_s,
+                             first_step=first)
+    return _refine_candidates(block, positions, velocities, step_seconds, 0, screening_distance_km)
+
+
+def _screen_pair_shard(positions: np.ndarray, velocities: np.ndarray, pairs: np.ndarray,
+                       step_seconds: float, screening_distance_km: float,
+                       block_steps: int) -> Dict[str, np.ndarray]:
+    """Screening of a slice of the candidate pairs over the whole shared grid"""
+    blocks = []
+    for first in range(0, positions.shape[1], block_steps):
+        inner = slice(first, first + block_steps)
+        blocks.append(screen_pairs(positions[:, inner], velocities[:, inner], pairs, step_seconds,
+                                   screening_distance_km, first_step=first))
+    block = {name: np.concatenate([b[name] for b in blocks]) for name in blocks[0]}
+    return _refine_candidates(block, positions, velocities, step_seconds, 0, screening_distance_km)
+
+
+def _screen_sharded(catalog: TLECatalog, rows: np.ndarray, jd: np.ndarray, fr: np.ndarray,
+                    step_seconds: float, screening_distance_km: float,
+                    primary_mask: Optional[np.ndarray], max_relative_speed_km_s: float,
+                    pairs: Optional[np.ndarray], block_steps: int,
+                    workers: int, executor: Optional[Executor] = None) -> Dict[str, np.ndarray]:
+    """
+    Candidate approaches from a worker pool sharing one ephemeris
+
+    The (N, M, 3) states live in shared memory: workers first fill it in
+    parallel by time block, then screen either time shards (KD-tree) or, when
+    pairs are given, pair shards over the whole window. Every task maps the
+    full grid zero-copy, so refinement needs no block padding and only the
+    small candidate columns are pickled back. Samples of an encounter
+    straddling a time shard boundary come back from both neighbours;
+    group_events merges them into one event. Tasks carry everything they
+    need, so a long-lived executor can serve any number of runs.
+    """
+    shape = (len(rows), len(jd), 3)
+    nbytes = max(int(np.prod(shape)) * 8, 1)
+    blocks = [SharedMemory(create=True, size=nbytes) for _ in range(2)]
+    names = [block.name for block in blocks]
+    # Just the screened rows, without the parent's SGP4 records (tasks are pickled)
+    involved = TLECatalog(catalog.names[rows], {name: column[rows] for name, column in catalog.columns.items()})
+    pool = executor if executor is not None else ProcessPoolExecutor(max_workers=workers)
+    futures = []
+    try:
+        futures = [pool.submit(_with_ephemeris, names, shape, _propagate_shard, involved, names[0],
+                               jd[first:first + block_steps], fr[first:first + block_steps], first)
+                   for first in range(0, len(jd), block_steps)]
+        for future in futures:
+            future.result()
+
+        n_shards = workers * SHARDS_PER_WORKER
+        if pairs is None:
+            bounds = np.linspace(0, len(jd), min(n_shards, len(jd)) + 1).astype(int)
+            futures = [pool.submit(_with_ephemeris, names, shape, _screen_time_shard, lo, hi, step_seconds,
+                                   screening_distance_km, primary_mask, max_relative_speed_km_s)
+                       for lo, hi in zip(bounds[:-1], bounds[1:])]
+        else:
+            futures = [pool.submit(_with_ephemeris, names, shape, _screen_pair_shard, shard, step_seconds,
+                                   screening_distance_km, block_steps)
+                       for shard in np.array_split(pairs, min(n_shards, max(len(pairs), 1)))]
+        results = [future.result() for future in futures]
+    finally:
+        for future in futures:
+            future.cancel()
+        if executor is None:
+            pool.shutdown()
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return {name: np.concatenate([r[name] for r in results]) for name in results[0]}
+
+
+def screen_catalog(catalog: TLECatalog,
+                   start: Optional[datetime] = None,
+                   duration_hours: float = 24.0,
+                   step_seconds: float = 30.0,
+                   screening_distance_km: float = DEFAULT_SCREENING_DISTANCE_KM,
+                   primaries: Optional[Sequence[Union[int, str]]] = None,
+                   max_relative_speed_km_s: float = MAX_RELATIVE_SPEED_KM_S,
+                   block_steps: int = 120,
+                   prefilter: bool = False,
+                   workers: int = 1,
+                   executor: Optional[Executor] = None) -> Dict[str, Any]:
+    """
+    Screen a catalog for close approaches over a time window
+
+    The catalog is propagated in blocks of block_steps epochs so memory stays
+    bounded, and each epoch is screened with a KD-tree rather than all pairs.
+    Candidate approaches are then refined to the true TCA with refine_tca.
+    With prefilter, the apogee/perigee, orbit path and time filters first
+    reduce the problem to candidate pairs, and only the objects involved are
+    propagated. This pays off when screening a few primaries (3 against 20,000
+    objects over 24 h at 5 km: 24 s against 170 s), but the filters still
+    visit every pair, so all-vs-all they lose to the KD-tree sweep (2,000
+    objects: 61 s against 7 s); see benchmarks/bench_prefilter_screening.py.
+
+    With workers > 1 the ephemeris for the whole window is propagated once
+    into shared memory and screened by a process pool, sharded by time
+    (KD-tree) or by candidate pairs (prefilter). The result is identical to
+    the single-process path. Pass an executor to reuse one pool across calls
+    instead of starting workers each time.
+
+    Args:
+        catalog: Element source
+        start: Window start (UTC); defaults to now
+        duration_hours: Window length
+        step_seconds: Sample spacing
+        screening_distance_km: Report approaches closer than this
+        primaries: NORAD IDs or names to screen against everything (default: all-vs-all)
+        max_relative_speed_km_s: Upper bound on relative speed
+        block_steps: Epochs propagated per block
+        prefilter: Run the classical filter chain before sampling
+        workers: Worker processes (1 screens in-process, block by block)
+        executor: Process pool for workers > 1 (default: a new pool of workers processes)
+
+    Returns:
+        Dict of event columns (catalog row indices for primary/secondary,
+        tca_seconds from start, miss_distance_km, relative_speed_km_s, and
+        (K, 3) relative_position_km / relative_velocity_km_s at TCA) plus
+        'start', 'step_seconds' and 'objects' (and 'prefilter' elimination
+        counts when prefiltering)
+    """
+    start = start or datetime.now(timezone.utc)
+    if start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+
+    primary_mask = None
+    if primaries is not None:
+        primary_mask = np.zeros(len(catalog), dtype=bool)
+        primary_mask[[catalog.index_of(key) for key in primaries]] = True
+
+    jd, fr = time_grid(start, duration_hours, step_seconds)
+    filter_stats = None
+    if prefilter:
+        pairs, filter_stats = prefilter_pairs(catalog, start, duration_hours,
+                                              screening_distance_km, primaries)
+        rows, local_pairs = np.unique(pairs, return_inverse=True)
+        local_pairs = local_pairs.reshape(pairs.shape)
+        satellites = [catalog.satellite(int(norad_id)) for norad_id in catalog.norad_ids[rows]]
+    else:
+        rows, local_pairs = np.arange(len(catalog)), None
+        satellites = catalog.satellites()
+
+    screen = not (prefilter and len(pairs) == 0)
+    blocks = []
+    if screen and workers > 1:
+        block = _screen_sharded(catalog, rows, jd, fr, step_seconds, screening_distance_km,
+                                primary_mask, max_relative_speed_km_s, local_pairs, block_steps,
+                                workers, executor)
+        if prefilter:
+            block['primary'], block['secondary'] = rows[block['primary']], rows[block['secondary']]
+        blocks.append(block)
+    elif screen:
+        for first in range(0, len(jd), block_steps):
+            # One extra sample either side so TCA brackets can cross block boundaries
+            lo, hi = max(first - 1, 0), min(first + block_steps + 1, len(jd))
+            positions, velocities = propagate_batch(satellites, jd[lo:hi], fr[lo:hi])
+            inner = slice(first - lo, min(first + block_steps, len(jd)) - lo)
+            if prefilter:
+                block = screen_pairs(positions[:, inner], velocities[:, inner], local_pairs,
+                                     step_seconds, screening_distance_km, first_step=first)
+            else:
+                block = screen_positions(positions[:, inner], velocities[:, inner], step_seconds,
+                                         screening_distance_km, primary_mask,
+                                         max_relative_speed_km_s, first_step=first)
+            block = _refine_candidates(block, positions, velocities, step_seconds, lo,
+                                       screening_distance_km)
+            if prefilter:
+                block['primary'], block['secondary'] = rows[block['primary']], rows[block['secondary']]
+            blocks.append(block)
+
+    if blocks:
+        candidates = {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+        events = group_events(candidates)
+    else:
+        events = _empty_events()
+
+    # Report the flagged object first when screening primaries against the catalog
+    if primary_mask is not None:
+        swap = ~primary_mask[events['primary']]
+        events['primary'][swap], events['secondary'][swap] = (
+            events['secondary'][swap], events['primary'][swap])
+        for name in STATE_COLUMNS:
+            events[name][swap] = -events[name][swap]
+
+    logger.info(f"Screened {len(catalog)} objects over {duration_hours} h: "
+                f"{len(events['primary'])} conjunctions within {screening_distance_km} km")
+
+    events.update({'start': start, 'step_seconds': step_seconds, 'objects': len(catalog)})
+    if filter_stats is not None:
+        events['prefilter'] = filter_stats
+    return events
+
+
+def refine_events_numerical(catalog: TLECatalog, events: Dict[str, Any],
+                            window_seconds: float = NUMERICAL_WINDOW_SECONDS,
+                            step_seconds: float = NUMERICAL_STEP_SECONDS,
+                            drag: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Re-solve screened TCAs on numerically integrated trajectories
+
+    Both objects of every event start from their SGP4 states window_seconds
+    before the screened TCA, and all 2K objects are integrated together by
+    propagate_numerical (J2-J4, plus drag from each object's B*). The
+    closest approach is then solved with refine_tca on the output grid.
+
+    Args:
+        catalog: Catalog the event rows index
+        events: screen_catalog output
+        window_seconds: Integration span either side of each screened TCA
+        step_seconds: Output grid spacing
+        drag: Include atmospheric drag
+
+    Returns:
+        Columns as refine_tca, with tca_seconds measured from events['start']
+    """
+    n_events = len(events['primary'])
+    rows = np.concatenate([events['primary'], events['secondary']])
+    offsets = np.tile(events['tca_seconds'] - window_seconds, 2)
+    jd, fr = julian_dates(events['start'])
+
+    positions = np.full((2 * n_events, 3), np.nan)
+    velocities = np.full((2 * n_events, 3), np.nan)
+    ballistic = np.zeros(2 * n_events)
+    order = np.argsort(rows, kind='stable')
+    unique_rows, first = np.unique(rows[order], return_index=True)
+    for row, members in zip(unique_rows, np.split(order, first[1:])):
+        satellite = catalog.satellite(int(catalog.norad_ids[row]))
+        errors, r, v = satellite.sgp4_array(np.full(len(members), jd[0]),
+                                            fr[0] + offsets[members] / SECONDS_PER_DAY)
+        ok = errors == 0
+        positions[members[ok]], velocities[members[ok]] = r[ok], v[ok]
+        ballistic[members] = BSTAR_TO_BALLISTIC * max(satellite.bstar, 0.0)
+
+    times = np.arange(0.0, 2 * window_seconds + step_seconds / 2, step_seconds)
+    positions, velocities = propagate_numerical(positions, velocities, times,
+                                                ballistic if drag else None)
+
+    pairs = np.column_stack([np.arange(n_events), np.arange(n_events, 2 * n_events)])
+    distance = np.linalg.norm(positions[pairs[:, 1]] - positions[pairs[:, 0]], axis=-1)
+    steps = np.argmin(np.where(np.isfinite(distance), distance, np.inf), axis=1)
+    tca = refine_tca(positions, velocities, pairs, steps, step_seconds)
+    tca['tca_seconds'] = tca['tca_seconds'] + events['tca_seconds'] - window_seconds
+    return tca
+
+
+def events_to_records(events: Dict[str, Any], catalog: TLECatalog) -> List[Dict]:
+    """
+    Convert event columns into report-ready dicts, closest approach first
+
+    Returns:
+        List of dicts with object names, NORAD IDs, TCA, miss distance and
+        the event's position in the columns (event_index)
+    """
+    records = []
+    for k in np.argsort(events['miss_distance_km']):
+        i, j = events['primary'][k], events['secondary'][k]
+        records.append({
+            'primary_id': int(catalog.norad_ids[i]),
+            'primary_name': str(catalog.names[i]),
+            'object_id': int(catalog.norad_ids[j]),
+            'object_name': str(catalog.names[j]),
+            'tca': events['start'] + timedelta(seconds=float(events['tca_seconds'][k])),
+            'tca_seconds': float(events['tca_seconds'][k]),
+            'distance': float(events['miss_distance_km'][k]),
+            'relative_speed': float(events['relative_speed_km_s'][k]),
+            'event_index': int(k),
+        })
+    return records
@@ -0,0 +1,193 @@
+"""
+Downlink Scheduling
+Station contention resolved by per-station weighted interval scheduling with satellite conflict repair
+"""
+
+import logging
+import numpy as np
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_RATE_MBPS = 150.0
+DEFAULT_TURNAROUND_SECONDS = 60.0   # antenna slew / reconfiguration between contacts
+MIN_CONTACT_SECONDS = 120.0
+
+
+def _window_key(window: Dict) -> Tuple[int, str, object]:
+    return int(window['norad_id']), window['station'], window['aos']
+
+
+def weighted_interval_schedule(start: np.ndarray, end: np.ndarray, weight: np.ndarray,
+                               gap: float = 0.0) -> np.ndarray:
+    """
+    Maximum-weight set of non-overlapping intervals (exact, O(n log n))
+
+    Args:
+        start, end: Interval bounds (n,), any ordered numeric type
+        weight: Interval values (n,)
+        gap: Minimum spacing between consecutive chosen intervals
+
+    Returns:
+        Indices of the chosen intervals, earliest first
+    """
+    order = np.argsort(end, kind='stable')
+    start, end, weight = start[order], end[order], weight[order]
+    # Last interval finishing at least gap before each one starts (-1 if none)
+    previous = np.searchsorted(end, start - gap, side='right') - 1
+
+    best = np.zeros(len(order) + 1)
+    for i in range(len(order)):
+        best[i + 1] = max(best[i], weight[i] + best[previous[i] + 1])
+
+    chosen = []
+    i = len(order) - 1
+    while i >= 0:
+        if weight[i] + best[previous[i] + 1] >= best[i + 1] - 1e-12 and best[i + 1] > best[i]:
+            chosen.append(order[i])
+            i = previous[i]
+        else:
+            i -= 1
+    return np.array(chosen[::-1], dtype=np.int64)
+
+
+class DownlinkScheduler:
+    """
+    Constellation downlink plan
+    - Each station serves one satellite at a time (with a turnaround gap)
+    - Each satellite downlinks to one station at a time
+    - Maximizes total volume (station data rate x contact duration)
+    - Updates re-solve only the stations whose windows changed
+    """
+
+    def __init__(self, stations: Sequence[Dict],
+                 turnaround_seconds: float = DEFAULT_TURNAROUND_SECONDS,
+                 min_contact_seconds: float = MIN_CONTACT_SECONDS):
+        self.rates = {s['name']: s.get('data_rate_mbps', DEFAULT_DATA_RATE_MBPS) for s in stations}
+        self.turnaround_seconds = turnaround_seconds
+        self.min_contact_seconds = min_contact_seconds
+        self.windows = defaultdict(dict)     # station -> {key: pass}
+        self.banned = defaultdict(set)       # station -> keys excluded by conflict repair
+        self.contacts = {}                   # station -> chosen passes
+
+    def schedule(self, passes: Iterable[Dict]) -> List[Dict]:
+        """Solve from scratch for pass dicts as returned by predict_passes"""
+        self.windows.clear()
+        self.banned.clear()
+        self.contacts.clear()
+        return self.update(added=passes)
+
+    def update(self, added: Iterable[Dict] = (), removed: Iterable[Dict] = ()) -> List[Dict]:
+        """
+        Add or remove visibility windows and re-plan incrementally
+
+        Stations whose windows changed are re-solved; conflict bans on the
+        affected satellites are lifted so they can be re-decided.
+        """
+        dirty, satellites = set(), set()
+        for window in removed:
+            key = _window_key(window)
+            if self.windows[window['station']].pop(key, None) is not None:
+                dirty.add(window['station'])
+                satellites.add(key[0])
+        for window in added:
+            if window['station'] not in self.rates:
+                continue
+            if (window['los'] - window['aos']).total_seconds() < self.min_contact_seconds:
+                continue
+            key = _window_key(window)
+            self.windows[window['station']][key] = window
+            dirty.add(window['station'])
+            satellites.add(key[0])
+
+        for station, banned in self.banned.items():
+            lifted = {key for key in banned if key[0] in satellites}
+            if lifted:
+                banned -= lifted
+                dirty.add(station)
+
+        self._solve(dirty)
+        return self.plan()
+
+    def _solve_station(self, station: str):
+        windows = [w for key, w in self.windows[station].items() if key not in self.banned[station]]
+        if not windows:
+            self.contacts[station] = []
+            return
+        origin = min(w['aos'] for w in windows)
+        start = np.array([(w['aos'] - origin).total_seconds() for w in windows])
+        end = np.array([(w['los'] - origin).total_seconds() for w in windows])
+        chosen = weighted_interval_schedule(start, end, (end - start) * self.rates[station],
+                                            self.turnaround_seconds)
+        self.contacts[station] = [windows[i] for i in chosen]
+
+    def _satellite_conflicts(self) -> Set[Tuple[str, Tuple]]:
+        """(station, key) of the lower-volume contact in every same-satellite overlap"""
+        by_satellite = defaultdict(list)
+        for station, contacts in self.contacts.items():
+            for window in contacts:
+                by_satellite[int(window['norad_id'])].append(window)
+
+        losers = set()
+        for contacts in by_satellite.values():
+            if len(contacts) < 2:
+                continue
+            contacts.sort(key=lambda w: w['aos'])
+            kept = contacts[0]
+            for window in contacts[1:]:
+                if window['aos'] < kept['los']:
+                    if self._volume(window) > self._volume(kept):
+                        kept, window = window, kept
+                    losers.add((window['station'], _window_key(window)))
+                else:
+                    kept = window
+        return losers
+
+    def _solve(self, dirty: Set[str]):
+        rounds = 0
+        while dirty:
+            for station in dirty:
+                self._solve_station(station)
+            losers = self._satellite_conflicts()
+            for station, key in losers:
+                self.banned[station].add(key)
+            dirty = {station for station, _ in losers}
+            rounds += 1
+        logger.debug(f"Downlink schedule converged in {rounds} round(s)")
+
+    def _volume(self, window: Dict) -> float:
+        return (window['los'] - window['aos']).total_seconds() * self.rates[window['station']]
+
+    def plan(self) -> List[Dict]:
+        """
+        Scheduled contacts, earliest first
+
+        Returns:
+            Dicts with satellite, norad_id, station, start, end, duration_seconds and volume_mbit
+        """
+        contacts = [{
+            'satellite': w['satellite'],
+            'norad_id': int(w['norad_id']),
+            'station': w['station'],
+            'start': w['aos'],
+            'end': w['los'],
+            'duration_seconds': (w['los'] - w['aos']).total_seconds(),
+            'volume_mbit': self._volume(w),
+        } for contacts in self.contacts.values() for w in contacts]
+        contacts.sort(key=lambda c: c['start'])
+        return contacts
+
+    def total_volume_mbit(self) -> float:
+        return sum(self._volume(w) for contacts in self.contacts.values() for w in contacts)
+
+
+def schedule_downlinks(passes: Iterable[Dict], stations: Sequence[Dict],
+                       turnaround_seconds: float = DEFAULT_TURNAROUND_SECONDS) -> List[Dict]:
+    """One-shot downlink plan for pass dicts from predict_passes"""
+    return DownlinkScheduler(stations, turnaround_seconds).schedule(passes)
+
+
+def next_contact(plan: Sequence[Dict], satellite: str, after: Optional[object] = None) -> Optional[Dict]:
+    """First scheduled contact of a satellite ending after the given time"""
+    return next((c for c in plan if c['satellite'] == satellite and (after is None or c['end'] > after)), None)
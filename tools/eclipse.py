@@ -0,0 +1,261 @@
+"""
+Eclipse Prediction
+Sun position, cylindrical/conical Earth shadow and batched eclipse entry/exit intervals
+"""
+
+import logging
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Union
+
+from tools.orbital_mechanics import propagate_batch, time_grid, EARTH_RADIUS_KM, SECONDS_PER_DAY
+from tools.ephemeris_cache import hermite_interpolate
+from tools.tle_catalog import TLECatalog, get_catalog
+
+logger = logging.getLogger(__name__)
+
+AU_KM = 149597870.7
+SUN_RADIUS_KM = 696000.0
+ROOT_ITERATIONS = 8       # Illinois method on a 60 s bracket -> sub-millisecond
+SCHEDULE_MARGIN_HOURS = 6.0  # cached schedules cover this much beyond the requested window
+
+
+def sun_position(jd: np.ndarray, fr: np.ndarray) -> np.ndarray:
+    """
+    Geocentric Sun position (Vallado's low-precision series, ~0.01 deg)
+
+    The series is in mean-of-date axes; the nutation offset to TEME (< 20")
+    is far below the series accuracy, so the result is used as TEME.
+
+    Args:
+        jd, fr: Two-part Julian dates (M,)
+
+    Returns:
+        (M, 3) positions in km
+    """
+    t = ((np.asarray(jd) - 2451545.0) + np.asarray(fr)) / 36525.0
+    mean_longitude = np.radians(280.460 + 36000.771 * t)
+    anomaly = np.radians(357.5291092 + 35999.05034 * t)
+    ecliptic_longitude = (mean_longitude + np.radians(1.914666471) * np.sin(anomaly)
+                          + np.radians(0.019994643) * np.sin(2 * anomaly))
+    distance = (1.000140612 - 0.016708617 * np.cos(anomaly) - 0.000139589 * np.cos(2 * anomaly)) * AU_KM
+    obliquity = np.radians(23.439291 - 0.0130042 * t)
+    return distance[..., None] * np.stack([
+        np.cos(ecliptic_longitude),
+        np.cos(obliquity) * np.sin(ecliptic_longitude),
+        np.sin(obliquity) * np.sin(ecliptic_longitude),
+    ], axis=-1)
+
+
+def _disc_angles(positions: np.ndarray, sun: np.ndarray):
+    """Apparent Sun radius a, Earth radius b and their separation c seen from each satellite"""
+    to_sun = sun - positions
+    r = np.linalg.norm(positions, axis=-1)
+    d = np.linalg.norm(to_sun, axis=-1)
+    a = np.arcsin(SUN_RADIUS_KM / d)
+    b = np.arcsin(np.minimum(EARTH_RADIUS_KM / r, 1.0))
+    c = np.arccos(np.clip(-np.einsum('...i,...i->...', positions, to_sun) / (r * d), -1.0, 1.0))
+    return a, b, c
+
+
+def shadow_function(positions: np.ndarray, sun: np.ndarray, model: str = 'conical') -> np.ndarray:
+    """
+    Smooth function that is negative in eclipse and positive in sunlight
+
+    'conical': separation of the Sun's centre from the Earth's limb as seen by
+    the satellite (radians; zero at mid-penumbra). 'cylindrical': distance from
+    the shadow cylinder wall (km).
+
+    Args:
+        positions: (..., M, 3) TEME positions
+        sun: (M, 3) Sun positions
+        model: 'conical' or 'cylindrical'
+    """
+    if model == 'conical':
+        _, b, c = _disc_angles(positions, sun)
+        return c - b
+    if model == 'cylindrical':
+        direction = sun / np.linalg.norm(sun, axis=-1, keepdims=True)
+        along = np.einsum('...i,...i->...', positions, direction)
+        radial = np.linalg.norm(positions - along[..., None] * direction, axis=-1)
+        # Behind the Earth: distance to the shadow axis; sunward: distance to the centre
+        # (the two agree on the terminator plane, so the function stays continuous)
+        return np.where(along < 0, radial, np.linalg.norm(positions, axis=-1)) - EARTH_RADIUS_KM
+    raise ValueError(f"Unknown shadow model '{model}'")
+
+
+def illumination(positions: np.ndarray, sun: np.ndarray, model: str = 'conical') -> np.ndarray:
+    """
+    Fraction of the solar disc visible from each satellite
+
+    Args:
+        positions: (..., M, 3) TEME positions
+        sun: (M, 3) Sun positions
+        model: 'conical' (umbra / penumbra disc overlap) or 'cylindrical' (0 or 1)
+
+    Returns:
+        (..., M) fractions in [0, 1]
+    """
+    if model == 'cylindrical':
+        return (shadow_function(positions, sun, model) > 0).astype(np.float64)
+    if model != 'conical':
+        raise ValueError(f"Unknown shadow model '{model}'")
+
+    a, b, c = _disc_angles(positions, sun)
+    # Overlap area of two discs (Montenbruck & Gill 3.4), valid where |a - b| < c < a + b
+    safe_c = np.maximum(c, 1e-12)
+    x = (safe_c**2 + a**2 - b**2) / (2 * safe_c)
+    y = np.sqrt(np.maximum(a**2 - x**2, 0.0))
+    overlap = (a**2 * np.arccos(np.clip(x / a, -1.0, 1.0))
+               + b**2 * np.arccos(np.clip((safe_c - x) / b, -1.0, 1.0)) - safe_c * y)
+    fraction = 1.0 - overlap / (np.pi * a**2)
+
+    fraction = np.where(c >= a + b, 1.0, fraction)
+    fraction = np.where(c <= b - a, 0.0, fraction)
+    fraction = np.where(c <= a - b, 1.0 - (b / a)**2, fraction)
+    return np.clip(fraction, 0.0, 1.0)
+
+
+def _refine_transitions(positions: np.ndarray, velocities: np.ndarray, sat: np.ndarray, k: np.ndarray,
+                        f_lo: np.ndarray, f_hi: np.ndarray, step: float, jd0: float, fr0: float,
+                        model: str) -> np.ndarray:
+    """Shadow-function roots bracketed by grid intervals k (vectorized Illinois method)"""
+    def shadow_at(t):
+        j = np.minimum(np.floor(t / step).astype(np.int64), positions.shape[1] - 2)
+        r, _ = hermite_interpolate(positions[sat, j], velocities[sat, j],
+                                   positions[sat, j + 1], velocities[sat, j + 1], t / step - j, step)
+        return shadow_function(r, sun_position(jd0, fr0 + t / SECONDS_PER_DAY), model)
+
+    a, b = k * step, (k + 1) * step
+    fa, fb = f_lo, f_hi
+    for _ in range(ROOT_ITERATIONS):
+        denominator = fb - fa
+        c = np.where(denominator != 0, b - fb * (b - a) / np.where(denominator != 0, denominator, 1), b)
+        fc = shadow_at(c)
+        flip = fc * fb < 0
+        a, fa = np.where(flip, b, a), np.where(flip, fb, 0.5 * fa)
+        b, fb = c, fc
+    return b
+
+
+def predict_eclipses(catalog: TLECatalog, start: Optional[datetime] = None,
+                     duration_hours: float = 24.0, step_seconds: float = 60.0,
+                     satellites: Optional[Sequence[Union[int, str]]] = None,
+                     model: str = 'conical') -> List[Dict]:
+    """
+    Eclipse entry and exit times for every satellite in one pass
+
+    The shadow function is evaluated on a coarse (N, M) grid for all
+    satellites at once; each sign change is refined by the Illinois method on
+    Hermite-interpolated states. Eclipses shorter than one grid step can be
+    missed (LEO eclipses last 20-40 minutes).
+
+    Args:
+        catalog: Element source
+        start: Window start (UTC); defaults to now
+        duration_hours: Prediction horizon
+        step_seconds: Coarse grid spacing
+        satellites: NORAD IDs or names to include (default: whole catalog)
+        model: 'conical' (entry/exit when the Sun's centre crosses the limb) or 'cylindrical'
+
+    Returns:
+        Interval dicts (satellite, norad_id, entry, exit as naive UTC, duration_seconds)
+        sorted by entry. Eclipses in progress at either end are clipped to the window.
+    """
+    start = start or datetime.now(timezone.utc)
+    if start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    if satellites is not None:
+        catalog = catalog.subset(satellites)
+
+    jd, fr = time_grid(start, duration_hours, step_seconds)
+    positions, velocities = propagate_batch(catalog.satellites(), jd, fr)
+    shadow = shadow_function(positions, sun_position(jd, fr), model)
+    duration = duration_hours * 3600
+    n_epochs = len(jd)
+
+    # Pad each row with "sunlit" so every eclipse has exactly one entry and one exit
+    padded = np.zeros((len(catalog), n_epochs + 2), dtype=np.int8)
+    padded[:, 1:-1] = shadow < 0
+    change = np.diff(padded, axis=1)
+    sat_entry, j_entry = np.nonzero(change == 1)
+    sat_exit, j_exit = np.nonzero(change == -1)
+
+    entry = np.zeros(len(sat_entry))
+    refine = j_entry > 0
+    sat, j = sat_entry[refine], j_entry[refine]
+    entry[refine] = _refine_transitions(positions, velocities, sat, j - 1, shadow[sat, j - 1],
+                                        shadow[sat, j], step_seconds, jd[0], fr[0], model)
+
+    exit_ = np.full(len(sat_exit), duration, dtype=np.float64)
+    refine = j_exit < n_epochs
+    sat, j = sat_exit[refine], j_exit[refine]
+    exit_[refine] = _refine_transitions(positions, velocities, sat, j - 1, shadow[sat, j - 1],
+                                        shadow[sat, j], step_seconds, jd[0], fr[0], model)
+
+    eclipses = [{
+        'satellite': str(catalog.names[sat]),
+        'norad_id': int(catalog.norad_ids[sat]),
+        'entry': start + timedelta(seconds=float(t_entry)),
+        'exit': start + timedelta(seconds=float(t_exit)),
+        'duration_seconds': float(t_exit - t_entry),
+    } for sat, t_entry, t_exit in zip(sat_entry.tolist(), entry, exit_)]
+    eclipses.sort(key=lambda e: e['entry'])
+
+    logger.info(f"Predicted {len(eclipses)} eclipses for {len(catalog)} satellites "
+                f"over {duration_hours:.0f} h")
+    return eclipses
+
+
+def eclipse_status(eclipses: Sequence[Dict], satellite: str, moment: datetime) -> Dict:
+    """
+    Eclipse state of one satellite at a moment from a predicted schedule
+
+    Returns:
+        in_eclipse, plus next_entry / next_exit (naive UTC, or None beyond the schedule)
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    own = [e for e in eclipses if e['satellite'] == satellite and e['exit'] > moment]
+    current = next((e for e in own if e['entry'] <= moment), None)
+    upcoming = next((e for e in own if e['entry'] > moment), None)
+    return {
+        'in_eclipse': current is not None,
+        'next_entry': upcoming['entry'] if upcoming else None,
+        'next_exit': current['exit'] if current else (upcoming['exit'] if upcoming else None),
+    }
+
+
+_shared_schedules = {}
+
+
+def get_eclipse_schedule(satellites: Sequence[Union[int, str]], start: Optional[datetime] = None,
+                         duration_hours: float = 24.0, catalog: Optional[TLECatalog] = None) -> List[Dict]:
+    """
+    Eclipse intervals overlapping [start, start + duration_hours], shared by the
+    anomaly detector and dashboard
+
+    Predictions cover SCHEDULE_MARGIN_HOURS beyond the requested window and are
+    reused until a request falls outside what was predicted or the satellites'
+    element sets change (a catalog reload with new epochs replaces the entry).
+    """
+    start = start or datetime.now(timezone.utc)
+    if start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    end = start + timedelta(hours=duration_hours)
+
+    elements = (catalog or get_catalog()).subset(satellites)
+    epochs = (elements['epoch_jd'] + elements['epoch_fr']).tolist()
+    key = tuple(satellites)
+    cached = _shared_schedules.get(key)
+    if cached is None or cached['epochs'] != epochs or start < cached['start'] or end > cached['end']:
+        hours = duration_hours + SCHEDULE_MARGIN_HOURS
+        cached = {
+            'start': start,
+            'end': start + timedelta(hours=hours),
+            'epochs': epochs,
+            'eclipses': predict_eclipses(elements, start=start, duration_hours=hours),
+        }
+        _shared_schedules[key] = cached
+
+    return [e for e in cached['eclipses'] if e['exit'] > start and e['entry'] < end]
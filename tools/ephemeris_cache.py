@@ -0,0 +1,231 @@
+"""
+Ephemeris Cache
+Coarse-grid SGP4 states per object, answered at arbitrary times by cubic Hermite interpolation
+"""
+
+import logging
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from tools.orbital_mechanics import propagate_batch, SECONDS_PER_DAY, MU_EARTH, J2, EARTH_RADIUS_KM
+from tools.tle_catalog import TLECatalog, get_catalog
+
+logger = logging.getLogger(__name__)
+
+JD_J2000 = 2451545.0
+LEO_PERIGEE_KM = 6600.0        # lowest perigee error_bound_km covers
+LEO_MAX_ECCENTRICITY = 0.02    # highest eccentricity error_bound_km covers
+
+
+def hermite_error_bound_km(step_seconds: float, perigee_km: Union[float, np.ndarray] = LEO_PERIGEE_KM,
+                           eccentricity: Union[float, np.ndarray] = 0.0) -> Union[float, np.ndarray]:
+    """
+    Upper bound on the cubic Hermite position error (vector norm) for an SGP4 orbit
+
+    Two parts:
+        - Interpolating Keplerian motion: h^4 / 384 * max|r^(4)|, where
+          max|r^(4)| <= (1 + e)^3 mu^2 / r_p^5 (the perigee is the worst
+          point; n^4 a for a circular orbit).
+        - SGP4 velocities are not exactly the derivative of its positions
+          (short-period terms), so the interpolant's slopes are slightly
+          off. This part is empirical: 0.1 h n (J2 Re^2 / a) (0.02 + 2e),
+          1.3x the largest error measured over 600 objects (e <= 0.1,
+          perigee 6,500-8,400 km) at steps of 30-120 s.
+
+    Args:
+        step_seconds: Grid spacing
+        perigee_km: Perigee radius, scalar or per object (the lowest orbit is the worst case)
+        eccentricity: Eccentricity, scalar or per object
+
+    Returns:
+        Maximum interpolation error in km (array when given arrays)
+    """
+    e = np.asarray(eccentricity, dtype=np.float64)
+    perigee = np.asarray(perigee_km, dtype=np.float64)
+    semi_major_axis = perigee / (1 - e)
+    kepler = step_seconds**4 / 384.0 * (1 + e)**3 * MU_EARTH**2 / perigee**5
+    mean_motion = np.sqrt(MU_EARTH / semi_major_axis**3)
+    short_period = (0.1 * step_seconds * mean_motion * J2 * EARTH_RADIUS_KM**2 / semi_major_axis
+                    * (0.02 + 2 * e))
+    return kepler + short_period
+
+
+def hermite_interpolate(p0: np.ndarray, v0: np.ndarray, p1: np.ndarray, v1: np.ndarray,
+                        s: np.ndarray, h: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cubic Hermite interpolation of position and velocity
+
+    Args:
+        p0, v0: States at the start of each interval (..., 3)
+        p1, v1: States at the end of each interval (..., 3)
+        s: Fractional position within the interval, 0..1 (...)
+        h: Interval length in seconds
+
+    Returns:
+        (positions, velocities) at s
+    """
+    s = np.asarray(s)[..., None]
+    s2, s3 = s * s, s * s * s
+    h00, h10 = 2 * s3 - 3 * s2 + 1, s3 - 2 * s2 + s
+    h01, h11 = -2 * s3 + 3 * s2, s3 - s2
+    d00, d10 = 6 * s2 - 6 * s, 3 * s2 - 4 * s + 1
+    d01, d11 = -6 * s2 + 6 * s, 3 * s2 - 2 * s
+
+    positions = h00 * p0 + h10 * h * v0 + h01 * p1 + h11 * h * v1
+    velocities = (d00 * p0 + d01 * p1) / h + d10 * v0 + d11 * v1
+    return positions, velocities
+
+
+def _seconds_since_j2000(jd: np.ndarray, fr: np.ndarray) -> np.ndarray:
+    return ((jd - JD_J2000) + fr) * SECONDS_PER_DAY
+
+
+class EphemerisCache:
+    """
+    Per-object ephemeris cache
+    - States stored on a coarse, globally aligned time grid
+    - Cubic Hermite interpolation (position and velocity) between grid points
+    - LRU eviction by memory budget
+    - Entries invalidated automatically when a newer TLE epoch is loaded
+    """
+
+    def __init__(self, step_seconds: float = 60.0, segment_hours: float = 6.0,
+                 memory_budget_mb: float = 512.0):
+        self.step_seconds = step_seconds
+        self.segment_steps = int(np.ceil(segment_hours * 3600 / step_seconds))
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.entries: 'OrderedDict[int, Dict]' = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def error_bound_km(self) -> float:
+        """Interpolation error bound at the configured step for perigees above 6,600 km and e <= 0.02"""
+        return float(hermite_error_bound_km(self.step_seconds, LEO_PERIGEE_KM, LEO_MAX_ECCENTRICITY))
+
+    def error_bounds_km(self, norad_ids: Sequence[int], catalog: Optional[TLECatalog] = None) -> np.ndarray:
+        """Per-object interpolation error bound from each object's perigee and eccentricity"""
+        catalog = catalog or get_catalog()
+        rows = [catalog.index_of(int(norad_id)) for norad_id in norad_ids]
+        eccentricity = catalog['eccentricity'][rows]
+        perigee = catalog.semi_major_axis_km[rows] * (1 - eccentricity)
+        return hermite_error_bound_km(self.step_seconds, perigee, eccentricity)
+
+    def invalidate(self, norad_id: Optional[int] = None):
+        """Drop one object's ephemeris, or everything when norad_id is None"""
+        if norad_id is None:
+            self.entries.clear()
+            self.nbytes = 0
+        elif norad_id in self.entries:
+            self.nbytes -= self.entries.pop(norad_id)['nbytes']
+
+    def states(self, norad_ids: Sequence[int], jd: np.ndarray,
+               fr: Optional[np.ndarray] = None,
+               catalog: Optional[TLECatalog] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolated states for N objects at M epochs
+
+        Args:
+            norad_ids: Objects to evaluate
+            jd, fr: Two-part Julian dates of the epochs
+            catalog: Element source (defaults to the shared catalog)
+
+        Returns:
+            (positions_km, velocities_km_s) of shape (N, M, 3) in TEME
+        """
+        catalog = catalog or get_catalog()
+        jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+        fr = np.zeros_like(jd) if fr is None else np.atleast_1d(np.asarray(fr, dtype=np.float64))
+
+        t = _seconds_since_j2000(jd, fr)
+        k = np.floor(t / self.step_seconds).astype(np.int64)
+        s = t / self.step_seconds - k
+        k_min, k_max = int(k.min()), int(k.max()) + 1
+
+        norad_ids = [int(norad_id) for norad_id in norad_ids]
+        self._fill(norad_ids, k_min, k_max, catalog)
+
+        positions = np.empty((len(norad_ids), len(t), 3))
+        velocities = np.empty((len(norad_ids), len(t), 3))
+
+        for i, norad_id in enumerate(norad_ids):
+            entry = self.entries[norad_id]
+            self.entries.move_to_end(norad_id)
+            local = k - entry['k0']
+            positions[i], velocities[i] = hermite_interpolate(
+                entry['positions'][local], entry['velocities'][local],
+                entry['positions'][local + 1], entry['velocities'][local + 1],
+                s, self.step_seconds
+            )
+
+        return positions, velocities
+
+    def _fill(self, norad_ids: Sequence[int], k_min: int, k_max: int, catalog: TLECatalog):
+        """Propagate (in one batch) every object whose entry is missing, stale or too short"""
+        rows = [catalog.index_of(norad_id) for norad_id in norad_ids]
+        epochs = catalog['epoch_jd'][rows] + catalog['epoch_fr'][rows]
+
+        stale = []
+        for norad_id, epoch in zip(norad_ids, epochs):
+            entry = self.entries.get(norad_id)
+            if entry is not None and entry['element_epoch'] < epoch:
+                logger.debug(f"Newer TLE epoch for {norad_id}, invalidating ephemeris")
+                self.invalidate(norad_id)
+                entry = None
+            if entry is not None and entry['k0'] <= k_min and k_max <= entry['k1']:
+                self.hits += 1
+            else:
+                self.misses += 1
+                stale.append((norad_id, epoch))
+
+        if not stale:
+            return
+
+        k0 = k_min
+        k1 = max(k_max, k_min + self.segment_steps)
+        grid_seconds = np.arange(k0, k1 + 1) * self.step_seconds
+        jd = np.full(len(grid_seconds), JD_J2000)
+        fr = grid_seconds / SECONDS_PER_DAY
+
+        satellites = [catalog.satellite(norad_id) for norad_id, _ in stale]
+        positions, velocities = propagate_batch(satellites, jd, fr)
+
+        for i, (norad_id, epoch) in enumerate(stale):
+            self.invalidate(norad_id)
+            entry = {
+                'element_epoch': epoch,
+                'k0': k0,
+                'k1': k1,
+                # Copies, so evicting one entry releases its memory
+                'positions': positions[i].copy(),
+                'velocities': velocities[i].copy(),
+                'nbytes': positions[i].nbytes + velocities[i].nbytes,
+            }
+            self.entries[norad_id] = entry
+            self.nbytes += entry['nbytes']
+
+        self._evict(protected=set(norad_ids))
+
+    def _evict(self, protected: set):
+        """Evict least recently used entries until within the memory budget"""
+        for norad_id in list(self.entries):
+            if self.nbytes <= self.memory_budget_bytes:
+                break
+            if norad_id not in protected:
+                self.invalidate(norad_id)
+
+
+_shared_cache = None
+
+
+def get_ephemeris_cache() -> EphemerisCache:
+    """Shared ephemeris cache used by the orbit, collision and dashboard paths"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = EphemerisCache()
+    return _shared_cache
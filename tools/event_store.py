@@ -0,0 +1,205 @@
+"""
+Conjunction Event Store
+Embedded SQLite store of screened conjunctions with indexed queries and re-screen dedup
+"""
+
+import os
+import json
+import sqlite3
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+EVENT_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'conjunction_events.db')
+DEDUP_SECONDS = 600.0  # re-screens of one encounter land within this of the stored TCA
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conjunction_events (
+    id INTEGER PRIMARY KEY,
+    primary_id INTEGER NOT NULL,
+    secondary_id INTEGER NOT NULL,
+    primary_name TEXT,
+    secondary_name TEXT,
+    tca REAL NOT NULL,                  -- Unix seconds, UTC
+    miss_distance_km REAL NOT NULL,
+    relative_speed_km_s REAL,
+    probability REAL,
+    probability_mc REAL,
+    covariance TEXT,                    -- JSON matrix
+    first_screened REAL NOT NULL,
+    last_screened REAL NOT NULL,
+    screen_count INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_events_primary ON conjunction_events (primary_id, secondary_id, tca);
+CREATE INDEX IF NOT EXISTS idx_events_secondary ON conjunction_events (secondary_id, tca);
+CREATE INDEX IF NOT EXISTS idx_events_tca ON conjunction_events (tca);
+CREATE INDEX IF NOT EXISTS idx_events_probability ON conjunction_events (probability);
+"""
+
+UPDATE_COLUMNS = ('primary_name', 'secondary_name', 'tca', 'miss_distance_km',
+                  'relative_speed_km_s', 'probability', 'probability_mc', 'covariance')
+
+
+def _timestamp(moment: datetime) -> float:
+    """Unix seconds for a datetime (naive datetimes are taken as UTC)"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _datetime(timestamp: float) -> datetime:
+    """Naive UTC datetime, matching screen_catalog's convention"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+class ConjunctionEventStore:
+    """
+    Persistent conjunction events
+    - One row per encounter, updated in place when it is screened again
+    - Indexed by object, TCA and probability
+    """
+
+    def __init__(self, path: str = EVENT_DB_PATH):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        if path != ':memory:':
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> 'ConjunctionEventStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM conjunction_events").fetchone()[0]
+
+    def upsert_events(self, events: Sequence[Dict],
+                      screened_at: Optional[datetime] = None) -> Tuple[int, int]:
+        """
+        Insert events, or update the stored encounter when the same pair is
+        screened again with a TCA within DEDUP_SECONDS (either pair order)
+
+        Args:
+            events: Dicts with primary_id, secondary_id (NORAD IDs), tca (datetime)
+                and miss_distance_km; optionally primary_name, secondary_name,
+                relative_speed_km_s, probability, probability_mc and covariance
+            screened_at: Screening time (defaults to now)
+
+        Returns:
+            (inserted, updated) counts
+        """
+        now = _timestamp(screened_at or datetime.now(timezone.utc))
+        inserted = updated = 0
+        with self.connection:
+            for event in events:
+                i, j = int(event['primary_id']), int(event['secondary_id'])
+                tca = _timestamp(event['tca'])
+                covariance = event.get('covariance')
+                values = {
+                    'primary_name': event.get('primary_name'),
+                    'secondary_name': event.get('secondary_name'),
+                    'tca': tca,
+                    'miss_distance_km': float(event['miss_distance_km']),
+                    'relative_speed_km_s': event.get('relative_speed_km_s'),
+                    'probability': event.get('probability'),
+                    'probability_mc': event.get('probability_mc'),
+                    'covariance': None if covariance is None else json.dumps(
+                        [[float(x) for x in row] for row in covariance]),
+                }
+
+                existing = self.connection.execute(
+                    """SELECT id FROM conjunction_events
+                       WHERE ((primary_id = ? AND secondary_id = ?) OR (primary_id = ? AND secondary_id = ?))
+                         AND tca BETWEEN ? AND ?
+                       ORDER BY ABS(tca - ?) LIMIT 1""",
+                    (i, j, j, i, tca - DEDUP_SECONDS, tca + DEDUP_SECONDS, tca)).fetchone()
+
+                if existing is not None:
+                    assignments = ', '.join(f"{name} = :{name}" for name in UPDATE_COLUMNS)
+                    self.connection.execute(
+                        f"""UPDATE conjunction_events
+                            SET primary_id = :primary_id, secondary_id = :secondary_id, {assignments},
+                                last_screened = :now, screen_count = screen_count + 1
+                            WHERE id = :id""",
+                        {**values, 'primary_id': i, 'secondary_id': j, 'now': now, 'id': existing['id']})
+                    updated += 1
+                else:
+                    self.connection.execute(
+                        f"""INSERT INTO conjunction_events
+                            (primary_id, secondary_id, {', '.join(UPDATE_COLUMNS)}, first_screened, last_screened)
+                            VALUES (:primary_id, :secondary_id, {', '.join(':' + c for c in UPDATE_COLUMNS)},
+                                    :now, :now)""",
+                        {**values, 'primary_id': i, 'secondary_id': j, 'now': now})
+                    inserted += 1
+
+        logger.info(f"Stored conjunction events: {inserted} new, {updated} re-screened")
+        return inserted, updated
+
+    def query(self, object_id: Optional[int] = None, start: Optional[datetime] = None,
+              end: Optional[datetime] = None, min_probability: Optional[float] = None,
+              limit: Optional[int] = None) -> List[Dict]:
+        """
+        Stored events matching all given filters, earliest TCA first
+
+        Args:
+            object_id: NORAD ID appearing as primary or secondary
+            start, end: TCA range (inclusive)
+            min_probability: Only events with Pc at or above this
+            limit: Maximum number of events
+
+        Returns:
+            Event dicts (tca and screening times as naive UTC datetimes,
+            covariance as nested lists)
+        """
+        clauses, params = [], []
+        if object_id is not None:
+            clauses.append("(primary_id = ? OR secondary_id = ?)")
+            params += [int(object_id), int(object_id)]
+        if start is not None:
+            clauses.append("tca >= ?")
+            params.append(_timestamp(start))
+        if end is not None:
+            clauses.append("tca <= ?")
+            params.append(_timestamp(end))
+        if min_probability is not None:
+            clauses.append("probability >= ?")
+            params.append(float(min_probability))
+
+        sql = "SELECT * FROM conjunction_events"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY tca"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        events = []
+        for row in self.connection.execute(sql, params):
+            event = dict(row)
+            for name in ('tca', 'first_screened', 'last_screened'):
+                event[name] = _datetime(event[name])
+            if event['covariance'] is not None:
+                event['covariance'] = json.loads(event['covariance'])
+            events.append(event)
+        return events
+
+
+_shared_store = None
+
+
+def get_event_store() -> ConjunctionEventStore:
+    """Shared process-wide event store used by the collision agent and dashboard"""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = ConjunctionEventStore()
+    return _shared_store
@@ -0,0 +1,245 @@
+"""
+Reference Frames
+Batched TEME / J2000 / Earth-fixed / geodetic conversions with per-epoch rotations cached
+"""
+
+import logging
+import numpy as np
+from functools import lru_cache
+from typing import Dict, Tuple, Union
+
+from tools.orbital_mechanics import EARTH_ROTATION_RAD_S, SECONDS_PER_DAY
+
+logger = logging.getLogger(__name__)
+
+WGS84_A_KM = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+GEODETIC_ITERATIONS = 4   # Bowring iteration, well below a millimetre in LEO
+EPOCH_CACHE_SIZE = 64
+
+ARCSEC = np.pi / (180.0 * 3600.0)
+
+# Largest IAU 1980 nutation terms: multipliers of (l, l', F, D, Omega), then
+# longitude (A + B t) and obliquity (C + D t) coefficients in arcseconds.
+# Together they hold the series to a few tens of milliarcseconds (~1 m in LEO).
+_NUTATION_TERMS = np.array([
+    [0, 0, 0, 0, 1, -17.1996, -0.01742, 9.2025, 0.00089],
+    [0, 0, 2, -2, 2, -1.3187, -0.00016, 0.5736, -0.00031],
+    [0, 0, 2, 0, 2, -0.2274, -0.00002, 0.0977, -0.00005],
+    [0, 0, 0, 0, 2, 0.2062, 0.00002, -0.0895, 0.00005],
+    [0, 1, 0, 0, 0, 0.1426, -0.00034, 0.0054, -0.00001],
+    [1, 0, 0, 0, 0, 0.0712, 0.00001, -0.0007, 0.0],
+    [0, 1, 2, -2, 2, -0.0517, 0.00012, 0.0224, -0.00006],
+    [0, 0, 2, 0, 1, -0.0386, -0.00004, 0.0200, 0.0],
+    [1, 0, 2, 0, 2, -0.0301, 0.0, 0.0129, -0.00001],
+    [0, -1, 2, -2, 2, 0.0217, -0.00005, -0.0095, 0.00003],
+    [1, 0, 0, -2, 0, -0.0158, 0.0, -0.0001, 0.0],
+    [0, 0, 2, -2, 1, 0.0129, 0.00001, -0.0070, 0.0],
+    [-1, 0, 2, 0, 2, 0.0123, 0.0, -0.0053, 0.0],
+])
+
+
+def gmst(jd: np.ndarray, fr: np.ndarray) -> np.ndarray:
+    """
+    Greenwich mean sidereal time (IAU 1982), treating UTC as UT1
+
+    Args:
+        jd, fr: Two-part Julian dates
+
+    Returns:
+        GMST angle in radians
+    """
+    t = ((jd - 2451545.0) + fr) / 36525.0
+    seconds = (67310.54841 + (876600.0 * 3600 + 8640184.812866) * t
+               + 0.093104 * t**2 - 6.2e-6 * t**3)
+    return np.radians((seconds % SECONDS_PER_DAY) / 240.0)
+
+
+def _rotation(axis: int, angle: np.ndarray) -> np.ndarray:
+    """(..., 3, 3) passive rotations of the coordinate axes by angle about x/y/z (0/1/2)"""
+    angle = np.asarray(angle, dtype=np.float64)
+    c, s = np.cos(angle), np.sin(angle)
+    matrix = np.zeros(angle.shape + (3, 3))
+    i, j = (axis + 1) % 3, (axis + 2) % 3
+    matrix[..., axis, axis] = 1.0
+    matrix[..., i, i] = c
+    matrix[..., j, j] = c
+    matrix[..., i, j] = s
+    matrix[..., j, i] = -s
+    return matrix
+
+
+def _nutation(t: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Mean obliquity, nutation in longitude and in obliquity (radians) at Julian centuries t"""
+    t = t[..., None]
+    arguments = np.radians(np.stack([
+        134.96340251 + (1717915923.2178 * t + 31.8792 * t**2) / 3600.0,    # l
+        357.52910918 + (129596581.0481 * t - 0.5532 * t**2) / 3600.0,      # l'
+        93.27209062 + (1739527262.8478 * t - 12.7512 * t**2) / 3600.0,     # F
+        297.85019547 + (1602961601.2090 * t - 6.3706 * t**2) / 3600.0,     # D
+        125.04455501 - (6962890.2665 * t - 7.4722 * t**2) / 3600.0,        # Omega
+    ], axis=-1))                                                           # (..., 1, 5)
+    phase = np.sum(_NUTATION_TERMS[:, :5] * arguments, axis=-1)             # (..., terms)
+    t = t[..., 0]
+    d_psi = np.sum((_NUTATION_TERMS[:, 5] + _NUTATION_TERMS[:, 6] * t[..., None]) * np.sin(phase), axis=-1)
+    d_eps = np.sum((_NUTATION_TERMS[:, 7] + _NUTATION_TERMS[:, 8] * t[..., None]) * np.cos(phase), axis=-1)
+    mean_obliquity = 84381.448 - 46.8150 * t - 0.00059 * t**2 + 0.001813 * t**3
+    return mean_obliquity * ARCSEC, d_psi * ARCSEC, d_eps * ARCSEC
+
+
+@lru_cache(maxsize=EPOCH_CACHE_SIZE)
+def _epoch_terms(jd_bytes: bytes, fr_bytes: bytes) -> Dict[str, np.ndarray]:
+    jd, fr = np.frombuffer(jd_bytes), np.frombuffer(fr_bytes)
+    # Precession and nutation use UTC for TT; the ~69 s offset moves them by < 0.1 mas
+    t = ((jd - 2451545.0) + fr) / 36525.0
+
+    zeta = (2306.2181 * t + 0.30188 * t**2 + 0.017998 * t**3) * ARCSEC
+    theta = (2004.3109 * t - 0.42665 * t**2 - 0.041833 * t**3) * ARCSEC
+    z = (2306.2181 * t + 1.09468 * t**2 + 0.018203 * t**3) * ARCSEC
+    precession = _rotation(2, -z) @ _rotation(1, theta) @ _rotation(2, -zeta)            # J2000 -> MOD
+
+    mean_obliquity, d_psi, d_eps = _nutation(t)
+    nutation = (_rotation(0, -(mean_obliquity + d_eps)) @ _rotation(2, -d_psi)
+                @ _rotation(0, mean_obliquity))                                           # MOD -> TOD
+    equinox = _rotation(2, -d_psi * np.cos(mean_obliquity))                               # TEME -> TOD
+
+    terms = {
+        'gmst': gmst(jd, fr),
+        'teme_to_j2000': np.swapaxes(precession, -1, -2) @ np.swapaxes(nutation, -1, -2) @ equinox,
+    }
+    for value in terms.values():
+        value.flags.writeable = False
+    return terms
+
+
+def epoch_rotations(jd: Union[float, np.ndarray], fr: Union[float, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Frame terms for a grid of epochs, cached so repeated grids cost nothing
+
+    Args:
+        jd, fr: Two-part Julian dates (M,)
+
+    Returns:
+        'gmst' (M,) in radians and 'teme_to_j2000' (M, 3, 3) rotation matrices
+        (IAU 1976 precession, truncated IAU 1980 nutation). Arrays are read-only.
+    """
+    jd, fr = np.broadcast_arrays(np.atleast_1d(np.asarray(jd, dtype=np.float64)),
+                                 np.atleast_1d(np.asarray(fr, dtype=np.float64)))
+    return _epoch_terms(np.ascontiguousarray(jd).tobytes(), np.ascontiguousarray(fr).tobytes())
+
+
+def _rotate(matrices: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """Apply (M, 3, 3) per-epoch matrices to (..., M, 3) vectors"""
+    return np.einsum('mij,...mj->...mi', matrices, vectors, optimize=True)
+
+
+def teme_to_j2000(vectors: np.ndarray, jd: np.ndarray, fr: np.ndarray) -> np.ndarray:
+    """
+    Rotate TEME positions or velocities into the J2000 mean equator and equinox
+
+    Args:
+        vectors: (..., M, 3) states, e.g. an (N, M, 3) ephemeris
+        jd, fr: Two-part Julian dates of the M epochs
+
+    Returns:
+        (..., M, 3) J2000 vectors
+    """
+    return _rotate(epoch_rotations(jd, fr)['teme_to_j2000'], vectors)
+
+
+def j2000_to_teme(vectors: np.ndarray, jd: np.ndarray, fr: np.ndarray) -> np.ndarray:
+    """Inverse of teme_to_j2000"""
+    return _rotate(np.swapaxes(epoch_rotations(jd, fr)['teme_to_j2000'], -1, -2), vectors)
+
+
+def teme_to_ecef(positions: np.ndarray, theta: np.ndarray) -> np.ndarray:
+    """
+    Rotate TEME positions into the Earth-fixed frame (polar motion neglected)
+
+    Args:
+        positions: (..., 3) TEME positions
+        theta: GMST angles broadcastable to positions[..., 0]
+
+    Returns:
+        (..., 3) Earth-fixed positions
+    """
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+    x, y = positions[..., 0], positions[..., 1]
+    return np.stack([cos_t * x + sin_t * y, -sin_t * x + cos_t * y, positions[..., 2]], axis=-1)
+
+
+def ecef_to_teme(positions: np.ndarray, theta: np.ndarray) -> np.ndarray:
+    """Inverse of teme_to_ecef"""
+    return teme_to_ecef(positions, -np.asarray(theta))
+
+
+def teme_to_ecef_velocity(positions: np.ndarray, velocities: np.ndarray,
+                          theta: np.ndarray) -> np.ndarray:
+    """
+    Earth-fixed velocities: the rotated TEME velocity less Earth's rotation (omega x r)
+
+    Args:
+        positions, velocities: (..., 3) TEME states
+        theta: GMST angles broadcastable to positions[..., 0]
+    """
+    ecef = teme_to_ecef(positions, theta)
+    rotated = teme_to_ecef(velocities, theta)
+    return rotated + EARTH_ROTATION_RAD_S * np.stack(
+        [ecef[..., 1], -ecef[..., 0], np.zeros_like(ecef[..., 2])], axis=-1)
+
+
+def geodetic_to_ecef(latitude_deg: Union[float, np.ndarray], longitude_deg: Union[float, np.ndarray],
+                     altitude_km: Union[float, np.ndarray] = 0.0) -> np.ndarray:
+    """
+    WGS84 geodetic coordinates to Earth-fixed positions
+
+    Returns:
+        (..., 3) positions in km
+    """
+    lat, lon = np.radians(latitude_deg), np.radians(longitude_deg)
+    n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * np.sin(lat)**2)
+    return np.stack(np.broadcast_arrays(
+        (n + altitude_km) * np.cos(lat) * np.cos(lon),
+        (n + altitude_km) * np.cos(lat) * np.sin(lon),
+        (n * (1 - WGS84_E2) + altitude_km) * np.sin(lat),
+    ), axis=-1)
+
+
+def ecef_to_geodetic(positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Earth-fixed positions to WGS84 geodetic coordinates (Bowring iteration)
+
+    Args:
+        positions: (..., 3) positions in km
+
+    Returns:
+        (latitude_deg, longitude_deg, altitude_km), each (...,)
+    """
+    x, y, z = positions[..., 0], positions[..., 1], positions[..., 2]
+    p = np.hypot(x, y)
+    lat = np.arctan2(z, p * (1 - WGS84_E2))
+    for _ in range(GEODETIC_ITERATIONS):
+        sin_lat = np.sin(lat)
+        n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * sin_lat**2)
+        lat = np.arctan2(z + WGS84_E2 * n * sin_lat, p)
+
+    sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+    # Stable at the poles, unlike p / cos(lat) - N
+    altitude = p * cos_lat + z * sin_lat - WGS84_A_KM * np.sqrt(1 - WGS84_E2 * sin_lat**2)
+    return np.degrees(lat), np.degrees(np.arctan2(y, x)), altitude
+
+
+def teme_to_geodetic(positions: np.ndarray, jd: np.ndarray,
+                     fr: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sub-satellite latitude / longitude and altitude for an ephemeris
+
+    Args:
+        positions: (..., M, 3) TEME positions
+        jd, fr: Two-part Julian dates of the M epochs
+
+    Returns:
+        (latitude_deg, longitude_deg, altitude_km), each (..., M)
+    """
+    return ecef_to_geodetic(teme_to_ecef(positions, epoch_rotations(jd, fr)['gmst']))
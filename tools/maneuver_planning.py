@@ -0,0 +1,157 @@
+"""
+Maneuver Planning
+Vectorized collision avoidance trade space: RTN delta-V grid x burn epochs, scored by miss distance and Pc
+"""
+
+import logging
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Sequence
+from sgp4.api import Satrec
+
+from tools.orbital_mechanics import propagate_batch, julian_dates, kepler_propagate, rtn_basis
+from tools.conjunction_screening import refine_tca
+from tools.collision_probability import project_to_encounter_plane, collision_probability
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RADIAL_M_S = np.linspace(-0.5, 0.5, 5)
+DEFAULT_ALONG_TRACK_M_S = np.linspace(-0.5, 0.5, 11)
+DEFAULT_CROSS_TRACK_M_S = np.linspace(-0.5, 0.5, 5)
+DEFAULT_BURN_LEADS_SECONDS = (1800.0, 2700.0, 3600.0, 5400.0)
+TCA_WINDOW_SECONDS = 120.0  # post-maneuver TCA search half-width
+TCA_STEP_SECONDS = 10.0
+
+
+def pareto_front(fuel: np.ndarray, risk: np.ndarray) -> np.ndarray:
+    """
+    Indices of non-dominated candidates (less fuel or less risk than every other), cheapest first
+    """
+    order = np.lexsort((risk, fuel))
+    best_before = np.minimum.accumulate(np.concatenate([[np.inf], risk[order][:-1]]))
+    return order[risk[order] < best_before]
+
+
+def plan_maneuvers(primary: Satrec, threats: Sequence[Satrec], tca_seconds: Sequence[float],
+                   epoch: datetime, covariance: np.ndarray, hard_body_radius_km: float,
+                   radial_m_s: np.ndarray = DEFAULT_RADIAL_M_S,
+                   along_track_m_s: np.ndarray = DEFAULT_ALONG_TRACK_M_S,
+                   cross_track_m_s: np.ndarray = DEFAULT_CROSS_TRACK_M_S,
+                   burn_leads_seconds: Sequence[float] = DEFAULT_BURN_LEADS_SECONDS,
+                   window_seconds: float = TCA_WINDOW_SECONDS,
+                   step_seconds: float = TCA_STEP_SECONDS) -> Dict[str, np.ndarray]:
+    """
+    Evaluate a grid of impulsive avoidance burns against every threat at once
+
+    Burns are applied lead seconds before the earliest TCA. Each candidate
+    trajectory is the SGP4 nominal plus the two-body deviation caused by the
+    burn, so the grid costs one SGP4 call plus one vectorized Kepler solve.
+    Post-burn TCAs are found with refine_tca in a window around each
+    original TCA, and Pc is evaluated in the new encounter plane.
+
+    Args:
+        primary: Maneuvering satellite
+        threats: Objects it has conjunctions with
+        tca_seconds: Original TCA of each threat, seconds after epoch
+        epoch: Reference epoch (UTC); burns are never scheduled before it
+        covariance: Combined 3x3 position covariance in km^2, shared or one per threat (T, 3, 3)
+        hard_body_radius_km: Combined hard-body radius
+        radial_m_s, along_track_m_s, cross_track_m_s: Delta-V grid axes
+        burn_leads_seconds: Burn times before the earliest TCA
+        window_seconds, step_seconds: Post-burn TCA search grid
+
+    Returns:
+        Candidate columns burn_seconds (C,), delta_v_rtn_m_s (C, 3),
+        delta_v_m_s (C,), miss_distance_km (C, T), probability (C, T),
+        risk (C,) (probability of any collision), plus 'pareto' (indices of
+        the fuel/risk Pareto set, cheapest first)
+    """
+    tca_seconds = np.asarray(tca_seconds, dtype=np.float64)
+    n_threats = len(threats)
+
+    burn_seconds = tca_seconds.min() - np.asarray(burn_leads_seconds, dtype=np.float64)
+    burn_seconds = burn_seconds[burn_seconds >= 0]
+    if len(burn_seconds) == 0:
+        burn_seconds = np.zeros(1)
+
+    delta_v = np.stack(np.meshgrid(radial_m_s, along_track_m_s, cross_track_m_s, indexing='ij'),
+                       axis=-1).reshape(-1, 3)
+    n_burns, n_delta_v = len(burn_seconds), len(delta_v)
+
+    # One SGP4 call: primary at every burn epoch and search epoch, threats at their search epochs
+    offsets = np.arange(-window_seconds, window_seconds + step_seconds / 2, step_seconds)
+    search = tca_seconds[:, None] + offsets[None, :]
+    times = np.concatenate([burn_seconds, search.ravel()])
+    jd, fr = julian_dates([epoch + timedelta(seconds=float(t)) for t in times])
+    positions, velocities = propagate_batch([primary] + list(threats), jd, fr)
+
+    burn_positions, burn_velocities = positions[0, :n_burns], velocities[0, :n_burns]
+    shape = (n_threats, len(offsets), 3)
+    primary_positions = positions[0, n_burns:].reshape(shape)
+    primary_velocities = velocities[0, n_burns:].reshape(shape)
+    threat_positions = positions[1:, n_burns:].reshape(n_threats, n_threats, len(offsets), 3)
+    threat_velocities = velocities[1:, n_burns:].reshape(n_threats, n_threats, len(offsets), 3)
+    threat_positions = threat_positions[np.arange(n_threats), np.arange(n_threats)]
+    threat_velocities = threat_velocities[np.arange(n_threats), np.arange(n_threats)]
+
+    # Burn in TEME (km/s) for every (burn epoch, delta-V) candidate: (B, D, 3)
+    basis = rtn_basis(burn_positions, burn_velocities)
+    burn_teme = np.einsum('dj,bjk->bdk', delta_v / 1000.0, basis)
+
+    # Two-body deviation of each candidate from the nominal, zero before the burn
+    dt = np.maximum(search[None, None] - burn_seconds[:, None, None, None], 0.0)   # (B, 1, T, M)
+    start_r = burn_positions[:, None, None, None, :]
+    start_v = burn_velocities[:, None, None, None, :]
+    moved_r, moved_v = kepler_propagate(start_r, start_v + burn_teme[:, :, None, None, :], dt)
+    nominal_r, nominal_v = kepler_propagate(start_r, start_v, dt)
+    candidate_positions = primary_positions + (moved_r - nominal_r)          # (B, D, T, M, 3)
+    candidate_velocities = primary_velocities + (moved_v - nominal_v)
+
+    # Post-burn TCA for every (candidate, threat) pair
+    n_candidates = n_burns * n_delta_v
+    stacked_positions = np.concatenate([
+        candidate_positions.reshape(n_candidates * n_threats, len(offsets), 3), threat_positions])
+    stacked_velocities = np.concatenate([
+        candidate_velocities.reshape(n_candidates * n_threats, len(offsets), 3), threat_velocities])
+    pair_index = np.arange(n_candidates * n_threats)
+    pairs = np.column_stack([pair_index, n_candidates * n_threats + pair_index % n_threats])
+    distance = np.linalg.norm(stacked_positions[pairs[:, 1]] - stacked_positions[pairs[:, 0]], axis=-1)
+    tca = refine_tca(stacked_positions, stacked_velocities, pairs,
+                     np.argmin(distance, axis=1), step_seconds)
+
+    covariance = np.broadcast_to(np.asarray(covariance, dtype=np.float64), (n_threats, 3, 3))
+    miss, covariance_2d = project_to_encounter_plane(
+        tca['relative_position_km'], tca['relative_velocity_km_s'],
+        np.tile(covariance, (n_candidates, 1, 1)))
+    probability = collision_probability(miss, covariance_2d, hard_body_radius_km)
+
+    probability = probability.reshape(n_candidates, n_threats)
+    risk = 1.0 - np.prod(1.0 - probability, axis=1)
+    delta_v_m_s = np.tile(np.linalg.norm(delta_v, axis=1), n_burns)
+
+    plan = {
+        'burn_seconds': np.repeat(burn_seconds, n_delta_v),
+        'delta_v_rtn_m_s': np.tile(delta_v, (n_burns, 1)),
+        'delta_v_m_s': delta_v_m_s,
+        'miss_distance_km': tca['miss_distance_km'].reshape(n_candidates, n_threats),
+        'probability': probability,
+        'risk': risk,
+        'pareto': pareto_front(delta_v_m_s, risk),
+    }
+    logger.info(f"Evaluated {n_candidates:,} maneuver candidates against {n_threats} objects: "
+                f"{len(plan['pareto'])} on the fuel/risk Pareto front")
+    return plan
+
+
+def select_maneuver(plan: Dict[str, np.ndarray], max_risk: float) -> Optional[int]:
+    """
+    Cheapest Pareto candidate whose risk is at most max_risk
+
+    Returns:
+        Candidate index, or the lowest-risk candidate if none meets max_risk
+    """
+    pareto = plan['pareto']
+    acceptable = pareto[plan['risk'][pareto] <= max_risk]
+    if len(acceptable):
+        return int(acceptable[0])
+    return int(pareto[-1]) if len(pareto) else None
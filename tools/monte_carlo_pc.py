@@ -0,0 +1,211 @@
+"""
+Monte Carlo Collision Probability
+Sampled state uncertainties propagated to the encounter, counted against the hard-body radius
+"""
+
+import logging
+import numpy as np
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional, Sequence
+from scipy.stats import beta
+from sgp4.api import Satrec
+
+from tools.orbital_mechanics import kepler_propagate, propagate_batch, julian_dates
+from tools.conjunction_screening import refine_tca
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_SECONDS = 20.0
+DEFAULT_STEP_SECONDS = 10.0
+DEFAULT_BATCH_SIZE = 10_000
+DEFAULT_MAX_SAMPLES = 1_000_000
+MIN_HITS = 20  # hits required before the relative-width stopping rule applies
+
+
+def clopper_pearson(hits: int, samples: int, confidence: float = 0.95):
+    """Exact binomial confidence interval for hits / samples"""
+    alpha = 1 - confidence
+    low = beta.ppf(alpha / 2, hits, samples - hits + 1) if hits > 0 else 0.0
+    high = beta.ppf(1 - alpha / 2, hits + 1, samples - hits) if hits < samples else 1.0
+    return float(low), float(high)
+
+
+def _monte_carlo_batch(seed: np.random.SeedSequence, n: int, states: np.ndarray,
+                       cholesky: np.ndarray, dt: np.ndarray, correction: Optional[np.ndarray],
+                       step_seconds: float, hard_body_radius: float) -> Dict:
+    """
+    Sample, propagate and test one batch (runs in a worker process)
+
+    Returns:
+        Dict with the batch's hits and samples
+    """
+    rng = np.random.default_rng(seed)
+    # (2, n, 6) perturbed states of both objects at the sampling epoch
+    samples = states[:, None, :] + np.einsum('kij,knj->kni', cholesky, rng.standard_normal((2, n, 6)))
+
+    positions, velocities = kepler_propagate(samples[..., None, :3], samples[..., None, 3:], dt)
+    if correction is not None:
+        positions += correction[:, None, :, :3]
+        velocities += correction[:, None, :, 3:]
+
+    stacked_positions = positions.reshape(2 * n, len(dt), 3)
+    stacked_velocities = velocities.reshape(2 * n, len(dt), 3)
+    pairs = np.column_stack([np.arange(n), np.arange(n, 2 * n)])
+    distance = np.linalg.norm(positions[1] - positions[0], axis=-1)
+    tca = refine_tca(stacked_positions, stacked_velocities, pairs,
+                     np.argmin(distance, axis=1), step_seconds)
+
+    return {'hits': int(np.count_nonzero(tca['miss_distance_km'] < hard_body_radius)), 'samples': n}
+
+
+def stream_pc_monte_carlo(states: np.ndarray, covariances: np.ndarray, hard_body_radius: float,
+                          tca_seconds: float, window_seconds: float = DEFAULT_WINDOW_SECONDS,
+                          step_seconds: float = DEFAULT_STEP_SECONDS, reference: Optional[np.ndarray] = None,
+                          batch_size: int = DEFAULT_BATCH_SIZE,
+                          max_samples: int = DEFAULT_MAX_SAMPLES,
+                          relative_tolerance: float = 0.1, confidence: float = 0.95,
+                          stop_below: Optional[float] = None, workers: int = 1,
+                          seed: int = 0, executor: Optional[Executor] = None) -> Iterator[Dict]:
+    """
+    Monte Carlo Pc, yielding a running estimate after every batch
+
+    Both objects' states are sampled from their 6x6 covariances at the
+    sampling epoch and propagated (two-body) to a grid spanning
+    tca_seconds +/- window_seconds, where each sample's own closest approach
+    is solved with refine_tca and compared to the hard-body radius.
+
+    If reference states from a higher-fidelity propagator are given, each
+    sample follows the reference trajectory plus its two-body deviation from
+    the nominal, so the force model error cancels and only the spread of
+    the samples is modelled with two-body dynamics.
+
+    Batch i always draws from the i-th child of SeedSequence(seed) and
+    results are consumed in submission order, so the estimates (and the
+    stopping point) do not depend on the number of workers.
+
+    Stops when the confidence interval half-width falls below
+    relative_tolerance * Pc (once MIN_HITS hits are seen), when its upper
+    bound falls below stop_below, or at max_samples.
+
+    Args:
+        states: (2, 6) nominal TEME states (km, km/s) at the sampling epoch
+        covariances: (2, 6, 6) state covariances at the sampling epoch
+        hard_body_radius: Combined hard-body radius in km
+        tca_seconds: Nominal TCA relative to the sampling epoch
+        window_seconds: Half-width of the TCA search window
+        step_seconds: Search grid spacing
+        reference: Optional (2, M, 6) nominal states on the search grid
+        batch_size: Samples per batch (one worker task)
+        max_samples: Hard limit on the number of samples
+        relative_tolerance: Target CI half-width relative to Pc
+        confidence: CI confidence level
+        stop_below: Stop early once Pc is confidently below this value
+        workers: Worker processes (1 runs in-process)
+        seed: Root seed
+        executor: Process pool to run the batches on instead of starting one
+            (workers still sets how many batches are in flight)
+
+    Yields:
+        Dicts with samples, hits, pc, ci_low, ci_high and converged
+    """
+    states = np.asarray(states, dtype=np.float64)
+    cholesky = np.linalg.cholesky(np.asarray(covariances, dtype=np.float64))
+    dt = tca_seconds + np.arange(-window_seconds, window_seconds + step_seconds / 2, step_seconds)
+
+    correction = None
+    if reference is not None:
+        nominal_positions, nominal_velocities = kepler_propagate(
+            states[:, None, :3], states[:, None, 3:], dt[None, :])
+        correction = np.asarray(reference, dtype=np.float64) - np.concatenate(
+            [nominal_positions, nominal_velocities], axis=-1)
+
+    n_batches = int(np.ceil(max_samples / batch_size))
+    seeds = np.random.SeedSequence(seed).spawn(n_batches)
+    args = (states, cholesky, dt, correction, step_seconds, hard_body_radius)
+
+    pool = executor if executor is not None else (
+        ProcessPoolExecutor(max_workers=workers) if workers > 1 else None)
+    pending = deque()
+    next_batch = 0
+    hits = samples = 0
+    try:
+        while next_batch < n_batches or pending:
+            # Keep every worker busy with one task queued behind it
+            while pool is not None and next_batch < n_batches and len(pending) < 2 * workers:
+                n = min(batch_size, max_samples - next_batch * batch_size)
+                pending.append(pool.submit(_monte_carlo_batch, seeds[next_batch], n, *args))
+                next_batch += 1
+
+            if pool is None:
+                n = min(batch_size, max_samples - next_batch * batch_size)
+                result = _monte_carlo_batch(seeds[next_batch], n, *args)
+                next_batch += 1
+            else:
+                result = pending.popleft().result()
+
+            hits += result['hits']
+            samples += result['samples']
+            pc = hits / samples
+            ci_low, ci_high = clopper_pearson(hits, samples, confidence)
+            converged = ((hits >= MIN_HITS and (ci_high - ci_low) / 2 <= relative_tolerance * pc)
+                         or (stop_below is not None and ci_high < stop_below))
+
+            yield {'samples': samples, 'hits': hits, 'pc': pc,
+                   'ci_low': ci_low, 'ci_high': ci_high, 'converged': converged}
+            if converged:
+                break
+    finally:
+        for future in pending:
+            future.cancel()
+        if pool is not None and executor is None:
+            pool.shutdown(wait=True)
+
+
+def pc_monte_carlo(states: np.ndarray, covariances: np.ndarray, hard_body_radius: float,
+                   tca_seconds: float, **kwargs) -> Dict:
+    """
+    Monte Carlo Pc run to convergence (see stream_pc_monte_carlo for arguments)
+
+    Returns:
+        Final estimate dict (samples, hits, pc, ci_low, ci_high, converged)
+    """
+    estimate = None
+    for estimate in stream_pc_monte_carlo(states, covariances, hard_body_radius, tca_seconds, **kwargs):
+        pass
+    logger.info(f"Monte Carlo Pc {estimate['pc']:.3e} "
+                f"[{estimate['ci_low']:.3e}, {estimate['ci_high']:.3e}] "
+                f"from {estimate['samples']:,} samples")
+    return estimate
+
+
+def pc_monte_carlo_sgp4(satellites: Sequence[Satrec], epoch: datetime, covariances: np.ndarray,
+                        hard_body_radius: float, tca_seconds: float,
+                        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+                        step_seconds: float = DEFAULT_STEP_SECONDS, **kwargs) -> Dict:
+    """
+    Monte Carlo Pc for two SGP4 objects
+
+    States at epoch (where the covariances apply) and the reference
+    trajectory around TCA both come from SGP4.
+
+    Args:
+        satellites: Primary and secondary SGP4 records
+        epoch: Sampling epoch (UTC)
+        covariances: (2, 6, 6) TEME state covariances at epoch
+        hard_body_radius: Combined hard-body radius in km
+        tca_seconds: Nominal TCA relative to epoch
+        **kwargs: Passed to stream_pc_monte_carlo
+
+    Returns:
+        Final estimate dict, as pc_monte_carlo
+    """
+    offsets = np.concatenate([[0.0], tca_seconds + np.arange(
+        -window_seconds, window_seconds + step_seconds / 2, step_seconds)])
+    jd, fr = julian_dates([epoch + timedelta(seconds=float(t)) for t in offsets])
+    positions, velocities = propagate_batch(satellites, jd, fr)
+    states = np.concatenate([positions, velocities], axis=-1)
+    return pc_monte_carlo(states[:, 0], covariances, hard_body_radius, tca_seconds,
+                          window_seconds=window_seconds, step_seconds=step_seconds,
+                          reference=states[:, 1:], **kwargs)
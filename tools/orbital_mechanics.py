@@ -4,8 +4,165 @@ SGP4 propagation and trajectory calculations
 """
 
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Tuple, Dict
+from datetime import datetime, timedelta, timezone
+from typing import Tuple, Dict, Sequence, Union, Optional
+from sgp4.api import Satrec, SatrecArray, WGS72
+
+from tools.collision_probability import pc_foster
+
+# Julian date of the Unix epoch and of the SGP4 element epoch origin (1949-12-31 00:00 UT)
+JD_UNIX_EPOCH = 2440587.5
+JD_SGP4_EPOCH = 2433281.5
+SECONDS_PER_DAY = 86400.0
+MU_EARTH = 398600.4418  # km^3/s^2
+EARTH_RADIUS_KM = 6378.137
+J2 = 1.08262668e-3
+J3 = -2.53265649e-6
+J4 = -1.61962159e-6
+EARTH_ROTATION_RAD_S = 7.292115e-5
+BSTAR_TO_BALLISTIC = 12.741621  # Cd*A/m (m^2/kg) per unit B* (1/earth radii)
+
+# Exponential atmosphere (Vallado table 8-4): base altitude km, base density kg/m^3, scale height km
+ATMOSPHERE_TABLE = np.array([
+    (0, 1.225, 7.249), (25, 3.899e-2, 6.349), (30, 1.774e-2, 6.682), (40, 3.972e-3, 7.554),
+    (50, 1.057e-3, 8.382), (60, 3.206e-4, 7.714), (70, 8.770e-5, 6.549), (80, 1.905e-5, 5.799),
+    (90, 3.396e-6, 5.382), (100, 5.297e-7, 5.877), (110, 9.661e-8, 7.263), (120, 2.438e-8, 9.473),
+    (130, 8.484e-9, 12.636), (140, 3.845e-9, 16.149), (150, 2.070e-9, 22.523),
+    (180, 5.464e-10, 29.740), (200, 2.789e-10, 37.105), (250, 7.248e-11, 45.546),
+    (300, 2.418e-11, 53.628), (350, 9.518e-12, 53.298), (400, 3.725e-12, 58.515),
+    (450, 1.585e-12, 60.828), (500, 6.967e-13, 63.822), (600, 1.454e-13, 71.835),
+    (700, 3.614e-14, 88.667), (800, 1.170e-14, 124.64), (900, 5.245e-15, 181.05),
+    (1000, 3.019e-15, 268.00),
+])
+
+# Dormand-Prince 5(4) tableau; the force model is time-independent, so the stage times (c) are not needed
+_DP_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+    [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+]
+_DP_ERROR = np.array([35 / 384 - 5179 / 57600, 0, 500 / 1113 - 7571 / 16695, 125 / 192 - 393 / 640,
+                      -2187 / 6784 + 92097 / 339200, 11 / 84 - 187 / 2100, -1 / 40])
+
+
+def parse_tle(tle_line1: str, tle_line2: str) -> Satrec:
+    """
+    Parse a TLE pair into an SGP4 satellite record
+
+    Args:
+        tle_line1: TLE first line
+        tle_line2: TLE second line
+
+    Returns:
+        Initialized SGP4 satellite record
+    """
+    return Satrec.twoline2rv(tle_line1, tle_line2)
+
+
+def satellite_from_elements(norad_id: int, epoch_jd: float, bstar: float,
+                            ndot: float, nddot: float, eccentricity: float,
+                            arg_perigee_rad: float, inclination_rad: float,
+                            mean_anomaly_rad: float, mean_motion_rad_min: float,
+                            raan_rad: float) -> Satrec:
+    """
+    Build an SGP4 satellite record directly from mean elements
+
+    Args:
+        norad_id: NORAD catalog number
+        epoch_jd: Element epoch as a Julian date (UTC)
+        bstar: B* drag term (1/earth radii)
+        ndot, nddot: Mean motion derivatives as stored by SGP4 (rad/min^2, rad/min^3)
+        eccentricity: Orbital eccentricity
+        arg_perigee_rad, inclination_rad, mean_anomaly_rad, raan_rad: Angles in radians
+        mean_motion_rad_min: Kozai mean motion in rad/min
+
+    Returns:
+        Initialized SGP4 satellite record
+    """
+    satellite = Satrec()
+    satellite.sgp4init(WGS72, 'i', int(norad_id), epoch_jd - JD_SGP4_EPOCH,
+                       bstar, ndot, nddot, eccentricity, arg_perigee_rad,
+                       inclination_rad, mean_anomaly_rad, mean_motion_rad_min,
+                       raan_rad)
+    return satellite
+
+
+def julian_dates(epochs: Union[datetime, Sequence[datetime], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert UTC epochs to two-part Julian dates
+
+    Args:
+        epochs: datetime(s) or numpy datetime64 array; naive datetimes are taken as UTC
+
+    Returns:
+        (jd, fr) arrays whose sum is the Julian date, as expected by SGP4
+    """
+    if isinstance(epochs, datetime):
+        epochs = [epochs]
+    if not isinstance(epochs, np.ndarray):
+        epochs = [e.astimezone(timezone.utc).replace(tzinfo=None) if e.tzinfo else e
+                  for e in epochs]
+
+    microseconds = np.asarray(epochs, dtype='datetime64[us]').astype(np.int64)
+    days, remainder = np.divmod(microseconds, 86_400_000_000)
+    jd = days + JD_UNIX_EPOCH
+    fr = remainder / 86_400_000_000
+    return jd, fr
+
+
+def time_grid(start: datetime, duration_hours: float,
+              step_seconds: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build an evenly spaced propagation grid
+
+    Args:
+        start: First epoch (UTC)
+        duration_hours: Length of the grid in hours (end point included)
+        step_seconds: Spacing between epochs in seconds
+
+    Returns:
+        (jd, fr) two-part Julian dates for every grid epoch
+    """
+    offsets = np.arange(0.0, duration_hours * 3600 + 1e-9, step_seconds)
+    jd0, fr0 = julian_dates(start)
+    jd = np.full(len(offsets), jd0[0])
+    fr = fr0[0] + offsets / SECONDS_PER_DAY
+    return jd, fr
+
+
+def propagate_batch(satellites: Union[SatrecArray, Sequence[Satrec]],
+                    jd: np.ndarray,
+                    fr: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Propagate N satellites to M epochs in a single vectorized SGP4 call
+
+    Args:
+        satellites: SatrecArray, or a sequence of Satrec records (N objects)
+        jd: Julian dates of the M epochs (whole or two-part with fr)
+        fr: Fractional part of the Julian dates (optional)
+
+    Returns:
+        (positions_km, velocities_km_s) arrays of shape (N, M, 3) in TEME.
+        Entries for which SGP4 reported an error (e.g. decayed orbits) are NaN.
+    """
+    if not isinstance(satellites, SatrecArray):
+        satellites = SatrecArray(list(satellites))
+
+    jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+    fr = np.zeros_like(jd) if fr is None else np.atleast_1d(np.asarray(fr, dtype=np.float64))
+
+    errors, positions, velocities = satellites.sgp4(jd, fr)
+
+    failed = errors != 0
+    if failed.any():
+        positions[failed] = np.nan
+        velocities[failed] = np.nan
+
+    return positions, velocities
 
 
 def sgp4_propagate(tle_line1: str, tle_line2: str, time_delta_hours: float) -> Tuple[np.ndarray, np.ndarray]:
@@ -20,20 +177,255 @@ def sgp4_propagate(tle_line1: str, tle_line2: str, time_delta_hours: float) -> T
     Returns:
         (position_km, velocity_km_s) in ECI coordinates
     """
-    # Production implementation would use Skyfield or sgp4 library
-    # from skyfield.api import load, EarthSatellite
-    # ts = load.timescale()
-    # satellite = EarthSatellite(tle_line1, tle_line2)
-    # time = ts.now() + timedelta(hours=time_delta_hours)
-    # geocentric = satellite.at(time)
-    # position = geocentric.position.km
-    # velocity = geocentric.velocity.km_per_s
+    satellite = parse_tle(tle_line1, tle_line2)
+    jd, fr = julian_dates(datetime.now(timezone.utc) + timedelta(hours=time_delta_hours))
+    positions, velocities = propagate_batch([satellite], jd, fr)
+
+    return positions[0, 0], velocities[0, 0]
+
+
+def state_to_elements(positions: np.ndarray, velocities: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Convert Cartesian states to osculating Keplerian elements (vectorized)
+
+    Args:
+        positions: (..., 3) positions in km
+        velocities: (..., 3) velocities in km/s
+
+    Returns:
+        Dict of arrays: semi_major_axis_km, eccentricity, inclination, raan,
+        arg_perigee, true_anomaly, mean_anomaly (radians) and mean_motion (rad/s).
+        For equatorial orbits the node is taken along the x axis.
+    """
+    r = np.linalg.norm(positions, axis=-1)
+    v_sq = np.einsum('...i,...i->...', velocities, velocities)
+    rv = np.einsum('...i,...i->...', positions, velocities)
+
+    h = np.cross(positions, velocities)
+    h_norm = np.linalg.norm(h, axis=-1)
+    inclination = np.arccos(np.clip(h[..., 2] / h_norm, -1.0, 1.0))
+
+    node_norm = np.hypot(h[..., 0], h[..., 1])
+    equatorial = node_norm < 1e-10 * h_norm
+    raan = np.where(equatorial, 0.0, np.arctan2(h[..., 0], -h[..., 1]))
+    node = np.stack([np.cos(raan), np.sin(raan), np.zeros_like(raan)], axis=-1)
+    # In-plane unit vector 90 degrees ahead of the node
+    normal = h / h_norm[..., None]
+    ahead = np.cross(normal, node)
+
+    e_vec = ((v_sq - MU_EARTH / r)[..., None] * positions - rv[..., None] * velocities) / MU_EARTH
+    eccentricity = np.linalg.norm(e_vec, axis=-1)
+    semi_major_axis = 1.0 / (2.0 / r - v_sq / MU_EARTH)
+
+    arg_latitude = np.arctan2(np.einsum('...i,...i->...', positions, ahead),
+                              np.einsum('...i,...i->...', positions, node))
+    arg_perigee = np.arctan2(np.einsum('...i,...i->...', e_vec, ahead),
+                             np.einsum('...i,...i->...', e_vec, node))
+    true_anomaly = np.mod(arg_latitude - arg_perigee, 2 * np.pi)
+
+    eccentric_anomaly = 2 * np.arctan2(np.sqrt(1 - eccentricity) * np.sin(true_anomaly / 2),
+                                       np.sqrt(1 + eccentricity) * np.cos(true_anomaly / 2))
+    mean_anomaly = np.mod(eccentric_anomaly - eccentricity * np.sin(eccentric_anomaly), 2 * np.pi)
+
+    return {
+        'semi_major_axis_km': semi_major_axis,
+        'eccentricity': eccentricity,
+        'inclination': inclination,
+        'raan': np.mod(raan, 2 * np.pi),
+        'arg_perigee': np.mod(arg_perigee, 2 * np.pi),
+        'true_anomaly': true_anomaly,
+        'mean_anomaly': mean_anomaly,
+        'mean_motion': np.sqrt(MU_EARTH / np.abs(semi_major_axis)**3),
+    }
+
+
+def rtn_basis(positions: np.ndarray, velocities: np.ndarray) -> np.ndarray:
+    """
+    Radial / along-track / cross-track unit vectors
+
+    Returns:
+        (..., 3, 3) with rows R, T, N in the frame of the input states
+    """
+    radial = positions / np.linalg.norm(positions, axis=-1, keepdims=True)
+    normal = np.cross(positions, velocities)
+    normal /= np.linalg.norm(normal, axis=-1, keepdims=True)
+    along = np.cross(normal, radial)
+    return np.stack([radial, along, normal], axis=-2)
+
+
+def j2_secular_rates(semi_major_axis_km: np.ndarray, eccentricity: np.ndarray,
+                     inclination: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Secular J2 drift of the node and argument of perigee
+
+    Returns:
+        (raan_rate, arg_perigee_rate) in rad/s
+    """
+    mean_motion = np.sqrt(MU_EARTH / semi_major_axis_km**3)
+    p = semi_major_axis_km * (1 - eccentricity**2)
+    factor = 1.5 * mean_motion * J2 * (EARTH_RADIUS_KM / p)**2
+    cos_i = np.cos(inclination)
+    return -factor * cos_i, 0.5 * factor * (5 * cos_i**2 - 1)
+
+
+def _stumpff(psi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Stumpff functions c2(psi), c3(psi) with a series near zero"""
+    small = np.abs(psi) < 1e-6
+    safe = np.where(small, 1.0, psi)
+    root = np.sqrt(np.abs(safe))
+    # Both branches are evaluated; the unused hyperbolic one may overflow
+    with np.errstate(over='ignore', invalid='ignore'):
+        c2 = np.where(safe > 0, (1 - np.cos(root)) / safe, (1 - np.cosh(root)) / safe)
+        c3 = np.where(safe > 0, (root - np.sin(root)) / root**3, (np.sinh(root) - root) / root**3)
+    c2 = np.where(small, 0.5 - psi / 24, c2)
+    c3 = np.where(small, 1 / 6 - psi / 120, c3)
+    return c2, c3
+
+
+def kepler_propagate(positions: np.ndarray, velocities: np.ndarray, dt: np.ndarray,
+                     iterations: int = 12) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Two-body propagation of many states at once (universal variables)
+
+    Args:
+        positions, velocities: (..., 3) initial states in km and km/s
+        dt: Propagation times in seconds, broadcastable against positions[..., 0]
+        iterations: Maximum Newton iterations on the universal anomaly
+
+    Returns:
+        (positions, velocities) after dt, broadcast shape (..., 3)
+    """
+    r0_vec, v0_vec = np.asarray(positions, dtype=np.float64), np.asarray(velocities, dtype=np.float64)
+    dt = np.asarray(dt, dtype=np.float64)
+    r0 = np.linalg.norm(r0_vec, axis=-1)
+    rv = np.einsum('...i,...i->...', r0_vec, v0_vec) / np.sqrt(MU_EARTH)
+    alpha = 2 / r0 - np.einsum('...i,...i->...', v0_vec, v0_vec) / MU_EARTH
+    sqrt_mu = np.sqrt(MU_EARTH)
+
+    chi = sqrt_mu * dt * alpha
+    for _ in range(iterations):
+        psi = chi**2 * alpha
+        c2, c3 = _stumpff(psi)
+        r = chi**2 * c2 + rv * chi * (1 - psi * c3) + r0 * (1 - psi * c2)
+        step = (sqrt_mu * dt - chi**3 * c3 - rv * chi**2 * c2 - r0 * chi * (1 - psi * c3)) / r
+        chi = chi + step
+        if np.all(np.abs(step) <= 1e-12 * np.maximum(np.abs(chi), 1.0)):
+            break
 
-    # Placeholder
-    position = np.array([3456.7, 4521.3, 2345.8])
-    velocity = np.array([-3.2, 6.1, 2.8])
+    psi = chi**2 * alpha
+    c2, c3 = _stumpff(psi)
+    r = chi**2 * c2 + rv * chi * (1 - psi * c3) + r0 * (1 - psi * c2)
+    f = 1 - chi**2 * c2 / r0
+    g = dt - chi**3 * c3 / sqrt_mu
+    f_dot = sqrt_mu / (r * r0) * chi * (psi * c3 - 1)
+    g_dot = 1 - chi**2 * c2 / r
+    return (f[..., None] * r0_vec + g[..., None] * v0_vec,
+            f_dot[..., None] * r0_vec + g_dot[..., None] * v0_vec)
 
-    return position, velocity
+
+def atmospheric_density(altitude_km: np.ndarray) -> np.ndarray:
+    """Exponential-atmosphere density in kg/m^3 (altitudes below the table use its first band)"""
+    altitude_km = np.asarray(altitude_km, dtype=np.float64)
+    band = np.clip(np.searchsorted(ATMOSPHERE_TABLE[:, 0], altitude_km, side='right') - 1,
+                   0, len(ATMOSPHERE_TABLE) - 1)
+    base, density, scale = ATMOSPHERE_TABLE[band].T
+    return density * np.exp(-(altitude_km - base) / scale)
+
+
+def perturbed_acceleration(positions: np.ndarray, velocities: np.ndarray,
+                           ballistic_coefficients: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Two-body + J2-J4 zonal gravity + exponential-atmosphere drag
+
+    Args:
+        positions, velocities: (N, 3) TEME states in km and km/s
+        ballistic_coefficients: (N,) Cd*A/m in m^2/kg (None disables drag)
+
+    Returns:
+        (N, 3) accelerations in km/s^2
+    """
+    x, y, z = positions[:, 0], positions[:, 1], positions[:, 2]
+    r2 = np.einsum('ij,ij->i', positions, positions)
+    r = np.sqrt(r2)
+    u2 = z**2 / r2
+    mu_r3 = MU_EARTH / (r2 * r)
+
+    # Zonal terms J2-J4 written as corrections to the point-mass term -mu r / r^3
+    u = z / r
+    k2 = 1.5 * J2 * (EARTH_RADIUS_KM / r)**2
+    k3 = 2.5 * J3 * (EARTH_RADIUS_KM / r)**3
+    k4 = 1.875 * J4 * (EARTH_RADIUS_KM / r)**4
+    xy = 1 + k2 * (1 - 5 * u2) + k3 * u * (3 - 7 * u2) - k4 * (1 - 14 * u2 + 21 * u2**2)
+    zz = 1 + k2 * (3 - 5 * u2) - k4 * (5 - 70 / 3 * u2 + 21 * u2**2)
+    acceleration = -mu_r3[:, None] * np.column_stack([x * xy, y * xy, z * zz])
+    acceleration[:, 2] -= mu_r3 * k3 * r * (6 * u2 - 7 * u2**2 - 0.6)
+
+    if ballistic_coefficients is not None:
+        relative = velocities - EARTH_ROTATION_RAD_S * np.column_stack([-y, x, np.zeros_like(x)])
+        speed = np.linalg.norm(relative, axis=1)
+        density = atmospheric_density(r - EARTH_RADIUS_KM)
+        # 0.5 rho B v^2 with rho in kg/m^3, B in m^2/kg and v in km/s gives 1e3 km/s^2 per unit
+        drag = 500.0 * ballistic_coefficients * density * speed
+        acceleration -= drag[:, None] * relative
+    return acceleration
+
+
+def propagate_numerical(positions: np.ndarray, velocities: np.ndarray, times: np.ndarray,
+                        ballistic_coefficients: Optional[np.ndarray] = None,
+                        rtol: float = 1e-10, atol_km: float = 1e-6,
+                        initial_step: float = 30.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Numerically integrate many objects at once with J2-J4 gravity and drag
+
+    All N objects advance together through one Dormand-Prince 5(4) step per
+    iteration; the step size is shared and set by the worst object's error
+    estimate, so each step is a handful of (N, 3) array operations rather
+    than N separate integrations. Steps are shortened to land exactly on
+    the requested output times.
+
+    Args:
+        positions, velocities: (N, 3) TEME states in km and km/s at t = 0
+        times: (M,) output times in seconds, monotonic (negative integrates backwards)
+        ballistic_coefficients: (N,) Cd*A/m in m^2/kg (None disables drag)
+        rtol: Relative error tolerance per step
+        atol_km: Absolute position tolerance (velocity tolerance scales by 1e-3 / s)
+        initial_step: First trial step in seconds
+
+    Returns:
+        (positions, velocities) of shape (N, M, 3)
+    """
+    state = np.concatenate([np.asarray(positions, dtype=np.float64),
+                            np.asarray(velocities, dtype=np.float64)], axis=1)
+    times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+    atol = np.array([atol_km] * 3 + [atol_km * 1e-3] * 3)
+    direction = 1.0 if times[-1] >= 0 else -1.0
+
+    def derivative(y):
+        return np.concatenate([y[:, 3:], perturbed_acceleration(y[:, :3], y[:, 3:],
+                                                                ballistic_coefficients)], axis=1)
+
+    output = np.empty((len(state), len(times), 6))
+    t, h = 0.0, initial_step
+    k1 = derivative(state)
+    for m, target in enumerate(times):
+        while direction * (target - t) > 1e-9:
+            step = direction * min(h, direction * (target - t))
+            stages = [k1]
+            for a_row in _DP_A[1:]:
+                stages.append(derivative(state + step * sum(a * k for a, k in zip(a_row, stages) if a)))
+            candidate = state + step * sum(a * k for a, k in zip(_DP_A[-1], stages) if a)
+
+            error = step * sum(e * k for e, k in zip(_DP_ERROR, stages) if e)
+            scale = atol + rtol * np.maximum(np.abs(state), np.abs(candidate))
+            norm = np.sqrt(np.mean((error / scale)**2, axis=1))
+            norm = norm[np.isfinite(norm)].max(initial=0.0)   # failed (NaN) objects do not steer the step
+
+            if norm <= 1.0:
+                t += step
+                state, k1 = candidate, stages[-1]   # first-same-as-last
+            h = abs(step) * min(5.0, max(0.2, 0.9 * max(norm, 1e-10)**-0.2))
+        output[:, m] = state
+    return output[..., :3], output[..., 3:]
 
 
 def calculate_orbital_period(semi_major_axis_km: float) -> float:
@@ -46,8 +438,7 @@ def calculate_orbital_period(semi_major_axis_km: float) -> float:
     Returns:
         Orbital period in minutes
     """
-    mu_earth = 398600.4418  # km^3/s^2
-    period_seconds = 2 * np.pi * np.sqrt(semi_major_axis_km**3 / mu_earth)
+    period_seconds = 2 * np.pi * np.sqrt(semi_major_axis_km**3 / MU_EARTH)
     period_minutes = period_seconds / 60
     return period_minutes
 
@@ -58,6 +449,10 @@ def calculate_miss_distance(pos1: np.ndarray, pos2: np.ndarray,
     """
     Calculate miss distance at Time of Closest Approach (TCA)
 
+    Both objects move in straight lines for the given time, so this neither
+    finds the TCA nor follows the orbits; conjunction_screening.refine_tca
+    solves for the actual TCA of many pairs at once.
+
     Args:
         pos1, pos2: Current positions in ECI (km)
         vel1, vel2: Current velocities in ECI (km/s)
@@ -85,6 +480,9 @@ def calculate_collision_probability(miss_distance_m: float,
     """
     Calculate probability of collision
 
+    Scalar convenience wrapper around collision_probability.pc_foster for
+    an isotropic position uncertainty.
+
     Args:
         miss_distance_m: Miss distance in meters
         position_uncertainty_m: Position uncertainty (1-sigma) in meters
@@ -93,14 +491,6 @@ def calculate_collision_probability(miss_distance_m: float,
     Returns:
         Probability of collision (0 to 1)
     """
-    # Simplified Pc calculation
-    # Production: Use more sophisticated models (e.g., Foster 1992)
-
-    if miss_distance_m > combined_radius_m + 3 * position_uncertainty_m:
-        return 0.0
-
-    # Gaussian approximation
-    sigma = position_uncertainty_m
-    pc = 1.0 / (2 * np.pi * sigma**2) * np.exp(-(miss_distance_m**2) / (2 * sigma**2))
-
-    return min(pc, 1.0)
+    covariance = np.eye(2) * position_uncertainty_m**2
+    pc = pc_foster(np.array([[miss_distance_m, 0.0]]), covariance[None], combined_radius_m)
+    return float(pc[0])
@@ -0,0 +1,362 @@
+"""
+Telemetry Aggregation
+Streaming tumbling and sliding window statistics per satellite and channel (Welford moments + histogram sketches)
+"""
+
+import logging
+import numpy as np
+from typing import Dict, Hashable, Optional, Sequence, Tuple, Union
+
+from tools.telemetry_store import SatelliteRows, TELEMETRY_CHANNELS, INITIAL_SATELLITES, grown
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_SECONDS = 60.0
+DEFAULT_PANES = 12              # sliding window resolution: window / panes
+SKETCH_BINS = 128
+# Sketch range per channel; values outside land in the edge bins (min / max stay exact)
+CHANNEL_RANGES = {
+    'battery_temp_c': (-40.0, 80.0),
+    'power_w': (0.0, 1000.0),
+    'attitude_deg': (0.0, 1.0),
+    'altitude_km': (150.0, 2000.0),
+    'velocity_km_s': (6.0, 9.0),
+}
+DEFAULT_PERCENTILES = (50.0, 95.0, 99.0)
+
+
+class _Moments:
+    """Count, Welford mean/M2, min, max and a fixed-bin histogram over a leading shape"""
+
+    def __init__(self, shape: Tuple[int, ...], n_channels: int, bins: int):
+        self.count = np.zeros(shape + (n_channels,), dtype=np.int64)
+        self.mean = np.zeros(shape + (n_channels,))
+        self.m2 = np.zeros(shape + (n_channels,))
+        self.minimum = np.full(shape + (n_channels,), np.inf)
+        self.maximum = np.full(shape + (n_channels,), -np.inf)
+        self.histogram = np.zeros(shape + (n_channels, bins), dtype=np.uint32)
+
+    def arrays(self):
+        return ('count', 0), ('mean', 0.0), ('m2', 0.0), ('minimum', np.inf), ('maximum', -np.inf), \
+            ('histogram', 0)
+
+    def grow(self, rows: int, axis: int):
+        for name, fill in self.arrays():
+            array = getattr(self, name)
+            if axis:
+                array = np.moveaxis(grown(np.moveaxis(array, axis, 0), rows, fill), 0, axis)
+            else:
+                array = grown(array, rows, fill)
+            setattr(self, name, np.ascontiguousarray(array))
+
+    def reset(self, index):
+        for name, fill in self.arrays():
+            getattr(self, name)[index] = fill
+
+    def merge(self, index, count, mean, m2, minimum, maximum):
+        """Chan et al. parallel combination of group moments into the entries at index"""
+        n_a, mean_a = self.count[index], self.mean[index]
+        n = n_a + count
+        safe = np.maximum(n, 1)
+        delta = mean - mean_a
+        self.mean[index] = np.where(n > 0, mean_a + delta * count / safe, 0.0)
+        self.m2[index] = self.m2[index] + m2 + delta**2 * n_a * count / safe
+        self.count[index] = n
+        self.minimum[index] = np.minimum(self.minimum[index], minimum)
+        self.maximum[index] = np.maximum(self.maximum[index], maximum)
+
+    def add_to_histograms(self, index, bins: np.ndarray, valid: np.ndarray):
+        """Count (K, C) sample bins into the histograms at per-sample index"""
+        sample, channel = np.nonzero(valid)
+        flat = np.ravel_multi_index(tuple(i[sample] for i in index) + (channel, bins[sample, channel]),
+                                    self.histogram.shape)
+        cells, counts = np.unique(flat, return_counts=True)
+        self.histogram.reshape(-1)[cells] += counts.astype(self.histogram.dtype)
+
+
+def _group_moments(groups: np.ndarray, n_groups: int, values: np.ndarray):
+    """
+    Moments of (K, C) values per group (NaNs ignored), two-pass within the batch
+
+    Returns:
+        count, mean, m2, minimum, maximum, each (G, C)
+    """
+    n_channels = values.shape[1]
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+    flat = (groups[:, None] * n_channels + np.arange(n_channels)).ravel()
+    size = n_groups * n_channels
+
+    count = np.bincount(flat, valid.ravel(), size).reshape(n_groups, n_channels)
+    mean = np.bincount(flat, x.ravel(), size).reshape(n_groups, n_channels) / np.maximum(count, 1)
+    deviation = np.where(valid, x - mean[groups], 0.0)
+    m2 = np.bincount(flat, (deviation**2).ravel(), size).reshape(n_groups, n_channels)
+
+    minimum = np.full((n_groups, n_channels), np.inf)
+    maximum = np.full((n_groups, n_channels), -np.inf)
+    np.minimum.at(minimum, groups, np.where(valid, values, np.inf))
+    np.maximum.at(maximum, groups, np.where(valid, values, -np.inf))
+    return count.astype(np.int64), mean, m2, minimum, maximum
+
+
+def _statistics(count: np.ndarray, mean: np.ndarray, m2: np.ndarray, minimum: np.ndarray,
+                maximum: np.ndarray, histogram: np.ndarray, lows: np.ndarray, widths: np.ndarray,
+                percentiles: Sequence[float]) -> Dict[str, np.ndarray]:
+    empty = count == 0
+    variance = np.where(count > 1, m2 / np.maximum(count - 1, 1), np.nan)
+    stats = {
+        'count': count,
+        'mean': np.where(empty, np.nan, mean),
+        'variance': variance,
+        'std': np.sqrt(variance),
+        'min': np.where(empty, np.nan, minimum),
+        'max': np.where(empty, np.nan, maximum),
+    }
+
+    cumulative = np.cumsum(histogram, axis=-1)
+    for q in percentiles:
+        target = q / 100.0 * count
+        k = np.minimum(np.sum(cumulative < target[..., None], axis=-1), histogram.shape[-1] - 1)
+        below = np.where(k > 0, np.take_along_axis(cumulative, np.maximum(k - 1, 0)[..., None], -1)[..., 0], 0)
+        in_bin = np.take_along_axis(histogram, k[..., None], -1)[..., 0]
+        fraction = np.clip((target - below) / np.maximum(in_bin, 1), 0.0, 1.0)
+        value = np.clip(lows + (k + fraction) * widths, minimum, maximum)
+        stats[f'p{q:g}'] = np.where(empty, np.nan, value)
+    return stats
+
+
+class WindowAggregator:
+    """
+    Incremental window statistics for every satellite x channel
+    - Sliding window: ring of panes (window / panes seconds each) plus running
+      window totals updated as panes rotate in and out, so queries read stored state
+    - Tumbling window: the current bucket and the last completed one
+    - Mean / variance by Welford-Chan merges, exact min / max, percentiles
+      from fixed-range histogram sketches (error below one bin width)
+    - Updates are O(1) per sample; state is fixed-size per satellite
+    """
+
+    def __init__(self, window_seconds: float = DEFAULT_WINDOW_SECONDS, panes: int = DEFAULT_PANES,
+                 channels: Sequence[str] = TELEMETRY_CHANNELS, bins: int = SKETCH_BINS,
+                 ranges: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.window_seconds = window_seconds
+        self.panes = panes
+        self.pane_seconds = window_seconds / panes
+        self.channels = tuple(channels)
+        self.bins = bins
+        ranges = {**CHANNEL_RANGES, **(ranges or {})}
+        self.lows = np.array([ranges.get(c, (0.0, 1.0))[0] for c in self.channels])
+        self.widths = np.array([(ranges.get(c, (0.0, 1.0))[1] - ranges.get(c, (0.0, 1.0))[0]) / bins
+                                for c in self.channels])
+
+        self.satellite_rows = SatelliteRows(self._grow)
+        n_channels = len(self.channels)
+        self.sliding = _Moments((panes, INITIAL_SATELLITES), n_channels, bins)
+        self.pane_ids = np.full((panes, INITIAL_SATELLITES), -1, dtype=np.int64)
+        self.latest_pane = np.full(INITIAL_SATELLITES, -1, dtype=np.int64)
+        self.window = _Moments((INITIAL_SATELLITES,), n_channels, bins)     # panes (latest - panes, latest]
+        self.current = _Moments((INITIAL_SATELLITES,), n_channels, bins)
+        self.completed = _Moments((INITIAL_SATELLITES,), n_channels, bins)
+        self.bucket = np.full(INITIAL_SATELLITES, -1, dtype=np.int64)
+        self.completed_bucket = np.full(INITIAL_SATELLITES, -1, dtype=np.int64)
+
+    def _grow(self, rows: int):
+        self.sliding.grow(rows, axis=1)
+        self.pane_ids = np.ascontiguousarray(np.moveaxis(grown(self.pane_ids.T, rows, -1), 0, 1))
+        self.latest_pane = grown(self.latest_pane, rows, -1)
+        self.window.grow(rows, axis=0)
+        self.current.grow(rows, axis=0)
+        self.completed.grow(rows, axis=0)
+        self.bucket = grown(self.bucket, rows, -1)
+        self.completed_bucket = grown(self.completed_bucket, rows, -1)
+
+    @property
+    def satellites(self):
+        return self.satellite_rows.keys
+
+    def update(self, satellite: Hashable, timestamp: float, **values: float):
+        """Add one sample (Unix seconds)"""
+        self.update_batch([satellite], [timestamp], {name: [value] for name, value in values.items()})
+
+    def update_batch(self, satellites: Union[Sequence[Hashable], np.ndarray], timestamps: np.ndarray,
+                     columns: Dict[str, np.ndarray]):
+        """
+        Add a micro-batch of samples from any mix of satellites
+
+        Samples are reduced per (satellite, pane) inside the batch and merged
+        into the window state, so the cost is linear in the batch size.
+        Samples older than a satellite's sliding window or tumbling bucket
+        are ignored by that window.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(timestamps) == 0:
+            return
+        rows = self.satellite_rows.rows(satellites)
+        values = np.full((len(timestamps), len(self.channels)), np.nan)
+        for c, name in enumerate(self.channels):
+            if name in columns:
+                values[:, c] = columns[name]
+        bins = np.clip(((values - self.lows) / self.widths), 0, self.bins - 1)
+        bins = np.where(np.isnan(bins), 0, bins).astype(np.int64)
+
+        pane = np.floor(timestamps / self.pane_seconds).astype(np.int64)
+        self._update_sliding(rows, pane, values, bins)
+        self._update_tumbling(rows, pane // self.panes, values, bins)
+
+    def _update_sliding(self, rows, pane, values, bins):
+        # Rows whose newest pane moves forward drop the panes leaving their window
+        # from the running histogram (exact counts) before the slots are recycled
+        advancing = pane > self.latest_pane[rows]
+        advanced = np.unique(rows[advancing])
+        previous = self.latest_pane[advanced]
+        np.maximum.at(self.latest_pane, rows, pane)
+        if len(advanced):
+            ids = self.pane_ids[:, advanced]
+            leaving = (ids > previous - self.panes) & (ids <= self.latest_pane[advanced] - self.panes)
+            slot, k = np.nonzero(leaving)
+            np.subtract.at(self.window.histogram, advanced[k], self.sliding.histogram[slot, advanced[k]])
+
+        live = pane > self.latest_pane[rows] - self.panes
+        rows, pane, values, bins = rows[live], pane[live], values[live], bins[live]
+        slot = pane % self.panes
+
+        # Claim slots now holding a newer pane
+        stale = self.pane_ids[slot, rows] < pane
+        if stale.any():
+            index = (slot[stale], rows[stale])
+            self.sliding.reset(index)
+            self.pane_ids[index] = pane[stale]
+        # Samples for a pane that has already been recycled are dropped
+        current = self.pane_ids[slot, rows] == pane
+        rows, slot, values, bins = rows[current], slot[current], values[current], bins[current]
+
+        keys, groups = np.unique(slot * len(self.latest_pane) + rows, return_inverse=True)
+        self.sliding.merge((keys // len(self.latest_pane), keys % len(self.latest_pane)),
+                           *_group_moments(groups.ravel(), len(keys), values))
+        valid = ~np.isnan(values)
+        self.sliding.add_to_histograms((slot, rows), bins, valid)
+        self.window.add_to_histograms((rows,), bins, valid)
+
+        # Window moments: merge the batch where the window did not move, rebuild from
+        # the panes (min / max cannot be unmerged) where it did
+        moved = np.zeros(len(self.latest_pane), dtype=bool)
+        moved[advanced] = True
+        steady = ~moved[rows]
+        if steady.any():
+            keys, groups = np.unique(rows[steady], return_inverse=True)
+            self.window.merge(keys, *_group_moments(groups.ravel(), len(keys), values[steady]))
+        if len(advanced):
+            _, count, mean, m2, minimum, maximum = self._pane_moments(advanced, self.latest_pane[advanced])
+            self.window.count[advanced], self.window.mean[advanced], self.window.m2[advanced] = count, mean, m2
+            self.window.minimum[advanced], self.window.maximum[advanced] = minimum, maximum
+
+    def _pane_moments(self, rows: np.ndarray, end: np.ndarray):
+        """
+        Merge the panes in (end - panes, end] of each row
+
+        Returns:
+            live (P, R) mask, then count, mean, m2, minimum, maximum, each (R, C)
+        """
+        ids = self.pane_ids[:, rows]
+        live = (ids > end - self.panes) & (ids <= end)
+        count = np.where(live[..., None], self.sliding.count[:, rows], 0)
+        total = count.sum(axis=0)
+        mean = np.sum(count * self.sliding.mean[:, rows], axis=0) / np.maximum(total, 1)
+        m2 = np.sum(np.where(live[..., None], self.sliding.m2[:, rows]
+                             + count * (self.sliding.mean[:, rows] - mean)**2, 0.0), axis=0)
+        minimum = np.min(np.where(live[..., None], self.sliding.minimum[:, rows], np.inf), axis=0)
+        maximum = np.max(np.where(live[..., None], self.sliding.maximum[:, rows], -np.inf), axis=0)
+        return live, total, mean, m2, minimum, maximum
+
+    def _update_tumbling(self, rows, bucket, values, bins):
+        # Batches span at most a couple of buckets; walk them in time order
+        for b in np.unique(bucket):
+            selected = bucket == b
+            batch_rows = rows[selected]
+            rolling = np.unique(batch_rows[self.bucket[batch_rows] < b])
+            if len(rolling):
+                finished = rolling[self.bucket[rolling] >= 0]
+                for name, _ in self.current.arrays():
+                    getattr(self.completed, name)[finished] = getattr(self.current, name)[finished]
+                self.completed_bucket[finished] = self.bucket[finished]
+                self.current.reset(rolling)
+                self.bucket[rolling] = b
+
+            accepted = self.bucket[batch_rows] == b
+            batch_rows, batch_values = batch_rows[accepted], values[selected][accepted]
+            keys, groups = np.unique(batch_rows, return_inverse=True)
+            self.current.merge(keys, *_group_moments(groups.ravel(), len(keys), batch_values))
+            self.current.add_to_histograms((batch_rows,), bins[selected][accepted], ~np.isnan(batch_values))
+
+    def _rows(self, satellites: Optional[Sequence[Hashable]]) -> np.ndarray:
+        if satellites is None:
+            return np.arange(len(self.satellite_rows))
+        return self.satellite_rows.lookup(satellites)
+
+    def sliding_window(self, satellites: Optional[Sequence[Hashable]] = None, now: Optional[float] = None,
+                       percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, np.ndarray]:
+        """
+        Statistics over the last window_seconds for each satellite and channel
+
+        Args:
+            satellites: Keys to report (default all, in registration order)
+            now: Window end in Unix seconds (default each satellite's newest sample)
+            percentiles: Percentiles to estimate from the sketch
+
+        Returns:
+            (S, C) arrays count, mean, variance, std, min, max and p<q> (NaN where empty)
+        """
+        rows = self._rows(satellites)
+        safe = np.maximum(rows, 0)
+        latest = self.latest_pane[safe]
+        end = latest if now is None else np.full(len(rows), int(np.floor(now / self.pane_seconds)))
+        ids = self.pane_ids[:, safe]
+        held = ids > latest - self.panes                                              # (P, S)
+        live = (ids > end - self.panes) & (ids <= end) & (rows >= 0)
+
+        # Running totals answer rows whose window holds the same panes; the rest
+        # (a 'now' cutting through the window) are merged pane by pane
+        count = np.where(live.any(axis=0)[:, None], self.window.count[safe], 0)
+        mean, m2 = self.window.mean[safe], self.window.m2[safe]
+        minimum, maximum = self.window.minimum[safe], self.window.maximum[safe]
+        histogram = self.window.histogram[safe]
+        partial = np.flatnonzero(live.any(axis=0) & (held != live).any(axis=0))
+        if len(partial):
+            merged, count[partial], mean[partial], m2[partial], minimum[partial], maximum[partial] = \
+                self._pane_moments(safe[partial], end[partial])
+            histogram[partial] = np.sum(np.where(merged[..., None, None],
+                                                 self.sliding.histogram[:, safe[partial]], 0), axis=0)
+        return _statistics(count, mean, m2, minimum, maximum, histogram, self.lows, self.widths, percentiles)
+
+    def tumbling_window(self, satellites: Optional[Sequence[Hashable]] = None, completed: bool = True,
+                        percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, np.ndarray]:
+        """
+        Statistics of the last completed (or the in-progress) tumbling bucket
+
+        Buckets are aligned to multiples of window_seconds since the Unix epoch.
+
+        Returns:
+            As sliding_window, plus 'start' (S,) bucket start in Unix seconds
+        """
+        rows = self._rows(satellites)
+        safe = np.maximum(rows, 0)
+        moments = self.completed if completed else self.current
+        bucket = (self.completed_bucket if completed else self.bucket)[safe]
+        known = (rows >= 0) & (bucket >= 0)
+        count = np.where(known[:, None], moments.count[safe], 0)
+        stats = _statistics(count, moments.mean[safe], moments.m2[safe], moments.minimum[safe],
+                            moments.maximum[safe], moments.histogram[safe], self.lows, self.widths,
+                            percentiles)
+        stats['start'] = np.where(known, bucket * self.window_seconds, np.nan)
+        return stats
+
+
+_shared_aggregator = None
+
+
+def get_telemetry_aggregator() -> WindowAggregator:
+    """Shared process-wide aggregator fed alongside the telemetry store"""
+    global _shared_aggregator
+    if _shared_aggregator is None:
+        _shared_aggregator = WindowAggregator()
+    return _shared_aggregator
@@ -0,0 +1,507 @@
+"""
+Telemetry Archive
+Persistent per-satellite, day-partitioned columnar chunks (delta-of-delta time, XOR floats) with a sparse chunk index
+and precomputed rollups
+"""
+
+import os
+import re
+import json
+import mmap
+import zlib
+import asyncio
+import logging
+import numpy as np
+from datetime import datetime, timezone
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+from tools.telemetry_store import SatelliteRows, TELEMETRY_CHANNELS
+from tools.telemetry_rollups import (DEFAULT_MAX_POINTS, rollup, rollup_dtype, merge_rollups, lttb_indices,
+                                     series_level)
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_ARCHIVE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'telemetry_archive')
+ARCHIVE_FORMAT = 1
+TICKS_PER_SECOND = 65536            # CCSDS fine time resolution; timestamps are stored as integer ticks
+CHUNK_SECONDS = 3600.0              # chunks cover aligned windows of this length (divides a day)
+FLUSH_DELAY_SECONDS = 10.0          # a window is written once samples this far past its end arrive
+COMPRESSION_LEVEL = 6
+STORED_ROLLUP_SECONDS = (60.0, 3600.0)  # 1 s rollups of <= 1 Hz telemetry are the raw samples; derived on demand
+DAY_SECONDS = 86400
+CHUNK_MAGIC = b'TLC1'
+# One sparse index record per chunk, appended to <day>.idx after the chunk reaches <day>.tlm
+INDEX_DTYPE = np.dtype([('start', '<f8'), ('end', '<f8'), ('offset', '<u8'), ('length', '<u4'),
+                        ('count', '<u4')])
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    return (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+
+
+def _pack_integers(values: np.ndarray, level: int) -> bytes:
+    """Zigzag, narrowest of 1/2/4/8 bytes, then zlib"""
+    unsigned = _zigzag(values.astype(np.int64))
+    top = int(unsigned.max()) if len(unsigned) else 0
+    width = next(w for w in (1, 2, 4, 8) if top < 1 << (8 * w))
+    return bytes([width]) + zlib.compress(unsigned.astype(f'<u{width}').tobytes(), level)
+
+
+def _unpack_integers(blob: Union[bytes, memoryview]) -> np.ndarray:
+    width = blob[0]
+    return _unzigzag(np.frombuffer(zlib.decompress(blob[1:]), dtype=f'<u{width}').astype(np.uint64))
+
+
+def encode_timestamps(timestamps: np.ndarray, level: int = COMPRESSION_LEVEL) -> bytes:
+    """
+    Delta-of-delta encoding of Unix-second timestamps at 1/65536 s resolution
+
+    Regular sampling makes the second differences zero, which zlib reduces to
+    almost nothing; jitter costs one or two bytes per sample.
+    """
+    ticks = np.round(np.asarray(timestamps, dtype=np.float64) * TICKS_PER_SECOND).astype(np.int64)
+    head = np.array([ticks[0], ticks[1] - ticks[0] if len(ticks) > 1 else 0], dtype='<i8')
+    return head.tobytes() + _pack_integers(np.diff(ticks, 2), level)
+
+
+def decode_timestamps(blob: Union[bytes, memoryview], count: int) -> np.ndarray:
+    """Inverse of encode_timestamps (exact on the tick grid)"""
+    first, delta = np.frombuffer(blob[:16], dtype='<i8')
+    deltas = np.cumsum(np.concatenate([[delta], _unpack_integers(blob[16:])]))
+    ticks = first + np.concatenate([[0], np.cumsum(deltas)])[:count]
+    return ticks / TICKS_PER_SECOND
+
+
+def encode_floats(values: np.ndarray, level: int = COMPRESSION_LEVEL) -> bytes:
+    """
+    XOR of consecutive float32 bit patterns (Gorilla), byte planes shuffled, then zlib
+
+    Slowly varying values share sign, exponent and high mantissa bits, so the
+    XOR leaves mostly zero high-order byte planes. Lossless, NaN included.
+    """
+    bits = np.ascontiguousarray(values, dtype='<f4').view('<u4')
+    xor = bits ^ np.concatenate([np.zeros(min(len(bits), 1), dtype='<u4'), bits[:-1]])
+    return zlib.compress(xor.view(np.uint8).reshape(-1, 4).T.tobytes(), level)
+
+
+def decode_floats(blob: Union[bytes, memoryview], count: int) -> np.ndarray:
+    planes = np.frombuffer(zlib.decompress(blob), dtype=np.uint8).reshape(4, count)
+    xor = np.ascontiguousarray(planes.T).view('<u4').ravel()
+    return np.bitwise_xor.accumulate(xor).view('<f4').astype(np.float32)
+
+
+def _directory_name(satellite: Hashable) -> str:
+    return re.sub(r'[^A-Za-z0-9._-]', '_', str(satellite))
+
+
+def _day_name(day: int) -> str:
+    return datetime.fromtimestamp(day * DAY_SECONDS, timezone.utc).strftime('%Y%m%d')
+
+
+class TelemetryArchive:
+    """
+    On-disk telemetry history
+    - <root>/<satellite>/<YYYYMMDD>.tlm: append-only compressed chunks, one
+      column blob per channel, covering aligned chunk_seconds windows
+    - <root>/<satellite>/<YYYYMMDD>.idx: sparse index, one INDEX_DTYPE
+      record (time span, byte range) per chunk
+    - <root>/<satellite>/<YYYYMMDD>.r<seconds>: rollup_dtype records of
+      each chunk's buckets, appended with the chunk
+    - Samples are buffered per window and written once the window has
+      closed; queries include buffered samples
+    - Range queries pick days by file name and chunks by index, memory-map
+      the chunk file and decode only the requested channels
+    """
+
+    def __init__(self, root: str = TELEMETRY_ARCHIVE_PATH, channels: Sequence[str] = TELEMETRY_CHANNELS,
+                 chunk_seconds: float = CHUNK_SECONDS, flush_delay_seconds: float = FLUSH_DELAY_SECONDS,
+                 compression_level: int = COMPRESSION_LEVEL,
+                 rollup_seconds: Sequence[float] = STORED_ROLLUP_SECONDS):
+        if DAY_SECONDS % chunk_seconds:
+            raise ValueError(f"chunk_seconds must divide a day, got {chunk_seconds}")
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+        metadata_path = os.path.join(self.root, 'archive.json')
+        if os.path.exists(metadata_path):
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            if metadata['format'] != ARCHIVE_FORMAT or metadata['ticks_per_second'] != TICKS_PER_SECOND:
+                raise ValueError(f"Unsupported telemetry archive format in {self.root}")
+            channels, rollup_seconds = metadata['channels'], metadata.get('rollup_seconds', ())
+        else:
+            with open(metadata_path, 'w') as f:
+                json.dump({'format': ARCHIVE_FORMAT, 'ticks_per_second': TICKS_PER_SECOND,
+                           'channels': list(channels), 'rollup_seconds': list(rollup_seconds)}, f)
+        self.channels = tuple(channels)
+        self.rollup_seconds = tuple(rollup_seconds)
+        self.chunk_seconds = chunk_seconds
+        self.flush_delay_seconds = flush_delay_seconds
+        self.compression_level = compression_level
+
+        self.satellite_rows = SatelliteRows(lambda rows: None)
+        self._pending = []              # (rows, timestamps, columns) per appended batch
+        self._flushed_until = -np.inf   # windows ending at or before this are on disk
+        self._newest = -np.inf
+        self._maps = {}                 # path -> (size, mmap)
+
+    def close(self):
+        self.flush()
+        for _, mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+
+    def __enter__(self) -> 'TelemetryArchive':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, satellite: Hashable, timestamp: float, **values: float):
+        """Archive one sample (Unix seconds)"""
+        self.append_batch([satellite], [timestamp], {name: [value] for name, value in values.items()})
+
+    def append_batch(self, satellites: Union[Sequence[Hashable], np.ndarray], timestamps: np.ndarray,
+                     columns: Dict[str, np.ndarray]):
+        """
+        Archive a micro-batch from any mix of satellites; channels not given are stored as NaN
+
+        Windows that have closed are compressed and written before returning.
+        """
+        pending = self._buffer(satellites, timestamps, columns)
+        if pending is not None:
+            self._write(pending)
+
+    async def record(self, batches: asyncio.Queue):
+        """
+        Archive batches from a TelemetryIngestServer subscription until cancelled
+
+        Closed windows are handed to a writer task that compresses and writes
+        them in a worker thread, so the subscription keeps being read while
+        an hour of a large constellation goes to disk (seconds). On
+        cancellation the batches still queued are archived and everything is
+        flushed before returning.
+        """
+        closed = asyncio.Queue()
+        writer = asyncio.create_task(self._write_closed(closed))
+
+        def archive(batch: Dict):
+            pending = self._buffer(batch['satellites'], batch['timestamps'], batch['columns'])
+            if pending is not None:
+                closed.put_nowait(pending)
+
+        try:
+            while True:
+                batch = await batches.get()
+                if writer.done():
+                    writer.result()
+                archive(batch)
+        finally:
+            while not batches.empty():
+                archive(batches.get_nowait())
+            closed.put_nowait(None)
+            await writer
+            self.flush()
+
+    async def _write_closed(self, closed: asyncio.Queue):
+        """Write closed windows in order until None arrives"""
+        while True:
+            pending = await closed.get()
+            if pending is None:
+                return
+            await asyncio.to_thread(self._write, pending)
+
+    def _buffer(self, satellites, timestamps, columns) -> Optional[Tuple]:
+        """Queue a batch; returns the samples of newly closed windows, if any"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(timestamps) == 0:
+            return None
+        rows = self.satellite_rows.rows(satellites)
+        values = {name: (np.asarray(columns[name], dtype=np.float32) if name in columns
+                         else np.full(len(timestamps), np.nan, dtype=np.float32)) for name in self.channels}
+        self._pending.append((rows, timestamps, values))
+        self._newest = max(self._newest, float(timestamps.max()))
+
+        closed = np.floor((self._newest - self.flush_delay_seconds) / self.chunk_seconds) * self.chunk_seconds
+        if closed <= self._flushed_until:
+            return None
+        self._flushed_until = closed
+        return self._take(lambda t: t < closed)
+
+    def _compact(self):
+        """Merge the buffered batches into one"""
+        if len(self._pending) > 1:
+            rows = np.concatenate([p[0] for p in self._pending])
+            timestamps = np.concatenate([p[1] for p in self._pending])
+            values = {name: np.concatenate([p[2][name] for p in self._pending]) for name in self.channels}
+            self._pending = [(rows, timestamps, values)]
+
+    def _take(self, selector) -> Optional[Tuple]:
+        """Remove the buffered samples selected by selector(timestamps) and return them"""
+        if not self._pending:
+            return None
+        self._compact()
+        rows, timestamps, values = self._pending[0]
+        taken = selector(timestamps)
+        kept = ~taken
+        self._pending = [(rows[kept], timestamps[kept], {n: v[kept] for n, v in values.items()})] \
+            if kept.any() else []
+        if not taken.any():
+            return None
+        return rows[taken], timestamps[taken], {n: v[taken] for n, v in values.items()}
+
+    def flush(self):
+        """Write every buffered sample (open windows become chunks of their own)"""
+        pending = self._take(lambda t: np.ones(len(t), dtype=bool))
+        if pending is not None:
+            self._write(pending)
+
+    def _write(self, pending: Tuple):
+        rows, timestamps, values = pending
+        day = np.floor(timestamps / DAY_SECONDS).astype(np.int64)
+        order = np.lexsort((timestamps, day, rows))
+        rows, day, timestamps = rows[order], day[order], timestamps[order]
+        values = {name: column[order] for name, column in values.items()}
+        bounds = np.flatnonzero(np.r_[True, (rows[1:] != rows[:-1]) | (day[1:] != day[:-1]), True])
+        for first, last in zip(bounds[:-1], bounds[1:]):
+            satellite = self.satellite_rows.keys[rows[first]]
+            self._write_chunk(satellite, int(day[first]), timestamps[first:last],
+                              {name: column[first:last] for name, column in values.items()})
+
+    def _write_chunk(self, satellite: Hashable, day: int, timestamps: np.ndarray, values: Dict[str, np.ndarray]):
+        blobs = [encode_timestamps(timestamps, self.compression_level)]
+        blobs += [encode_floats(values[name], self.compression_level) for name in self.channels]
+        header = np.array([len(timestamps), len(blobs)] + [len(b) for b in blobs], dtype='<u4')
+        chunk = CHUNK_MAGIC + header.tobytes() + b''.join(blobs)
+
+        directory = os.path.join(self.root, _directory_name(satellite))
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, _day_name(day))
+        with open(base + '.tlm', 'ab') as f:
+            offset = f.tell()
+            f.write(chunk)
+        matrix = np.stack([values[name] for name in self.channels], axis=1)
+        for seconds in self.rollup_seconds:
+            with open(f'{base}.r{seconds:g}', 'ab') as f:
+                f.write(rollup(timestamps, matrix, seconds).tobytes())
+        record = np.array([(timestamps[0], timestamps[-1], offset, len(chunk), len(timestamps))], dtype=INDEX_DTYPE)
+        with open(base + '.idx', 'ab') as f:
+            f.write(record.tobytes())
+
+    def _mapped(self, path: str) -> mmap.mmap:
+        """Read-only map of a chunk file, remapped when it has grown"""
+        size = os.path.getsize(path)
+        cached = self._maps.get(path)
+        if cached is None or cached[0] != size:
+            if cached is not None:
+                cached[1].close()
+            with open(path, 'rb') as f:
+                cached = (size, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            self._maps[path] = cached
+        return cached[1]
+
+    @property
+    def satellites(self) -> List[str]:
+        """Satellites with archived or buffered samples (directory names)"""
+        names = {name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name))}
+        return sorted(names | {_directory_name(key) for key in self.satellite_rows.keys})
+
+    def days(self, satellite: Hashable) -> List[str]:
+        """Partitions (YYYYMMDD) holding chunks of a satellite"""
+        directory = os.path.join(self.root, _directory_name(satellite))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(directory) if name.endswith('.idx'))
+
+    def index(self, satellite: Hashable, day: str) -> np.ndarray:
+        """Chunk index records of one partition"""
+        return np.fromfile(os.path.join(self.root, _directory_name(satellite), day + '.idx'), dtype=INDEX_DTYPE)
+
+    def _days_between(self, satellite: Hashable, low: float, high: float) -> List[str]:
+        first_day = _day_name(int(np.floor(low / DAY_SECONDS))) if np.isfinite(low) else ''
+        last_day = _day_name(int(np.floor(high / DAY_SECONDS))) if np.isfinite(high) else '99999999'
+        return [day for day in self.days(satellite) if first_day <= day <= last_day]
+
+    def _buffered(self, satellite: Hashable) -> Optional[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+        """Buffered (timestamps, columns) of a satellite, if any"""
+        row = self.satellite_rows.index.get(satellite)
+        if row is None or not self._pending:
+            return None
+        self._compact()
+        rows, timestamps, values = self._pending[0]
+        mine = rows == row
+        if not mine.any():
+            return None
+        return timestamps[mine], {name: column[mine] for name, column in values.items()}
+
+    def query(self, satellite: Hashable, channels: Optional[Union[str, Sequence[str]]] = None,
+              start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Archived samples of one satellite in a time range, oldest first
+
+        Args:
+            satellite: Satellite key
+            channels: Channel name(s) to decode (default all)
+            start, end: Unix-second bounds (inclusive); default unbounded
+
+        Returns:
+            'timestamp' and one float32 array per channel
+        """
+        channels = self.channels if channels is None else [channels] if isinstance(channels, str) else channels
+        columns = [self.channels.index(name) + 1 for name in channels]
+        low = -np.inf if start is None else start
+        high = np.inf if end is None else end
+
+        parts = []
+        directory = os.path.join(self.root, _directory_name(satellite))
+        for day in self._days_between(satellite, low, high):
+            index = self.index(satellite, day)
+            selected = index[(index['end'] >= low) & (index['start'] <= high)]
+            if not len(selected):
+                continue
+            with memoryview(self._mapped(os.path.join(directory, day + '.tlm'))) as mapped:
+                for record in selected:
+                    parts.append(self._decode_chunk(mapped, record, columns))
+
+        buffered = self._buffered(satellite)
+        if buffered is not None:
+            parts.append([buffered[0]] + [buffered[1][name] for name in channels])
+
+        if not parts:
+            return {'timestamp': np.empty(0), **{name: np.empty(0, dtype=np.float32) for name in channels}}
+        stacked = [np.concatenate(column) for column in zip(*parts)]
+        keep = (stacked[0] >= low) & (stacked[0] <= high)
+        if not keep.all():
+            stacked = [column[keep] for column in stacked]
+        if np.any(stacked[0][1:] < stacked[0][:-1]):    # chunks of late data may overlap
+            order = np.argsort(stacked[0], kind='stable')
+            stacked = [column[order] for column in stacked]
+        return dict(zip(['timestamp', *channels], stacked))
+
+    def rollups(self, satellite: Hashable, seconds: float, start: Optional[float] = None,
+                end: Optional[float] = None) -> np.ndarray:
+        """
+        Bucket summaries of one satellite, oldest first
+
+        Stored resolutions are read from the .r<seconds> files (plus the
+        buffered samples); others are computed from the raw samples.
+
+        Args:
+            satellite: Satellite key
+            seconds: Bucket length
+            start, end: Unix-second bounds; buckets overlapping them are returned
+
+        Returns:
+            rollup_dtype records (per-channel arrays in self.channels order)
+        """
+        if seconds not in self.rollup_seconds:
+            low = None if start is None else np.floor(start / seconds) * seconds
+            high = None if end is None else np.floor(end / seconds) * seconds + seconds
+            samples = self.query(satellite, start=low, end=high)
+            records = rollup(samples['timestamp'], np.stack([samples[name] for name in self.channels], axis=1),
+                             seconds)
+            return records[records['start'] < high] if high is not None else records
+
+        low = -np.inf if start is None else start
+        high = np.inf if end is None else end
+        dtype = rollup_dtype(len(self.channels))
+        parts = [np.fromfile(os.path.join(self.root, _directory_name(satellite), f'{day}.r{seconds:g}'), dtype=dtype)
+                 for day in self._days_between(satellite, low, high)]
+        buffered = self._buffered(satellite)
+        if buffered is not None:
+            order = np.argsort(buffered[0], kind='stable')
+            parts.append(rollup(buffered[0][order],
+                                np.stack([buffered[1][name][order] for name in self.channels], axis=1), seconds))
+        records = merge_rollups(np.concatenate(parts)) if parts else np.zeros(0, dtype=dtype)
+        return records[(records['start'] + seconds > low) & (records['start'] <= high)]
+
+    def series(self, satellite: Hashable, channel: str, start: Optional[float] = None, end: Optional[float] = None,
+               max_points: int = DEFAULT_MAX_POINTS) -> Dict[str, Union[np.ndarray, float]]:
+        """
+        One channel over a time range as at most max_points points, for plotting
+
+        Reads the finest level (raw samples, then the stored 1 min / 1 h
+        rollups) with at most SERIES_OVERSAMPLE x max_points points in the
+        range (sample counts come from the chunk index), then LTTB-downsamples
+        it. Levels derived from raw samples (1 s) are skipped, since building
+        them reads every sample. The work is bounded by max_points for spans
+        up to SERIES_OVERSAMPLE x max_points of the coarsest stored level
+        (about 666 days at the defaults); longer spans read every hourly record.
+
+        Args:
+            satellite: Satellite key
+            channel: Channel name
+            start, end: Unix-second bounds; default everything archived
+            max_points: Most points returned
+
+        Returns:
+            'timestamp' (bucket start for rollups), 'mean', 'min', 'max'
+            (equal for raw samples) and 'resolution_seconds' (0 for raw samples)
+        """
+        k = self.channels.index(channel)
+        low = -np.inf if start is None else start
+        high = np.inf if end is None else end
+        points, first, last = 0, np.inf, -np.inf
+        for day in self._days_between(satellite, low, high):
+            index = self.index(satellite, day)
+            index = index[(index['end'] >= low) & (index['start'] <= high)]
+            if len(index):
+                # Prorated by the overlapped fraction of each chunk's time span
+                overlap = np.minimum(index['end'], high) - np.maximum(index['start'], low)
+                duration = index['end'] - index['start']
+                fraction = np.where(duration > 0, overlap / np.where(duration > 0, duration, 1.0), 1.0)
+                points += int(np.ceil(np.sum(index['count'] * np.clip(fraction, 0.0, 1.0))))
+                first, last = min(first, index['start'].min()), max(last, index['end'].max())
+        buffered = self._buffered(satellite)
+        if buffered is not None:
+            points += int(np.count_nonzero((buffered[0] >= low) & (buffered[0] <= high)))
+            first, last = min(first, buffered[0].min()), max(last, buffered[0].max())
+        span = max(min(high, last) - max(low, first), 0.0)
+
+        seconds = series_level(points, span, max_points, self.rollup_seconds) if self.rollup_seconds else 0.0
+        if seconds == 0.0:
+            samples = self.query(satellite, channel, start, end)
+            timestamps, values = samples['timestamp'], samples[channel]
+            minimum = maximum = values
+        else:
+            records = self.rollups(satellite, seconds, start, end)
+            timestamps, values = records['start'], records['mean'][:, k]
+            minimum, maximum = records['min'][:, k], records['max'][:, k]
+
+        finite = np.isfinite(values)
+        if not finite.all():
+            timestamps, values, minimum, maximum = timestamps[finite], values[finite], minimum[finite], maximum[finite]
+        kept = lttb_indices(timestamps, values, max_points)
+        return {'timestamp': timestamps[kept], 'mean': values[kept], 'min': minimum[kept], 'max': maximum[kept],
+                'resolution_seconds': seconds}
+
+    def _decode_chunk(self, mapped: memoryview, record: np.void, columns: List[int]) -> List[np.ndarray]:
+        offset, count = int(record['offset']), int(record['count'])
+        if bytes(mapped[offset:offset + 4]) != CHUNK_MAGIC:
+            raise ValueError(f"Corrupt telemetry chunk at byte {offset}")
+        n_blobs = int(np.frombuffer(mapped[offset + 8:offset + 12], dtype='<u4')[0])
+        lengths = np.frombuffer(mapped[offset + 12:offset + 12 + 4 * n_blobs], dtype='<u4').astype(np.int64)
+        starts = offset + 12 + 4 * n_blobs + np.concatenate([[0], np.cumsum(lengths)])
+        decoded = [decode_timestamps(mapped[starts[0]:starts[1]], count)]
+        decoded += [decode_floats(mapped[starts[c]:starts[c + 1]], count) for c in columns]
+        return decoded
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes on disk (chunks and indexes)"""
+        return sum(os.path.getsize(os.path.join(path, name))
+                   for path, _, names in os.walk(self.root) for name in names)
+
+
+_shared_archive = None
+
+
+def get_telemetry_archive() -> TelemetryArchive:
+    """Shared archive under data/telemetry_archive"""
+    global _shared_archive
+    if _shared_archive is None:
+        _shared_archive = TelemetryArchive()
+    return _shared_archive
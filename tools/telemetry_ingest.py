@@ -0,0 +1,352 @@
+"""
+Telemetry Ingestion
+Asyncio UDP/TCP packet server micro-batching housekeeping telemetry into the store and aggregator
+"""
+
+import asyncio
+import logging
+import socket
+import time
+import numpy as np
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from tools.telemetry_tools import (HOUSEKEEPING_DTYPE, APID_MASK, SEQUENCE_COUNT_MASK, DEFAULT_REJECT,
+                                   VALIDATION_REASONS, FrameValidator, decode_frames, frame_apids,
+                                   frame_sequence_counts, frame_times, housekeeping_channels, reason_counts,
+                                   select_valid)
+from tools.telemetry_store import TelemetryStore, get_telemetry_store
+from tools.telemetry_aggregation import WindowAggregator, get_telemetry_aggregator
+from tools.telemetry_recording import TelemetryRecorder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5600
+SATELLITE_NAME_FORMAT = 'LEO-SAT-{apid:03d}'
+BATCH_INTERVAL_SECONDS = 0.1
+MAX_BATCH_PACKETS = 8192
+MAX_QUEUE_PACKETS = 65536           # about a minute of 1000 satellites at 1 Hz
+PAUSE_FRACTION = 0.5                # TCP readers pause at this queue fill, resume at half of it
+DROP_POLICIES = ('drop_oldest', 'drop_newest')
+SUBSCRIBER_QUEUE_BATCHES = 32
+RATE_WINDOW_SECONDS = 10.0
+UDP_RECEIVE_BUFFER_BYTES = 4 * 1024 * 1024
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server: 'TelemetryIngestServer'):
+        self.server = server
+
+    def datagram_received(self, data: bytes, addr: Tuple):
+        self.server._receive(data)
+
+    def error_received(self, exc: Exception):
+        logger.warning(f"Telemetry UDP receive error: {exc}")
+
+
+class _StreamProtocol(asyncio.Protocol):
+    """Cuts a TCP byte stream into whole fixed-size packets"""
+
+    def __init__(self, server: 'TelemetryIngestServer'):
+        self.server = server
+        self.pending = bytearray()
+        self.transport = None
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+        self.server._readers.add(transport)
+        if self.server._paused:
+            transport.pause_reading()
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.server._readers.discard(self.transport)
+
+    def data_received(self, data: bytes):
+        self.pending += data
+        whole = len(self.pending) - len(self.pending) % self.server.dtype.itemsize
+        step = self.server.max_batch_packets * self.server.dtype.itemsize
+        for offset in range(0, whole, step):
+            self.server._receive(bytes(self.pending[offset:min(offset + step, whole)]), stream=True)
+        del self.pending[:whole]
+
+
+class TelemetryIngestServer:
+    """
+    Receives CCSDS housekeeping packets over UDP and/or TCP
+    - Datagrams / stream segments are queued as raw bytes; a batcher task
+      decodes them every batch_interval_seconds (or sooner when
+      max_batch_packets are waiting) and appends them to the telemetry
+      store and window aggregator in one vectorized write
+    - Backpressure: TCP connections stop being read while the queue is
+      over PAUSE_FRACTION full (nothing is dropped; the queue may overshoot
+      by one socket read); UDP cannot be slowed, so datagrams arriving at
+      a full queue drop the newest or oldest packets (drop_policy)
+    - Every batch runs through a FrameValidator; packets with reject bits
+      are discarded, other flagged packets are stored and counted by reason
+    - Subscribers get each ingested batch through a bounded asyncio.Queue;
+      a subscriber that falls behind loses its oldest batches, never
+      stalling ingestion
+    - An optional TelemetryRecorder captures every dequeued packet (before
+      validation) with its arrival time, for replay
+    - Satellites are keyed by APID via satellite_name_format
+    """
+
+    def __init__(self, store: Optional[TelemetryStore] = None, aggregator: Optional[WindowAggregator] = None,
+                 host: str = DEFAULT_HOST, udp_port: Optional[int] = DEFAULT_PORT,
+                 tcp_port: Optional[int] = DEFAULT_PORT, dtype: np.dtype = HOUSEKEEPING_DTYPE,
+                 satellite_name_format: str = SATELLITE_NAME_FORMAT,
+                 batch_interval_seconds: float = BATCH_INTERVAL_SECONDS,
+                 max_batch_packets: int = MAX_BATCH_PACKETS, max_queue_packets: int = MAX_QUEUE_PACKETS,
+                 drop_policy: str = 'drop_oldest', validator: Optional[FrameValidator] = None,
+                 recorder: Optional[TelemetryRecorder] = None):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {drop_policy!r}, expected one of {DROP_POLICIES}")
+        self.store = store if store is not None else get_telemetry_store()
+        self.aggregator = aggregator if aggregator is not None else get_telemetry_aggregator()
+        self.host = host
+        self.udp_port = udp_port
+        self.tcp_port = tcp_port
+        self.dtype = dtype
+        self.batch_interval_seconds = batch_interval_seconds
+        self.max_batch_packets = max_batch_packets
+        self.max_queue_packets = max_queue_packets
+        self.drop_policy = drop_policy
+        self.validator = validator if validator is not None else FrameValidator(reject=DEFAULT_REJECT)
+        self.recorder = recorder
+        self.names = np.array([satellite_name_format.format(apid=apid) for apid in range(APID_MASK + 1)])
+
+        self._queue = deque()                # (arrival time, bytes, packets)
+        self._queued_packets = 0
+        self._readers = set()
+        self._paused = False
+        self._subscribers = []
+        self._last_sequence = np.full(APID_MASK + 1, -1, dtype=np.int64)
+        self._ingested = deque()             # (ingest time, packets) within RATE_WINDOW_SECONDS
+        self._wake = None
+        self._task = None
+        self._udp_transport = None
+        self._tcp_server = None
+        self.counters = dict.fromkeys(('packets_received', 'packets_ingested', 'packets_dropped',
+                                       'packets_rejected', 'packets_lost', 'batches',
+                                       'subscriber_batches_dropped'), 0)
+        self.reasons = dict.fromkeys(VALIDATION_REASONS.values(), 0)
+        self.packet_age_seconds = np.nan
+        self.batch_seconds = np.nan
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def udp_address(self) -> Optional[Tuple]:
+        return self._udp_transport.get_extra_info('sockname') if self._udp_transport else None
+
+    @property
+    def tcp_address(self) -> Optional[Tuple]:
+        return self._tcp_server.sockets[0].getsockname() if self._tcp_server else None
+
+    async def start(self):
+        """Bind the sockets and start the batcher (port 0 picks a free port)"""
+        loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        if self.udp_port is not None:
+            self._udp_transport, _ = await loop.create_datagram_endpoint(
+                lambda: _DatagramProtocol(self), local_addr=(self.host, self.udp_port))
+            sock = self._udp_transport.get_extra_info('socket')
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RECEIVE_BUFFER_BYTES)
+        if self.tcp_port is not None:
+            self._tcp_server = await loop.create_server(lambda: _StreamProtocol(self), self.host, self.tcp_port)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Telemetry ingestion listening on UDP {self.udp_address} TCP {self.tcp_address}")
+
+    async def stop(self):
+        """Close the sockets and ingest whatever is still queued"""
+        if self._udp_transport is not None:
+            self._udp_transport.close()
+            self._udp_transport = None
+        if self._tcp_server is not None:
+            self._tcp_server.close()
+            for transport in list(self._readers):
+                transport.close()
+            await self._tcp_server.wait_closed()
+            self._tcp_server = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._queue:
+            self._flush()
+
+    async def __aenter__(self) -> 'TelemetryIngestServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def subscribe(self, maxsize: int = SUBSCRIBER_QUEUE_BATCHES) -> asyncio.Queue:
+        """
+        Queue receiving every ingested batch as a dict of satellites,
+        timestamps, received (arrival Unix time per sample) and channel
+        columns (oldest batches dropped when full)
+        """
+        queue = asyncio.Queue(maxsize)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.remove(queue)
+
+    def _receive(self, data: bytes, stream: bool = False):
+        """Queue received packets; stream data is never dropped (its reader is paused instead)"""
+        packets, remainder = divmod(len(data), self.dtype.itemsize)
+        if remainder or not packets:
+            self.counters['packets_rejected'] += max(packets, 1)
+            return
+        self.counters['packets_received'] += packets
+
+        if not stream and self._queued_packets + packets > self.max_queue_packets:
+            if self.drop_policy == 'drop_newest':
+                self.counters['packets_dropped'] += packets
+                return
+            while self._queue and self._queued_packets + packets > self.max_queue_packets:
+                _, _, dropped = self._queue.popleft()
+                self._queued_packets -= dropped
+                self.counters['packets_dropped'] += dropped
+
+        self._queue.append((time.time(), data, packets))
+        self._queued_packets += packets
+        if not self._paused and self._readers and self._queued_packets >= PAUSE_FRACTION * self.max_queue_packets:
+            self._paused = True
+            for transport in self._readers:
+                transport.pause_reading()
+        if self._queued_packets >= self.max_batch_packets and self._wake is not None:
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.batch_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            # Drain what is queued now; packets arriving meanwhile wait for the next batch
+            backlog = self._queued_packets
+            while backlog > 0 and self._queue:
+                backlog -= self._flush()
+                await asyncio.sleep(0)       # let the sockets be read between batches
+
+    def _flush(self) -> int:
+        """Ingest up to max_batch_packets queued packets; returns the packets taken off the queue"""
+        started = time.perf_counter()
+        chunks, arrivals, counts, packets = [], [], [], 0
+        while self._queue and packets < self.max_batch_packets:
+            arrival, data, n = self._queue.popleft()
+            chunks.append(data)
+            arrivals.append(arrival)
+            counts.append(n)
+            packets += n
+        self._queued_packets -= packets
+        if self._paused and self._queued_packets < PAUSE_FRACTION * self.max_queue_packets / 2:
+            self._paused = False
+            for transport in self._readers:
+                transport.resume_reading()
+
+        data = b''.join(chunks)
+        received = np.repeat(arrivals, counts)
+        if self.recorder is not None:
+            self.recorder.write(data, received)
+        frames = decode_frames(data, self.dtype, validate=False)
+        reasons = self.validator.validate(frames, now=time.time())
+        if reasons.any():
+            for name, count in reason_counts(reasons).items():
+                self.reasons[name] += count
+            frames = select_valid(frames, reasons, self.validator.reject)
+            received = select_valid(received, reasons, self.validator.reject)
+            self.counters['packets_rejected'] += packets - len(frames)
+        if len(frames):
+            apids = frame_apids(frames).astype(np.int64)
+            self._count_lost(apids, frame_sequence_counts(frames).astype(np.int64))
+            satellites = self.names[apids]
+            timestamps = frame_times(frames)
+            columns = housekeeping_channels(frames)
+            self.store.append_batch(satellites, timestamps, columns)
+            self.aggregator.update_batch(satellites, timestamps, columns)
+
+            now = time.time()
+            self.packet_age_seconds = float(np.mean(now - timestamps))
+            self._ingested.append((now, len(frames)))
+            self.counters['packets_ingested'] += len(frames)
+            self.counters['batches'] += 1
+            self._publish({'satellites': satellites, 'timestamps': timestamps, 'received': received,
+                           'columns': columns})
+        self.batch_seconds = time.perf_counter() - started
+        return packets
+
+    def _count_lost(self, apids: np.ndarray, sequence: np.ndarray):
+        """Packets missing from the per-APID sequence counts (reordering is not counted)"""
+        order = np.argsort(apids, kind='stable')
+        apids, sequence = apids[order], sequence[order]
+        first = np.r_[True, apids[1:] != apids[:-1]]
+        previous = np.where(first, self._last_sequence[apids], np.r_[-1, sequence[:-1]])
+        gaps = (sequence - previous - 1) & SEQUENCE_COUNT_MASK
+        known = (previous >= 0) & (gaps < (SEQUENCE_COUNT_MASK + 1) // 2)
+        self.counters['packets_lost'] += int(gaps[known].sum())
+        last = np.r_[first[1:], True]
+        self._last_sequence[apids[last]] = sequence[last]
+
+    def _publish(self, batch: Dict):
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.counters['subscriber_batches_dropped'] += 1
+            queue.put_nowait(batch)
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Ingestion health
+
+        Returns:
+            Counters plus ingest_rate_hz (packets/s over the last
+            RATE_WINDOW_SECONDS), queue_depth (packets), queue_lag_seconds
+            (wait of the oldest queued packet), packet_age_seconds (mean
+            packet time-code age at ingest in the last batch),
+            batch_seconds (last batch processing time), tcp_paused and
+            reasons (packets flagged per validation reason, rejected or not)
+        """
+        now = time.time()
+        while self._ingested and self._ingested[0][0] < now - RATE_WINDOW_SECONDS:
+            self._ingested.popleft()
+        metrics = dict(self.counters)
+        metrics.update({
+            'ingest_rate_hz': sum(n for _, n in self._ingested) / RATE_WINDOW_SECONDS,
+            'queue_depth': self._queued_packets,
+            'queue_lag_seconds': now - self._queue[0][0] if self._queue else 0.0,
+            'packet_age_seconds': self.packet_age_seconds,
+            'batch_seconds': self.batch_seconds,
+            'tcp_paused': self._paused,
+            'reasons': dict(self.reasons),
+        })
+        return metrics
+
+
+_shared_server = None
+
+
+async def start_ingest_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                              **options) -> TelemetryIngestServer:
+    """Start the shared server (UDP and TCP on port) feeding the shared store and aggregator"""
+    global _shared_server
+    if _shared_server is None:
+        _shared_server = TelemetryIngestServer(host=host, udp_port=port, tcp_port=port, **options)
+        await _shared_server.start()
+    return _shared_server
+
+
+def get_ingest_server() -> Optional[TelemetryIngestServer]:
+    """The shared server, or None if ingestion was not started"""
+    return _shared_server
@@ -0,0 +1,88 @@
+"""
+Telemetry Recording
+Append-only capture of received housekeeping packets with their arrival times, for replay
+"""
+
+import mmap
+import logging
+import numpy as np
+from typing import Iterator, Tuple
+
+from tools.telemetry_tools import HOUSEKEEPING_DTYPE
+
+logger = logging.getLogger(__name__)
+
+RECORDING_MAGIC = b'TLRC'
+RECORDING_VERSION = 1
+# File: FILE_HEADER_DTYPE, then blocks of BLOCK_HEADER_DTYPE, count float64 arrival times, count packets
+FILE_HEADER_DTYPE = np.dtype([('magic', 'S4'), ('version', '<u2'), ('packet_size', '<u2')])
+BLOCK_HEADER_DTYPE = np.dtype([('count', '<u4')])
+
+
+class TelemetryRecorder:
+    """
+    Writes packets exactly as received (rejected ones included) in arrival order
+    - One block per ingest batch: arrival time (Unix seconds) per packet,
+      then the raw packets
+    - Attach to a TelemetryIngestServer (recorder=...) to capture live traffic
+    """
+
+    def __init__(self, path: str, packet_size: int = HOUSEKEEPING_DTYPE.itemsize):
+        self.path = path
+        self.packet_size = packet_size
+        self.packets = 0
+        self._file = open(path, 'wb')
+        self._file.write(np.array([(RECORDING_MAGIC, RECORDING_VERSION, packet_size)],
+                                  dtype=FILE_HEADER_DTYPE).tobytes())
+
+    def write(self, data: bytes, received: np.ndarray):
+        """Append packets (concatenated) and their (K,) arrival times"""
+        count = len(received)
+        if len(data) != count * self.packet_size:
+            raise ValueError(f"Expected {count} packets of {self.packet_size} bytes, got {len(data)} bytes")
+        if count:
+            self._file.write(np.array([count], dtype=BLOCK_HEADER_DTYPE).tobytes())
+            self._file.write(np.ascontiguousarray(received, dtype='<f8').tobytes())
+            self._file.write(data)
+            self.packets += count
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> 'TelemetryRecorder':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_recording(path: str) -> Iterator[Tuple[np.ndarray, bytes]]:
+    """
+    Blocks of a recording in order, read through a memory map
+
+    Yields:
+        (arrival times (K,), K concatenated packets)
+    """
+    with open(path, 'rb') as f:
+        if not f.read(FILE_HEADER_DTYPE.itemsize):
+            return
+        f.seek(0)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            header = np.frombuffer(mapped[:FILE_HEADER_DTYPE.itemsize], dtype=FILE_HEADER_DTYPE)[0]
+            if header['magic'] != RECORDING_MAGIC or header['version'] != RECORDING_VERSION:
+                raise ValueError(f"{path} is not a telemetry recording")
+            packet_size = int(header['packet_size'])
+            offset = FILE_HEADER_DTYPE.itemsize
+            while offset + BLOCK_HEADER_DTYPE.itemsize <= len(mapped):
+                times_at = offset + BLOCK_HEADER_DTYPE.itemsize
+                count = int(np.frombuffer(mapped[offset:times_at], dtype=BLOCK_HEADER_DTYPE)[0]['count'])
+                data_at = times_at + 8 * count
+                end = data_at + count * packet_size
+                if end > len(mapped):
+                    logger.warning(f"Truncated block at byte {offset} of {path}")
+                    return
+                yield np.frombuffer(mapped[times_at:data_at], dtype='<f8'), mapped[data_at:end]
+                offset = end
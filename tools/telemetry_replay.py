@@ -0,0 +1,163 @@
+"""
+Telemetry Replay
+Streams recorded packets back into ingestion at real time, N x real time or flat out, and times the pipeline behind it
+"""
+
+import asyncio
+import logging
+import time
+import numpy as np
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from tools.telemetry_ingest import DEFAULT_HOST, DEFAULT_PORT, TelemetryIngestServer
+from tools.telemetry_recording import read_recording
+from tools.telemetry_store import TelemetryStore
+from tools.telemetry_aggregation import WindowAggregator
+
+logger = logging.getLogger(__name__)
+
+PACING_SECONDS = 0.005          # packets due within this of each other are sent in one write
+SETTLE_POLL_SECONDS = 0.01
+REPLAY_SUBSCRIBER_BATCHES = 4096
+
+
+class TelemetryReplayer:
+    """
+    Sends a recording to an ingest server over one TCP connection
+    - Byte order is the recorded arrival order, so the server sees the
+      packets in the same sequence at any speed
+    - speed=1 keeps the recorded spacing, speed=N compresses it N times,
+      speed=None sends as fast as the server's flow control allows
+    - Packets are replayed unchanged (original timestamps); replay into a
+      fresh server, as one that has already seen newer packets from the
+      same APIDs rejects them as out of order
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = 1.0, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        if speed is not None and speed <= 0:
+            raise ValueError(f"speed must be positive or None, got {speed}")
+        self.path = path
+        self.speed = speed
+        self.host = host
+        self.port = port
+        self.packets_sent = 0
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> int:
+        """
+        Replay the whole recording (or until stop is set)
+
+        Returns:
+            Packets sent
+        """
+        _, writer = await asyncio.open_connection(self.host, self.port)
+        started, origin = time.time(), None
+        try:
+            for received, data in read_recording(self.path):
+                size = len(data) // len(received)
+                if origin is None:
+                    origin = received[0]
+                if self.speed is None:
+                    due = np.zeros(len(received))
+                else:
+                    due = started + (received - origin) / self.speed
+                first = 0
+                while first < len(received):
+                    if stop is not None and stop.is_set():
+                        return self.packets_sent
+                    now = time.time()
+                    last = max(int(np.searchsorted(due, now + PACING_SECONDS, side='right')), first)
+                    if last == first:
+                        await asyncio.sleep(due[first] - now)
+                        continue
+                    writer.write(data[first * size:last * size])
+                    await writer.drain()
+                    self.packets_sent += last - first
+                    first = last
+        finally:
+            writer.close()
+            await writer.wait_closed()
+        return self.packets_sent
+
+
+def _percentiles(latencies: List[np.ndarray], prefix: str) -> Dict[str, float]:
+    values = np.concatenate(latencies) if latencies else np.empty(0)
+    if not len(values):
+        return {f'{prefix}_p50_seconds': np.nan, f'{prefix}_p99_seconds': np.nan, f'{prefix}_max_seconds': np.nan}
+    p50, p99 = np.percentile(values, [50, 99])
+    return {f'{prefix}_p50_seconds': float(p50), f'{prefix}_p99_seconds': float(p99),
+            f'{prefix}_max_seconds': float(values.max())}
+
+
+async def replay_pipeline(path: str, detect: Callable[[Dict], List[Dict[str, Any]]],
+                          alert: Callable[[List[Dict[str, Any]]], Awaitable[Any]], speed: Optional[float] = 1.0,
+                          **server_options) -> Dict[str, float]:
+    """
+    Replay a recording through a fresh ingest server into an anomaly -> alert pipeline
+
+    Every ingested batch goes to detect(batch); when it returns verdicts
+    (dicts with the sample 'index' in the batch) they are awaited through
+    alert(verdicts). Latencies run from each packet's arrival at the server.
+
+    Args:
+        path: Recording from TelemetryRecorder
+        detect: Batch -> verdicts, e.g. AnomalyDetectorAgent.assess_batch
+        alert: Coroutine function taking the verdicts of one batch
+        speed: Replay speed (None = as fast as possible)
+        **server_options: TelemetryIngestServer options (batch_interval_seconds, ...)
+
+    Returns:
+        packets_sent, packets_ingested, packets_rejected, anomalies (verdicts),
+        alerts (alert calls), duration_seconds, throughput_hz (ingested packets per second end to
+        end), subscriber_batches_dropped, and p50 / p99 / max of
+        verdict_latency and alert_latency
+    """
+    server = TelemetryIngestServer(TelemetryStore(), WindowAggregator(), udp_port=None, tcp_port=0,
+                                   **server_options)
+    verdict_latency, alert_latency = [], []
+    totals = {'anomalies': 0, 'alerts': 0}
+    busy = False
+
+    async def consume(batches: asyncio.Queue):
+        nonlocal busy
+        while True:
+            batch = await batches.get()
+            busy = True
+            verdicts = detect(batch)
+            verdict_latency.append(time.time() - batch['received'])
+            if verdicts:
+                await alert(verdicts)
+                alert_latency.append(time.time() - batch['received'][[v['index'] for v in verdicts]])
+                totals['anomalies'] += len(verdicts)
+                totals['alerts'] += 1
+            busy = False
+
+    async with server:
+        batches = server.subscribe(REPLAY_SUBSCRIBER_BATCHES)
+        consumer = asyncio.create_task(consume(batches))
+        started = time.time()
+        sent = await TelemetryReplayer(path, speed, *server.tcp_address[:2]).run()
+        # Settled once everything sent is received, ingested and through the pipeline
+        while (server.counters['packets_received'] < sent or server.metrics()['queue_depth']
+               or not batches.empty() or busy):
+            if consumer.done():
+                consumer.result()
+            await asyncio.sleep(SETTLE_POLL_SECONDS)
+        duration = time.time() - started
+        consumer.cancel()
+        try:
+            await consumer
+        except asyncio.CancelledError:
+            pass
+
+    report = {
+        'packets_sent': sent,
+        'packets_ingested': server.counters['packets_ingested'],
+        'packets_rejected': server.counters['packets_rejected'],
+        **totals,
+        'duration_seconds': duration,
+        'throughput_hz': server.counters['packets_ingested'] / duration if duration > 0 else np.nan,
+        'subscriber_batches_dropped': server.counters['subscriber_batches_dropped'],
+    }
+    report.update(_percentiles(verdict_latency, 'verdict_latency'))
+    report.update(_percentiles(alert_latency, 'alert_latency'))
+    return report
@@ -0,0 +1,132 @@
+"""
+Telemetry Rollups
+Fixed-resolution bucket summaries (count, mean, min, max) and Largest-Triangle-Three-Buckets downsampling for plotting
+"""
+
+import logging
+import numpy as np
+from typing import Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_SECONDS = (1.0, 60.0, 3600.0)
+DEFAULT_MAX_POINTS = 1000
+SERIES_OVERSAMPLE = 16          # a level is read when it has at most this many points per requested point
+
+
+def rollup_dtype(n_channels: int) -> np.dtype:
+    """One bucket: start (Unix seconds), and count / mean / min / max of the non-NaN values per channel"""
+    return np.dtype([('start', '<f8'), ('count', '<u4', (n_channels,)), ('mean', '<f4', (n_channels,)),
+                     ('min', '<f4', (n_channels,)), ('max', '<f4', (n_channels,))])
+
+
+def rollup(timestamps: np.ndarray, values: np.ndarray, seconds: float) -> np.ndarray:
+    """
+    Summaries of aligned buckets of `seconds` for one satellite's samples
+
+    Args:
+        timestamps: (K,) Unix seconds in time order
+        values: (K, C) channel values
+        seconds: Bucket length; buckets start at multiples of it
+
+    Returns:
+        rollup_dtype(C) records of the non-empty buckets, oldest first
+    """
+    values = np.asarray(values, dtype=np.float32)
+    if len(timestamps) == 0:
+        return np.zeros(0, dtype=rollup_dtype(values.shape[1]))
+    bucket = np.floor(np.asarray(timestamps) / seconds)
+    first = np.flatnonzero(np.concatenate([[True], bucket[1:] != bucket[:-1]]))
+    records = np.zeros(len(first), dtype=rollup_dtype(values.shape[1]))
+    records['start'] = bucket[first] * seconds
+    valid = ~np.isnan(values)
+    records['count'] = np.add.reduceat(valid.astype(np.int64), first)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        records['mean'] = np.add.reduceat(np.where(valid, values, 0.0).astype(np.float64), first) / records['count']
+    records['min'] = np.fmin.reduceat(values, first)
+    records['max'] = np.fmax.reduceat(values, first)
+    return records
+
+
+def merge_rollups(records: np.ndarray) -> np.ndarray:
+    """Combine records of the same bucket (late data written as separate chunks), oldest first"""
+    records = records[np.argsort(records['start'], kind='stable')]
+    if len(records) < 2 or np.all(records['start'][1:] != records['start'][:-1]):
+        return records
+    first = np.flatnonzero(np.concatenate([[True], records['start'][1:] != records['start'][:-1]]))
+    merged = records[first].copy()
+    count = records['count'].astype(np.float64)
+    merged['count'] = np.add.reduceat(count, first)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        merged['mean'] = np.add.reduceat(np.nan_to_num(records['mean']) * count, first) / merged['count']
+    merged['min'] = np.fmin.reduceat(records['min'], first)
+    merged['max'] = np.fmax.reduceat(records['max'], first)
+    return merged
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int = DEFAULT_MAX_POINTS) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets selection (Steinarsson 2013)
+
+    Keeps the first and last points and, from each of max_points - 2 equal
+    buckets in between, the point forming the largest triangle with the point
+    kept from the previous bucket and the mean of the next bucket. Peaks and
+    dips survive where striding or averaging would flatten them. O(n) work,
+    with one short vector step per bucket.
+
+    Args:
+        x: (n,) increasing sample times
+        y: (n,) finite values
+        max_points: Number of points to keep (at least 3)
+
+    Returns:
+        Indices of the kept points, increasing
+    """
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+    if max_points < 3:
+        raise ValueError(f"max_points must be at least 3, got {max_points}")
+    x = np.asarray(x, dtype=np.float64) - x[0]
+    y = np.asarray(y, dtype=np.float64)
+
+    # Interior points 1 .. n-2 split into buckets [edges[i], edges[i + 1])
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    next_x = np.append(np.add.reduceat(x[1:-1], edges[:-1] - 1)[1:] / sizes[1:], x[-1])
+    next_y = np.append(np.add.reduceat(y[1:-1], edges[:-1] - 1)[1:] / sizes[1:], y[-1])
+
+    # Twice the triangle area with apex a is |a_x * u + a_y * v + w| for each candidate point
+    cx, cy = np.repeat(next_x, sizes), np.repeat(next_y, sizes)
+    px, py = x[1:-1], y[1:-1]
+    u, v, w = py - cy, cx - px, px * cy - cx * py
+
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i] - 1, edges[i + 1] - 1
+        a = edges[i] + int(np.argmax(np.abs(x[a] * u[lo:hi] + y[a] * v[lo:hi] + w[lo:hi])))
+        kept[i + 1] = a
+    return kept
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int = DEFAULT_MAX_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """At most max_points of (x, y) chosen by lttb_indices"""
+    kept = lttb_indices(x, y, max_points)
+    return np.asarray(x)[kept], np.asarray(y)[kept]
+
+
+def series_level(points: int, span_seconds: float, max_points: int = DEFAULT_MAX_POINTS,
+                 levels: Sequence[float] = ROLLUP_SECONDS) -> float:
+    """
+    Finest level (0 = raw samples, else rollup seconds) with at most
+    SERIES_OVERSAMPLE x max_points points over a span holding `points` samples
+    """
+    budget = SERIES_OVERSAMPLE * max_points
+    if points <= budget:
+        return 0.0
+    for seconds in levels:
+        if min(points, span_seconds / seconds + 1) <= budget:
+            return seconds
+    return levels[-1]
@@ -0,0 +1,127 @@
+"""
+Telemetry Simulator
+Synthetic constellation housekeeping packets sent over UDP or TCP for exercising ingestion
+"""
+
+import asyncio
+import logging
+import time
+import numpy as np
+from typing import Dict, Optional
+
+from tools.orbital_mechanics import MU_EARTH, EARTH_RADIUS_KM
+from tools.telemetry_tools import HOUSEKEEPING_DTYPE, SEQUENCE_COUNT_MASK, encode_frames
+
+logger = logging.getLogger(__name__)
+
+SEND_SLICES = 20        # each period's packets are spread over this many sends (satellites are not in lockstep)
+
+
+def simulated_housekeeping(n_satellites: int, timestamps: np.ndarray, seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Plausible housekeeping payload for a constellation of circular LEO orbits
+
+    Args:
+        n_satellites: Constellation size (orbits are fixed by seed)
+        timestamps: Sample time per satellite in Unix seconds (n_satellites,) or scalar
+
+    Returns:
+        Payload columns for encode_frames, each (n_satellites, ...)
+    """
+    rng = np.random.default_rng(seed)
+    altitude = rng.uniform(450.0, 650.0, n_satellites)
+    inclination = np.radians(rng.uniform(45.0, 98.0, n_satellites))
+    phase = rng.uniform(0.0, 2 * np.pi, n_satellites)
+    radius = EARTH_RADIUS_KM + altitude
+    speed = np.sqrt(MU_EARTH / radius)
+    u = phase + speed / radius * np.asarray(timestamps, dtype=np.float64)
+
+    cos_u, sin_u, cos_i, sin_i = np.cos(u), np.sin(u), np.cos(inclination), np.sin(inclination)
+    noise = np.random.default_rng((seed, int(np.min(timestamps) * 1000)))
+    return {
+        'position_km': radius[:, None] * np.stack([cos_u, sin_u * cos_i, sin_u * sin_i], axis=-1),
+        'velocity_km_s': speed[:, None] * np.stack([-sin_u, cos_u * cos_i, cos_u * sin_i], axis=-1),
+        'battery_temp_c': 20.0 + 5.0 * np.sin(u) + noise.normal(0.0, 0.3, n_satellites),
+        'power_w': 450.0 + 30.0 * np.cos(u) + noise.normal(0.0, 5.0, n_satellites),
+        'attitude_deg': noise.normal(0.0, 0.02, (n_satellites, 3)),
+    }
+
+
+class TelemetrySimulator:
+    """
+    Sends one packet per satellite per period at rate_hz, time-stamped with the wall clock
+    - APIDs first_apid .. first_apid + n_satellites - 1
+    - UDP: packets_per_datagram packets per datagram; TCP: one stream
+      (honouring the server's flow control)
+    """
+
+    def __init__(self, n_satellites: int = 1000, rate_hz: float = 1.0, host: str = '127.0.0.1',
+                 port: int = 5600, protocol: str = 'udp', packets_per_datagram: int = 1,
+                 first_apid: int = 1, seed: int = 0):
+        if protocol not in ('udp', 'tcp'):
+            raise ValueError(f"Unknown protocol {protocol!r}, expected 'udp' or 'tcp'")
+        self.n_satellites = n_satellites
+        self.rate_hz = rate_hz
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.packets_per_datagram = packets_per_datagram
+        self.apids = first_apid + np.arange(n_satellites)
+        self.seed = seed
+        self.sequence = 0
+        self.packets_sent = 0
+
+    def packets(self, timestamps: np.ndarray) -> bytes:
+        """One packet per satellite at its timestamp (n_satellites,), in APID order"""
+        timestamps = np.broadcast_to(np.asarray(timestamps, dtype=np.float64), (self.n_satellites,))
+        payload = simulated_housekeeping(self.n_satellites, timestamps, self.seed)
+        data = encode_frames(self.apids, timestamps, payload,
+                             np.full(self.n_satellites, self.sequence & SEQUENCE_COUNT_MASK))
+        self.sequence += 1
+        return data
+
+    async def run(self, duration_seconds: float, stop: Optional[asyncio.Event] = None) -> int:
+        """
+        Send telemetry for duration_seconds of wall time (or until stop is set)
+
+        Returns:
+            Packets sent
+        """
+        loop = asyncio.get_running_loop()
+        if self.protocol == 'udp':
+            transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol,
+                                                               remote_addr=(self.host, self.port))
+            writer = None
+        else:
+            _, writer = await asyncio.open_connection(self.host, self.port)
+
+        size = HOUSEKEEPING_DTYPE.itemsize
+        period = 1.0 / self.rate_hz
+        slice_packets = max(1, -(-self.n_satellites // SEND_SLICES))
+        started = time.time()
+        tick = 0
+        try:
+            while time.time() - started < duration_seconds and not (stop is not None and stop.is_set()):
+                due = max(started + tick * period, time.time())
+                data = self.packets(due + np.arange(self.n_satellites) // slice_packets * slice_packets
+                                    / self.n_satellites * period)
+                for first in range(0, self.n_satellites, slice_packets):
+                    chunk = data[first * size:min(first + slice_packets, self.n_satellites) * size]
+                    if writer is None:
+                        step = self.packets_per_datagram * size
+                        for offset in range(0, len(chunk), step):
+                            transport.sendto(chunk[offset:offset + step])
+                    else:
+                        writer.write(chunk)
+                        await writer.drain()
+                    self.packets_sent += len(chunk) // size
+                    await asyncio.sleep(max(0.0, due + (first + slice_packets) / self.n_satellites * period
+                                            - time.time()))
+                tick += 1
+        finally:
+            if writer is None:
+                transport.close()
+            else:
+                writer.close()
+                await writer.wait_closed()
+        return self.packets_sent
@@ -0,0 +1,262 @@
+"""
+Telemetry Store
+Fixed-capacity columnar ring buffers per satellite and channel with zero-copy window views
+"""
+
+import logging
+import numpy as np
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_CHANNELS = ('battery_temp_c', 'power_w', 'attitude_deg', 'altitude_km', 'velocity_km_s')
+DEFAULT_RETENTION_SECONDS = 3 * 3600.0
+DEFAULT_SAMPLE_RATE_HZ = 1.0
+DEFAULT_VIEW_SECONDS = 900.0    # windows up to this long are always contiguous views
+INITIAL_SATELLITES = 16
+
+
+class SatelliteRows:
+    """
+    Satellite key -> array row registry shared by the telemetry structures
+    - Rows are assigned on first use; capacity doubles via the grow callback
+    """
+
+    def __init__(self, grow: Callable[[int], None], capacity: int = INITIAL_SATELLITES):
+        self.index = {}
+        self.keys = []
+        self.capacity = capacity
+        self.grow = grow
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def row(self, satellite: Hashable) -> int:
+        """Row of a satellite, registering it on first use"""
+        row = self.index.get(satellite)
+        if row is None:
+            row = len(self.keys)
+            if row == self.capacity:
+                self.capacity *= 2
+                self.grow(self.capacity)
+            self.index[satellite] = row
+            self.keys.append(satellite)
+        return row
+
+    def rows(self, satellites: Union[Sequence[Hashable], np.ndarray]) -> np.ndarray:
+        """Rows for a per-sample array of satellite keys (one dict lookup per distinct key)"""
+        keys, inverse = np.unique(np.asarray(satellites), return_inverse=True)
+        keys = keys.tolist()
+        try:
+            rows = [self.index[key] for key in keys]
+        except KeyError:
+            rows = [self.row(key) for key in keys]
+        return np.array(rows, dtype=np.int64)[inverse.ravel()]
+
+    def lookup(self, satellites: Sequence[Hashable]) -> np.ndarray:
+        """Rows of known satellites, -1 for unknown ones (nothing is registered)"""
+        return np.array([self.index.get(s, -1) for s in satellites], dtype=np.int64)
+
+
+def grown(array: np.ndarray, rows: int, fill) -> np.ndarray:
+    """Copy of array with its first axis extended to rows, new rows set to fill"""
+    bigger = np.full((rows,) + array.shape[1:], fill, dtype=array.dtype)
+    bigger[:len(array)] = array
+    return bigger
+
+
+class TelemetryStore:
+    """
+    In-memory telemetry history
+    - One (satellites, slots) array per channel plus one for timestamps
+    - Each satellite row is a ring of retention x rate samples; appends are O(1)
+    - The first view_seconds of every ring are mirrored past its end, so any
+      window up to that length is a contiguous slice (no copy)
+    - Memory is fixed per satellite; rows are added as satellites appear
+
+    Samples of a satellite are expected in time order (window queries
+    binary-search the timestamps).
+    """
+
+    def __init__(self, retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+                 sample_rate_hz: float = DEFAULT_SAMPLE_RATE_HZ,
+                 channels: Sequence[str] = TELEMETRY_CHANNELS,
+                 view_seconds: float = DEFAULT_VIEW_SECONDS,
+                 dtype: Union[str, np.dtype] = np.float32):
+        self.capacity = int(np.ceil(retention_seconds * sample_rate_hz))
+        self.overhang = min(int(np.ceil(view_seconds * sample_rate_hz)), self.capacity)
+        self.channels = tuple(channels)
+        self.dtype = np.dtype(dtype)
+
+        self.satellite_rows = SatelliteRows(self._grow)
+        slots = self.capacity + self.overhang
+        self.timestamps = np.full((INITIAL_SATELLITES, slots), np.nan)
+        self.values = {name: np.full((INITIAL_SATELLITES, slots), np.nan, dtype=self.dtype)
+                       for name in self.channels}
+        self.head = np.zeros(INITIAL_SATELLITES, dtype=np.int64)    # next write slot
+        self.count = np.zeros(INITIAL_SATELLITES, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.satellite_rows)
+
+    def __contains__(self, satellite: Hashable) -> bool:
+        return satellite in self.satellite_rows.index
+
+    @property
+    def satellites(self) -> List[Hashable]:
+        return self.satellite_rows.keys
+
+    @property
+    def memory_bytes(self) -> int:
+        return (self.timestamps.nbytes + sum(v.nbytes for v in self.values.values())
+                + self.head.nbytes + self.count.nbytes)
+
+    def _grow(self, rows: int):
+        self.timestamps = grown(self.timestamps, rows, np.nan)
+        self.values = {name: grown(values, rows, np.nan) for name, values in self.values.items()}
+        self.head = grown(self.head, rows, 0)
+        self.count = grown(self.count, rows, 0)
+
+    def _write(self, rows: np.ndarray, slots: np.ndarray, timestamps: np.ndarray,
+               columns: Dict[str, np.ndarray]):
+        mirrored = slots < self.overhang
+        mirror_rows, mirror_slots = rows[mirrored], slots[mirrored] + self.capacity
+        self.timestamps[rows, slots] = timestamps
+        self.timestamps[mirror_rows, mirror_slots] = timestamps[mirrored]
+        for name in self.channels:
+            target = self.values[name]
+            values = columns.get(name)
+            if values is None:
+                target[rows, slots] = np.nan
+                target[mirror_rows, mirror_slots] = np.nan
+            else:
+                values = np.asarray(values)
+                target[rows, slots] = values
+                target[mirror_rows, mirror_slots] = values[mirrored]
+
+    def append(self, satellite: Hashable, timestamp: float, **values: float):
+        """Add one sample (Unix seconds); channels not given are stored as NaN"""
+        row = self.satellite_rows.row(satellite)
+        slot = self.head[row]
+        self._write(np.array([row]), np.array([slot]), np.array([timestamp]),
+                    {name: np.array([value]) for name, value in values.items()})
+        self.head[row] = (slot + 1) % self.capacity
+        self.count[row] = min(self.count[row] + 1, self.capacity)
+
+    def append_batch(self, satellites: Union[Sequence[Hashable], np.ndarray], timestamps: np.ndarray,
+                     columns: Dict[str, np.ndarray]):
+        """
+        Add a micro-batch of samples from any mix of satellites in one vectorized write
+
+        Args:
+            satellites: (K,) satellite key per sample
+            timestamps: (K,) Unix seconds, in time order within each satellite
+            columns: (K,) array per channel; channels not given are stored as NaN
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(timestamps) == 0:
+            return
+        rows = self.satellite_rows.rows(satellites)
+
+        # Rank of each sample among its satellite's samples in this batch
+        order = np.argsort(rows, kind='stable')
+        sorted_rows = rows[order]
+        first = np.r_[0, np.nonzero(np.diff(sorted_rows))[0] + 1]
+        group_sizes = np.diff(np.r_[first, len(rows)])
+        rank = np.empty(len(rows), dtype=np.int64)
+        rank[order] = np.arange(len(rows)) - np.repeat(first, group_sizes)
+        added = np.bincount(rows, minlength=len(self.head))
+
+        # Only the newest `capacity` samples of a satellite survive a batch
+        keep = rank >= added[rows] - self.capacity
+        rows, rank, timestamps = rows[keep], rank[keep], timestamps[keep]
+        columns = {name: np.asarray(values)[keep] for name, values in columns.items()}
+
+        slots = (self.head[rows] + rank) % self.capacity
+        self._write(rows, slots, timestamps, columns)
+        self.head = (self.head + added) % self.capacity
+        self.count = np.minimum(self.count + added, self.capacity)
+
+    def _span(self, row: int, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        """Logical sample range [i0, i1) (0 = oldest held) with start <= t <= end"""
+        n = int(self.count[row])
+        oldest = (int(self.head[row]) - n) % self.capacity
+        times = self.timestamps[row]
+
+        def position(value: float, side: str) -> int:
+            # The held samples are one or two sorted physical segments
+            first = times[oldest:min(oldest + n, self.capacity)]
+            k = int(np.searchsorted(first, value, side=side))
+            if k < len(first) or len(first) == n:
+                return k
+            return len(first) + int(np.searchsorted(times[:n - len(first)], value, side=side))
+
+        i0 = 0 if start is None else position(start, 'left')
+        i1 = n if end is None else position(end, 'right')
+        return i0, max(i0, i1)
+
+    def window(self, satellite: Hashable, channel: str, start: Optional[float] = None,
+               end: Optional[float] = None, last: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Samples of one channel within a time range, oldest first
+
+        Windows of up to view_seconds worth of samples (and any window that
+        does not straddle the ring's end) are read-only views into the store;
+        longer wrapped windows are copied.
+
+        Args:
+            satellite: Satellite key
+            channel: Channel name
+            start, end: Unix-second bounds (inclusive); default all held samples
+            last: Keep only the newest `last` samples of the range
+
+        Returns:
+            (timestamps, values)
+        """
+        row = self.satellite_rows.index.get(satellite)
+        if row is None:
+            return np.empty(0), np.empty(0, dtype=self.dtype)
+        i0, i1 = self._span(row, start, end)
+        if last is not None:
+            i0 = max(i0, i1 - last)
+
+        oldest = (int(self.head[row]) - int(self.count[row])) % self.capacity
+        p0 = (oldest + i0) % self.capacity
+        values = self.values[channel][row]
+        if p0 + (i1 - i0) <= self.capacity + self.overhang:
+            times, values = self.timestamps[row, p0:p0 + i1 - i0], values[p0:p0 + i1 - i0]
+            times, values = times.view(), values.view()
+            times.flags.writeable = values.flags.writeable = False
+            return times, values
+        slots = (p0 + np.arange(i1 - i0)) % self.capacity
+        return self.timestamps[row, slots], values[slots]
+
+    def latest(self, satellites: Optional[Sequence[Hashable]] = None) -> Dict[str, np.ndarray]:
+        """
+        Newest sample of each satellite (NaN where nothing was received)
+
+        Returns:
+            'timestamp' and one entry per channel, each (S,) in the order of satellites
+        """
+        satellites = self.satellites if satellites is None else satellites
+        rows = self.satellite_rows.lookup(satellites)
+        known = rows >= 0
+        safe = np.where(known, rows, 0)
+        slots = (self.head[safe] - 1) % self.capacity
+        empty = ~known | (self.count[safe] == 0)
+
+        latest = {'timestamp': np.where(empty, np.nan, self.timestamps[safe, slots])}
+        for name in self.channels:
+            latest[name] = np.where(empty, np.nan, self.values[name][safe, slots])
+        return latest
+
+
+_shared_store = None
+
+
+def get_telemetry_store() -> TelemetryStore:
+    """Shared process-wide telemetry store used by the telemetry agent and dashboard"""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = TelemetryStore()
+    return _shared_store
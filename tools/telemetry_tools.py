@@ -3,30 +3,215 @@ Telemetry Processing Utilities
 Functions for parsing and processing satellite telemetry data
 """
 
-import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
-from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from datetime import datetime, timezone
 
+from tools.orbital_mechanics import EARTH_RADIUS_KM
 
-def parse_telemetry(raw_data: bytes) -> Dict:
+# CCSDS space packet primary header (big-endian): version/type/secondary-header flag/APID,
+# sequence flags/count, packet data length (octets after the primary header, minus one)
+PRIMARY_HEADER_FIELDS = [('packet_id', '>u2'), ('sequence', '>u2'), ('data_length', '>u2')]
+# Secondary header: CCSDS unsegmented time code, 4 octets of seconds + 2 of 1/65536 s (Unix epoch)
+SECONDARY_HEADER_FIELDS = [('time_coarse', '>u4'), ('time_fine', '>u2')]
+HOUSEKEEPING_FIELDS = [
+    ('position_km', '>f4', (3,)),
+    ('velocity_km_s', '>f4', (3,)),
+    ('battery_temp_c', '>f4'),
+    ('power_w', '>f4'),
+    ('attitude_deg', '>f4', (3,)),   # roll, pitch, yaw error
+]
+
+PACKET_TYPE_TELEMETRY = 0        # top four bits: version 1 ('000'), type telemetry ('0')
+SECONDARY_HEADER_FLAG = 0x0800
+UNSEGMENTED = 0xC000             # sequence flags '11': standalone packet
+APID_MASK = 0x07FF
+SEQUENCE_COUNT_MASK = 0x3FFF
+
+# Batch validation reason bits (one uint16 per packet, 0 = passed every check)
+BAD_HEADER = 1 << 0              # version / type / secondary-header flag / length mismatch
+MISSING_FIELD = 1 << 1           # NaN or infinite required field
+OUT_OF_RANGE = 1 << 2
+RATE_OF_CHANGE = 1 << 3
+NON_MONOTONIC = 1 << 4           # not after the preceding packet of the same APID
+STALE = 1 << 5
+FUTURE_TIMESTAMP = 1 << 6
+VALIDATION_REASONS = {
+    BAD_HEADER: 'bad_header',
+    MISSING_FIELD: 'missing_field',
+    OUT_OF_RANGE: 'out_of_range',
+    RATE_OF_CHANGE: 'rate_of_change',
+    NON_MONOTONIC: 'non_monotonic',
+    STALE: 'stale',
+    FUTURE_TIMESTAMP: 'future_timestamp',
+}
+# Packets with these bits cannot be stored (the store needs per-satellite time order)
+DEFAULT_REJECT = BAD_HEADER | MISSING_FIELD | NON_MONOTONIC | FUTURE_TIMESTAMP
+# Physical limits; vector fields are checked by magnitude
+FIELD_LIMITS = {
+    'position_km': (EARTH_RADIUS_KM + 100.0, EARTH_RADIUS_KM + 50000.0),
+    'velocity_km_s': (1.0, 12.0),
+    'battery_temp_c': (-40.0, 80.0),
+    'power_w': (0.0, 2000.0),
+    'attitude_deg': (0.0, 45.0),
+}
+# Largest plausible change per second between consecutive packets of one APID
+RATE_LIMITS = {
+    'position_km': 12.0,
+    'battery_temp_c': 2.0,
+    'power_w': 250.0,
+    'attitude_deg': 10.0,
+}
+MAX_AGE_SECONDS = 300.0
+MAX_CLOCK_SKEW_SECONDS = 5.0
+
+
+def frame_dtype(payload_fields: Sequence[Tuple] = HOUSEKEEPING_FIELDS) -> np.dtype:
+    """
+    Packed structured dtype of one packet: primary header, time code, then the payload
+
+    Args:
+        payload_fields: NumPy field specs (name, big-endian type[, shape]) in wire order
+    """
+    return np.dtype(PRIMARY_HEADER_FIELDS + SECONDARY_HEADER_FIELDS + list(payload_fields))
+
+
+HOUSEKEEPING_DTYPE = frame_dtype()
+
+
+def decode_frames(buffer: Union[bytes, bytearray, memoryview, np.ndarray],
+                  dtype: np.dtype = HOUSEKEEPING_DTYPE, count: int = -1, offset: int = 0,
+                  validate: bool = True) -> np.ndarray:
+    """
+    Map a buffer of back-to-back fixed-layout packets onto a structured array
+
+    No bytes are copied: every field of the result is a strided view into
+    buffer (read-only for bytes input), and the big-endian fields are
+    byte-swapped by NumPy on use.
+
+    Args:
+        buffer: Packets as received
+        dtype: Layout from frame_dtype
+        count: Number of packets (-1: as many as the buffer holds)
+        offset: Byte offset of the first packet
+        validate: Check packet version, type, secondary-header flag and length
+
+    Returns:
+        (K,) structured array of packets
+
+    Raises:
+        ValueError: The buffer is not a whole number of packets, or packets
+            do not match the layout
+    """
+    size = (len(buffer) if not isinstance(buffer, np.ndarray) else buffer.nbytes) - offset
+    if count < 0 and size % dtype.itemsize:
+        raise ValueError(f"Buffer of {size} bytes is not a whole number of "
+                         f"{dtype.itemsize}-byte packets")
+    frames = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+
+    if validate and len(frames):
+        bad = _bad_headers(frames)
+        if bad.any():
+            raise ValueError(f"{int(bad.sum())} of {len(frames)} packets do not match the "
+                             f"{dtype.itemsize}-byte layout (first at index {int(np.argmax(bad))})")
+    return frames
+
+
+def _bad_headers(frames: np.ndarray) -> np.ndarray:
+    packet_id = frames['packet_id']
+    bad = ((packet_id >> 12) != PACKET_TYPE_TELEMETRY) | ((packet_id & SECONDARY_HEADER_FLAG) == 0)
+    return bad | (frames['data_length'] != frames.dtype.itemsize - 7)
+
+
+def frame_apids(frames: np.ndarray) -> np.ndarray:
+    """Application process IDs (11 bits) of decoded packets"""
+    return frames['packet_id'] & APID_MASK
+
+
+def frame_sequence_counts(frames: np.ndarray) -> np.ndarray:
+    """Per-APID packet sequence counts (14 bits, wrapping)"""
+    return frames['sequence'] & SEQUENCE_COUNT_MASK
+
+
+def frame_times(frames: np.ndarray) -> np.ndarray:
+    """Packet time codes as float64 Unix seconds"""
+    return frames['time_coarse'] + frames['time_fine'] / 65536.0
+
+
+def encode_frames(apids: Union[int, np.ndarray], timestamps: np.ndarray,
+                  payload: Dict[str, np.ndarray], sequence_counts: Optional[np.ndarray] = None,
+                  dtype: np.dtype = HOUSEKEEPING_DTYPE) -> bytes:
+    """
+    Build packets for a batch of samples (simulators, tests and replay)
+
+    Args:
+        apids: Application process ID per packet (or one for all)
+        timestamps: (K,) Unix seconds
+        payload: Column per payload field of dtype; missing fields are zero
+        sequence_counts: Per-packet counts (default 0..K-1)
+        dtype: Layout from frame_dtype
+
+    Returns:
+        Concatenated packets
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    frames = np.zeros(len(timestamps), dtype=dtype)
+    if sequence_counts is None:
+        sequence_counts = np.arange(len(timestamps))
+    frames['packet_id'] = SECONDARY_HEADER_FLAG | (np.asarray(apids) & APID_MASK)
+    frames['sequence'] = UNSEGMENTED | (np.asarray(sequence_counts) & SEQUENCE_COUNT_MASK)
+    frames['data_length'] = dtype.itemsize - 7
+    coarse = np.floor(timestamps)
+    frames['time_coarse'] = coarse
+    frames['time_fine'] = np.minimum(np.round((timestamps - coarse) * 65536.0), 65535)
+    for name, values in payload.items():
+        frames[name] = values
+    return frames.tobytes()
+
+
+def housekeeping_channels(frames: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Telemetry store channels from decoded housekeeping packets
+
+    Returns:
+        battery_temp_c, power_w, attitude_deg (total pointing error),
+        altitude_km (above the equatorial radius) and velocity_km_s, each (K,)
+    """
+    return {
+        'battery_temp_c': frames['battery_temp_c'].astype(np.float32),
+        'power_w': frames['power_w'].astype(np.float32),
+        'attitude_deg': np.linalg.norm(frames['attitude_deg'].astype(np.float32), axis=-1),
+        'altitude_km': np.linalg.norm(frames['position_km'].astype(np.float32), axis=-1) - EARTH_RADIUS_KM,
+        'velocity_km_s': np.linalg.norm(frames['velocity_km_s'].astype(np.float32), axis=-1),
+    }
+
+
+def parse_telemetry(raw_data: bytes, dtype: np.dtype = HOUSEKEEPING_DTYPE) -> Dict:
     """
     Parse raw telemetry data into structured format
 
     Args:
-        raw_data: Raw telemetry bytes from satellite
+        raw_data: One housekeeping packet (further bytes are ignored)
+        dtype: Packet layout
 
     Returns:
         Parsed telemetry dictionary
+
+    Raises:
+        ValueError: raw_data is shorter than a packet or is not a telemetry packet
     """
-    # Implementation for parsing satellite telemetry
+    if len(raw_data) < dtype.itemsize:
+        raise ValueError(f"Telemetry packet needs {dtype.itemsize} bytes, got {len(raw_data)}")
+    frame = decode_frames(raw_data, dtype, count=1)
     telemetry = {
-        'timestamp': datetime.now(),
-        'position': np.array([0, 0, 0]),
-        'velocity': np.array([0, 0, 0]),
-        'temperature': 0.0,
-        'power': 0.0,
-        'attitude': np.array([0, 0, 0])
+        'timestamp': datetime.fromtimestamp(float(frame_times(frame)[0]), timezone.utc).replace(tzinfo=None),
+        'apid': int(frame_apids(frame)[0]),
+        'sequence_count': int(frame_sequence_counts(frame)[0]),
+        'position': frame['position_km'][0].astype(np.float64),
+        'velocity': frame['velocity_km_s'][0].astype(np.float64),
+        'temperature': float(frame['battery_temp_c'][0]),
+        'power': float(frame['power_w'][0]),
+        'attitude': frame['attitude_deg'][0].astype(np.float64),
     }
     return telemetry
 
@@ -57,24 +242,209 @@ def validate_telemetry(telemetry: Dict) -> Tuple[bool, List[str]]:
     return is_valid, errors
 
 
+def _native(column: np.ndarray) -> np.ndarray:
+    """Field in native byte order (much faster to compute on than big-endian strided views)"""
+    return column.astype(column.dtype.newbyteorder('='))
+
+
+def _magnitude(values: np.ndarray) -> np.ndarray:
+    """Scalars unchanged, vectors (last axis) by Euclidean norm"""
+    return np.sqrt(np.square(values) @ np.ones(values.shape[-1])) if values.ndim > 1 else values
+
+
+class FrameValidator:
+    """
+    Batch validation of decoded packets, one uint16 of reason bits per packet
+    - Required fields, physical ranges, rate of change and timestamp order
+      are checked as NumPy masks over the whole batch
+    - Order is judged per APID against the latest kept packet, rate against
+      the last kept packet that also passed the range and rate checks, both
+      within the batch and continuing from earlier batches
+    - Staleness and clock skew are checked when a reference time is given
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 rate_limits: Optional[Dict[str, float]] = None, required: Optional[Sequence[str]] = None,
+                 max_age_seconds: float = MAX_AGE_SECONDS,
+                 max_clock_skew_seconds: float = MAX_CLOCK_SKEW_SECONDS, reject: int = DEFAULT_REJECT):
+        """
+        Args:
+            limits: Field -> (low, high), default FIELD_LIMITS
+            rate_limits: Field -> largest change per second, default RATE_LIMITS
+            required: Fields that must be finite (default every payload field)
+            max_age_seconds: Older packets are STALE
+            max_clock_skew_seconds: Packets further ahead are FUTURE_TIMESTAMP
+            reject: Reason bits that keep a packet from becoming the APID's
+                reference for later order and rate checks (out of range and
+                too fast packets are never a rate reference either)
+        """
+        self.limits = FIELD_LIMITS if limits is None else limits
+        self.rate_limits = RATE_LIMITS if rate_limits is None else rate_limits
+        self.required = required
+        self.max_age_seconds = max_age_seconds
+        self.max_clock_skew_seconds = max_clock_skew_seconds
+        self.reject = reject
+        self.last_time = np.full(APID_MASK + 1, -np.inf)
+        self.reference_time = np.full(APID_MASK + 1, -np.inf)   # of the last rate reference per APID
+        self.last_values = {}           # field -> value of the last rate reference per APID
+
+    def validate(self, frames: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        """
+        Check a batch of packets from any mix of APIDs
+
+        Args:
+            frames: (K,) structured array from decode_frames (validate=False is fine)
+            now: Reference Unix time for the stale / future checks (skipped if None)
+
+        Returns:
+            (K,) uint16 reason bits, 0 where every check passed
+        """
+        n = len(frames)
+        if n == 0:
+            return np.zeros(0, dtype=np.uint16)
+
+        # Work on packets grouped by APID, arrival order kept within each group
+        apids = frame_apids(frames).astype(np.int64)
+        order = np.argsort(apids, kind='stable')
+        frames, apids = np.take(frames, order), apids[order]
+        first = np.empty(n, dtype=bool)
+        first[0], first[1:] = True, apids[1:] != apids[:-1]
+        times = frame_times(frames)
+
+        header = {name for name, *_ in PRIMARY_HEADER_FIELDS + SECONDARY_HEADER_FIELDS}
+        required = [name for name in frames.dtype.names if name not in header] if self.required is None \
+            else self.required
+        values = {name: _native(frames[name]).astype(np.float64)
+                  for name in set(required) | set(self.limits) | set(self.rate_limits)
+                  if name in frames.dtype.names}
+        # NaN / inf propagate into the magnitude, so it serves the missing and range checks
+        magnitudes = {name: _magnitude(column) for name, column in values.items()}
+
+        bad_header = _bad_headers(frames)
+        reasons = bad_header * np.uint16(BAD_HEADER)
+        missing = np.zeros(n, dtype=bool)
+        for name in required:
+            missing |= ~np.isfinite(magnitudes[name])
+        reasons |= missing * np.uint16(MISSING_FIELD)
+        out_of_range = np.zeros(n, dtype=bool)
+        for name, (low, high) in self.limits.items():
+            if name in magnitudes:
+                out_of_range |= (magnitudes[name] < low) | (magnitudes[name] > high)
+        reasons |= out_of_range * np.uint16(OUT_OF_RANGE)
+
+        future = np.zeros(n, dtype=bool)
+        if now is not None:
+            future = times - now > self.max_clock_skew_seconds
+            reasons |= (now - times > self.max_age_seconds) * np.uint16(STALE)
+            reasons |= future * np.uint16(FUTURE_TIMESTAMP)
+
+        # Latest earlier timestamp per APID: running max over groups offset so they never mix
+        usable = ~(bad_header | future)
+        origin = times[usable].min() - 1.0 if usable.any() else 0.0
+        relative = np.maximum(np.where(usable, times - origin, 0.0), 0.0)
+        seed = np.maximum(self.last_time[apids] - origin, 0.0)
+        span = max(relative.max(), seed.max()) + 1.0
+        offset = (np.cumsum(first) - 1) * span
+        running = np.maximum.accumulate(offset + relative) - offset
+        latest = np.maximum(seed, np.where(first, 0.0, np.concatenate([[0.0], running[:-1]])))
+        reasons |= (usable & (times - origin <= latest)) * np.uint16(NON_MONOTONIC)
+
+        # Change per second against the APID's last rate reference (kept, in range, not too fast).
+        # Being a reference depends on the packet's own rate check, so the flags are settled in
+        # passes: each pass gets at least one more packet per APID right, and a pass that changes
+        # nothing matches checking the packets one by one
+        rated = [name for name in self.rate_limits if name in values]
+        for name in rated:
+            if name not in self.last_values:
+                self.last_values[name] = np.zeros((APID_MASK + 1,) + values[name].shape[1:])
+        candidate = (reasons & (self.reject | MISSING_FIELD | OUT_OF_RANGE)) == 0
+        positions = np.arange(n)
+        group_start = np.maximum.accumulate(np.where(first, positions, 0))
+        too_fast = np.zeros(n, dtype=bool)
+        for _ in range(n):
+            latest = np.maximum.accumulate(np.where(candidate & ~too_fast, positions, -1))
+            before = np.concatenate([[-1], latest[:-1]])
+            carried = before < group_start      # no reference yet in this batch
+            before = np.maximum(before, 0)
+            dt = times - np.where(carried, self.reference_time[apids], times[before])
+            flagged = np.zeros(n, dtype=bool)
+            for name in rated:
+                current = values[name]
+                previous = np.where(carried.reshape((-1,) + (1,) * (current.ndim - 1)),
+                                    np.take(self.last_values[name], apids, axis=0), current[before])
+                flagged |= np.abs(_magnitude(current - previous)) > self.rate_limits[name] * dt
+            flagged &= dt > 0
+            if np.array_equal(flagged, too_fast):
+                break
+            too_fast = flagged
+        reasons |= too_fast * np.uint16(RATE_OF_CHANGE)
+
+        # The last packet kept per APID becomes the order reference for the next batch
+        kept = np.flatnonzero((reasons & self.reject) == 0)
+        if len(kept):
+            last = kept[np.append(apids[kept][1:] != apids[kept][:-1], True)]
+            self.last_time[apids[last]] = times[last]
+        references = np.flatnonzero(candidate & ~too_fast)
+        if len(references):
+            last = references[np.append(apids[references][1:] != apids[references][:-1], True)]
+            self.reference_time[apids[last]] = times[last]
+            for name, previous in self.last_values.items():
+                previous[apids[last]] = values[name][last]
+
+        unsorted = np.empty(n, dtype=np.uint16)
+        unsorted[order] = reasons
+        return unsorted
+
+
+def validate_frames(frames: np.ndarray, now: Optional[float] = None, **options) -> np.ndarray:
+    """One-off FrameValidator pass (each APID's first packet has no predecessor)"""
+    return FrameValidator(**options).validate(frames, now)
+
+
+def select_valid(frames: np.ndarray, reasons: np.ndarray, reject: int = DEFAULT_REJECT) -> np.ndarray:
+    """Packets without reject bits; the input itself (no copy) when all of them pass"""
+    keep = (reasons & reject) == 0
+    return frames if keep.all() else frames[keep]
+
+
+def reason_counts(reasons: np.ndarray) -> Dict[str, int]:
+    """Packets flagged per validation reason"""
+    return {name: int(np.count_nonzero(reasons & bit)) for bit, name in VALIDATION_REASONS.items()}
+
+
+def reason_names(reasons: int) -> List[str]:
+    """Names of the bits set in one packet's reasons"""
+    return [name for bit, name in VALIDATION_REASONS.items() if reasons & bit]
+
+
 def aggregate_telemetry(telemetry_list: List[Dict], window_seconds: int = 60) -> Dict:
     """
     Aggregate telemetry over time window
 
+    One-shot summary of a list of parsed samples; streams should feed a
+    WindowAggregator (tools.telemetry_aggregation) instead.
+
     Args:
         telemetry_list: List of telemetry samples
-        window_seconds: Aggregation window in seconds
+        window_seconds: Aggregation window in seconds, ending at the newest sample
 
     Returns:
         Aggregated telemetry statistics
     """
-    df = pd.DataFrame(telemetry_list)
+    if not telemetry_list:
+        return {'mean_temperature': np.nan, 'max_temperature': np.nan, 'mean_power': np.nan, 'sample_count': 0}
+
+    newest = max(sample['timestamp'] for sample in telemetry_list)
+    window = [sample for sample in telemetry_list
+              if (newest - sample['timestamp']).total_seconds() < window_seconds]
+    temperature = np.array([sample.get('temperature', np.nan) for sample in window], dtype=np.float64)
+    power = np.array([sample.get('power', np.nan) for sample in window], dtype=np.float64)
 
     aggregated = {
-        'mean_temperature': df['temperature'].mean(),
-        'max_temperature': df['temperature'].max(),
-        'mean_power': df['power'].mean(),
-        'sample_count': len(df)
+        'mean_temperature': np.nanmean(temperature) if np.isfinite(temperature).any() else np.nan,
+        'max_temperature': np.nanmax(temperature) if np.isfinite(temperature).any() else np.nan,
+        'mean_power': np.nanmean(power) if np.isfinite(power).any() else np.nan,
+        'sample_count': len(window)
     }
 
     return aggregated
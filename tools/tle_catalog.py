@@ -0,0 +1,309 @@
+"""
+TLE Catalog Store
+Columnar (struct-of-arrays) storage of mean elements with a memory-mapped cache
+"""
+
+import os
+import json
+import logging
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from sgp4.api import Satrec, SatrecArray
+
+from tools.orbital_mechanics import satellite_from_elements, MU_EARTH
+
+logger = logging.getLogger(__name__)
+
+TLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'tle_data.txt')
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', '.tle_cache')
+CACHE_VERSION = 1
+NAME_DTYPE = 'U24'  # TLE title lines are at most 24 characters
+
+CATALOG_COLUMNS = {
+    'norad_id': np.int32,
+    'epoch_jd': np.float64,
+    'epoch_fr': np.float64,
+    'bstar': np.float64,
+    'ndot': np.float64,
+    'nddot': np.float64,
+    'eccentricity': np.float64,
+    'inclination': np.float64,    # rad
+    'raan': np.float64,           # rad
+    'arg_perigee': np.float64,    # rad
+    'mean_anomaly': np.float64,   # rad
+    'mean_motion': np.float64,    # rad/min (Kozai)
+}
+
+
+def tle_checksum(line: str) -> int:
+    """
+    Compute the modulo-10 checksum of a TLE line
+
+    Digits count their value, minus signs count 1, everything else 0.
+    """
+    total = 0
+    for char in line[:68]:
+        if char.isdigit():
+            total += int(char)
+        elif char == '-':
+            total += 1
+    return total % 10
+
+
+def validate_tle_pair(line1: str, line2: str) -> Tuple[bool, List[str]]:
+    """
+    Validate TLE line structure and checksums
+
+    Returns:
+        (is_valid, error_messages)
+    """
+    errors = []
+
+    for number, line in (('1', line1), ('2', line2)):
+        if len(line) < 69 or not line.startswith(number + ' '):
+            errors.append(f"Malformed line {number}: {line[:20]!r}")
+        elif not line[68].isdigit() or int(line[68]) != tle_checksum(line):
+            errors.append(f"Checksum mismatch on line {number}")
+
+    if not errors and line1[2:7] != line2[2:7]:
+        errors.append(f"Catalog number mismatch: {line1[2:7]} vs {line2[2:7]}")
+
+    is_valid = len(errors) == 0
+    return is_valid, errors
+
+
+class TLECatalog:
+    """
+    Columnar store of TLE mean elements
+    - One contiguous NumPy array per element (struct-of-arrays)
+    - O(1) lookup by NORAD ID or object name
+    - Memory-mapped binary cache for fast restarts
+    """
+
+    def __init__(self, names: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.names = names
+        self.columns = columns
+        self._satellites = None
+        self._build_index()
+
+    def _build_index(self):
+        norad_ids = self.columns['norad_id'].tolist()
+        self.norad_index = {norad_id: i for i, norad_id in enumerate(norad_ids)}
+        self.name_index = {}
+        for i, name in enumerate(self.names.tolist()):
+            self.name_index.setdefault(name, i)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    @property
+    def norad_ids(self) -> np.ndarray:
+        return self.columns['norad_id']
+
+    @property
+    def semi_major_axis_km(self) -> np.ndarray:
+        """Semi-major axis derived from mean motion"""
+        mean_motion_rad_s = self.columns['mean_motion'] / 60.0
+        return np.cbrt(MU_EARTH / mean_motion_rad_s**2)
+
+    def index_of(self, key: Union[int, str]) -> int:
+        """Row index for a NORAD ID or object name"""
+        if isinstance(key, str):
+            return self.name_index[key]
+        return self.norad_index[int(key)]
+
+    def subset(self, keys: Sequence[Union[int, str]]) -> 'TLECatalog':
+        """Catalog restricted to the given objects (columns are copied)"""
+        rows = np.array([self.index_of(key) for key in keys], dtype=np.int64)
+        columns = {name: np.asarray(column[rows]) for name, column in self.columns.items()}
+        return TLECatalog(np.asarray(self.names[rows]), columns)
+
+    def satellite(self, key: Union[int, str]) -> Satrec:
+        """SGP4 record for one object"""
+        return self._make_satellite(self.index_of(key))
+
+    def satellites(self) -> SatrecArray:
+        """SGP4 records for the whole catalog, built once and reused"""
+        if self._satellites is None:
+            self._satellites = SatrecArray([self._make_satellite(i) for i in range(len(self))])
+        return self._satellites
+
+    def _make_satellite(self, i: int) -> Satrec:
+        c = self.columns
+        return satellite_from_elements(
+            c['norad_id'][i], c['epoch_jd'][i] + c['epoch_fr'][i], c['bstar'][i],
+            c['ndot'][i], c['nddot'][i], c['eccentricity'][i], c['arg_perigee'][i],
+            c['inclination'][i], c['mean_anomaly'][i], c['mean_motion'][i], c['raan'][i]
+        )
+
+    @classmethod
+    def from_satellites(cls, names: List[str], satellites: List[Satrec]) -> 'TLECatalog':
+        """Build a catalog from already-initialized SGP4 records"""
+        columns = {
+            'norad_id': [s.satnum for s in satellites],
+            'epoch_jd': [s.jdsatepoch for s in satellites],
+            'epoch_fr': [s.jdsatepochF for s in satellites],
+            'bstar': [s.bstar for s in satellites],
+            'ndot': [s.ndot for s in satellites],
+            'nddot': [s.nddot for s in satellites],
+            'eccentricity': [s.ecco for s in satellites],
+            'inclination': [s.inclo for s in satellites],
+            'raan': [s.nodeo for s in satellites],
+            'arg_perigee': [s.argpo for s in satellites],
+            'mean_anomaly': [s.mo for s in satellites],
+            'mean_motion': [s.no_kozai for s in satellites],
+        }
+        columns = {name: np.array(values, dtype=CATALOG_COLUMNS[name])
+                   for name, values in columns.items()}
+        return cls(np.array(names, dtype=NAME_DTYPE), columns)
+
+    @classmethod
+    def from_text(cls, text: str, strict: bool = False) -> 'TLECatalog':
+        """
+        Parse 3-line (or bare 2-line) TLE sets
+
+        Args:
+            text: TLE file contents
+            strict: Raise on the first invalid set instead of skipping it
+
+        Returns:
+            Parsed catalog
+        """
+        lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+        names, satellites = [], []
+        rejected = 0
+
+        i = 0
+        while i < len(lines) - 1:
+            if lines[i].startswith('1 ') and lines[i + 1].startswith('2 '):
+                name, line1, line2 = lines[i][2:7].strip(), lines[i], lines[i + 1]
+                i += 2
+            elif i + 2 < len(lines):
+                name, line1, line2 = lines[i].strip(), lines[i + 1], lines[i + 2]
+                i += 3
+            else:
+                break
+
+            is_valid, errors = validate_tle_pair(line1, line2)
+            if not is_valid:
+                if strict:
+                    raise ValueError(f"Invalid TLE for {name}: {'; '.join(errors)}")
+                logger.warning(f"Skipping TLE for {name}: {'; '.join(errors)}")
+                rejected += 1
+                continue
+
+            names.append(name)
+            satellites.append(Satrec.twoline2rv(line1, line2))
+
+        if rejected:
+            logger.warning(f"Rejected {rejected} invalid TLE sets")
+        return cls.from_satellites(names, satellites)
+
+    @classmethod
+    def from_file(cls, path: str = TLE_PATH,
+                  cache_dir: Optional[str] = CACHE_DIR) -> 'TLECatalog':
+        """
+        Load a TLE file, reusing the binary cache when it is up to date
+
+        Args:
+            path: TLE text file
+            cache_dir: Cache directory (None disables caching)
+
+        Returns:
+            Loaded catalog
+        """
+        stamp = _source_stamp(path)
+
+        if cache_dir is not None:
+            catalog = cls.load_cache(cache_dir, stamp)
+            if catalog is not None:
+                return catalog
+
+        with open(path) as f:
+            catalog = cls.from_text(f.read())
+
+        if cache_dir is not None:
+            try:
+                catalog.save_cache(cache_dir, stamp)
+            except OSError as e:
+                logger.warning(f"Could not write TLE cache: {e}")
+
+        logger.info(f"Parsed {len(catalog)} TLE sets from {path}")
+        return catalog
+
+    def save_cache(self, cache_dir: str, stamp: Optional[Dict] = None):
+        """Write one .npy file per column plus a metadata stamp"""
+        os.makedirs(cache_dir, exist_ok=True)
+        meta_path = os.path.join(cache_dir, 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        np.save(os.path.join(cache_dir, 'names.npy'), self.names)
+        for name in CATALOG_COLUMNS:
+            np.save(os.path.join(cache_dir, f'{name}.npy'), self.columns[name])
+
+        # Metadata is written last so a partial cache is never considered valid
+        meta = {'version': CACHE_VERSION, 'count': len(self), 'source': stamp or {}}
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load_cache(cls, cache_dir: str,
+                   stamp: Optional[Dict] = None) -> Optional['TLECatalog']:
+        """
+        Memory-map a cached catalog
+
+        Returns:
+            The catalog, or None if the cache is missing or stale
+        """
+        meta_path = os.path.join(cache_dir, 'meta.json')
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get('version') != CACHE_VERSION:
+            return None
+        if stamp is not None and meta.get('source') != stamp:
+            return None
+
+        try:
+            names = np.load(os.path.join(cache_dir, 'names.npy'), mmap_mode='r')
+            columns = {name: np.load(os.path.join(cache_dir, f'{name}.npy'), mmap_mode='r')
+                       for name in CATALOG_COLUMNS}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable TLE cache: {e}")
+            return None
+
+        if len(names) != meta.get('count'):
+            return None
+        return cls(names, columns)
+
+
+def _source_stamp(path: str) -> Dict:
+    """Identify a TLE file version by size and modification time"""
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+_shared_catalog = None
+
+
+def get_catalog(reload: bool = False) -> TLECatalog:
+    """
+    Shared process-wide catalog used by the orbit, collision and dashboard paths
+
+    Args:
+        reload: Re-read the TLE file (picking up new element sets)
+
+    Returns:
+        The shared catalog
+    """
+    global _shared_catalog
+    if _shared_catalog is None or reload:
+        _shared_catalog = TLECatalog.from_file()
+    return _shared_catalog
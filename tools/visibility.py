@@ -0,0 +1,235 @@
+"""
+Ground Station Visibility
+AOS/LOS/max-elevation pass prediction with a coarse vectorized sweep and bracketed refinement
+"""
+
+import logging
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from tools.orbital_mechanics import propagate_batch, time_grid, SECONDS_PER_DAY
+from tools.ephemeris_cache import hermite_interpolate
+from tools.tle_catalog import TLECatalog
+from tools.frames import gmst, teme_to_ecef, geodetic_to_ecef
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GROUND_STATIONS = [
+    {'name': 'Svalbard', 'latitude_deg': 78.23, 'longitude_deg': 15.41, 'altitude_km': 0.50, 'min_elevation_deg': 5.0},
+    {'name': 'Fairbanks', 'latitude_deg': 64.86, 'longitude_deg': -147.85, 'altitude_km': 0.20, 'min_elevation_deg': 5.0},
+    {'name': 'Wallops', 'latitude_deg': 37.94, 'longitude_deg': -75.46, 'altitude_km': 0.01, 'min_elevation_deg': 5.0},
+    {'name': 'Hartebeesthoek', 'latitude_deg': -25.89, 'longitude_deg': 27.69, 'altitude_km': 1.54, 'min_elevation_deg': 5.0},
+]
+
+ROOT_ITERATIONS = 8       # Illinois method on a 60 s bracket -> sub-millisecond
+GOLDEN_ITERATIONS = 16    # peak time to ~1 s over a 10 min pass
+_INV_PHI = (np.sqrt(5) - 1) / 2
+
+
+def station_geometry(station: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Earth-fixed position and local zenith unit vector of a ground station (WGS84)
+
+    Returns:
+        (position_km, up_unit_vector)
+    """
+    lat = np.radians(station['latitude_deg'])
+    lon = np.radians(station['longitude_deg'])
+    position = geodetic_to_ecef(station['latitude_deg'], station['longitude_deg'],
+                                station.get('altitude_km', 0.0))
+    up = np.array([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+    return position, up
+
+
+def _sin_elevation(ecef: np.ndarray, station_pos: np.ndarray, up: np.ndarray,
+                   radius_sq: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Sine of the elevation angle of Earth-fixed positions seen from a station
+
+    |r - s|^2 is expanded as |r|^2 - 2 r.s + |s|^2 so no (..., 3) range
+    vectors are materialized; pass radius_sq (|r|^2) when it is reused.
+    """
+    if radius_sq is None:
+        radius_sq = np.einsum('...i,...i->...', ecef, ecef)
+    projections = ecef @ np.column_stack([up, station_pos])
+    range_km = np.sqrt(radius_sq - 2 * projections[..., 1] + station_pos @ station_pos)
+    return (projections[..., 0] - station_pos @ up) / range_km
+
+
+class _Sweep:
+    """Coarse-grid ephemeris of a batch of satellites with Hermite evaluation between samples"""
+
+    def __init__(self, catalog: TLECatalog, start: datetime, duration_hours: float, step_seconds: float):
+        self.step = step_seconds
+        self.duration = duration_hours * 3600
+        self.jd, self.fr = time_grid(start, duration_hours, step_seconds)
+        self.positions, self.velocities = propagate_batch(catalog.satellites(), self.jd, self.fr)
+        self.theta = gmst(self.jd, self.fr)
+        self.ecef = teme_to_ecef(self.positions, self.theta[None, :])
+        self.radius_sq = np.einsum('...i,...i->...', self.ecef, self.ecef)
+
+    def sin_elevation_at(self, sat: np.ndarray, t: np.ndarray,
+                         station_pos: np.ndarray, up: np.ndarray) -> np.ndarray:
+        """sin(elevation) for satellite indices sat at offsets t (seconds from start)"""
+        t = np.clip(t, 0.0, self.duration)
+        k = np.minimum(np.floor(t / self.step).astype(np.int64), len(self.jd) - 2)
+        s = t / self.step - k
+        positions, _ = hermite_interpolate(
+            self.positions[sat, k], self.velocities[sat, k],
+            self.positions[sat, k + 1], self.velocities[sat, k + 1],
+            s, self.step
+        )
+        theta = gmst(self.jd[0], self.fr[0] + t / SECONDS_PER_DAY)
+        return _sin_elevation(teme_to_ecef(positions, theta), station_pos, up)
+
+
+def _refine_crossings(sweep: _Sweep, sat: np.ndarray, k: np.ndarray, f_lo: np.ndarray,
+                      f_hi: np.ndarray, station_pos: np.ndarray, up: np.ndarray,
+                      sin_mask: float) -> np.ndarray:
+    """
+    Refine mask crossings bracketed by grid intervals k (vectorized Illinois method)
+
+    f_lo and f_hi are sin(elevation) - sin(mask) at the bracket ends and have
+    opposite signs; the bracket is kept throughout, so the root never escapes.
+    """
+    a, b = k * sweep.step, (k + 1) * sweep.step
+    fa, fb = f_lo, f_hi
+    for _ in range(ROOT_ITERATIONS):
+        denominator = fb - fa
+        c = np.where(denominator != 0, b - fb * (b - a) / np.where(denominator != 0, denominator, 1), b)
+        fc = sweep.sin_elevation_at(sat, c, station_pos, up) - sin_mask
+        flip = fc * fb < 0
+        a, fa = np.where(flip, b, a), np.where(flip, fb, 0.5 * fa)
+        b, fb = c, fc
+    return b
+
+
+def _golden_maximum(sweep: _Sweep, sat: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+                    station_pos: np.ndarray, up: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Locate the elevation peak of each pass (vectorized golden-section search)"""
+    a, b = lo.copy(), hi.copy()
+    c = b - _INV_PHI * (b - a)
+    d = a + _INV_PHI * (b - a)
+    fc = sweep.sin_elevation_at(sat, c, station_pos, up)
+    fd = sweep.sin_elevation_at(sat, d, station_pos, up)
+    for _ in range(GOLDEN_ITERATIONS):
+        left = fc > fd
+        b = np.where(left, d, b)
+        a = np.where(left, a, c)
+        new_c = np.where(left, b - _INV_PHI * (b - a), d)
+        new_d = np.where(left, c, a + _INV_PHI * (b - a))
+        f_new = sweep.sin_elevation_at(sat, np.where(left, new_c, new_d), station_pos, up)
+        fc, fd = np.where(left, f_new, fd), np.where(left, fc, f_new)
+        c, d = new_c, new_d
+    t_peak = 0.5 * (a + b)
+    return t_peak, sweep.sin_elevation_at(sat, t_peak, station_pos, up)
+
+
+def _predict_chunk(catalog: TLECatalog, stations: Sequence[Dict], start: datetime,
+                   duration_hours: float, step_seconds: float) -> List[Dict]:
+    """Predict passes for every satellite of a (sub-)catalog against every station"""
+    sweep = _Sweep(catalog, start, duration_hours, step_seconds)
+    n_epochs = len(sweep.jd)
+    passes = []
+
+    for station in stations:
+        station_pos, up = station_geometry(station)
+        sin_mask = np.sin(np.radians(station.get('min_elevation_deg', 5.0)))
+
+        margin = _sin_elevation(sweep.ecef, station_pos, up, sweep.radius_sq) - sin_mask
+        above = margin > 0
+        # Pad each row with "below" so every pass has exactly one start and one end
+        padded = np.zeros((above.shape[0], n_epochs + 2), dtype=np.int8)
+        padded[:, 1:-1] = above
+        change = np.diff(padded, axis=1)
+        sat_start, j_start = np.nonzero(change == 1)
+        sat_end, j_end = np.nonzero(change == -1)
+        if len(sat_start) == 0:
+            continue
+
+        aos = np.zeros(len(sat_start))
+        refine = j_start > 0
+        sat, j = sat_start[refine], j_start[refine]
+        aos[refine] = _refine_crossings(sweep, sat, j - 1, margin[sat, j - 1], margin[sat, j],
+                                        station_pos, up, sin_mask)
+
+        los = np.full(len(sat_end), sweep.duration, dtype=np.float64)
+        refine = j_end < n_epochs
+        sat, j = sat_end[refine], j_end[refine]
+        los[refine] = _refine_crossings(sweep, sat, j - 1, margin[sat, j - 1], margin[sat, j],
+                                        station_pos, up, sin_mask)
+
+        t_peak, sin_peak = _golden_maximum(sweep, sat_start, aos, los, station_pos, up)
+        max_elevation = np.degrees(np.arcsin(np.clip(sin_peak, -1.0, 1.0)))
+
+        for i in range(len(sat_start)):
+            sat = sat_start[i]
+            passes.append({
+                'satellite': str(catalog.names[sat]),
+                'norad_id': int(catalog.norad_ids[sat]),
+                'station': station['name'],
+                'aos': start + timedelta(seconds=float(aos[i])),
+                'los': start + timedelta(seconds=float(los[i])),
+                'max_elevation_time': start + timedelta(seconds=float(t_peak[i])),
+                'max_elevation_deg': float(max_elevation[i]),
+                'duration_seconds': float(los[i] - aos[i]),
+            })
+
+    return passes
+
+
+def predict_passes(catalog: TLECatalog,
+                   stations: Sequence[Dict] = DEFAULT_GROUND_STATIONS,
+                   start: Optional[datetime] = None,
+                   duration_hours: float = 24.0,
+                   step_seconds: float = 60.0,
+                   satellites: Optional[Sequence[Union[int, str]]] = None,
+                   workers: int = 1,
+                   chunk_size: int = 500) -> List[Dict]:
+    """
+    Predict ground station passes (AOS, LOS and maximum elevation)
+
+    The horizon is swept on a coarse grid for all satellites and stations at
+    once. Each horizon crossing is then refined by the Illinois (bracketed
+    false position) method and each peak by golden-section search, both on
+    Hermite-interpolated states. Passes shorter than one grid step can be
+    missed, so keep step_seconds well below the shortest pass of interest.
+
+    Args:
+        catalog: Element source
+        stations: Ground stations (name, latitude_deg, longitude_deg, altitude_km, min_elevation_deg)
+        start: Window start (UTC); defaults to now
+        duration_hours: Prediction horizon
+        step_seconds: Coarse sweep spacing
+        satellites: NORAD IDs or names to include (default: whole catalog)
+        workers: Number of worker processes (1 runs in-process)
+        chunk_size: Satellites per worker task
+
+    Returns:
+        List of pass dicts sorted by AOS
+    """
+    start = start or datetime.now(timezone.utc)
+    if start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+
+    if satellites is not None:
+        catalog = catalog.subset(satellites)
+
+    if workers <= 1 or len(catalog) <= chunk_size:
+        passes = _predict_chunk(catalog, stations, start, duration_hours, step_seconds)
+    else:
+        keys = catalog.norad_ids.tolist()
+        chunks = [catalog.subset(keys[i:i + chunk_size]) for i in range(0, len(keys), chunk_size)]
+        passes = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_predict_chunk, chunk, stations, start, duration_hours, step_seconds)
+                       for chunk in chunks]
+            for future in futures:
+                passes.extend(future.result())
+
+    passes.sort(key=lambda p: p['aos'])
+    logger.info(f"Predicted {len(passes)} passes for {len(catalog)} satellites "
+                f"over {len(stations)} stations")
+    return passes